@@ -2,6 +2,8 @@
 Advanced Stats Ranking API エンドポイント
 Statcast ベースの高度指標ランキング (P1-P7, B1-B7)
 """
+from typing import List
+
 from fastapi import APIRouter, Query, HTTPException
 
 from backend.app.services.advanced_stats_service import AdvancedStatsService
@@ -9,6 +11,19 @@ from backend.app.services.advanced_stats_service import AdvancedStatsService
 router = APIRouter(tags=["Advanced Stats"])
 service = AdvancedStatsService()
 
+MAX_BULK_TREND_PLAYERS = 50
+
+
+def _bulk_ids(ids: List[int]) -> tuple:
+    """重複を除いた選手 ID（順序は保つ）。件数上限を超えたら 400"""
+    unique = tuple(dict.fromkeys(ids))
+    if len(unique) > MAX_BULK_TREND_PLAYERS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many players: {len(unique)} (max {MAX_BULK_TREND_PLAYERS})",
+        )
+    return unique
+
 
 # ==============================================================
 # P2: Pressure Dominance Index
@@ -337,6 +352,18 @@ async def search_pitchers(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/advanced-stats/pitching/trends")
+async def get_pitcher_trends_bulk(
+    ids: List[int] = Query(..., description="投手 ID（?ids=1&ids=2 のように複数指定）"),
+):
+    """複数投手の全メトリクス・全シーズントレンドを一括取得（比較ページ用）"""
+    pitcher_ids = _bulk_ids(ids)
+    try:
+        return await service.get_pitcher_trends_bulk(pitcher_ids=pitcher_ids)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/advanced-stats/pitching/trends/{pitcher_id}")
 async def get_pitcher_trends(pitcher_id: int):
     """投手の全メトリクス・全シーズントレンド取得"""
@@ -362,6 +389,18 @@ async def search_batters(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/advanced-stats/batting/trends")
+async def get_batter_trends_bulk(
+    ids: List[int] = Query(..., description="打者 ID（?ids=1&ids=2 のように複数指定）"),
+):
+    """複数打者の全メトリクス・全シーズントレンドを一括取得（比較ページ用）"""
+    batter_ids = _bulk_ids(ids)
+    try:
+        return await service.get_batter_trends_bulk(batter_ids=batter_ids)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/advanced-stats/batting/trends/{batter_id}")
 async def get_batter_trends(batter_id: int):
     """打者の全メトリクス・全シーズントレンド取得"""
@@ -2,7 +2,7 @@ from fastapi import APIRouter, HTTPException, Request
 from typing import Optional, List, Any, Dict, AsyncGenerator
 from uuid import uuid4
 # サービス層とスキーマをインポート
-from backend.app.services.ai_service import get_ai_response_with_simple_chart # For Development, add backend. path
+from backend.app.services.ai_service import get_ai_response_with_simple_chart, stream_ai_response_for_qna # For Development, add backend. path
 # 新しいインポート（テスト用）
 # from backend.app.services.ai_service_refactored import get_ai_response_with_simple_chart
 from backend.app.services.conversation_service import get_conversation_service
@@ -231,6 +231,118 @@ async def get_player_stats_qna_endpoint(
 
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
+@router.post(
+    "/qa/player-stats-stream",
+    summary="選手/チームの統計情報に関するQ&AをAIで生成 (ストリーミング版)",
+    description="/qa/player-stats と同じ処理で、ナラティブ回答をトークン単位の Server-Sent Events で返します。",
+    tags=["players"],
+    response_class=StreamingResponse
+)
+@limiter.limit(_player_stats_limit)
+async def get_player_stats_qna_stream_endpoint(
+    request_body: QnARequest,
+    request: Request,
+) -> StreamingResponse:
+    """
+    /qa/player-stats のストリーミング版。
+    回答生成の完了を待たず、LLM の最初の断片から token イベントとして送信する。
+    最後に /qa/player-stats と同じ形のレスポンスを final_answer イベントで返す。
+    """
+    session_id = request_body.session_id or str(uuid4())
+    set_session_id(session_id)
+    reset_bq_latency_ms()
+
+    # トークンバジェットチェック
+    token_budget = get_token_budget_service()
+    if token_budget.is_budget_exceeded("chat"):
+        from starlette.responses import JSONResponse
+        return JSONResponse(
+            status_code=503,
+            content={
+                "error": "Service at capacity",
+                "detail": "本日のAI分析サービスの利用上限に達しました。明日以降に再度お試しください。",
+                "session_id": session_id,
+                "service_at_capacity": True,
+            },
+        )
+
+    llm_logger = get_llm_logger()
+    log_entry = LLMLogEntry()
+    log_entry.request_id = get_request_id()
+    log_entry.user_id = getattr(request.state, "user_id", "anonymous")
+    log_entry.session_id = session_id
+    log_entry.user_query = request_body.query
+    log_entry.endpoint = "/qa/player-stats-stream"
+    log_entry.prompt_name = "parse_query"
+    log_entry.prompt_version = get_prompt_version("parse_query")
+    stream_start_time = time.time()
+
+    async def event_generator() -> AsyncGenerator[Dict[str, Any], None]:
+        """SSEイベントを生成する非同期ジェネレーター"""
+        yield {
+            "type": "session_start",
+            "session_id": session_id,
+            "query": request_body.query
+        }
+
+        # ★ Guardrail チェック
+        from backend.app.services.security_guardrail import get_security_guardrail
+        is_safe, reason = get_security_guardrail().validate_and_log(request_body.query)
+        if not is_safe:
+            yield {
+                "type": "error",
+                "error_type": "blocked",
+                "message": "申し訳ございませんが、このリクエストにはお応えできません。MLB統計に関する質問をお願いいたします。",
+                "detected_pattern": reason,
+            }
+            return
+
+        try:
+            first_token_ms = None
+            async for event in stream_ai_response_for_qna(
+                request_body.query, request_body.season, session_id=session_id
+            ):
+                if event["type"] == "token" and first_token_ms is None:
+                    first_token_ms = (time.time() - stream_start_time) * 1000
+                    logger.info(f"⚡ First narrative token after {first_token_ms:.0f}ms")
+                if event["type"] == "final_answer":
+                    event["session_id"] = session_id
+                    log_entry.response_answer = event.get("answer", "")
+                    log_entry.response_has_table = event.get("isTable", False)
+                    log_entry.response_has_chart = event.get("isChart", False)
+                yield event
+
+            yield {
+                "type": "stream_end",
+                "message": "処理が完了しました"
+            }
+            log_entry.success = True
+        except Exception as e:
+            logger.error(f"❌ Stream Error: {str(e)}", exc_info=True)
+            log_entry.success = False
+            log_entry.error_type = "stream_error"
+            log_entry.error_message = str(e)
+            get_monitoring_service().record_api_error("/qa/player-stats-stream", "stream_error")
+            yield {
+                "type": "error",
+                "error_type": "internal_error",
+                "message": str(e)
+            }
+        finally:
+            log_entry.total_latency_ms = (time.time() - stream_start_time) * 1000
+            log_entry.bigquery_latency_ms = get_bq_latency_ms() or None
+            llm_logger.log(log_entry)
+
+    return StreamingResponse(
+        stream_json_events(event_generator()),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",  # Nginxのバッファリングを無効化
+        }
+    )
+
 # ★★★ 新規エンドポイント: 会話履歴取得 ★★★
 @router.get(
     "/qa/history/{session_id}",
@@ -335,8 +447,8 @@ async def get_agentic_stats_endpoint(
     logger.info(f"🤖 Agentic Request: query='{body.query}', session_id={session_id}")
 
     try:
-        # 自律型エージェントの実行
-        result_state = run_mlb_agent(body.query)
+        # 自律型エージェントの実行（同期 I/O のためイベントループを塞がないよう別スレッドへ）
+        result_state = await asyncio.to_thread(run_mlb_agent, body.query)
         
         # 1. 回答の取得（final_answer または 最後のメッセージから）
         answer = result_state.get("final_answer", "")
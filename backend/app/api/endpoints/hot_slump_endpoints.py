@@ -1,3 +1,4 @@
+import asyncio
 from fastapi import APIRouter, HTTPException, Query
 from typing import Optional
 import logging
@@ -21,7 +22,7 @@ async def get_hot_slump_batters_endpoint(
     game_date: Optional[str] = Query(None, description="基準日 YYYY-MM-DD。省略時は最新日"),
     top_n: int = Query(10, ge=1, le=30, description="取得件数"),
 ):
-    data = get_hot_slump_batters(metric=metric, period=period, game_date=game_date, top_n=top_n)
+    data = await asyncio.to_thread(get_hot_slump_batters, metric=metric, period=period, game_date=game_date, top_n=top_n)
     if data is None:
         raise HTTPException(status_code=500, detail="Failed to fetch hot/slump data.")
     return data
@@ -35,7 +36,7 @@ async def get_hot_slump_batters_endpoint(
 async def get_available_dates_endpoint(
     period: int = Query(7, description="集計期間 (7 または 15)"),
 ):
-    dates = get_available_dates(period=period)
+    dates = await asyncio.to_thread(get_available_dates, period=period)
     if dates is None:
         raise HTTPException(status_code=500, detail="Failed to fetch available dates.")
     return {"dates": dates}
@@ -1,3 +1,4 @@
+import asyncio
 from fastapi import APIRouter, HTTPException, Path, Query
 from typing import Optional, List, Any, Dict
 import logging
@@ -38,7 +39,7 @@ async def get_batting_leaderboard_endpoint(
     """
     
     # Get data from the service layer
-    leaderboard_data = get_batting_leaderboard(season, league, min_pa, metric_order)
+    leaderboard_data = await asyncio.to_thread(get_batting_leaderboard, season, league, min_pa, metric_order)
 
     # If no data is found, raise a 404 error
     if leaderboard_data is None:
@@ -100,7 +101,7 @@ async def get_pitching_leaderboard_endpoint(
     データが見つからない場合は404エラーを返します。
     """
     # Get data from the service layer
-    leaderboard_data = get_pitching_leaderboard(season, league, min_ip, metric_order)
+    leaderboard_data = await asyncio.to_thread(get_pitching_leaderboard, season, league, min_ip, metric_order)
 
     # If no data is found, raise a 404 error
     if leaderboard_data is None:
@@ -1,12 +1,19 @@
 """
 MLB リアルタイム試合速報 エンドポイント
 """
+import asyncio
+import logging
 from fastapi import APIRouter, HTTPException, Query
-from typing import List
+from fastapi.responses import StreamingResponse
+from typing import AsyncGenerator, List
 from datetime import datetime
 
 from backend.app.services.live_game_service import LiveGameService
 from backend.app.services.live_fatigue_service import LiveFatigueService
+from backend.app.services.live_game_hub import get_live_game_hub
+from backend.app.utils.streaming import format_sse
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["Live Games"])
 service = LiveGameService()
@@ -73,7 +80,7 @@ async def get_pitcher_baselines(
 ):
     """複数投手のシーズン平均球速ベースライン（イニング1）を一括取得"""
     try:
-        return fatigue_service.get_pitcher_baselines(pitchers, season)
+        return await asyncio.to_thread(fatigue_service.get_pitcher_baselines, pitchers, season)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -87,6 +94,39 @@ async def get_today_live_games():
     - Live 試合がない場合は空配列を返す
     """
     try:
-        return await service.get_today_live_games()
+        # ハブの直近スナップショットを返す（閲覧者数に関係なく上流取得は poll 間隔ごとに 1 回）
+        return await get_live_game_hub().get_snapshot()
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/live/games/stream")
+async def stream_live_games():
+    """
+    本日の試合状態を SSE で配信する
+
+    - event: snapshot — 接続直後（と取りこぼし後）の全量。形式は /live/games/today と同じ
+    - event: diff — 変化した試合（upsert）、Live でなくなった gamePk（removed）、
+      変化があった場合のみ final / preview
+    """
+    async def event_generator() -> AsyncGenerator[str, None]:
+        try:
+            async for event in get_live_game_hub().subscribe():
+                if event is None:
+                    # プロキシにアイドル切断されないための keep-alive コメント
+                    yield ": keep-alive\n\n"
+                else:
+                    yield format_sse(event, event=event["type"])
+        except Exception as e:
+            logger.error(f"Live game stream error: {e}", exc_info=True)
+            yield format_sse({"type": "error", "message": str(e)}, event="error")
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",  # Nginxのバッファリングを無効化
+        },
+    )
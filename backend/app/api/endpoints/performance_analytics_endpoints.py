@@ -1,3 +1,4 @@
+import asyncio
 from fastapi import APIRouter, HTTPException, Path, Query
 from typing import Optional, List, Any, Dict
 import logging
@@ -45,7 +46,7 @@ async def get_season_batting_stats_endpoint(
     metrics_tuple = tuple(metrics) if metrics else ()
 
     # Get data from the service layer
-    stats_data = get_season_batting_stats(player_id, season, metrics_tuple)
+    stats_data = await asyncio.to_thread(get_season_batting_stats, player_id, season, metrics_tuple)
 
     # If no data is found, raise a 404 error
     if stats_data is None:
@@ -76,7 +77,7 @@ async def get_batter_season_splits_stats_endpoint(
     metrics_tuple = tuple(metrics) if metrics else ()
 
     # Get data from the service layer
-    stats_data = get_batter_season_splits_stats(player_id, season, split_type, metrics_tuple)
+    stats_data = await asyncio.to_thread(get_batter_season_splits_stats, player_id, season, split_type, metrics_tuple)
 
     # If no data is found, raise a 404 error
     if stats_data is None:
@@ -105,7 +106,7 @@ async def get_monthly_batting_stats_endpoint(
     成績が見つからない場合は404エラーを返します。
     """
     # Get data from the service layer
-    monthly_stats = get_monthly_batting_stats(player_id, season, month, metric)
+    monthly_stats = await asyncio.to_thread(get_monthly_batting_stats, player_id, season, month, metric)
 
     # If no data is found, raise a 404 error
     if monthly_stats is None:
@@ -135,7 +136,7 @@ async def get_monthly_offensive_stats_endpoint(
     成績が見つからない場合は404エラーを返します。
     """
     # Get data from the service layer
-    monthly_stats = get_batter_monthly_offensive_stats(player_id, season, month, metric)
+    monthly_stats = await asyncio.to_thread(get_batter_monthly_offensive_stats, player_id, season, month, metric)
 
     # If no data is found, raise a 404 error
     if monthly_stats is None:
@@ -165,7 +166,7 @@ async def get_season_pitching_stats_endpoint(
     metrics_tuple = tuple(metrics) if metrics else ()
 
     # Get data from the service layer
-    stats_data = get_season_pitching_stats(player_id, season, metrics_tuple)
+    stats_data = await asyncio.to_thread(get_season_pitching_stats, player_id, season, metrics_tuple)
 
     # If no data is found, raise a 404 error
     if stats_data is None:
@@ -221,7 +222,7 @@ async def get_batter_performance_at_risp_endpoint(
     成績が見つからない場合は404エラーを返します。
     """
     # Get data from the service layer
-    performance_data = get_batter_performance_at_risp(player_id, season, metric)
+    performance_data = await asyncio.to_thread(get_batter_performance_at_risp, player_id, season, metric)
 
     # If no data is found, raise a 404 error
     if performance_data is None:
@@ -1,3 +1,4 @@
+import asyncio
 from fastapi import APIRouter, Query, HTTPException
 from backend.app.services.pitcher_fatigue import PitcherFatigueService
 
@@ -10,7 +11,7 @@ async def get_pitcher_fatigue(
 ):
     """特定投手のイニング別疲労分析"""
     service = PitcherFatigueService()
-    result = service.get_pitcher_fatigue_analysis(pitcher_name, season)
+    result = await asyncio.to_thread(service.get_pitcher_fatigue_analysis, pitcher_name, season)
     
     if result.get("error"):
         raise HTTPException(status_code=404, detail=result.get("message"))
@@ -23,7 +24,7 @@ async def get_league_average_fatigue(
 ):
     """リーグ全体のイニング別平均疲労傾向"""
     service = PitcherFatigueService()
-    result = service.get_league_average_fatigue(season)
+    result = await asyncio.to_thread(service.get_league_average_fatigue, season)
     
     if result.get("error"):
         raise HTTPException(status_code=400, detail=result.get("message"))
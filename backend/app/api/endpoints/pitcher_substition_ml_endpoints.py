@@ -1,3 +1,4 @@
+import asyncio
 from fastapi import APIRouter, Query, HTTPException
 from backend.app.services.pitcher_substitution_ml import PitcherSubstitutionMLService
 
@@ -16,7 +17,7 @@ async def predict_pitcher_substitution(
     - recommendation: SUBSTITUTE（交代推奨）or CONTINUE（続投推奨）
     """
     service = PitcherSubstitutionMLService()
-    result = service.predict_substitution(pitcher_name, season)
+    result = await asyncio.to_thread(service.predict_substitution, pitcher_name, season)
     
     if result.get("error"):
         raise HTTPException(status_code=404, detail=result.get("message"))
@@ -1,17 +1,21 @@
+import asyncio
 from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from typing import Optional
 import logging
 import time
 
 # サービス層とスキーマをインポート
 from backend.app.services.player_service import get_players_by_name
-from backend.app.services.player_profile_service import get_player_profile
+from backend.app.services.player_profile_service import get_player_profile, stream_player_profile
 from backend.app.api.schemas import (
     PlayerSearchResults,
     PlayerProfileResponse,
     AutocompleteResponse,
     AutocompletePlayerItem,
 )
+from backend.app.utils.streaming import stream_json_events
 from backend.app.utils.structured_logger import get_logger
 
 structured_logger = get_logger("diamond-lens")
@@ -42,7 +46,7 @@ async def search_players_endpoint(
     # サービス層の検索関数を呼び出す
     # player_service.get_players_by_name は Optional[List[PlayerSearchItem]] を返す想定
     search_query = q if q is not None else ""
-    search_results_list = get_players_by_name(search_query)
+    search_results_list = await asyncio.to_thread(get_players_by_name, search_query)
 
     # サービス層でエラーが発生した場合など、Noneが返された場合のハンドリング
     if search_results_list is None:
@@ -130,7 +134,7 @@ async def autocomplete_players_endpoint(
 
     # フォールバック: 既存 /players/search 相当のロジックで候補を返す
     # （context によるサブセット絞り込みは Vol.1 の fallback ではスキップ）
-    fallback_results_raw = get_players_by_name(q) or []
+    fallback_results_raw = await asyncio.to_thread(get_players_by_name, q) or []
     fallback_results = [
         AutocompletePlayerItem(
             mlbid=item.mlbid if item.mlbid is not None else 0,
@@ -177,12 +181,54 @@ async def get_player_profile_endpoint(
     """
     指定された mlbid の選手プロフィール（Bio + 打者/投手KPI + 月別成績）を返します。
     """
-    profile = get_player_profile(mlbid, season=season)
+    profile = await get_player_profile(mlbid, season=season)
     if profile is None:
         raise HTTPException(status_code=404, detail=f"Player with mlbid={mlbid} not found.")
     return profile
 
 
+@router.get(
+    "/players/{mlbid}/profile/stream",
+    summary="選手プロフィール取得（SSE ストリーミング）",
+    description="プロフィールのセクションを取得できた順に SSE で送ります。最初は必ず bio、最後に done を送ります。",
+    tags=["players"]
+)
+async def stream_player_profile_endpoint(
+    mlbid: int,
+    season: Optional[int] = Query(None, description="取得するシーズン (例: 2024)。省略時は最新シーズン。"),
+):
+    """
+    section イベントの data は PlayerProfileResponse のフィールドの一部。
+    クライアントは受け取った順にマージすれば /players/{mlbid}/profile と同じ内容になる。
+    """
+    sections = stream_player_profile(mlbid, season)
+    # bio が取れない（選手がいない）ときはストリームを始める前に 404 を返す
+    try:
+        first = await sections.__anext__()
+    except StopAsyncIteration:
+        raise HTTPException(status_code=404, detail=f"Player with mlbid={mlbid} not found.") from None
+
+    async def _events():
+        try:
+            section, payload = first
+            yield {"type": "section", "section": section, "data": jsonable_encoder(payload)}
+            async for section, payload in sections:
+                yield {"type": "section", "section": section, "data": jsonable_encoder(payload)}
+            yield {"type": "done"}
+        finally:
+            await sections.aclose()
+
+    return StreamingResponse(
+        stream_json_events(_events()),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",
+        }
+    )
+
+
 # # Router for Shohei Ohtani's two-way player stats
 # @router.get(
 #     "/players/ohtani/two-way-stats",
@@ -1,7 +1,8 @@
+import asyncio
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, List
-import os
 import logging
 
 logger = logging.getLogger(__name__)
@@ -9,8 +10,10 @@ logger = logging.getLogger(__name__)
 # RAGサービスのインポート
 try:
     from app.services.rag_service import MLBKnowledgeRAG
+    from app.utils.streaming import stream_json_events
 except ImportError:
     from backend.app.services.rag_service import MLBKnowledgeRAG
+    from backend.app.utils.streaming import stream_json_events
 
 router = APIRouter(prefix="/rag", tags=["RAG"])
 
@@ -25,9 +28,6 @@ class RAGQueryResponse(BaseModel):
     isRAG: bool = True
 
 
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY_V2")
-
-
 # RAGサービスのシングルトンインスタンス（起動時に一度だけ初期化）
 rag_service = None
 
@@ -53,21 +53,15 @@ async def ask_mlb_metrics(request: RAGQuery):
         RAGQueryResponse (answer, sources, isRAG)
     """
     try:
-        if not GEMINI_API_KEY:
-            raise HTTPException(
-                status_code=500,
-                detail="GEMINI_API_KEY_V2 が設定されていません"
-            )
-        
         logger.info(f"RAG query received: {request.query}")
 
         # RAGサービスを取得
         rag = get_rag_service()
 
-        # RAGで回答生成
-        result = rag.generate_answer_with_context(
+        # RAGで回答生成（検索・LLM 呼び出しは同期処理なのでスレッドで行う）
+        result = await asyncio.to_thread(
+            rag.generate_answer_with_context,
             query=request.query,
-            gemini_api_key=GEMINI_API_KEY,
             n_results=request.n_results
         )
 
@@ -84,6 +78,27 @@ async def ask_mlb_metrics(request: RAGQuery):
             detail=f"RAG処理エラー: {str(e)}"
         )
 
+@router.post("/ask-mlb-metrics/stream")
+async def ask_mlb_metrics_stream(request: RAGQuery):
+    """
+    MLB メトリクス用語をRAGで回答（SSE ストリーミング）
+    sources → token（断片）→ final_answer の順にイベントを送る
+    """
+    logger.info(f"RAG stream query received: {request.query}")
+    rag = get_rag_service()
+
+    return StreamingResponse(
+        stream_json_events(
+            rag.stream_answer_with_context(query=request.query, n_results=request.n_results)
+        ),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",  # Nginxのバッファリングを無効化
+        }
+    )
+
 @router.get("/health")
 async def rag_health_check():
     """RAGサービスのヘルスチェック"""
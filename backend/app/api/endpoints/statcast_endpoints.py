@@ -1,3 +1,4 @@
+import asyncio
 from fastapi import APIRouter, HTTPException, Path, Query
 from typing import Optional, List, Any, Dict
 import logging
@@ -73,7 +74,7 @@ async def get_batter_statcast_data_endpoint(
     pitch_types_tuple = tuple(pitch_types) if pitch_types else ()
 
     # Get data from the service layer
-    statcast_data = get_batter_splits_stats_advanced(batter_id, season, innings_tuple, strikes, balls, p_throws, runners_tuple, pitch_types_tuple, is_career)
+    statcast_data = await asyncio.to_thread(get_batter_splits_stats_advanced, batter_id, season, innings_tuple, strikes, balls, p_throws, runners_tuple, pitch_types_tuple, is_career)
 
     # If no data is found, raise a 404 error
     if statcast_data is None:
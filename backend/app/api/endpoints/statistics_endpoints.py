@@ -1,3 +1,4 @@
+import asyncio
 from fastapi import APIRouter, HTTPException, Query, Request
 from typing import Optional
 from backend.app.services.statistical_analysis import StatisticalAnalysisService
@@ -30,7 +31,7 @@ async def predict_winrate(
         予測勝率、想定勝利数、モデル評価指標
     """
     service = StatisticalAnalysisService()
-    result = service.predict_winrate_from_ops(team_ops, team_era, team_hrs_allowed)
+    result = await asyncio.to_thread(service.predict_winrate_from_ops, team_ops, team_era, team_hrs_allowed)
 
     if "error" in result:
         raise HTTPException(status_code=400, detail=result["message"])
@@ -56,7 +57,7 @@ async def ops_sensitivity_analysis(
         OPS 0.650 ~ 0.850 の範囲での予測結果リスト
     """
     service = StatisticalAnalysisService()
-    result = service.get_ops_sensitivity_analysis(fixed_era, fixed_hrs_allowed)
+    result = await asyncio.to_thread(service.get_ops_sensitivity_analysis, fixed_era, fixed_hrs_allowed)
     return {"data": result, "count": len(result)}
 
 
@@ -72,5 +73,5 @@ async def get_model_summary(
         R², RMSE, MAE, 回帰係数、回帰式
     """
     service = StatisticalAnalysisService()
-    result = service.get_model_summary()
+    result = await asyncio.to_thread(service.get_model_summary)
     return result
\ No newline at end of file
@@ -12,14 +12,26 @@ import time
 from typing import Any, Dict, Optional
 from uuid import uuid4
 
-from fastapi import APIRouter, HTTPException, Query, Request
+import numpy as np
+from fastapi import APIRouter, HTTPException, Query, Request, Response
 from pydantic import BaseModel, Field
 
 from backend.app.api.rate_limit import limiter
 from backend.app.config.settings import get_settings
 from backend.app.middleware.request_context import set_session_id
+from backend.app.utils.singleflight import singleflight
 from backend.app.utils.structured_logger import get_logger
 from backend.app.services.token_budget_service import get_token_budget_service
+from backend.app.services.strategy_tiles import (
+    COUNT_CELLS,
+    COUNT_MATRIX,
+    HEAT_ZONE,
+    SPRAY,
+    SPRAY_ZONES,
+    Tile,
+    TileLayout,
+    get_strategy_tile_store,
+)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -178,6 +190,7 @@ _SF_EVENTS = {"sac_fly", "sac_fly_double_play"}
     summary="対戦サンプル集計（Hero strip 用、LLM 不使用）",
     description="statcast_master を batter/pitcher (mlbid) で直接集計し PA/AB/H/HR/BB/K/HISTORICAL_OPS/CONFIDENCE を返します。",
 )
+@singleflight
 async def get_matchup_sample_size_endpoint(
     batter_id: int = Query(..., description="打者 MLB ID"),
     pitcher_id: int = Query(..., description="投手 MLB ID"),
@@ -191,10 +204,8 @@ async def get_matchup_sample_size_endpoint(
 
     docs/statcast_cols.csv 参照。
     """
-    from google.cloud.bigquery import (
-        ArrayQueryParameter, QueryJobConfig, ScalarQueryParameter,
-    )
-    from backend.app.services.bigquery_service import client
+    from google.cloud.bigquery import ArrayQueryParameter, ScalarQueryParameter
+    from backend.app.services.bigquery_service import run_query
     from backend.app.config.settings import get_settings
 
     statcast_table = get_settings().get_table_full_name("statcast_master")
@@ -217,17 +228,14 @@ async def get_matchup_sample_size_endpoint(
       AND game_type = 'R'
     """
 
-    job_config = QueryJobConfig(query_parameters=[
+    params = [
         ScalarQueryParameter("batter_id",  "INT64", batter_id),
         ScalarQueryParameter("pitcher_id", "INT64", pitcher_id),
         ArrayQueryParameter("ab_exclude",  "STRING", list(_AB_EXCLUDE_EVENTS)),
-    ])
+    ]
 
-    import asyncio
     try:
-        df = await asyncio.to_thread(
-            lambda: client.query(sql, job_config=job_config).to_dataframe()
-        )
+        df = await run_query(sql, params)
     except Exception as e:
         structured_logger.error(
             "matchup sample-size: BQ query failed",
@@ -276,6 +284,7 @@ async def get_matchup_sample_size_endpoint(
     summary="戦略レポート KPI バンド（打者シーズン6項目 + 比較値）",
     description="シーズン KPI は player_profile から、対戦予測 xBA とリーグ平均は statcast_master を直集計します。",
 )
+@singleflight
 async def get_kpi_band_endpoint(
     batter_id: int = Query(..., description="打者 MLB ID"),
     pitcher_id: int = Query(..., description="投手 MLB ID（対戦予測 xBA 用）"),
@@ -287,10 +296,8 @@ async def get_kpi_band_endpoint(
     旧実装は直列で 25秒前後かかっていた。
     """
     import asyncio
-    from google.cloud.bigquery import (
-        ArrayQueryParameter, QueryJobConfig, ScalarQueryParameter,
-    )
-    from backend.app.services.bigquery_service import client
+    from google.cloud.bigquery import ArrayQueryParameter, ScalarQueryParameter
+    from backend.app.services.bigquery_service import run_query
     from backend.app.config.settings import get_settings
 
     settings = get_settings()
@@ -301,12 +308,6 @@ async def get_kpi_band_endpoint(
         else "mart_batter_season_stats"
     )
 
-    def _run_query(sql: str, params: list):
-        """BQ 同期クエリ実行（asyncio.to_thread で並列化用）"""
-        return client.query(
-            sql, job_config=QueryJobConfig(query_parameters=params)
-        ).to_dataframe()
-
     # ---- Q1. シーズン KPI（mart_batter_season_stats を直接集計）----
     # 対戦戦略タブは Player Profile から独立。mart は 2015年以降の全シーズンを持つので
     # シーズンに関係なく直接叩く。
@@ -384,7 +385,7 @@ async def get_kpi_band_endpoint(
     # ---- 4 クエリを並列実行 ----
     async def _safe(label: str, sql: str, params: list):
         try:
-            return await asyncio.to_thread(_run_query, sql, params)
+            return await run_query(sql, params)
         except Exception as e:
             structured_logger.warning(f"kpi-band: {label} failed", error=str(e))
             return None
@@ -452,6 +453,56 @@ async def get_kpi_band_endpoint(
     }
 
 
+# ============================================================
+# 事前計算タイル（heat-zone / spray / count-matrix 共通）
+# 日次バッチが選手 × シーズンごとに集計済みのタイルを保存しておき、
+# エンドポイントはタイルを読んでレスポンスを組み立てる（statcast_master をスキャンしない）。
+# タイルのハッシュを ETag にし、ブラウザの再検証には 304 を返す。
+# ============================================================
+
+
+async def _load_tile_or_500(layout: TileLayout, player_id: int, season: int, label: str) -> Tile:
+    try:
+        return await get_strategy_tile_store().get(layout, player_id, season)
+    except Exception as e:
+        structured_logger.error(
+            f"{label}: tile load failed",
+            error=str(e), player_id=player_id, season=season,
+        )
+        raise HTTPException(status_code=500, detail=f"BQ query failed: {e}") from e
+
+
+def _apply_tile_cache_headers(request: Request, response: Response, tile: Tile) -> Optional[Response]:
+    """Cache-Control / ETag を付ける。If-None-Match が一致すれば 304 のレスポンスを返す。"""
+    headers = {
+        "Cache-Control": f"private, max-age={tile.max_age}",
+        "ETag": f'"{tile.etag}"',
+    }
+    if_none_match = request.headers.get("if-none-match", "")
+    if headers["ETag"] in {t.strip().removeprefix("W/") for t in if_none_match.split(",")}:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
+@router.post("/internal/strategy-report/tiles/build")
+async def build_strategy_tiles_endpoint(
+    season: Optional[int] = Query(None, ge=2015, le=2030, description="対象シーズン（省略時は今年）"),
+) -> Dict[str, Any]:
+    """
+    シーズン全選手の heat-zone / spray / count-matrix タイルを作り直す（Cloud Scheduler から日次で呼び出し）
+
+    種類ごとに statcast_master を 1 回だけ集計し、選手ごとのタイルに分けて保存する。
+    """
+    season = season or time.localtime().tm_year
+    try:
+        written = await get_strategy_tile_store().build_season(season)
+    except Exception as e:
+        structured_logger.error("strategy tiles: build failed", error=str(e), season=season)
+        raise HTTPException(status_code=500, detail=f"Tile build failed: {e}") from e
+    return {"season": season, "tiles": written}
+
+
 # ============================================================
 # Heat Zone エンドポイント（5x5 ゾーン別 xwOBA）
 # 打者のシーズン別「狙いゾーン / 避けるゾーン」を可視化するためのデータ
@@ -465,6 +516,8 @@ async def get_kpi_band_endpoint(
     description="plate_x / plate_z を 5x5 にビン分けし、各セルの xwOBA を返します。",
 )
 async def get_heat_zone_endpoint(
+    request: Request,
+    response: Response,
     batter_id: int = Query(..., description="打者 MLB ID"),
     season: int = Query(2026, ge=2015, le=2030, description="対象シーズン"),
 ) -> Dict[str, Any]:
@@ -479,94 +532,25 @@ async def get_heat_zone_endpoint(
         }
 
     plate_x / plate_z はフィート単位。中央 3x3 がストライクゾーン相当。
+    日次バッチの事前計算タイルから返す（無ければその場で集計）。
     """
-    from google.cloud.bigquery import QueryJobConfig, ScalarQueryParameter
-    from backend.app.services.bigquery_service import client
-    from backend.app.config.settings import get_settings
-
-    statcast_table = get_settings().get_table_full_name("statcast_master")
-
-    sql = f"""
-    WITH zoned AS (
-      SELECT
-        CASE
-          WHEN plate_x < -0.6 THEN 0
-          WHEN plate_x < -0.2 THEN 1
-          WHEN plate_x <  0.2 THEN 2
-          WHEN plate_x <  0.6 THEN 3
-          ELSE                     4
-        END AS col,
-        CASE
-          WHEN plate_z >= 3.5 THEN 0
-          WHEN plate_z >= 3.0 THEN 1
-          WHEN plate_z >= 2.5 THEN 2
-          WHEN plate_z >= 2.0 THEN 3
-          ELSE                     4
-        END AS row_idx,
-        estimated_woba_using_speedangle,
-        woba_value,
-        woba_denom
-      FROM `{statcast_table}`
-      WHERE batter = @batter_id
-        AND game_year = @season
-        AND game_type = 'R'
-        AND plate_x IS NOT NULL
-        AND plate_z IS NOT NULL
-        AND woba_denom > 0
-    )
-    SELECT
-      row_idx,
-      col,
-      ROUND(SAFE_DIVIDE(
-        SUM(COALESCE(estimated_woba_using_speedangle, woba_value)),
-        SUM(woba_denom)
-      ), 3) AS xwoba,
-      COUNT(*) AS n
-    FROM zoned
-    GROUP BY row_idx, col
-    """
-
-    import asyncio as _asyncio
-    try:
-        df = await _asyncio.to_thread(
-            lambda: client.query(
-                sql,
-                job_config=QueryJobConfig(query_parameters=[
-                    ScalarQueryParameter("batter_id", "INT64", batter_id),
-                    ScalarQueryParameter("season",    "INT64", season),
-                ]),
-            ).to_dataframe()
-        )
-    except Exception as e:
-        structured_logger.error(
-            "heat-zone: BQ query failed",
-            error=str(e), batter_id=batter_id, season=season,
-        )
-        raise HTTPException(status_code=500, detail=f"BQ query failed: {e}") from e
-
-    # 5x5 grid を初期化（None で）
-    zone: list[list[Any]] = [[None] * 5 for _ in range(5)]
-    counts: list[list[int]] = [[0] * 5 for _ in range(5)]
-    total_pa = 0
-
-    if not df.empty:
-        for _, r in df.iterrows():
-            ri = _safe_int(r.get("row_idx"))
-            ci = _safe_int(r.get("col"))
-            if 0 <= ri < 5 and 0 <= ci < 5:
-                v = r.get("xwoba")
-                xw = float(v) if v is not None and v == v else None
-                n = _safe_int(r.get("n"))
-                zone[ri][ci] = xw
-                counts[ri][ci] = n
-                total_pa += n
+    tile = await _load_tile_or_500(HEAT_ZONE, batter_id, season, "heat-zone")
+    not_modified = _apply_tile_cache_headers(request, response, tile)
+    if not_modified is not None:
+        return not_modified
+
+    xwoba = tile.arrays["xwoba"]
+    counts = tile.arrays["counts"].astype(int)
+    zone: list[list[Any]] = [
+        [None if np.isnan(v) else round(float(v), 3) for v in row] for row in xwoba
+    ]
 
     return {
         "batter_id": batter_id,
         "season": season,
         "zone": zone,
-        "counts": counts,
-        "total_pa": total_pa,
+        "counts": counts.tolist(),
+        "total_pa": int(counts.sum()),
     }
 
 
@@ -633,6 +617,7 @@ def _strategy_tag(xwoba: Optional[float], whiff: Optional[float], use_pct: Optio
     summary="投手の球種別シーズン成績（vs 全打者）",
     description="pitch_type ごとに VEL / USE% / xwOBA / Whiff% / CSW% を集計し、Strategy Tag を付与します。",
 )
+@singleflight
 async def get_pitch_arsenal_endpoint(
     pitcher_id: int = Query(..., description="投手 MLB ID"),
     season: int = Query(2026, ge=2015, le=2030, description="対象シーズン"),
@@ -641,17 +626,15 @@ async def get_pitch_arsenal_endpoint(
     投手の対象シーズン全ピッチ（vs 全打者）から球種別に成績を集計する。
     打者フィルタなし。WHERE は pitcher = @pitcher_id AND game_year = @season のみ。
     """
-    from google.cloud.bigquery import (
-        ArrayQueryParameter, QueryJobConfig, ScalarQueryParameter,
-    )
-    from backend.app.services.bigquery_service import client
+    from google.cloud.bigquery import ArrayQueryParameter, ScalarQueryParameter
+    from backend.app.services.bigquery_service import run_query
     from backend.app.config.settings import get_settings
 
     statcast_table = get_settings().get_table_full_name("statcast_master")
 
     # ハイブリッド集計（並列）:
     #   - mart_pitch_performance_xba_whiff: usage_pct / whiff_pct / xba / avg_speed / avg_spin_rate
-    #     （事前集計済み・高速。player_profile_service._fetch_pitch_performance と同じロジック）
+    #     （事前集計済み・高速。player_profile_service の pitch_performance セクションと同じロジック）
     #   - statcast_master: xwOBA / CSW% / pfx_x / pfx_z（mart に存在しない列のみ）
     # pitch_type をキーに Python 側で merge する。
     import asyncio
@@ -740,14 +723,9 @@ async def get_pitch_arsenal_endpoint(
         ScalarQueryParameter("season",     "INT64", season),
     ]
 
-    def _run(sql: str, params: list):
-        return client.query(
-            sql, job_config=QueryJobConfig(query_parameters=params)
-        ).to_dataframe()
-
     async def _safe(label: str, sql: str, params: list):
         try:
-            return await asyncio.to_thread(_run, sql, params)
+            return await run_query(sql, params)
         except Exception as e:
             structured_logger.warning(f"pitch-arsenal: {label} failed", error=str(e))
             return None
@@ -867,6 +845,8 @@ async def get_pitch_arsenal_endpoint(
     description="hc_x と stand から Pull/Center/Oppo を判定し、各方向の打球比率と方向別 SLG を返します。",
 )
 async def get_spray_endpoint(
+    request: Request,
+    response: Response,
     batter_id: int = Query(..., description="打者 MLB ID"),
     season: int = Query(2026, ge=2015, le=2030, description="対象シーズン"),
 ) -> Dict[str, Any]:
@@ -880,87 +860,19 @@ async def get_spray_endpoint(
       - 左打者: Pull = Right, Oppo = Left
 
     SLG（方向別）= 各方向の打球の総塁打数 / 各方向の打球数
+    日次バッチの事前計算タイルから返す（無ければその場で集計）。
     """
-    from google.cloud.bigquery import QueryJobConfig, ScalarQueryParameter
-    from backend.app.services.bigquery_service import client
-    from backend.app.config.settings import get_settings
+    tile = await _load_tile_or_500(SPRAY, batter_id, season, "spray")
+    not_modified = _apply_tile_cache_headers(request, response, tile)
+    if not_modified is not None:
+        return not_modified
 
-    statcast_table = get_settings().get_table_full_name("statcast_master")
-
-    sql = f"""
-    WITH bip AS (
-      SELECT
-        stand,
-        hc_x,
-        events
-      FROM `{statcast_table}`
-      WHERE batter   = @batter_id
-        AND game_year = @season
-        AND game_type = 'R'
-        AND hc_x IS NOT NULL
-        AND bb_type IS NOT NULL
-    ),
-    classified AS (
-      SELECT
-        CASE
-          WHEN (stand = 'R' AND hc_x < 100) OR (stand = 'L' AND hc_x > 155) THEN 'PULL'
-          WHEN hc_x BETWEEN 100 AND 155                                      THEN 'CENTER'
-          ELSE                                                                    'OPPO'
-        END AS spray_zone,
-        events
-      FROM bip
-    )
-    SELECT
-      spray_zone,
-      COUNT(*) AS bip,
-      SUM(
-        CASE
-          WHEN events = 'single'   THEN 1
-          WHEN events = 'double'   THEN 2
-          WHEN events = 'triple'   THEN 3
-          WHEN events = 'home_run' THEN 4
-          ELSE 0
-        END
-      ) AS tb
-    FROM classified
-    GROUP BY spray_zone
-    """
-
-    import asyncio as _asyncio
-    try:
-        df = await _asyncio.to_thread(
-            lambda: client.query(
-                sql,
-                job_config=QueryJobConfig(query_parameters=[
-                    ScalarQueryParameter("batter_id", "INT64", batter_id),
-                    ScalarQueryParameter("season",    "INT64", season),
-                ]),
-            ).to_dataframe()
-        )
-    except Exception as e:
-        structured_logger.error(
-            "spray: BQ query failed",
-            error=str(e), batter_id=batter_id, season=season,
-        )
-        raise HTTPException(status_code=500, detail=f"BQ query failed: {e}") from e
-
-    # 集計: zone -> {bip, tb}
-    by_zone: Dict[str, Dict[str, int]] = {}
-    total_bip = 0
-    if not df.empty:
-        for _, r in df.iterrows():
-            z = str(r.get("spray_zone") or "").upper()
-            n = _safe_int(r.get("bip"))
-            tb = _safe_int(r.get("tb"))
-            by_zone[z] = {"bip": n, "tb": tb}
-            total_bip += n
+    bip_tb = tile.arrays["bip_tb"].astype(int)
+    total_bip = int(bip_tb[:, 0].sum())
 
     # design 互換のため PULL → CENTER → OPPO の固定順
     spray = []
-    for z, label in [("PULL", "RIGHT"), ("CENTER", "MID"), ("OPPO", "LEFT")]:
-        d = by_zone.get(z, {"bip": 0, "tb": 0})
-        n  = d["bip"]
-        tb = d["tb"]
+    for (n, tb), z, label in zip(bip_tb.tolist(), SPRAY_ZONES, ("RIGHT", "MID", "LEFT")):
         pct = round(n / total_bip * 100, 1) if total_bip > 0 else 0.0
         slg = round(tb / n, 3) if n > 0 else 0.0
         spray.append({
@@ -1014,6 +926,8 @@ def _count_conf_label(pitch_pct: Optional[float]) -> str:
     ),
 )
 async def get_count_matrix_endpoint(
+    request: Request,
+    response: Response,
     pitcher_id: int = Query(..., description="投手 MLB ID"),
     season: int = Query(2026, ge=2015, le=2030, description="対象シーズン"),
 ) -> Dict[str, Any]:
@@ -1030,99 +944,32 @@ async def get_count_matrix_endpoint(
 
     pitchPct は最頻球種がそのカウント内で占める割合（0-100）。
     pitches は各カウントの総球数（信頼度判定の母数）。
+    日次バッチの事前計算タイルから返す（無ければその場で集計）。
     """
-    from google.cloud.bigquery import QueryJobConfig, ScalarQueryParameter
-    from backend.app.services.bigquery_service import client
-    from backend.app.config.settings import get_settings
-
-    statcast_table = get_settings().get_table_full_name("statcast_master")
-
-    sql = f"""
-    WITH base AS (
-      SELECT balls, strikes, pitch_type
-      FROM `{statcast_table}`
-      WHERE pitcher    = @pitcher_id
-        AND game_year  = @season
-        AND game_type  = 'R'
-        AND balls   BETWEEN 0 AND 3
-        AND strikes BETWEEN 0 AND 2
-        AND pitch_type IS NOT NULL
-        AND pitch_type != ''
-    ),
-    agg AS (
-      SELECT balls, strikes, pitch_type, COUNT(*) AS pitch_count
-      FROM base
-      GROUP BY balls, strikes, pitch_type
-    ),
-    cell_total AS (
-      SELECT balls, strikes, SUM(pitch_count) AS total_pitches
-      FROM agg
-      GROUP BY balls, strikes
-    ),
-    ranked AS (
-      SELECT
-        a.balls,
-        a.strikes,
-        a.pitch_type,
-        a.pitch_count,
-        c.total_pitches,
-        ROW_NUMBER() OVER (
-          PARTITION BY a.balls, a.strikes
-          ORDER BY a.pitch_count DESC, a.pitch_type
-        ) AS rn
-      FROM agg a
-      JOIN cell_total c USING (balls, strikes)
-    )
-    SELECT balls, strikes, pitch_type, pitch_count, total_pitches
-    FROM ranked
-    WHERE rn = 1
-    ORDER BY balls, strikes
-    """
-
-    import asyncio as _asyncio
-    try:
-        df = await _asyncio.to_thread(
-            lambda: client.query(
-                sql,
-                job_config=QueryJobConfig(query_parameters=[
-                    ScalarQueryParameter("pitcher_id", "INT64", pitcher_id),
-                    ScalarQueryParameter("season",     "INT64", season),
-                ]),
-            ).to_dataframe()
-        )
-    except Exception as e:
-        structured_logger.error(
-            "count-matrix: BQ query failed",
-            error=str(e), pitcher_id=pitcher_id, season=season,
-        )
-        raise HTTPException(status_code=500, detail=f"BQ query failed: {e}") from e
-
-    by_cell: Dict[str, Dict[str, Any]] = {}
-    if not df.empty:
-        for _, r in df.iterrows():
-            b = _safe_int(r.get("balls"))
-            s = _safe_int(r.get("strikes"))
-            code = str(r.get("pitch_type") or "").upper()
-            pitch_count = _safe_int(r.get("pitch_count"))
-            total = _safe_int(r.get("total_pitches"))
-
-            pitch_pct = round(pitch_count / total * 100, 1) if total > 0 else None
-            by_cell[f"{b}-{s}"] = {
-                "c": f"{b}-{s}",
-                "call":     code or None,
-                "conf":     _count_conf_label(pitch_pct),
-                "pitches":  total,
-                "pitchPct": pitch_pct,
-            }
+    tile = await _load_tile_or_500(COUNT_MATRIX, pitcher_id, season, "count-matrix")
+    not_modified = _apply_tile_cache_headers(request, response, tile)
+    if not_modified is not None:
+        return not_modified
 
     counts: list = []
-    for b in range(0, 4):
-        for s in range(0, 3):
-            key = f"{b}-{s}"
-            counts.append(by_cell.get(key, {
+    for (b, s), call, (pitch_count, total) in zip(
+        COUNT_CELLS, tile.arrays["calls"], tile.arrays["pitches"].astype(int).tolist()
+    ):
+        key = f"{b}-{s}"
+        if total <= 0:
+            counts.append({
                 "c": key, "call": None, "conf": "LOW",
                 "pitches": 0, "pitchPct": None,
-            }))
+            })
+            continue
+        pitch_pct = round(pitch_count / total * 100, 1)
+        counts.append({
+            "c":        key,
+            "call":     call.decode("ascii") or None,
+            "conf":     _count_conf_label(pitch_pct),
+            "pitches":  total,
+            "pitchPct": pitch_pct,
+        })
 
     return {
         "pitcher_id": pitcher_id,
@@ -1205,6 +1052,7 @@ def _pa_note(events: Optional[str], description: Optional[str],
         "game_date 降順で最新 N 件返します。シーズン縛りなし（通算）。"
     ),
 )
+@singleflight
 async def get_recent_pa_endpoint(
     batter_id: int = Query(..., description="打者 MLB ID"),
     pitcher_id: int = Query(..., description="投手 MLB ID"),
@@ -1222,8 +1070,8 @@ async def get_recent_pa_endpoint(
         ]
       }
     """
-    from google.cloud.bigquery import QueryJobConfig, ScalarQueryParameter
-    from backend.app.services.bigquery_service import client
+    from google.cloud.bigquery import ScalarQueryParameter
+    from backend.app.services.bigquery_service import run_query
     from backend.app.config.settings import get_settings
 
     statcast_table = get_settings().get_table_full_name("statcast_master")
@@ -1246,18 +1094,12 @@ async def get_recent_pa_endpoint(
     LIMIT @limit
     """
 
-    import asyncio as _asyncio
     try:
-        df = await _asyncio.to_thread(
-            lambda: client.query(
-                sql,
-                job_config=QueryJobConfig(query_parameters=[
-                    ScalarQueryParameter("batter_id",  "INT64", batter_id),
-                    ScalarQueryParameter("pitcher_id", "INT64", pitcher_id),
-                    ScalarQueryParameter("limit",      "INT64", limit),
-                ]),
-            ).to_dataframe()
-        )
+        df = await run_query(sql, [
+            ScalarQueryParameter("batter_id",  "INT64", batter_id),
+            ScalarQueryParameter("pitcher_id", "INT64", pitcher_id),
+            ScalarQueryParameter("limit",      "INT64", limit),
+        ])
     except Exception as e:
         structured_logger.error(
             "recent-pa: BQ query failed",
@@ -2,6 +2,9 @@
 Stuff+ / Pitching+ API エンドポイント
 球質評価（Stuff+）と総合投球評価（Pitching+）のランキング・推論・比較
 """
+from datetime import datetime
+from typing import List, Optional
+
 from fastapi import APIRouter, Query, HTTPException, Path
 
 from backend.app.services.stuff_plus_service import StuffPlusService
@@ -140,3 +143,30 @@ async def compare_models(
         raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/internal/stuff-plus/score")
+async def score_new_pitches(
+    season: Optional[int] = Query(None, ge=2020, le=2026, description="対象シーズン（省略時は今年）"),
+    model_types: List[str] = Query(
+        ["stuff_plus", "pitching_plus", "pitching_plus_plus"],
+        description="スコアリング対象のモデル",
+    ),
+):
+    """
+    未スコアの投球を active モデルで推論し、事前計算ストアに保存（Cloud Scheduler から日次で呼び出し）
+
+    - 前日までの投球が対象（statcast の遅延到着に備えて直近数日は取り直す）
+    - 新バージョンに昇格した直後はシーズン全体をスコア
+    - 投手詳細・月別推移はストアを引き、未スコア分だけその場で推論する
+    """
+    season = season or datetime.now().year
+    results = []
+    for model_type in model_types:
+        try:
+            results.append(await service.score_new_pitches(model_type=model_type, season=season))
+        except FileNotFoundError as e:
+            results.append({"model_type": model_type, "error": str(e)})
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"{model_type}: {e}")
+    return {"season": season, "results": results}
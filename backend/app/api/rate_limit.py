@@ -2,6 +2,10 @@ from slowapi import Limiter
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 from starlette.requests import Request
+
+from backend.app.config.settings import get_settings
+
+
 def _get_session_or_ip(request: Request) -> str:
     """
     セッションIDがあればそれをキーに、なければIPアドレスをキーにする。
@@ -22,10 +26,20 @@ def _get_session_or_ip(request: Request) -> str:
     return get_remote_address(request)
 
 
-# slowapi のデフォルトストレージはインメモリ（memory://）
-# Cloud Run は単一コンテナなのでインメモリで十分。Redis不要。
+def _storage_uri() -> str:
+    """rate_limit_backend="redis" ならエンドポイント別の枠もインスタンス間で共有する。"""
+    settings = get_settings()
+    if settings.rate_limit_backend != "redis":
+        return "memory://"
+    auth = f":{settings.redis_password}@" if settings.redis_password else ""
+    return f"redis://{auth}{settings.redis_host}:{settings.redis_port}"
+
+
+# moving-window はスライディングウィンドウ（ログ方式）。固定ウィンドウ境界での 2 倍バーストを防ぐ。
+# Redis に繋がらない間はインメモリに退避する。
 limiter = Limiter(
     key_func=_get_session_or_ip,
-    storage_uri="memory://",
-    strategy="fixed-window",
+    storage_uri=_storage_uri(),
+    strategy="moving-window",
+    in_memory_fallback_enabled=True,
 )
\ No newline at end of file
@@ -25,6 +25,9 @@ ACTIVE_VERSIONS: Dict[str, str] = {
     "strategy_synthesizer": "v1",
     "oracle_semantic": "v1",  # Phase 3: Semantic Layer 用 Oracle プロンプト（Phase 4で実利用）
     "chat_orchestrator_system": "v1",  # Phase 2.5: ChatOrchestrator のシステムプロンプト (インライン定義)
+    # インライン定義のパースプロンプト。NL クエリキャッシュのキーに使うため、プロンプトを変えたら版を上げる
+    "parse_query_pitcher": "v1",       # analytics/pitcher_services.py
+    "parse_query_data_engine": "v1",   # mlb_data_engine.py
 }
 
 SHADOW_VERSIONS: Dict[str, Optional[str]] = {
@@ -35,6 +38,8 @@ SHADOW_VERSIONS: Dict[str, Optional[str]] = {
     "strategy_synthesizer": None,
     "oracle_semantic": None,
     "chat_orchestrator_system": None,
+    "parse_query_pitcher": None,
+    "parse_query_data_engine": None,
 }
 
 PromptRole = Literal["active", "shadow"]
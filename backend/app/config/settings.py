@@ -120,6 +120,10 @@ class Settings(BaseSettings):
     # Phase 3-A: プール別予算 (チャット / レポート)。合算は llm_daily_token_budget を超えない
     llm_daily_token_budget_chat: int = 500_000   # ChatOrchestrator 経由
     llm_daily_token_budget_report: int = 500_000  # StrategyAgent / strategy-report 経由
+    # Per-Session: LLM エンドポイントのトークン消費量（応答後に計上し、超過中は次のリクエストを弾く）
+    rate_limit_session_tokens_per_minute: int = 100_000
+    # カウンターの置き場所: "memory"（インスタンスごと）/ "redis"（全インスタンスで共有）
+    rate_limit_backend: str = "memory"
     # Rate Limit有効/無効（開発時にOFFにする用）
     rate_limit_enabled: bool = True
 
@@ -50,4 +50,10 @@ class PromptInjectionError(MLBAppError):
     def __init__(self, message: str, detected_pattern: str = None, risk_level: str = "high"):
         super().__init__(message)
         self.detected_pattern = detected_pattern
-        self.risk_level = risk_level
\ No newline at end of file
+        self.risk_level = risk_level
+
+class QueryTimeoutError(DataFetchError):
+    """
+    【孫クラス】BigQuery クエリが deadline を超過した場合のエラー。
+    発生時点でジョブはキャンセル済み。
+    """
@@ -8,6 +8,23 @@ import time
 from contextlib import asynccontextmanager
 from backend.app.utils.structured_logger import get_logger
 from backend.app.services.monitoring_service import get_monitoring_service
+from backend.app.services.bigquery_service import shutdown_query_executor
+from backend.app.services.cache_service import get_query_cache
+from backend.app.services.bq_log_writer import get_bq_log_writer, shutdown_bq_log_writer
+from backend.app.services.mlb_stats_client import close_mlb_stats_client
+from backend.app.services.live_game_hub import stop_live_game_hub
+from backend.app.services.model_artifact_cache import get_model_artifact_cache, stop_model_artifact_cache
+from backend.app.services.inference_batcher import shutdown_inference_batchers
+from backend.app.services.player_profile_service import shutdown_profile_pool
+from backend.app.services.leaderboard_snapshot import (
+    get_leaderboard_snapshot_store,
+    stop_leaderboard_snapshot_store,
+)
+from backend.app.services.glossary_rag_service import (
+    GLOSSARY_INDEX_ENABLED,
+    get_glossary_rag_service,
+    stop_glossary_rag_service,
+)
 from backend.app.services.sandbox.autocomplete_service import AutocompleteService
 from backend.app.middleware.request_id import RequestIDMiddleware
 from backend.app.middleware.firebase_auth import FirebaseAuthMiddleware
@@ -20,6 +37,8 @@ from backend.app.middleware.rate_limit import RateLimitMiddleware
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 structured_logger = get_logger("diamond-lens")
+# BigQuery 結果キャッシュ・ログ書き込みキューの統計を Cloud Monitoring に送る間隔（秒）
+QUERY_CACHE_METRICS_INTERVAL_SEC = 60
 # NOTE: monitoring（Cloud Monitoring gRPC client）はモジュールimport時に
 # 初期化すると起動が9秒前後遅くなるため、middleware/handler 内で
 # `get_monitoring_service()` を呼ぶ形に変更（シングルトンなので初回のみ初期化）。
@@ -49,8 +68,55 @@ async def lifespan(app: FastAPI):
     # タスクの参照を保持しないと GC で途中破棄される可能性があるため app.state に保持
     app.state.autocomplete_build_task = asyncio.create_task(_build_autocomplete())
 
+    async def _flush_query_cache_metrics() -> None:
+        while True:
+            await asyncio.sleep(QUERY_CACHE_METRICS_INTERVAL_SEC)
+            try:
+                await asyncio.to_thread(get_query_cache().flush_metrics)
+            except Exception as e:
+                logger.warning(f"Query cache metrics flush failed: {e}")
+            try:
+                await asyncio.to_thread(get_bq_log_writer().flush_metrics)
+            except Exception as e:
+                logger.warning(f"Log writer metrics flush failed: {e}")
+
+    app.state.query_cache_metrics_task = asyncio.create_task(_flush_query_cache_metrics())
+
+    # active モデルの先読みとバージョン変更のポーリング（最初の推論リクエストに GCS ダウンロードを払わせない）
+    get_model_artifact_cache().start()
+
+    # 用語集の埋め込みをメモリに載せ、検索のたびに BQ で全件距離計算しない
+    if GLOSSARY_INDEX_ENABLED:
+        get_glossary_rag_service().start()
+
+    # 読み込み済みのリーダーボード用シーズンスナップショットを定期的に読み直す
+    get_leaderboard_snapshot_store().start()
+
     yield
 
+    app.state.query_cache_metrics_task.cancel()
+    await stop_model_artifact_cache()
+    await stop_glossary_rag_service()
+    await stop_leaderboard_snapshot_store()
+
+    # 推論マイクロバッチのワーカーを止める（キュー済みの要求は処理してから）
+    await asyncio.to_thread(shutdown_inference_batchers)
+
+    # キューに残った BigQuery ログを書き切る
+    await asyncio.to_thread(shutdown_bq_log_writer)
+
+    # ライブ試合ハブのポーラーを止めてから MLB Stats API の共有接続プールを閉じる
+    await stop_live_game_hub()
+    await close_mlb_stats_client()
+
+    # 共有クエリ実行器と、それを待つプロフィール DAG のプールを閉じる（未着手のクエリは破棄される）
+    shutdown_query_executor()
+    shutdown_profile_pool()
+
+    # ChatOrchestrator の tool 実行プール（ルーター経由で import 済み）
+    from backend.app.services.chat_orchestrator import shutdown_tool_pool
+    shutdown_tool_pool()
+
 
 # Create the FastAPI app instance
 app = FastAPI(
@@ -28,6 +28,8 @@ PUBLIC_PATHS = {
 INTERNAL_PATHS = {
     "/api/v1/model-registry/retrain",
     "/api/v1/internal/summary/trigger",
+    "/api/v1/internal/stuff-plus/score",
+    "/api/v1/internal/strategy-report/tiles/build",
 }
 
 
@@ -1,14 +1,15 @@
 """
-Multi-tier Rate Limiting Middleware (In-Memory)
+Multi-tier Rate Limiting Middleware
 - Global: 全リクエスト合計で N req/min
 - Per-Session: user_id or IP ごとに M req/min
+- Per-Session tokens: LLM エンドポイントは user_id or IP ごとのトークン消費量でも制限
 
-Redis不要。Cloud Run単一コンテナ内で動作するインメモリカウンター方式。
-スケールアウト時はインスタンスごとに独立したカウンターとなるが、
-コスト防御目的には十分機能する。
+判定は rate_limiter_service（GCRA）に委譲する。rate_limit_backend="redis" なら
+全インスタンスで枠を共有し、Redis 障害時や "memory" 設定時はインスタンス内で数える。
+トークンは応答後にしか確定しないため TokenBudgetService が後払いで計上し、
+ここでは超過中かどうか（cost=0）だけを見る。
 """
-import time
-import threading
+import math
 from starlette.types import ASGIApp, Receive, Scope, Send
 from starlette.requests import Request
 from starlette.responses import JSONResponse
@@ -16,18 +17,28 @@ from backend.app.config.settings import get_settings
 from backend.app.utils.structured_logger import get_logger
 from backend.app.services.monitoring_service import get_monitoring_service
 from backend.app.services.llm_logger_service import get_llm_logger, LLMLogEntry
+from backend.app.services.rate_limiter_service import (
+    GLOBAL_KEY,
+    TOKENS_KEY_PREFIX,
+    Limit,
+    get_rate_limiter,
+    session_key,
+    session_tokens_key,
+)
+from backend.app.middleware.request_context import set_rate_limit_identity
 
 logger = get_logger("rate_limit")
 
-
 class RateLimitMiddleware:
     """
-    ASGI Middleware for global and per-session rate limiting using in-memory counters.
-    Fixed-window方式: 1分間ウィンドウ内のリクエスト数をカウント。
+    ASGI Middleware for global and per-session rate limiting.
+    GCRA 方式: 1 分あたりの上限を均等間隔に割り、固定ウィンドウ境界でのバーストを防ぐ。
     """
 
     # レートリミットを適用しないパス
     EXEMPT_PATHS = {"/", "/health", "/debug/routes", "/docs", "/openapi.json", "/redoc", "/api/v1/live/games/today"}
+    # トークン消費量でも制限するパス（LLM を呼ぶエンドポイント）
+    TOKEN_LIMITED_PATH_MARKERS = ("/qa/", "/strategy-report")
 
     def __init__(self, app: ASGIApp):
         self.app = app
@@ -35,12 +46,10 @@ class RateLimitMiddleware:
         self.enabled = settings.rate_limit_enabled
         self.global_limit = settings.rate_limit_global_per_minute
         self.session_limit = settings.rate_limit_session_per_minute
-        self.window_seconds = 60  # 1分間のウィンドウ
+        self.session_token_limit = settings.rate_limit_session_tokens_per_minute
+        self.window_seconds = 60  # 上限の基準期間（1分）
         self.monitoring = get_monitoring_service()
-
-        # インメモリカウンター: {key: (count, window_id)}
-        self._counters: dict[str, tuple[int, int]] = {}
-        self._lock = threading.Lock()
+        self.limiter = get_rate_limiter()
 
     async def __call__(self, scope: Scope, receive: Receive, send: Send):
         if scope["type"] != "http" or not self.enabled:
@@ -55,70 +64,56 @@ class RateLimitMiddleware:
             await self.app(scope, receive, send)
             return
 
-        # Global rate limit check
-        global_key = "ratelimit:global"
-        global_count = self._increment(global_key)
-
-        if global_count > self.global_limit:
-            retry_after = self._seconds_until_next_window()
-            response = self._rate_limit_response(
-                "Global rate limit exceeded", retry_after
-            )
-            await response(scope, receive, send)
-            logger.warning("Global rate limit exceeded", count=global_count)
-            self.monitoring.record_rate_limit_rejection(
-                endpoint=path, limit_type="global"
-            )
-            self._log_violation(path, "rate_limit_global", scope)
-            return
-
-        # --- Per-Session Rate Limit Check ---
         identity = self._get_identity(scope)
-        session_key = f"ratelimit:session:{identity}"
-        session_count = self._increment(session_key)
+        limits = [
+            Limit(GLOBAL_KEY, self.global_limit, self.window_seconds),
+            Limit(session_key(identity), self.session_limit, self.window_seconds),
+        ]
+        if any(marker in path for marker in self.TOKEN_LIMITED_PATH_MARKERS):
+            # 消費は後払い（TokenBudgetService が計上）。ここでは超過中かだけを見る
+            limits.append(
+                Limit(session_tokens_key(identity), self.session_token_limit, self.window_seconds, cost=0)
+            )
 
-        if session_count > self.session_limit:
-            retry_after = self._seconds_until_next_window()
+        result = await self.limiter.acheck(limits)
+        if not result.allowed:
+            limit_type = self._limit_type(result.rejected.key)
+            retry_after = max(1, math.ceil(result.retry_after))
             response = self._rate_limit_response(
-                "Per-session rate limit exceeded", retry_after
+                f"{self._limit_label(limit_type)} rate limit exceeded", retry_after
             )
             await response(scope, receive, send)
             logger.warning(
-                "Session rate limit exceeded",
+                "Rate limit exceeded",
+                limit_type=limit_type,
                 identity=identity,
-                count=session_count,
+                backend=self.limiter.backend,
             )
             self.monitoring.record_rate_limit_rejection(
-                endpoint=path, limit_type="session"
+                endpoint=path, limit_type=limit_type
             )
-            self._log_violation(path, "rate_limit_session", scope)
+            self._log_violation(path, f"rate_limit_{limit_type}", scope)
             return
 
-        # 制限内 → 次のミドルウェア/エンドポイントへ
+        # 制限内 → 次のミドルウェア/エンドポイントへ。トークン計上のため識別子を引き継ぐ
+        set_rate_limit_identity(identity)
         await self.app(scope, receive, send)
 
-    def _increment(self, key: str) -> int:
-        """インメモリカウンターをアトミックにインクリメント"""
-        current_window = self._current_window()
-        with self._lock:
-            stored = self._counters.get(key)
-            if stored is None or stored[1] != current_window:
-                # 新しいウィンドウ → カウンターリセット
-                self._counters[key] = (1, current_window)
-                self._cleanup_old_windows(current_window)
-                return 1
-            else:
-                new_count = stored[0] + 1
-                self._counters[key] = (new_count, current_window)
-                return new_count
-
-    def _cleanup_old_windows(self, current_window: int) -> None:
-        """古いウィンドウのカウンターを削除（メモリリーク防止）"""
-        stale_keys = [
-            k for k, (_, w) in self._counters.items() if w < current_window
-        ]
-        for k in stale_keys:
-            del self._counters[k]
+    @staticmethod
+    def _limit_type(key: str) -> str:
+        if key == GLOBAL_KEY:
+            return "global"
+        if key.startswith(TOKENS_KEY_PREFIX):
+            return "session_tokens"
+        return "session"
+
+    @staticmethod
+    def _limit_label(limit_type: str) -> str:
+        return {
+            "global": "Global",
+            "session": "Per-session",
+            "session_tokens": "Per-session token",
+        }[limit_type]
 
     def _get_identity(self, scope: Scope) -> str:
         """ユーザー識別子を取得: user_id > IP"""
@@ -133,14 +128,6 @@ class RateLimitMiddleware:
             return f"ip:{client[0]}"
         return "ip:unknown"
 
-    def _current_window(self) -> int:
-        """現在の1分間ウィンドウ（UNIXタイムスタンプを60で割った値）"""
-        return int(time.time()) // self.window_seconds
-
-    def _seconds_until_next_window(self) -> int:
-        """次のウィンドウまでの残り秒数"""
-        return self.window_seconds - (int(time.time()) % self.window_seconds)
-
     def _log_violation(self, path: str, error_type: str, scope: Scope) -> None:
         """レートリミット違反を llm_interaction_logs に記録（LLM関連エンドポイントのみ）"""
         if not path.startswith("/qa/"):
@@ -12,6 +12,8 @@ _session_id_var: ContextVar[str] = ContextVar("session_id", default="")
 # BigQuery クエリの累計実行時間 (ms)。1 リクエスト内で複数 BQ クエリが走った場合は合算。
 # analytics service が add_bq_latency_ms() で加算し、エンドポイントが最後に読む。
 _bq_latency_ms_var: ContextVar[float] = ContextVar("bq_latency_ms", default=0.0)
+# レートリミットの識別子（"user:..." / "ip:..."）。トークン消費を後から同じ枠に計上するために使う。
+_rate_limit_identity_var: ContextVar[str] = ContextVar("rate_limit_identity", default="")
 
 
 def get_request_id() -> str:
@@ -62,4 +64,12 @@ def add_bq_latency_ms(ms: float) -> None:
 
 
 def reset_bq_latency_ms() -> None:
-    _bq_latency_ms_var.set(0.0)
\ No newline at end of file
+    _bq_latency_ms_var.set(0.0)
+
+
+def get_rate_limit_identity() -> str:
+    return _rate_limit_identity_var.get()
+
+
+def set_rate_limit_identity(identity: str) -> None:
+    _rate_limit_identity_var.set(identity)
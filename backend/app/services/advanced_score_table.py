@@ -0,0 +1,82 @@
+"""
+Advanced Stats のスコア縦持ち表（選手 × シーズン × 指標）。
+
+get_pitcher_trends / get_batter_trends は指標 view ごと・選手ごとに BigQuery ジョブを投げていた
+（投手 6 本・打者 5 本。比較ページで N 人並べると N 倍）。ここでは全指標 view の
+(選手 ID, シーズン, 合成スコア) を UNION ALL の 1 ジョブでまとめて読み込み、
+
+    player_id → season → metric_id → score
+
+の表としてプロセス内に持つ。トレンドは何人分でもこの表から返す（BigQuery を叩かない）。
+表は leaderboard_snapshot のストアに載せ、リーダーボードと同じポーラーで定期的に読み直す。
+
+指標 ID は投手 P*・打者 B* で重ならないため、二刀流選手も 1 つの player_id にまとめてよい。
+"""
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Sequence
+
+import pandas as pd
+
+from backend.app.utils.columnar import to_records
+
+
+SCORE_TABLE_COLUMNS = ["metric_id", "player_id", "game_year", "score"]
+
+
+@dataclass(frozen=True)
+class ScoreMetric:
+    """縦持ち表に載せる指標 1 つ（view の ID 列・合成スコア列）。"""
+
+    metric_id: str    # "P1", "B2" など
+    view: str         # プロジェクト・データセット込みの view 名
+    id_column: str    # "pitcher" / "batter"
+    score_column: str
+
+
+def score_table_query(metrics: Sequence[ScoreMetric]) -> str:
+    """全指標の (metric_id, player_id, game_year, score) を 1 本にまとめる UNION ALL。"""
+    return "\nUNION ALL\n".join(
+        f"""
+        SELECT
+            '{m.metric_id}'                   AS metric_id,
+            CAST({m.id_column} AS INT64)      AS player_id,
+            CAST(game_year AS INT64)          AS game_year,
+            CAST({m.score_column} AS FLOAT64) AS score
+        FROM `{m.view}`
+        WHERE {m.score_column} IS NOT NULL
+        """
+        for m in metrics
+    )
+
+
+class ScoreLongTable:
+    """読み込み済みのスコア縦持ち表。構築後は読み取り専用（スレッド間で共有してよい）。"""
+
+    def __init__(self, df: pd.DataFrame):
+        self.loaded_at = time.monotonic()
+        self._rows = len(df)
+        self._scores: Dict[int, Dict[int, Dict[str, float]]] = {}
+        for rec in to_records(df, columns=SCORE_TABLE_COLUMNS):
+            if rec["player_id"] is None or rec["game_year"] is None or rec["score"] is None:
+                continue
+            seasons = self._scores.setdefault(int(rec["player_id"]), {})
+            seasons.setdefault(int(rec["game_year"]), {})[rec["metric_id"]] = round(float(rec["score"]), 2)
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def trends(self, player_id: int, metric_ids: Sequence[str]) -> List[Dict[str, Any]]:
+        """1 選手の [{"season": 年, metric_id: スコア or None, ...}]（指定指標のどれかがあるシーズンのみ・昇順）"""
+        by_season = self._scores.get(int(player_id), {})
+        return [
+            {"season": season, **{mid: scores.get(mid) for mid in metric_ids}}
+            for season, scores in sorted(by_season.items())
+            if any(mid in scores for mid in metric_ids)
+        ]
+
+    def trends_many(
+        self, player_ids: Iterable[int], metric_ids: Sequence[str]
+    ) -> Dict[int, List[Dict[str, Any]]]:
+        """複数選手のトレンドをまとめて返す（表に無い選手は空リスト）。"""
+        return {int(pid): self.trends(pid, metric_ids) for pid in player_ids}
@@ -1,13 +1,28 @@
 """
 Advanced Stats Ranking サービス
 Statcast pitch-level データから投手・打者の高度指標を算出
+
+公開メソッドは @singleflight 付き。同一引数の同時リクエストは 1 回の集計を共有する。
+ランキングは散布図とページを同じ 1 回の取得から切り出す（同じ view を 2 回読まない）。
+トレンドは全指標のスコア縦持ち表（advanced_score_table）から返し、複数選手分もまとめて返せる。
 """
 import asyncio
 import logging
 import math
-from typing import Dict, List
-
-from backend.app.services.base import get_bq_client
+from typing import Dict, List, Tuple
+
+import pandas as pd
+
+from backend.app.services.advanced_score_table import (
+    SCORE_TABLE_COLUMNS,
+    ScoreLongTable,
+    ScoreMetric,
+    score_table_query,
+)
+from backend.app.services.bigquery_service import run_query, run_query_sync
+from backend.app.services.leaderboard_snapshot import get_leaderboard_snapshot_store
+from backend.app.utils.columnar import to_records
+from backend.app.utils.singleflight import singleflight
 from backend.app.config.settings import get_settings
 
 logger = logging.getLogger(__name__)
@@ -28,16 +43,61 @@ CONTACT_CONSISTENCY_VIEW   = settings.get_table_full_name("view_batter_contact_c
 SPRAY_MASTERY_VIEW         = settings.get_table_full_name("view_batter_spray_mastery_score")
 SWING_EFFICIENCY_VIEW      = settings.get_table_full_name("view_batter_swing_efficiency")
 
+# トレンド用スコア縦持ち表に載せる指標（view ごとの合成スコア列）
+PITCHER_SCORE_METRICS = [
+    ScoreMetric("P1", TUNNEL_VIEW,   "pitcher", "pitch_tunnel_score"),
+    ScoreMetric("P2", PRESSURE_VIEW, "pitcher", "pressure_dominance_index"),
+    ScoreMetric("P3", STAMINA_VIEW,  "pitcher", "stamina_score"),
+    ScoreMetric("P4", FINISHER_VIEW, "pitcher", "finisher_score"),
+    ScoreMetric("P6", ARSENAL_VIEW,  "pitcher", "arsenal_effectiveness_score"),
+    ScoreMetric("P8", PLATOON_VIEW,  "pitcher", "platoon_neutrality_score"),
+]
+BATTER_SCORE_METRICS = [
+    ScoreMetric("B1", SWING_EFFICIENCY_VIEW,    "batter", "swing_efficiency_score"),
+    ScoreMetric("B2", PLATE_DISCIPLINE_VIEW,    "batter", "plate_discipline_score"),
+    ScoreMetric("B3", CLUTCH_HITTING_VIEW,      "batter", "clutch_hitting_score"),
+    ScoreMetric("B4", CONTACT_CONSISTENCY_VIEW, "batter", "contact_consistency_score"),
+    ScoreMetric("B6", SPRAY_MASTERY_VIEW,       "batter", "spray_mastery_score"),
+]
+PITCHER_METRIC_IDS = [m.metric_id for m in PITCHER_SCORE_METRICS]
+BATTER_METRIC_IDS = [m.metric_id for m in BATTER_SCORE_METRICS]
+SCORE_TABLE_KEY = ("advanced_scores",)
+
+
+def _load_score_table() -> ScoreLongTable:
+    """
+    全指標のスコアを UNION ALL の 1 ジョブで読み込む。
+    UNION が失敗したら（1 view の不具合など）指標ごとに読み直し、読めた指標だけで表を作る。
+    """
+    metrics = PITCHER_SCORE_METRICS + BATTER_SCORE_METRICS
+    try:
+        return ScoreLongTable(run_query_sync(score_table_query(metrics), cache=False))
+    except Exception as e:
+        logger.warning(f"Advanced score table bulk load failed, loading per metric: {e}")
+
+    frames = []
+    for metric in metrics:
+        try:
+            frames.append(run_query_sync(score_table_query([metric]), cache=False))
+        except Exception as e:
+            logger.warning(f"Advanced score load failed for {metric.metric_id}: {e}")
+    if not frames:
+        raise RuntimeError("No advanced score view could be loaded")
+    return ScoreLongTable(pd.concat(frames, ignore_index=True))
+
+
+def _split_ranked(df: pd.DataFrame, scatter_limit: int, limit: int, offset: int) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """スコア降順の結果から (散布図用の上位 scatter_limit 行, ランキングの offset〜offset+limit 行) を切り出す"""
+    return df.iloc[:scatter_limit], df.iloc[offset:offset + limit]
+
 
 class AdvancedStatsService:
     """Advanced Stats 指標の算出・ランキング取得"""
 
-    def __init__(self):
-        self.client = get_bq_client()
-
     # ----------------------------------------------------------
     # P1: Pitch Tunnel Score
     # ----------------------------------------------------------
+    @singleflight
     async def get_pitch_tunnel_rankings(
         self,
         season: int = 2025,
@@ -50,6 +110,7 @@ class AdvancedStatsService:
         BQ View `view_pitch_tunnel_stats` を参照。
         z-score・集計はView側で完結。サービスはseason絞り込みとページネーションのみ。
         """
+        scatter_limit = 300  # scatter: リリース収束度 vs プレート発散度（トンネリングの本質的可視化）
         query = f"""
             SELECT
                 pitcher,
@@ -67,39 +128,17 @@ class AdvancedStatsService:
             FROM `{TUNNEL_VIEW}`
             WHERE game_year = @season
             ORDER BY pitch_tunnel_score DESC
-            LIMIT @limit OFFSET @offset
-        """
-
-        # scatter: リリース収束度 vs プレート発散度（トンネリングの本質的可視化）
-        scatter_query = f"""
-            SELECT
-                player_name,
-                avg_release_diff,
-                avg_plate_diff,
-                deception_rate_pct,
-                pitch_tunnel_score
-            FROM `{TUNNEL_VIEW}`
-            WHERE game_year = @season
-            ORDER BY pitch_tunnel_score DESC
-            LIMIT 300
+            LIMIT @fetch_limit
         """
 
         params = [
             ("season", "INT64", season),
-            ("limit", "INT64", limit),
-            ("offset", "INT64", offset),
-        ]
-        scatter_params = [
-            ("season", "INT64", season),
+            ("fetch_limit", "INT64", max(scatter_limit, offset + limit)),
         ]
 
         try:
-            scatter_config = self._make_job_config(scatter_params)
-            job_config = self._make_job_config(params)
-            scatter_df, df = await asyncio.gather(
-                asyncio.to_thread(lambda: self.client.query(scatter_query, job_config=scatter_config).to_dataframe()),
-                asyncio.to_thread(lambda: self.client.query(query, job_config=job_config).to_dataframe()),
-            )
+            # 散布図（上位 scatter_limit 件）とランキングのページを同じ結果から切り出す
+            scatter_df, df = _split_ranked(await run_query(query, params), scatter_limit, limit, offset)
             scatter_all = [
                 {
                     "player_name": row.get("player_name") or "",
@@ -145,6 +184,7 @@ class AdvancedStatsService:
     # ----------------------------------------------------------
     # P2: Pressure Dominance Index
     # ----------------------------------------------------------
+    @singleflight
     async def get_pressure_rankings(
         self,
         season: int = 2025,
@@ -158,6 +198,7 @@ class AdvancedStatsService:
         高LI(上位25%)時と低LI時の delta_pitcher_run_exp を比較し、
         プレッシャー下での投球パフォーマンスをZスコアで合成。
         """
+        scatter_limit = 200
         query = f"""
             SELECT
                 pitcher,
@@ -172,35 +213,17 @@ class AdvancedStatsService:
             FROM `{PRESSURE_VIEW}`
             WHERE game_year = @season
             ORDER BY pressure_dominance_index DESC
-            LIMIT @limit OFFSET @offset
-        """
-
-        scatter_query = f"""
-            SELECT
-                player_name,
-                high_li_run_exp,
-                pressure_delta,
-                pressure_dominance_index
-            FROM `{PRESSURE_VIEW}`
-            WHERE game_year = @season
-            ORDER BY pressure_dominance_index DESC
-            LIMIT 200
+            LIMIT @fetch_limit
         """
 
         params = [
             ("season", "INT64", season),
-            ("limit",  "INT64", limit),
-            ("offset", "INT64", offset),
+            ("fetch_limit", "INT64", max(scatter_limit, offset + limit)),
         ]
-        scatter_params = [("season", "INT64", season)]
 
         try:
-            scatter_config = self._make_job_config(scatter_params)
-            job_config = self._make_job_config(params)
-            scatter_df, df = await asyncio.gather(
-                asyncio.to_thread(lambda: self.client.query(scatter_query, job_config=scatter_config).to_dataframe()),
-                asyncio.to_thread(lambda: self.client.query(query, job_config=job_config).to_dataframe()),
-            )
+            # 散布図（上位 scatter_limit 件）とランキングのページを同じ結果から切り出す
+            scatter_df, df = _split_ranked(await run_query(query, params), scatter_limit, limit, offset)
             scatter_all = [
                 {
                     "player_name":              row.get("player_name") or "",
@@ -242,6 +265,7 @@ class AdvancedStatsService:
     # ----------------------------------------------------------
     # P4: Two-Strike Finisher Score
     # ----------------------------------------------------------
+    @singleflight
     async def get_finisher_rankings(
         self,
         season: int = 2025,
@@ -255,6 +279,7 @@ class AdvancedStatsService:
         view 側で dim_players_latest・dim_teams と JOIN 済みのため、
         サービス側は season 絞り込みとページネーションのみ。
         """
+        scatter_limit = 200
         query = f"""
             SELECT
                 pitcher,
@@ -268,35 +293,17 @@ class AdvancedStatsService:
             FROM `{FINISHER_VIEW}`
             WHERE game_year = @season
             ORDER BY finisher_score DESC
-            LIMIT @limit OFFSET @offset
-        """
-
-        scatter_query = f"""
-            SELECT
-                player_name,
-                whiff_rate,
-                put_away_woba,
-                finisher_score
-            FROM `{FINISHER_VIEW}`
-            WHERE game_year = @season
-            ORDER BY finisher_score DESC
-            LIMIT 200
+            LIMIT @fetch_limit
         """
 
         params = [
             ("season", "INT64", season),
-            ("limit", "INT64", limit),
-            ("offset", "INT64", offset),
+            ("fetch_limit", "INT64", max(scatter_limit, offset + limit)),
         ]
-        scatter_params = [("season", "INT64", season)]
 
         try:
-            scatter_config = self._make_job_config(scatter_params)
-            job_config = self._make_job_config(params)
-            scatter_df, df = await asyncio.gather(
-                asyncio.to_thread(lambda: self.client.query(scatter_query, job_config=scatter_config).to_dataframe()),
-                asyncio.to_thread(lambda: self.client.query(query, job_config=job_config).to_dataframe()),
-            )
+            # 散布図（上位 scatter_limit 件）とランキングのページを同じ結果から切り出す
+            scatter_df, df = _split_ranked(await run_query(query, params), scatter_limit, limit, offset)
             scatter_all = [
                 {
                     "player_name": row.get("player_name") or "",
@@ -337,6 +344,7 @@ class AdvancedStatsService:
     # ----------------------------------------------------------
     # P3: Stamina Score
     # ----------------------------------------------------------
+    @singleflight
     async def get_stamina_rankings(
         self,
         season: int = 2025,
@@ -349,6 +357,7 @@ class AdvancedStatsService:
         BQ View `view_pitch_stamina_score` を参照。
         view 側で dim_players_master・dim_teams と JOIN 済み。
         """
+        scatter_limit = 200
         query = f"""
             SELECT
                 pitcher,
@@ -365,35 +374,17 @@ class AdvancedStatsService:
             FROM `{STAMINA_VIEW}`
             WHERE game_year = @season
             ORDER BY stamina_score DESC
-            LIMIT @limit OFFSET @offset
-        """
-
-        scatter_query = f"""
-            SELECT
-                player_name,
-                avg_speed_slope,
-                tto_delta,
-                stamina_score
-            FROM `{STAMINA_VIEW}`
-            WHERE game_year = @season
-            ORDER BY stamina_score DESC
-            LIMIT 200
+            LIMIT @fetch_limit
         """
 
         params = [
             ("season", "INT64", season),
-            ("limit",  "INT64", limit),
-            ("offset", "INT64", offset),
+            ("fetch_limit", "INT64", max(scatter_limit, offset + limit)),
         ]
-        scatter_params = [("season", "INT64", season)]
 
         try:
-            scatter_config = self._make_job_config(scatter_params)
-            job_config = self._make_job_config(params)
-            scatter_df, df = await asyncio.gather(
-                asyncio.to_thread(lambda: self.client.query(scatter_query, job_config=scatter_config).to_dataframe()),
-                asyncio.to_thread(lambda: self.client.query(query, job_config=job_config).to_dataframe()),
-            )
+            # 散布図（上位 scatter_limit 件）とランキングのページを同じ結果から切り出す
+            scatter_df, df = _split_ranked(await run_query(query, params), scatter_limit, limit, offset)
             scatter_all = [
                 {
                     "player_name":    row.get("player_name") or "",
@@ -437,6 +428,7 @@ class AdvancedStatsService:
     # ----------------------------------------------------------
     # P6: Pitch Arsenal Effectiveness
     # ----------------------------------------------------------
+    @singleflight
     async def get_arsenal_rankings(
         self,
         season: int = 2024,
@@ -452,6 +444,7 @@ class AdvancedStatsService:
         """
         team_filter = "AND team_abbr = @team" if team != "All" else ""
 
+        scatter_limit = 100
         query = f"""
             SELECT
                 pitcher,
@@ -464,42 +457,19 @@ class AdvancedStatsService:
             WHERE game_year = @season
             {team_filter}
             ORDER BY arsenal_effectiveness_score DESC
-            LIMIT @limit OFFSET @offset
+            LIMIT @fetch_limit
         """
 
         params = [
             ("season", "INT64", season),
-            ("limit", "INT64", limit),
-            ("offset", "INT64", offset),
+            ("fetch_limit", "INT64", max(scatter_limit, offset + limit)),
         ]
         if team != "All":
             params.append(("team", "STRING", team))
 
-        scatter_query = f"""
-            SELECT
-                player_name,
-                diversity_score,
-                effectiveness_score,
-                arsenal_effectiveness_score
-            FROM `{ARSENAL_VIEW}`
-            WHERE game_year = @season
-            {team_filter}
-            ORDER BY arsenal_effectiveness_score DESC
-            LIMIT 100
-        """
-
-        scatter_params = [("season", "INT64", season)]
-        if team != "All":
-            scatter_params.append(("team", "STRING", team))
-
         try:
-            scatter_config = self._make_job_config(scatter_params)
-            job_config = self._make_job_config(params)
-            # scatter と ranking を並列実行
-            scatter_df, df = await asyncio.gather(
-                asyncio.to_thread(lambda: self.client.query(scatter_query, job_config=scatter_config).to_dataframe()),
-                asyncio.to_thread(lambda: self.client.query(query, job_config=job_config).to_dataframe()),
-            )
+            # 散布図（上位 scatter_limit 件）とランキングのページを同じ結果から切り出す
+            scatter_df, df = _split_ranked(await run_query(query, params), scatter_limit, limit, offset)
 
             scatter_all = []
             for _, row in scatter_df.iterrows():
@@ -528,7 +498,7 @@ class AdvancedStatsService:
 
             # --- Batch fetch pitch mix for all ranked pitchers (single query) ---
             if pitcher_ids:
-                pitch_mix_map = await asyncio.to_thread(self._fetch_batch_pitch_mix, pitcher_ids, season)
+                pitch_mix_map = await self._fetch_batch_pitch_mix(pitcher_ids, season)
                 for r in rankings:
                     r["pitch_mix"] = pitch_mix_map.get(r["pitcher_id"], [])
 
@@ -547,6 +517,7 @@ class AdvancedStatsService:
     # ----------------------------------------------------------
     # P6: 球種内訳データ（ランキング上の各投手用）
     # ----------------------------------------------------------
+    @singleflight
     async def get_arsenal_pitch_mix(
         self,
         pitcher_id: int,
@@ -579,13 +550,13 @@ class AdvancedStatsService:
             ORDER BY pitch_count DESC
         """
 
-        job_config = self._make_job_config([
+        params = [
             ("pitcher_id", "INT64", pitcher_id),
             ("season", "INT64", season),
-        ])
+        ]
 
         try:
-            df = self.client.query(query, job_config=job_config).to_dataframe()
+            df = await run_query(query, params)
             pitch_mix = []
             for _, row in df.iterrows():
                 pitch_mix.append({
@@ -604,6 +575,7 @@ class AdvancedStatsService:
     # ----------------------------------------------------------
     # B2: Plate Discipline Score
     # ----------------------------------------------------------
+    @singleflight
     async def get_plate_discipline_rankings(
         self,
         season: int = 2025,
@@ -616,6 +588,7 @@ class AdvancedStatsService:
         BQ View `view_batter_plate_discipline_score` を参照。
         O-Swing%(35%) + Z-Swing%(35%) + avg_decision_value(30%) の合成Zスコア。
         """
+        scatter_limit = 300
         query = f"""
             SELECT
                 batter,
@@ -631,35 +604,17 @@ class AdvancedStatsService:
             FROM `{PLATE_DISCIPLINE_VIEW}`
             WHERE game_year = @season
             ORDER BY plate_discipline_score DESC
-            LIMIT @limit OFFSET @offset
-        """
-
-        scatter_query = f"""
-            SELECT
-                player_name,
-                o_swing_pct,
-                z_swing_pct,
-                plate_discipline_score
-            FROM `{PLATE_DISCIPLINE_VIEW}`
-            WHERE game_year = @season
-            ORDER BY plate_discipline_score DESC
-            LIMIT 300
+            LIMIT @fetch_limit
         """
 
         params = [
             ("season", "INT64", season),
-            ("limit",  "INT64", limit),
-            ("offset", "INT64", offset),
+            ("fetch_limit", "INT64", max(scatter_limit, offset + limit)),
         ]
-        scatter_params = [("season", "INT64", season)]
 
         try:
-            scatter_config = self._make_job_config(scatter_params)
-            job_config = self._make_job_config(params)
-            scatter_df, df = await asyncio.gather(
-                asyncio.to_thread(lambda: self.client.query(scatter_query, job_config=scatter_config).to_dataframe()),
-                asyncio.to_thread(lambda: self.client.query(query, job_config=job_config).to_dataframe()),
-            )
+            # 散布図（上位 scatter_limit 件）とランキングのページを同じ結果から切り出す
+            scatter_df, df = _split_ranked(await run_query(query, params), scatter_limit, limit, offset)
             scatter_all = [
                 {
                     "player_name":           row.get("player_name") or "",
@@ -702,6 +657,7 @@ class AdvancedStatsService:
     # ----------------------------------------------------------
     # B3: Clutch Hitting Index
     # ----------------------------------------------------------
+    @singleflight
     async def get_clutch_rankings(
         self,
         season: int = 2025,
@@ -714,6 +670,7 @@ class AdvancedStatsService:
         BQ View `view_batter_clutch_hitting` を参照。
         高LI(上位25%)時の wOBA - 全体wOBA = clutch_index の合成Zスコア。
         """
+        scatter_limit = 300
         query = f"""
             SELECT
                 batter,
@@ -730,36 +687,17 @@ class AdvancedStatsService:
             FROM `{CLUTCH_HITTING_VIEW}`
             WHERE game_year = @season
             ORDER BY clutch_hitting_score DESC
-            LIMIT @limit OFFSET @offset
-        """
-
-        scatter_query = f"""
-            SELECT
-                player_name,
-                woba_overall,
-                woba_high_li,
-                clutch_index,
-                clutch_hitting_score
-            FROM `{CLUTCH_HITTING_VIEW}`
-            WHERE game_year = @season
-            ORDER BY clutch_hitting_score DESC
-            LIMIT 300
+            LIMIT @fetch_limit
         """
 
         params = [
             ("season", "INT64", season),
-            ("limit",  "INT64", limit),
-            ("offset", "INT64", offset),
+            ("fetch_limit", "INT64", max(scatter_limit, offset + limit)),
         ]
-        scatter_params = [("season", "INT64", season)]
 
         try:
-            scatter_config = self._make_job_config(scatter_params)
-            job_config = self._make_job_config(params)
-            scatter_df, df = await asyncio.gather(
-                asyncio.to_thread(lambda: self.client.query(scatter_query, job_config=scatter_config).to_dataframe()),
-                asyncio.to_thread(lambda: self.client.query(query, job_config=job_config).to_dataframe()),
-            )
+            # 散布図（上位 scatter_limit 件）とランキングのページを同じ結果から切り出す
+            scatter_df, df = _split_ranked(await run_query(query, params), scatter_limit, limit, offset)
             scatter_all = [
                 {
                     "player_name":          row.get("player_name") or "",
@@ -804,6 +742,7 @@ class AdvancedStatsService:
     # ----------------------------------------------------------
     # B4: Contact Consistency Score
     # ----------------------------------------------------------
+    @singleflight
     async def get_contact_consistency_rankings(
         self,
         season: int = 2025,
@@ -818,6 +757,7 @@ class AdvancedStatsService:
         ハードヒット率(20%) + スウィートスポット率(10%) の合成Zスコア。
         再Zスコア化済み: 100 + Z*15 (OPS+/wRC+と同等スケール)
         """
+        scatter_limit = 300
         query = f"""
             SELECT
                 batter,
@@ -833,35 +773,17 @@ class AdvancedStatsService:
             FROM `{CONTACT_CONSISTENCY_VIEW}`
             WHERE game_year = @season
             ORDER BY contact_consistency_score DESC
-            LIMIT @limit OFFSET @offset
-        """
-
-        scatter_query = f"""
-            SELECT
-                player_name,
-                avg_xwoba,
-                cv_xwoba,
-                contact_consistency_score
-            FROM `{CONTACT_CONSISTENCY_VIEW}`
-            WHERE game_year = @season
-            ORDER BY contact_consistency_score DESC
-            LIMIT 300
+            LIMIT @fetch_limit
         """
 
         params = [
             ("season", "INT64", season),
-            ("limit",  "INT64", limit),
-            ("offset", "INT64", offset),
+            ("fetch_limit", "INT64", max(scatter_limit, offset + limit)),
         ]
-        scatter_params = [("season", "INT64", season)]
 
         try:
-            scatter_config = self._make_job_config(scatter_params)
-            job_config = self._make_job_config(params)
-            scatter_df, df = await asyncio.gather(
-                asyncio.to_thread(lambda: self.client.query(scatter_query, job_config=scatter_config).to_dataframe()),
-                asyncio.to_thread(lambda: self.client.query(query, job_config=job_config).to_dataframe()),
-            )
+            # 散布図（上位 scatter_limit 件）とランキングのページを同じ結果から切り出す
+            scatter_df, df = _split_ranked(await run_query(query, params), scatter_limit, limit, offset)
             scatter_all = [
                 {
                     "player_name":               row.get("player_name") or "",
@@ -904,6 +826,7 @@ class AdvancedStatsService:
     # ----------------------------------------------------------
     # B1: Swing Efficiency Score
     # ----------------------------------------------------------
+    @singleflight
     async def get_swing_efficiency_rankings(
         self,
         season: int = 2024,
@@ -918,6 +841,7 @@ class AdvancedStatsService:
         再Zスコア化済み: 100 + Z*15 (OPS+/wRC+と同等スケール)
         ⚠️ bat_speed / swing_length は 2024年〜のみ有効。
         """
+        scatter_limit = 500
         query = f"""
             SELECT
                 batter,
@@ -934,36 +858,17 @@ class AdvancedStatsService:
             FROM `{SWING_EFFICIENCY_VIEW}`
             WHERE game_year = @season
             ORDER BY swing_efficiency_score DESC
-            LIMIT @limit OFFSET @offset
-        """
-
-        scatter_query = f"""
-            SELECT
-                player_name,
-                avg_bat_speed,
-                avg_efficiency,
-                contact_count,
-                swing_efficiency_score
-            FROM `{SWING_EFFICIENCY_VIEW}`
-            WHERE game_year = @season
-            ORDER BY swing_efficiency_score DESC
-            LIMIT 500
+            LIMIT @fetch_limit
         """
 
         params = [
             ("season", "INT64", season),
-            ("limit",  "INT64", limit),
-            ("offset", "INT64", offset),
+            ("fetch_limit", "INT64", max(scatter_limit, offset + limit)),
         ]
-        scatter_params = [("season", "INT64", season)]
 
         try:
-            scatter_config = self._make_job_config(scatter_params)
-            job_config = self._make_job_config(params)
-            scatter_df, df = await asyncio.gather(
-                asyncio.to_thread(lambda: self.client.query(scatter_query, job_config=scatter_config).to_dataframe()),
-                asyncio.to_thread(lambda: self.client.query(query, job_config=job_config).to_dataframe()),
-            )
+            # 散布図（上位 scatter_limit 件）とランキングのページを同じ結果から切り出す
+            scatter_df, df = _split_ranked(await run_query(query, params), scatter_limit, limit, offset)
             scatter_all = [
                 {
                     "player_name":            row.get("player_name") or "",
@@ -1008,6 +913,7 @@ class AdvancedStatsService:
     # ----------------------------------------------------------
     # B6: Spray Mastery Score
     # ----------------------------------------------------------
+    @singleflight
     async def get_spray_mastery_rankings(
         self,
         season: int = 2025,
@@ -1021,6 +927,7 @@ class AdvancedStatsService:
         エントロピー(40%) + 全体xwOBA(35%) + オポ方向xwOBA(25%) の合成Zスコア。
         スケール: 100 + Z×15（OPS+/wRC+ スタイル、100=リーグ平均）
         """
+        scatter_limit = 300
         query = f"""
             SELECT
                 batter,
@@ -1041,36 +948,17 @@ class AdvancedStatsService:
             FROM `{SPRAY_MASTERY_VIEW}`
             WHERE game_year = @season
             ORDER BY spray_mastery_score DESC
-            LIMIT @limit OFFSET @offset
-        """
-
-        scatter_query = f"""
-            SELECT
-                player_name,
-                spray_entropy,
-                avg_xwoba,
-                oppo_pct,
-                spray_mastery_score
-            FROM `{SPRAY_MASTERY_VIEW}`
-            WHERE game_year = @season
-            ORDER BY spray_mastery_score DESC
-            LIMIT 300
+            LIMIT @fetch_limit
         """
 
         params = [
             ("season", "INT64", season),
-            ("limit",  "INT64", limit),
-            ("offset", "INT64", offset),
+            ("fetch_limit", "INT64", max(scatter_limit, offset + limit)),
         ]
-        scatter_params = [("season", "INT64", season)]
 
         try:
-            scatter_config = self._make_job_config(scatter_params)
-            job_config = self._make_job_config(params)
-            scatter_df, df = await asyncio.gather(
-                asyncio.to_thread(lambda: self.client.query(scatter_query, job_config=scatter_config).to_dataframe()),
-                asyncio.to_thread(lambda: self.client.query(query, job_config=job_config).to_dataframe()),
-            )
+            # 散布図（上位 scatter_limit 件）とランキングのページを同じ結果から切り出す
+            scatter_df, df = _split_ranked(await run_query(query, params), scatter_limit, limit, offset)
             scatter_all = [
                 {
                     "player_name":        row.get("player_name") or "",
@@ -1119,6 +1007,7 @@ class AdvancedStatsService:
     # ----------------------------------------------------------
     # P8: Platoon Neutrality Score
     # ----------------------------------------------------------
+    @singleflight
     async def get_platoon_neutrality_rankings(
         self,
         season: int = 2025,
@@ -1132,6 +1021,7 @@ class AdvancedStatsService:
         均等性 (60%) + パフォーマンス水準 (40%) の合成 z-score。
         スケール: 100 + Z×15（OPS+/wRC+ スタイル、100=リーグ平均）
         """
+        scatter_limit = 200
         query = f"""
             SELECT
                 pitcher,
@@ -1150,36 +1040,17 @@ class AdvancedStatsService:
             FROM `{PLATOON_VIEW}`
             WHERE game_year = @season
             ORDER BY platoon_neutrality_score DESC
-            LIMIT @limit OFFSET @offset
-        """
-
-        scatter_query = f"""
-            SELECT
-                player_name,
-                woba_vs_l,
-                woba_vs_r,
-                woba_diff_abs,
-                platoon_neutrality_score
-            FROM `{PLATOON_VIEW}`
-            WHERE game_year = @season
-            ORDER BY platoon_neutrality_score DESC
-            LIMIT 200
+            LIMIT @fetch_limit
         """
 
         params = [
             ("season", "INT64", season),
-            ("limit", "INT64", limit),
-            ("offset", "INT64", offset),
+            ("fetch_limit", "INT64", max(scatter_limit, offset + limit)),
         ]
-        scatter_params = [("season", "INT64", season)]
 
         try:
-            scatter_config = self._make_job_config(scatter_params)
-            job_config = self._make_job_config(params)
-            scatter_df, df = await asyncio.gather(
-                asyncio.to_thread(lambda: self.client.query(scatter_query, job_config=scatter_config).to_dataframe()),
-                asyncio.to_thread(lambda: self.client.query(query, job_config=job_config).to_dataframe()),
-            )
+            # 散布図（上位 scatter_limit 件）とランキングのページを同じ結果から切り出す
+            scatter_df, df = _split_ranked(await run_query(query, params), scatter_limit, limit, offset)
             scatter_all = [
                 {
                     "player_name": row.get("player_name") or "",
@@ -1226,6 +1097,7 @@ class AdvancedStatsService:
     # ----------------------------------------------------------
     # 検索（投手名オートコンプリート）— dim_players_latest 使用
     # ----------------------------------------------------------
+    @singleflight
     async def search_pitchers(
         self,
         name: str,
@@ -1247,16 +1119,14 @@ class AdvancedStatsService:
             LIMIT @limit
         """
 
-        job_config = self._make_job_config([
+        params = [
             ("season", "INT64", season),
             ("name_pattern", "STRING", f"%{name}%"),
             ("limit", "INT64", limit),
-        ])
+        ]
 
         try:
-            df = await asyncio.to_thread(
-                lambda: self.client.query(query, job_config=job_config).to_dataframe()
-            )
+            df = await run_query(query, params)
             results = []
             seen = set()
             for _, row in df.iterrows():
@@ -1278,7 +1148,7 @@ class AdvancedStatsService:
     # ----------------------------------------------------------
     # Batch pitch mix (ランキング一括取得用)
     # ----------------------------------------------------------
-    def _fetch_batch_pitch_mix(
+    async def _fetch_batch_pitch_mix(
         self,
         pitcher_ids: List[int],
         season: int,
@@ -1315,78 +1185,57 @@ class AdvancedStatsService:
             ORDER BY s.pitcher, pitch_count DESC
         """
 
-        from google.cloud import bigquery as bq
-        job_config = bq.QueryJobConfig(
-            query_parameters=[
-                bq.ArrayQueryParameter("pitcher_ids", "INT64", pitcher_ids),
-                bq.ScalarQueryParameter("season", "INT64", season),
-            ]
-        )
-
-        df = self.client.query(query, job_config=job_config).to_dataframe()
-
-        result: Dict[int, List[Dict]] = {}
-        for _, row in df.iterrows():
-            pid = int(row["pitcher_id"])
-            if pid not in result:
-                result[pid] = []
-            result[pid].append({
-                "pitch_name": row["pitch_name"],
-                "pitch_count": int(row["pitch_count"]),
-                "usage_pct": float(row["usage_pct"]),
-                "avg_run_exp": float(row["avg_run_exp"]),
-            })
-        return result
+        df = await run_query(query, [
+            ("pitcher_ids", "INT64", pitcher_ids),
+            ("season", "INT64", season),
+        ])
+
+        # 列単位で型を揃えてから投手ごとに切り出す（行単位の Series 生成を避ける）
+        if df.empty:
+            return {}
+        df = df.astype({"pitcher_id": "int64", "pitch_count": "int64",
+                        "usage_pct": "float64", "avg_run_exp": "float64"})
+        cols = ["pitch_name", "pitch_count", "usage_pct", "avg_run_exp"]
+        return {
+            int(pid): to_records(group, columns=cols)
+            for pid, group in df.groupby("pitcher_id", sort=False)
+        }
 
     # ----------------------------------------------------------
     # Pitcher Trends (全メトリクス・全シーズン)
     # ----------------------------------------------------------
-    async def get_pitcher_trends(self, pitcher_id: int) -> Dict:
-        """特定投手の全メトリクス・全シーズンスコアを並列取得"""
-        METRIC_SPECS = [
-            ("P1", TUNNEL_VIEW,   "pitcher", "pitch_tunnel_score"),
-            ("P2", PRESSURE_VIEW, "pitcher", "pressure_dominance_index"),
-            ("P3", STAMINA_VIEW,  "pitcher", "stamina_score"),
-            ("P4", FINISHER_VIEW, "pitcher", "finisher_score"),
-            ("P6", ARSENAL_VIEW,  "pitcher", "arsenal_effectiveness_score"),
-            ("P8", PLATOON_VIEW,  "pitcher", "platoon_neutrality_score"),
-        ]
+    async def _score_table(self) -> ScoreLongTable:
+        """スコア縦持ち表（未ロード・期限切れのときだけ BigQuery から 1 ジョブで読み込む）"""
+        try:
+            return await asyncio.to_thread(
+                get_leaderboard_snapshot_store().get, SCORE_TABLE_KEY, _load_score_table
+            )
+        except Exception as e:
+            # 従来どおり、スコアが読めなければ空のトレンドを返す
+            logger.warning(f"Advanced score table unavailable: {e}")
+            return ScoreLongTable(pd.DataFrame(columns=SCORE_TABLE_COLUMNS))
 
-        async def fetch_one(metric_id: str, view: str, id_col: str, score_col: str):
-            q = f"""
-                SELECT game_year, {score_col} AS score
-                FROM `{view}`
-                WHERE {id_col} = @player_id
-                ORDER BY game_year
-            """
-            cfg = self._make_job_config([("player_id", "INT64", pitcher_id)])
-            df = await asyncio.to_thread(lambda: self.client.query(q, job_config=cfg).to_dataframe())
-            return metric_id, {int(r["game_year"]): round(float(r["score"]), 2) for _, r in df.iterrows()}
-
-        results = await asyncio.gather(
-            *[fetch_one(*spec) for spec in METRIC_SPECS],
-            return_exceptions=True,
-        )
-
-        seasons: set = set()
-        metric_data: dict = {}
-        for r in results:
-            if isinstance(r, Exception):
-                logger.warning(f"Pitcher trend fetch failed: {r}")
-                continue
-            mid, season_scores = r
-            metric_data[mid] = season_scores
-            seasons.update(season_scores.keys())
-
-        trends = [
-            {"season": yr, **{mid: metric_data.get(mid, {}).get(yr) for mid in ["P1", "P2", "P3", "P4", "P6", "P8"]}}
-            for yr in sorted(seasons)
-        ]
-        return {"pitcher_id": pitcher_id, "trends": trends}
+    @singleflight
+    async def get_pitcher_trends(self, pitcher_id: int) -> Dict:
+        """特定投手の全メトリクス・全シーズンスコア（スコア縦持ち表から返す）"""
+        table = await self._score_table()
+        return {"pitcher_id": pitcher_id, "trends": table.trends(pitcher_id, PITCHER_METRIC_IDS)}
+
+    @singleflight
+    async def get_pitcher_trends_bulk(self, pitcher_ids: Tuple[int, ...]) -> Dict:
+        """複数投手のトレンドを 1 回でまとめて返す（比較ページ用。順序は pitcher_ids のまま）"""
+        table = await self._score_table()
+        return {
+            "players": [
+                {"pitcher_id": pid, "trends": table.trends(pid, PITCHER_METRIC_IDS)}
+                for pid in pitcher_ids
+            ]
+        }
 
     # ----------------------------------------------------------
     # Batter Search
     # ----------------------------------------------------------
+    @singleflight
     async def search_batters(self, name: str, season: int = 2025, limit: int = 10) -> List[Dict]:
         """打者名で検索（部分一致）"""
         query = f"""
@@ -1402,13 +1251,13 @@ class AdvancedStatsService:
                 AND s.pitch_type IS NOT NULL
             LIMIT @limit
         """
-        job_config = self._make_job_config([
+        params = [
             ("season", "INT64", season),
             ("name_pattern", "STRING", f"%{name}%"),
             ("limit", "INT64", limit),
-        ])
+        ]
         try:
-            df = await asyncio.to_thread(lambda: self.client.query(query, job_config=job_config).to_dataframe())
+            df = await run_query(query, params)
             results = []
             seen = set()
             for _, row in df.iterrows():
@@ -1429,57 +1278,19 @@ class AdvancedStatsService:
     # ----------------------------------------------------------
     # Batter Trends (全メトリクス・全シーズン)
     # ----------------------------------------------------------
+    @singleflight
     async def get_batter_trends(self, batter_id: int) -> Dict:
-        """特定打者の全メトリクス・全シーズンスコアを並列取得"""
-        METRIC_SPECS = [
-            ("B1", SWING_EFFICIENCY_VIEW,    "batter", "swing_efficiency_score"),
-            ("B2", PLATE_DISCIPLINE_VIEW,    "batter", "plate_discipline_score"),
-            ("B3", CLUTCH_HITTING_VIEW,      "batter", "clutch_hitting_score"),
-            ("B4", CONTACT_CONSISTENCY_VIEW, "batter", "contact_consistency_score"),
-            ("B6", SPRAY_MASTERY_VIEW,       "batter", "spray_mastery_score"),
-        ]
-
-        async def fetch_one(metric_id: str, view: str, id_col: str, score_col: str):
-            q = f"""
-                SELECT game_year, {score_col} AS score
-                FROM `{view}`
-                WHERE {id_col} = @player_id
-                ORDER BY game_year
-            """
-            cfg = self._make_job_config([("player_id", "INT64", batter_id)])
-            df = await asyncio.to_thread(lambda: self.client.query(q, job_config=cfg).to_dataframe())
-            return metric_id, {int(r["game_year"]): round(float(r["score"]), 2) for _, r in df.iterrows()}
-
-        results = await asyncio.gather(
-            *[fetch_one(*spec) for spec in METRIC_SPECS],
-            return_exceptions=True,
-        )
-
-        seasons: set = set()
-        metric_data: dict = {}
-        for r in results:
-            if isinstance(r, Exception):
-                logger.warning(f"Batter trend fetch failed: {r}")
-                continue
-            mid, season_scores = r
-            metric_data[mid] = season_scores
-            seasons.update(season_scores.keys())
-
-        trends = [
-            {"season": yr, **{mid: metric_data.get(mid, {}).get(yr) for mid in ["B1", "B2", "B3", "B4", "B6"]}}
-            for yr in sorted(seasons)
-        ]
-        return {"batter_id": batter_id, "trends": trends}
-
-    # ----------------------------------------------------------
-    # Helpers
-    # ----------------------------------------------------------
-    @staticmethod
-    def _make_job_config(params: List[tuple]):
-        from google.cloud import bigquery as bq
-        return bq.QueryJobConfig(
-            query_parameters=[
-                bq.ScalarQueryParameter(name, type_, value)
-                for name, type_, value in params
+        """特定打者の全メトリクス・全シーズンスコア（スコア縦持ち表から返す）"""
+        table = await self._score_table()
+        return {"batter_id": batter_id, "trends": table.trends(batter_id, BATTER_METRIC_IDS)}
+
+    @singleflight
+    async def get_batter_trends_bulk(self, batter_ids: Tuple[int, ...]) -> Dict:
+        """複数打者のトレンドを 1 回でまとめて返す（比較ページ用。順序は batter_ids のまま）"""
+        table = await self._score_table()
+        return {
+            "players": [
+                {"batter_id": bid, "trends": table.trends(bid, BATTER_METRIC_IDS)}
+                for bid in batter_ids
             ]
-        )
+        }
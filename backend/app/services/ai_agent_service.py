@@ -22,7 +22,6 @@ from .bigquery_service import client
 
 from backend.app.core.exceptions import DataFetchError, AgentReasoningError, DataStructureError
 from backend.app.utils.structured_logger import get_logger
-from .cache_service import StatsCache
 
 from backend.app.core.exceptions import PromptInjectionError
 from .security_guardrail import get_security_guardrail
@@ -1,15 +1,17 @@
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, AsyncIterator
 # from google.cloud import bigquery
 # from google.oauth2 import service_account
 from google.cloud.exceptions import GoogleCloudError
+from backend.app.core.exceptions import QueryTimeoutError
 import pandas as pd
+import asyncio
 import os
 import json
 import re
 from dotenv import load_dotenv
 # from functools import lru_cache
 from datetime import datetime
-from .bigquery_service import client
+from .bigquery_service import run_query_sync
 import logging
 from .conversation_service import get_conversation_service
 from .analytics.base_engine import BaseEngine
@@ -190,14 +192,15 @@ def _generate_final_response_with_llm(original_query: str, data_df: pd.DataFrame
     return BaseEngine.generate_final_response_with_llm(original_query, data_df)
 
 
-def get_ai_response_for_qna_enhanced(
-        query: str, 
+def _prepare_qna(
+        query: str,
         season: Optional[int] = None,
-        session_id: Optional[str] = None # Id from frontend to track user session
-    ) -> Optional[Dict[str, Any]]:
+        session_id: Optional[str] = None
+    ) -> Dict[str, Any]:
     """
-    【打撃リーダーボード特化版】
-    ユーザーの"打撃リーダーボード"に関する質問を処理します。
+    [ステップ0〜3] 会話コンテキスト解決 → 質問解析 → SQL 構築 → BigQuery 取得。
+    途中で打ち切る場合は {"response": 応答} を、最後まで進んだ場合は
+    ステップ4（応答生成）に必要な値を返す。同期版・ストリーミング版で共有する。
     """
 
     # Step 0: Resolve conversation context (会話コンテキストの解決 == 直前の履歴から情報を補完)
@@ -235,48 +238,47 @@ def get_ai_response_for_qna_enhanced(
         if session_id:
             conv_service.add_message(session_id, "assistant", error_response["answer"])
         
-        return error_response
+        return {"response": error_response}
     
     logger.info(f"Parsed query parameters: {query_params}")
 
     # Step 1.5: セキュリティ検証（SQLインジェクション対策）
     if not _validate_query_params(query_params):
         logger.error(f"Security validation failed for parameters: {query_params}")
-        return {
+        return {"response": {
             "answer": "不正な入力を検出しました。正しい形式で質問してください。",
             "isTable": False
-        }
+        }}
 
     # Step 2: Build SQL with parameterization
-    query_strategy = _determine_query_strategy(query_params)
+    # 同じ形状の質問はコンパイル済みプランを再利用し、SQL 組み立てを省く
+    query_strategy, sql_query, sql_parameters = BaseEngine.plan_query(query_params)
     logger.info(f"Using query strategy: {query_strategy}")
 
     if query_strategy == "aggregated_table":
         # Using aggregated table
-        sql_query, sql_parameters = _build_dynamic_sql(query_params)
         if not sql_query:
             logger.warning("Failed to build SQL query.")
-            return {
+            return {"response": {
                 "answer": "この質問に対応するデータの検索クエリを構築できませんでした。",
                 "isTable": False
-            }
+            }}
         logger.info(f"Generated parameterized SQL query:\n{sql_query}")
         logger.info(f"Query parameters: {sql_parameters}")
 
     else: # Using statcast master table
-        sql_query, sql_parameters = _build_dynamic_statcast_sql(query_params)
         if not sql_query:
             logger.warning("Failed to build SQL query with statcast master table.")
-            return {
+            return {"response": {
                 "answer": "この質問に対応するデータの検索クエリを構築できませんでした。",
                 "isTable": False
-            }
+            }}
         logger.info(f"Generated parameterized SQL query (strategy: {query_strategy}):\n{sql_query}")
         logger.info(f"Query parameters: {sql_parameters}")
 
     # Step 3: Fetch data from BigQuery with parameterized query
     try:
-        from google.cloud.bigquery import QueryJobConfig, ScalarQueryParameter, ArrayQueryParameter
+        from google.cloud.bigquery import ScalarQueryParameter, ArrayQueryParameter
 
         # BigQuery用のパラメータ設定を作成
         query_parameters_list = []
@@ -304,13 +306,11 @@ def get_ai_response_for_qna_enhanced(
                 query_parameters_list.append(param)
                 logger.debug(f"Added scalar parameter: {key} = {value} (STRING)")
 
-        job_config = QueryJobConfig(query_parameters=query_parameters_list)
-
         logger.info(f"Total query parameters configured: {len(query_parameters_list)}")
         logger.debug(f"Query parameters list: {[p.name for p in query_parameters_list]}")
 
         query_start = datetime.now()
-        results_df = client.query(sql_query, job_config=job_config).to_dataframe()
+        results_df = run_query_sync(sql_query, query_parameters_list)
         query_duration = (datetime.now() - query_start).total_seconds()
 
         logger.info(f"Query completed in {query_duration:.2f}s, fetched {len(results_df)} rows")
@@ -318,171 +318,264 @@ def get_ai_response_for_qna_enhanced(
         # Performance warning for slow queries
         if query_duration > 10:  # 10秒以上
             logger.warning(f"Slow query detected: {query_duration:.2f}s")
-    except GoogleCloudError as e:
+    except (GoogleCloudError, QueryTimeoutError) as e:
         logger.error(f"BigQuery query failed: {e}", exc_info=True)
 
         # より詳細なエラーメッセージ
         error_message = "データベースからのデータ取得中にエラーが発生しました。"
-        if "timeout" in str(e).lower():
+        if isinstance(e, QueryTimeoutError) or "timeout" in str(e).lower():
             error_message += "クエリがタイムアウトしました。条件を絞って再試行してください。"
         elif "quota" in str(e).lower():
             error_message += "利用制限に達しました。しばらくしてから再試行してください。"
         
-        return {
+        return {"response": {
             "answer": error_message,
             "isTable": False
-        }
+        }}
     
     if results_df.empty:
-        return {
+        return {"response": {
             "answer": "指定された条件に一致するデータが見つかりませんでした。条件を変更して再試行してください。",
             "isTable": False
-        }
-    
+        }}
+
     # Step 4: Format response
     total_duration = (datetime.now() - query_start).total_seconds()
     logger.info(f"Total request processing time: {total_duration:.2f}s")
-    
-    # if output format is table
-    if query_params.get("output_format") == "table":
-        # Debug logging
-        logger.info(f"DataFrame columns: {results_df.columns.tolist()}")
-        logger.info(f"DataFrame dtypes: {results_df.dtypes.to_dict()}")
-        logger.info(f"First row sample: {results_df.iloc[0].to_dict() if len(results_df) > 0 else 'No data'}")
-        
-        # Use centralized decimal columns configuration
-        decimal_columns = DECIMAL_FORMAT_COLUMNS
-        
-        # Force decimal columns to have proper numeric types BEFORE converting to dict
+
+    return {
+        "query_params": query_params,
+        "results_df": results_df,
+        "season": season,
+        "context_used": context_used,
+    }
+
+
+def _build_table_response(
+        query_params: Dict[str, Any],
+        results_df: pd.DataFrame,
+        session_id: Optional[str],
+        context_used: bool
+    ) -> Dict[str, Any]:
+    """[ステップ4] output_format が table の場合の表形式レスポンスを組み立てる。"""
+    conv_service = get_conversation_service()
+
+    # Debug logging
+    logger.info(f"DataFrame columns: {results_df.columns.tolist()}")
+    logger.info(f"DataFrame dtypes: {results_df.dtypes.to_dict()}")
+    logger.info(f"First row sample: {results_df.iloc[0].to_dict() if len(results_df) > 0 else 'No data'}")
+
+    # Use centralized decimal columns configuration
+    decimal_columns = DECIMAL_FORMAT_COLUMNS
+
+    # Force decimal columns to have proper numeric types BEFORE converting to dict
+    for col in decimal_columns:
+        if col in results_df.columns:
+            # Convert to numeric, coercing errors to NaN, then fill NaN with None
+            results_df[col] = pd.to_numeric(results_df[col], errors='coerce')
+            results_df[col] = results_df[col].where(pd.notnull(results_df[col]), None)
+
+    # Convert to dictionary
+    table_data = results_df.to_dict('records')
+
+    # Post-process to ensure decimal formatting
+    for row in table_data:
         for col in decimal_columns:
-            if col in results_df.columns:
-                # Convert to numeric, coercing errors to NaN, then fill NaN with None
-                results_df[col] = pd.to_numeric(results_df[col], errors='coerce')
-                results_df[col] = results_df[col].where(pd.notnull(results_df[col]), None)
-        
-        # Convert to dictionary
-        table_data = results_df.to_dict('records')
-        
-        # Post-process to ensure decimal formatting
-        for row in table_data:
-            for col in decimal_columns:
-                if col in row and row[col] is not None:
-                    try:
-                        # Ensure it's a proper decimal number
-                        value = float(row[col])
-                        if not pd.isna(value):
-                            row[col] = round(value, 3)
-                        else:
-                            row[col] = None
-                    except (ValueError, TypeError) as e:
-                        logger.warning(f"Could not convert {col} value {row[col]} to float: {e}")
-                        # Keep original value
-                        pass
-        
-        # Debug the final table data
-        logger.info(f"Final table_data sample: {table_data[0] if table_data else 'No data'}")
-        
-        columns = [{"key": col, "label": col.replace('_', ' ').title()} for col in results_df.columns]
-        
-        # Check if single row result for transposition
-        is_single_row = len(results_df) == 1
-        
-        # Add grouping metadata for career batting
-        grouping_info = None
-        if query_params.get("query_type") == "career_batting":
-            # Get base info columns (name, team, etc.)
-            base_columns = [col for col in results_df.columns if col in ['name', 'batter_name', 'career_last_team']]
-            career_base_columns = [col for col in results_df.columns if col.startswith('career_') and '_at_' not in col and '_by_' not in col]
-            risp_columns = [col for col in results_df.columns if '_at_risp' in col]
-            bases_loaded_columns = [col for col in results_df.columns if '_at_bases_loaded' in col]
-            
-            grouping_info = {
-                "type": "career_batting_chunks",
-                "groups": [
-                    {
-                        "name": "Career Stats",
-                        "columns": base_columns + career_base_columns
-                    },
-                    {
-                        "name": "Career RISP Stats", 
-                        "columns": risp_columns
-                    },
-                    {
-                        "name": "Career Bases Loaded Stats",
-                        "columns": bases_loaded_columns
-                    }
-                ]
-            }
-        
-        table_response = {
-            "answer": f"以下は{len(results_df)}件の結果です：",
-            "isTable": True,
-            "isTransposed": is_single_row,
-            "tableData": table_data,
-            "columns": columns,
-            "decimalColumns": [col for col in results_df.columns if col in DECIMAL_FORMAT_COLUMNS],
-            "grouping": grouping_info
+            if col in row and row[col] is not None:
+                try:
+                    # Ensure it's a proper decimal number
+                    value = float(row[col])
+                    if not pd.isna(value):
+                        row[col] = round(value, 3)
+                    else:
+                        row[col] = None
+                except (ValueError, TypeError) as e:
+                    logger.warning(f"Could not convert {col} value {row[col]} to float: {e}")
+                    # Keep original value
+                    pass
+
+    # Debug the final table data
+    logger.info(f"Final table_data sample: {table_data[0] if table_data else 'No data'}")
+
+    columns = [{"key": col, "label": col.replace('_', ' ').title()} for col in results_df.columns]
+
+    # Check if single row result for transposition
+    is_single_row = len(results_df) == 1
+
+    # Add grouping metadata for career batting
+    grouping_info = None
+    if query_params.get("query_type") == "career_batting":
+        # Get base info columns (name, team, etc.)
+        base_columns = [col for col in results_df.columns if col in ['name', 'batter_name', 'career_last_team']]
+        career_base_columns = [col for col in results_df.columns if col.startswith('career_') and '_at_' not in col and '_by_' not in col]
+        risp_columns = [col for col in results_df.columns if '_at_risp' in col]
+        bases_loaded_columns = [col for col in results_df.columns if '_at_bases_loaded' in col]
+
+        grouping_info = {
+            "type": "career_batting_chunks",
+            "groups": [
+                {
+                    "name": "Career Stats",
+                    "columns": base_columns + career_base_columns
+                },
+                {
+                    "name": "Career RISP Stats", 
+                    "columns": risp_columns
+                },
+                {
+                    "name": "Career Bases Loaded Stats",
+                    "columns": bases_loaded_columns
+                }
+            ]
         }
 
-        # テーブル表示も履歴に保存
-        if session_id:
-            # テーブル全体ではなく要約を保存（トークン節約）
-            summary = f"{len(results_df)}件の{query_params.get('query_type', '結果')}データを表示"
-            conv_service.add_message(
-                session_id,
-                "assistant",
-                summary,
-                metadata={ # 後で分析に使える（例: どの選手がよく検索されているか）
-                    "query_type": query_params.get("query_type"),
-                    "player_name": query_params.get("name"),
-                    "is_table": True,
-                    "context_used": context_used
-                }
-            )
-        
-        return table_response
+    table_response = {
+        "answer": f"以下は{len(results_df)}件の結果です：",
+        "isTable": True,
+        "isTransposed": is_single_row,
+        "tableData": table_data,
+        "columns": columns,
+        "decimalColumns": [col for col in results_df.columns if col in DECIMAL_FORMAT_COLUMNS],
+        "grouping": grouping_info
+    }
+
+    # テーブル表示も履歴に保存
+    if session_id:
+        # テーブル全体ではなく要約を保存（トークン節約）
+        summary = f"{len(results_df)}件の{query_params.get('query_type', '結果')}データを表示"
+        conv_service.add_message(
+            session_id,
+            "assistant",
+            summary,
+            metadata={ # 後で分析に使える（例: どの選手がよく検索されているか）
+                "query_type": query_params.get("query_type"),
+                "player_name": query_params.get("name"),
+                "is_table": True,
+                "context_used": context_used
+            }
+        )
+
+    return table_response
+
+
+def _finalize_narrative_response(
+        query: str,
+        query_params: Dict[str, Any],
+        results_df: pd.DataFrame,
+        season: Optional[int],
+        session_id: Optional[str],
+        context_used: bool,
+        final_response: str
+    ) -> Dict[str, Any]:
+    """[ステップ4] 生成済みの回答文を履歴に保存し、チャート付与を試みてレスポンスを返す。"""
+    conv_service = get_conversation_service()
+
+    # 回答を履歴に保存
+    if session_id:
+        conv_service.add_message(
+            session_id,
+            "assistant",
+            final_response,
+            metadata={ # 後で分析に使える（例: どの選手がよく検索されているか）
+                "query_type": query_params.get("query_type"),
+                "player_name": query_params.get("name"),
+                "context_used": context_used
+            }
+        )
+
+    # Try to enhance with chart data
+    from .simple_chart_service import enhance_response_with_simple_chart
+    try:
+        chart_data = enhance_response_with_simple_chart(
+            query, query_params, results_df, season
+        )
+
+        if chart_data:
+            # Return response with chart data only (minimal text)
+            response = {
+                "answer": "📈",  # Just chart emoji to avoid empty content message
+                "isTable": False
+            }
+            response.update(chart_data)
+            return response
+    except Exception as e:
+        logger.warning(f"Chart enhancement failed: {e}")
+
+    # Return regular response if no chart enhancement
+    return {
+        "answer": final_response,
+        "isTable": False
+    }
+
+
+def get_ai_response_for_qna_enhanced(
+        query: str, 
+        season: Optional[int] = None,
+        session_id: Optional[str] = None # Id from frontend to track user session
+    ) -> Optional[Dict[str, Any]]:
+    """
+    【打撃リーダーボード特化版】
+    ユーザーの"打撃リーダーボード"に関する質問を処理します。
+    """
+    prepared = _prepare_qna(query, season, session_id)
+    if "response" in prepared:
+        return prepared["response"]
+
+    query_params = prepared["query_params"]
+    results_df = prepared["results_df"]
+
+    # if output format is table
+    if query_params.get("output_format") == "table":
+        return _build_table_response(query_params, results_df, session_id, prepared["context_used"])
 
     # Step 4: Generate final response with LLM
-    else:
-        logger.info("Generating final response with LLM.")
-        final_response = _generate_final_response_with_llm(query, results_df)
+    logger.info("Generating final response with LLM.")
+    final_response = _generate_final_response_with_llm(query, results_df)
+    return _finalize_narrative_response(
+        query, query_params, results_df, prepared["season"],
+        session_id, prepared["context_used"], final_response,
+    )
 
-        # 回答を履歴に保存
-        if session_id:
-            conv_service.add_message(
-                session_id,
-                "assistant",
-                final_response,
-                metadata={ # 後で分析に使える（例: どの選手がよく検索されているか）
-                    "query_type": query_params.get("query_type"),
-                    "player_name": query_params.get("name"),
-                    "context_used": context_used
-                }
-            )
-        
-        # Try to enhance with chart data
-        from .simple_chart_service import enhance_response_with_simple_chart
-        try:
-            chart_data = enhance_response_with_simple_chart(
-                query, query_params, results_df, season
-            )
-            
-            if chart_data:
-                # Return response with chart data only (minimal text)
-                response = {
-                    "answer": "📈",  # Just chart emoji to avoid empty content message
-                    "isTable": False
-                }
-                response.update(chart_data)
-                return response
-        except Exception as e:
-            logger.warning(f"Chart enhancement failed: {e}")
-        
-        # Return regular response if no chart enhancement
-        return {
-            "answer": final_response,
-            "isTable": False
-        }
+
+async def stream_ai_response_for_qna(
+        query: str,
+        season: Optional[int] = None,
+        session_id: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+    """
+    get_ai_response_for_qna_enhanced のストリーミング版。
+    ナラティブ回答は {"type": "token"} を断片ごとに yield し、最後に
+    {"type": "final_answer"} で同期版と同じ形のレスポンスを返す。
+    表形式・早期終了のレスポンスは final_answer だけを返す。
+    """
+    # ステップ0〜3 は同期 I/O（BigQuery・LLM 解析）なのでスレッドで実行する
+    prepared = await asyncio.to_thread(_prepare_qna, query, season, session_id)
+    if "response" in prepared:
+        yield {"type": "final_answer", **prepared["response"]}
+        return
+
+    query_params = prepared["query_params"]
+    results_df = prepared["results_df"]
+
+    if query_params.get("output_format") == "table":
+        response = await asyncio.to_thread(
+            _build_table_response, query_params, results_df, session_id, prepared["context_used"]
+        )
+        yield {"type": "final_answer", **response}
+        return
+
+    logger.info("Streaming final response with LLM.")
+    parts: List[str] = []
+    async for chunk in BaseEngine.stream_final_response_with_llm(query, results_df):
+        parts.append(chunk)
+        yield {"type": "token", "content": chunk, "node": "synthesizer"}
+
+    response = await asyncio.to_thread(
+        _finalize_narrative_response,
+        query, query_params, results_df, prepared["season"],
+        session_id, prepared["context_used"], "".join(parts),
+    )
+    yield {"type": "final_answer", **response}
 
 
 def get_ai_response_with_simple_chart(
@@ -1,4 +1,5 @@
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Hashable, Tuple, AsyncIterator
+from dataclasses import dataclass
 # from google.cloud import bigquery
 # from google.oauth2 import service_account
 from google.cloud.exceptions import GoogleCloudError
@@ -25,7 +26,8 @@ try:
         MAIN_BATTING_BY_GAME_SCORE_SITUATIONS_STATS
     )
     from app.config.statcast_query import KEY_METRICS_QUERY_SELECT
-    from app.services.llm_gateway_service import call_gemini
+    from app.services.llm_gateway_service import call_gemini, acall_gemini_stream
+    from app.services.cache_service import TTLLRUCache
 except ImportError:
     # 本番実行時の絶対インポート
     from backend.app.config.query_maps import (
@@ -40,7 +42,8 @@ except ImportError:
         MAIN_BATTING_BY_GAME_SCORE_SITUATIONS_STATS
     )
     from backend.app.config.statcast_query import KEY_METRICS_QUERY_SELECT
-    from backend.app.services.llm_gateway_service import call_gemini
+    from backend.app.services.llm_gateway_service import call_gemini, acall_gemini_stream
+    from backend.app.services.cache_service import TTLLRUCache
 # from .simple_chart_service import enhance_response_with_simple_chart, should_show_simple_chart # For Development, add backend. path
 
 # ロガーの設定
@@ -65,6 +68,64 @@ GEMINI_API_KEY = os.getenv("GEMINI_API_KEY_V2")
 # Manage Google cloud alient with singleton pattern
 SERVICE_ACCOUNT_KEY_PATH = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
 
+# コンパイル済みクエリプランの保持数（形状の種類数。値の違いでは増えない）
+QUERY_PLAN_CACHE_SIZE = int(os.getenv("QUERY_PLAN_CACHE_SIZE", "256"))
+
+# 値そのものが SQL 文字列を変えるパラメータ。それ以外は「有無」だけが SQL に効く。
+_SHAPE_VALUE_KEYS = ("query_type", "split_type", "metrics", "order_by")
+
+# SQL プレースホルダー名 → 値の取得元パラメータ。ここに無いもの（filter_val 等）はプラン内の定数。
+_SQL_PARAM_SOURCES = {
+    "player_name": "name",
+    "season": "season",
+    "inning": "inning",
+    "innings": "inning",
+    "pitcher_throws": "pitcher_throws",
+    "strikes": "strikes",
+    "balls": "balls",
+    "pitch_types": "pitch_type",
+    "limit": "limit",
+}
+
+
+def _presence_marker(value: Any) -> Any:
+    """値を SQL 組み立てに効く粒度（None / falsy / truthy / リスト長 1 or 複数）に落とす。"""
+    if value is None:
+        return None
+    if isinstance(value, (list, tuple)):
+        return ("list", min(len(value), 2))
+    return bool(value)
+
+
+def query_shape(params: Dict[str, Any]) -> Hashable:
+    """パラメータの構造的な形状。形状が同じなら SQL テンプレートと戦略も同じになる。"""
+    shape = []
+    for key in sorted(params):
+        value = params[key]
+        if key in _SHAPE_VALUE_KEYS:
+            shape.append((key, tuple(value) if isinstance(value, list) else value))
+        else:
+            shape.append((key, _presence_marker(value)))
+    return tuple(shape)
+
+
+@dataclass(frozen=True)
+class QueryPlan:
+    """形状ごとにコンパイル済みの SQL テンプレートとバインド定義。"""
+    strategy: str
+    sql: Optional[str]
+    # (プレースホルダー名, 取得元パラメータ名 or None, 定数値)
+    bindings: Tuple[Tuple[str, Optional[str], Any], ...]
+
+    def bind(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            name: (params.get(source) if source else const)
+            for name, source, const in self.bindings
+        }
+
+
+_plan_cache = TTLLRUCache(max_entries=QUERY_PLAN_CACHE_SIZE)
+
 
 
 class BaseEngine:
@@ -597,17 +658,55 @@ class BaseEngine:
     
 
     @staticmethod
-    def generate_final_response_with_llm(original_query: str, data_df: pd.DataFrame) -> str:
+    def compile_query_plan(params: Dict[str, Any]) -> QueryPlan:
+        """戦略判定と SQL 組み立てを 1 回行い、値を差し替え可能なプランにする。"""
+        strategy = BaseEngine.determine_query_strategy(params)
+        if strategy == "aggregated_table":
+            sql, sql_params = BaseEngine.build_dynamic_sql(params)
+        else:
+            sql, sql_params = BaseEngine.build_dynamic_statcast_sql(params)
+
+        bindings = []
+        for name, value in sql_params.items():
+            source = _SQL_PARAM_SOURCES.get(name)
+            if source and params.get(source) == value:
+                bindings.append((name, source, None))
+            else:
+                bindings.append((name, None, value))
+        return QueryPlan(strategy=strategy, sql=sql, bindings=tuple(bindings))
+
+    @staticmethod
+    def plan_query(params: Dict[str, Any]) -> Tuple[str, Optional[str], Dict[str, Any]]:
         """
-        [ステップ4] 取得したデータと元の質問に基づいて、LLMが自然言語の回答を生成します。
-        * ステップ3はBigQueryからデータを取得することです。
+        クエリ戦略・SQL・バインド値を返す。同じ形状（query_type / split_type / metrics /
+        order_by と各条件の有無）のプランはキャッシュ済みのものを使い、SQL 組み立てを省く。
+        SQL 文字列が形状ごとに固定されるため BigQuery 側のクエリキャッシュにも当たりやすい。
+
+        validate_query_params は値ごとに必要なので、呼び出し側で先に実行すること。
+
+        Returns:
+            tuple[str, str | None, dict]: (戦略, SQL文字列, パラメータ辞書)
         """
-        if not GEMINI_API_KEY:
-            logger.error("GEMINI_API_KEY_V2 is not set.")
-            return "AIとの通信に失敗しました。"
-        
+        key = query_shape(params)
+        plan = _plan_cache.get(key)
+        if plan is None:
+            plan = BaseEngine.compile_query_plan(params)
+            _plan_cache.set(key, plan, ttl=float("inf"))
+        else:
+            logger.debug(f"Query plan cache hit: strategy={plan.strategy}")
+        return plan.strategy, plan.sql, plan.bind(params)
+
+    @staticmethod
+    def clear_query_plan_cache() -> None:
+        """テスト・設定変更用。コンパイル済みプランを破棄する。"""
+        _plan_cache.clear()
+
+
+    @staticmethod
+    def _build_final_response_prompt(original_query: str, data_df: pd.DataFrame) -> str:
+        """ナラティブ生成用のプロンプト。同期版・ストリーミング版で共有する。"""
         data_json_str = data_df.to_json(orient='records', indent=2, force_ascii=False)
-        prompt = f"""
+        return f"""
         あなたはMLBのデータアナリストです。以下のデータに基づいて、ユーザーの質問に簡潔に日本語で回答してください。
 
         【重要ルール】
@@ -623,6 +722,18 @@ class BaseEngine:
         ---
         回答:
         """
+
+    @staticmethod
+    def generate_final_response_with_llm(original_query: str, data_df: pd.DataFrame) -> str:
+        """
+        [ステップ4] 取得したデータと元の質問に基づいて、LLMが自然言語の回答を生成します。
+        * ステップ3はBigQueryからデータを取得することです。
+        """
+        if not GEMINI_API_KEY:
+            logger.error("GEMINI_API_KEY_V2 is not set.")
+            return "AIとの通信に失敗しました。"
+        
+        prompt = BaseEngine._build_final_response_prompt(original_query, data_df)
         text = call_gemini(
             prompt=prompt,
             model="gemini-2.5-flash",
@@ -632,4 +743,32 @@ class BaseEngine:
         )
         if not text:
             return "AIによる回答を生成できませんでした。"
-        return text.replace('\n', '<br>')
\ No newline at end of file
+        return text.replace('\n', '<br>')
+
+    @staticmethod
+    async def stream_final_response_with_llm(
+        original_query: str, data_df: pd.DataFrame
+    ) -> AsyncIterator[str]:
+        """
+        generate_final_response_with_llm のストリーミング版。
+        完了を待たずに断片を受信順に yield する（改行は同期版と同じく <br> に変換）。
+        失敗時・空応答時は同期版と同じ固定文言を 1 回だけ返す。
+        """
+        if not GEMINI_API_KEY:
+            logger.error("GEMINI_API_KEY_V2 is not set.")
+            yield "AIとの通信に失敗しました。"
+            return
+
+        prompt = BaseEngine._build_final_response_prompt(original_query, data_df)
+        received = False
+        async for chunk in acall_gemini_stream(
+            prompt,
+            model="gemini-2.5-flash",
+            response_mime_type="text/plain",
+            feature="analytics_base_stream",
+            user_query=original_query,
+        ):
+            received = True
+            yield chunk.replace('\n', '<br>')
+        if not received:
+            yield "AIによる回答を生成できませんでした。"
@@ -2,6 +2,7 @@ from typing import Optional, List, Dict, Any
 # from google.cloud import bigquery
 # from google.oauth2 import service_account
 from google.cloud.exceptions import GoogleCloudError
+from backend.app.core.exceptions import QueryTimeoutError
 import pandas as pd
 import os
 import json
@@ -9,12 +10,14 @@ import re
 from dotenv import load_dotenv
 # from functools import lru_cache
 from datetime import datetime
-from ..bigquery_service import client
+from ..bigquery_service import run_query_sync
 from ..llm_gateway_service import call_gemini
 from backend.app.middleware.request_context import add_bq_latency_ms
 import logging
 from ..conversation_service import get_conversation_service
 from .base_engine import BaseEngine
+from ..nl_query_cache_service import cached_parse
+from backend.app.config.prompt_registry import get_prompt_version
 
 # インポート: テスト実行時と本番実行時の両方に対応
 try:
@@ -63,6 +66,28 @@ def _parse_query_with_llm(
     query: str,
     season: Optional[int],
     original_query: Optional[str] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    [ステップ1] 質問からパラメータを抽出します。
+
+    同じ（または言い換えの）質問は nl_query_cache_service のキャッシュから返し、
+    LLM 呼び出しを省きます。キャッシュに載るのは検証を通過したパラメータのみです。
+    """
+    return cached_parse(
+        namespace="analytics_pitcher",
+        query=query,
+        season=season,
+        # インラインプロンプト。変更したら prompt_registry の版を上げる（キャッシュが破棄される）
+        prompt_version=get_prompt_version("parse_query_pitcher"),
+        parse_fn=lambda: _parse_query_with_llm_uncached(query, season, original_query),
+        validate_fn=BaseEngine.validate_query_params,
+    )
+
+
+def _parse_query_with_llm_uncached(
+    query: str,
+    season: Optional[int],
+    original_query: Optional[str] = None,
 ) -> Optional[Dict[str, Any]]:
     """
     [ステップ1] LLMを使い、質問からパラメータを抽出します。
@@ -253,12 +278,12 @@ def get_ai_response_for_pitcher_stats(
         }
 
     # Step 2: Build SQL with parameterization
-    query_strategy = BaseEngine.determine_query_strategy(query_params)
+    # 同じ形状の質問はコンパイル済みプランを再利用し、SQL 組み立てを省く
+    query_strategy, sql_query, sql_parameters = BaseEngine.plan_query(query_params)
     logger.info(f"Using query strategy: {query_strategy}")
 
     if query_strategy == "aggregated_table":
         # Using aggregated table
-        sql_query, sql_parameters = BaseEngine.build_dynamic_sql(query_params)
         if not sql_query:
             logger.warning("Failed to build SQL query.")
             return {
@@ -269,7 +294,6 @@ def get_ai_response_for_pitcher_stats(
         logger.info(f"Query parameters: {sql_parameters}")
 
     else: # Using statcast master table
-        sql_query, sql_parameters = BaseEngine.build_dynamic_statcast_sql(query_params)
         if not sql_query:
             logger.warning("Failed to build SQL query with statcast master table.")
             return {
@@ -281,7 +305,7 @@ def get_ai_response_for_pitcher_stats(
 
     # Step 3: Fetch data from BigQuery with parameterized query
     try:
-        from google.cloud.bigquery import QueryJobConfig, ScalarQueryParameter, ArrayQueryParameter
+        from google.cloud.bigquery import ScalarQueryParameter, ArrayQueryParameter
 
         # BigQuery用のパラメータ設定を作成
         query_parameters_list = []
@@ -309,13 +333,11 @@ def get_ai_response_for_pitcher_stats(
                 query_parameters_list.append(param)
                 logger.debug(f"Added scalar parameter: {key} = {value} (STRING)")
 
-        job_config = QueryJobConfig(query_parameters=query_parameters_list)
-
         logger.info(f"Total query parameters configured: {len(query_parameters_list)}")
         logger.debug(f"Query parameters list: {[p.name for p in query_parameters_list]}")
 
         query_start = datetime.now()
-        results_df = client.query(sql_query, job_config=job_config).to_dataframe()
+        results_df = run_query_sync(sql_query, query_parameters_list)
         query_duration = (datetime.now() - query_start).total_seconds()
         # BQ 累計時間を ContextVar に加算 (エンドポイントが最後に log_entry に書く)
         add_bq_latency_ms(query_duration * 1000)
@@ -325,12 +347,12 @@ def get_ai_response_for_pitcher_stats(
         # Performance warning for slow queries
         if query_duration > 10:  # 10秒以上
             logger.warning(f"Slow query detected: {query_duration:.2f}s")
-    except GoogleCloudError as e:
+    except (GoogleCloudError, QueryTimeoutError) as e:
         logger.error(f"BigQuery query failed: {e}", exc_info=True)
 
         # より詳細なエラーメッセージ
         error_message = "データベースからのデータ取得中にエラーが発生しました。"
-        if "timeout" in str(e).lower():
+        if isinstance(e, QueryTimeoutError) or "timeout" in str(e).lower():
             error_message += "クエリがタイムアウトしました。条件を絞って再試行してください。"
         elif "quota" in str(e).lower():
             error_message += "利用制限に達しました。しばらくしてから再試行してください。"
@@ -5,17 +5,50 @@ BigQueryクライアントを提供する役割。
 client は遅延初期化プロキシ。`from .bigquery_service import client` は認証を発生させず、
 初めて client.query(...) 等を呼んだ時点で実クライアントを生成する。
 これにより GCP 認証のない環境（CI・ユニットテスト）でも import が成功する。
+
+run_query() は async サービス層向けの共有実行口。イベントループを塞がずに
+BQ ジョブを待ち合わせる（詳細は後半の「非同期クエリ実行レイヤー」を参照）。
+読み取りクエリの結果は cache_service.QueryResultCache（L1 + Redis L2）を経由する。
 """
+import asyncio
+import logging
 import os
-from typing import Any, Optional
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor
+from concurrent.futures import CancelledError as FuturesCancelledError
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from concurrent.futures import wait as futures_wait
+from typing import Any, Optional, Sequence, Tuple, Union
 
+import pandas as pd
 from dotenv import load_dotenv
 from google.cloud import bigquery
 
+from backend.app.core.exceptions import QueryTimeoutError
+from backend.app.services.cache_service import (
+    QUERY_CACHE_ENABLED,
+    QueryResultCache,
+    get_query_cache,
+    is_cacheable_sql,
+    make_query_cache_key,
+    ttl_for_sql,
+)
+
+try:
+    import pyarrow as pa
+    _PYARROW_AVAILABLE = True
+except ImportError:
+    pa = None  # type: ignore
+    _PYARROW_AVAILABLE = False
+
 load_dotenv()
+logger = logging.getLogger(__name__)
 PROJECT_ID = os.getenv('GCP_PROJECT_ID')
 
 _real_client: Optional[bigquery.Client] = None
+_bqstorage_client: Optional[Any] = None
+_bqstorage_unavailable = False
 
 
 def get_bq_client() -> bigquery.Client:
@@ -26,10 +59,29 @@ def get_bq_client() -> bigquery.Client:
     return _real_client
 
 
+def get_bqstorage_client() -> Optional[Any]:
+    """Storage Read API クライアントを返す（シングルトン）。
+
+    to_dataframe / to_arrow に都度 create させると gRPC チャネルを毎回張り直すため共有する。
+    ライブラリ未導入・生成失敗時は None（REST ページングで取得される）。
+    """
+    global _bqstorage_client, _bqstorage_unavailable
+    if _bqstorage_client is None and not _bqstorage_unavailable:
+        try:
+            from google.cloud import bigquery_storage
+            _bqstorage_client = bigquery_storage.BigQueryReadClient()
+        except Exception as e:
+            _bqstorage_unavailable = True
+            logger.warning(f"BigQuery Storage Read API client unavailable, falling back to REST: {e}")
+    return _bqstorage_client
+
+
 def reset_bq_client() -> None:
     """テスト用。生成済みクライアントを破棄し、次回アクセスで作り直させる。"""
-    global _real_client
+    global _real_client, _bqstorage_client, _bqstorage_unavailable
     _real_client = None
+    _bqstorage_client = None
+    _bqstorage_unavailable = False
 
 
 class _LazyBigQueryClient:
@@ -48,3 +100,405 @@ class _LazyBigQueryClient:
 
 
 client = _LazyBigQueryClient()
+
+
+# ============================================================
+# 非同期クエリ実行レイヤー
+# ============================================================
+# `client.query(...).to_dataframe()` を async def から直接呼ぶとイベントループが
+# BQ ジョブ完了まで止まり、同じ Uvicorn ワーカー上の他リクエストが全て待たされる。
+# 全サービスは run_query() 経由で BQ を叩き、ジョブの待ち合わせは専用スレッドプールに逃がす。
+#   - 同時実行ジョブ数はプールのワーカー数で上限を掛ける（BQ の同時実行枠を食い潰さない）
+#   - deadline はサーバー側 (job_timeout_ms) とクライアント側 (asyncio.wait_for) の二重で掛ける。
+#     クライアント側はワーカーが実行を始めた時刻から数え、プールの待ち行列は別の上限 (queue_timeout) で打ち切る
+#   - タイムアウト / 呼び出し元キャンセル時は BQ ジョブ自体も cancel する
+#     （single-flight で相乗りしている呼び出し元が全員諦めたときだけ）
+BQ_QUERY_MAX_WORKERS = int(os.getenv("BIGQUERY_MAX_CONCURRENT_QUERIES", "16"))
+BQ_QUERY_TIMEOUT_SEC = float(os.getenv("BIGQUERY_TIMEOUT", "60"))
+BQ_QUERY_QUEUE_TIMEOUT_SEC = float(os.getenv("BIGQUERY_QUEUE_TIMEOUT", "60"))
+
+QueryParam = Union[
+    Tuple[str, str, Any],
+    bigquery.ScalarQueryParameter,
+    bigquery.ArrayQueryParameter,
+    bigquery.StructQueryParameter,
+]
+
+
+def build_job_config(params: Optional[Sequence[QueryParam]] = None) -> bigquery.QueryJobConfig:
+    """(name, type, value) タプル or QueryParameter のリストから QueryJobConfig を作る。
+
+    タプルの value が list / tuple の場合は ArrayQueryParameter として扱う。
+    """
+    query_parameters = []
+    for p in params or ():
+        if isinstance(p, tuple):
+            name, type_, value = p
+            if isinstance(value, (list, tuple)):
+                query_parameters.append(bigquery.ArrayQueryParameter(name, type_, list(value)))
+            else:
+                query_parameters.append(bigquery.ScalarQueryParameter(name, type_, value))
+        else:
+            query_parameters.append(p)
+    return bigquery.QueryJobConfig(query_parameters=query_parameters)
+
+
+def _cancel_job(job: Any) -> None:
+    try:
+        job.cancel()
+    except Exception as e:
+        logger.warning(f"BigQuery job cancel failed: {e}")
+
+
+class _QueryRun:
+    """プールに投入した 1 本のクエリ実行。single-flight で相乗りした呼び出し元とも共有する。
+
+    - started_at はワーカーが実行を始めた時刻。各呼び出し元の deadline はここから数える
+    - waiters は結果を待っている呼び出し元の数。全員が timeout / キャンセルしたときだけジョブを止める
+    - cancelled 後に client.query() から戻ってきたジョブはその場で cancel する
+    """
+
+    def __init__(self):
+        self.future: Optional[Future] = None
+        self.started: Future = Future()
+        self.started_at: Optional[float] = None
+        self.jobs: list = []
+        self.waiters = 1   # 実行を開始した呼び出し元
+        self.cancelled = False
+        self._lock = threading.Lock()
+
+    def add_done_callback(self, fn: Any) -> None:
+        """QueryResultCache.join_or_start が完了時の後始末を登録する。"""
+        self.future.add_done_callback(lambda _f: fn(self))
+
+    def mark_started(self) -> None:
+        """ワーカースレッド側から呼ぶ。キャンセル済みなら実行しない。"""
+        with self._lock:
+            if self.cancelled:
+                raise FuturesCancelledError()
+            if self.started_at is None:
+                self.started_at = time.monotonic()
+                self.started.set_result(self.started_at)
+
+    def attach_job(self, job: Any) -> None:
+        """投入したジョブを登録する。client.query() の最中にキャンセルされていたらジョブを止める。"""
+        with self._lock:
+            self.jobs.append(job)
+            cancelled = self.cancelled
+        if cancelled:
+            _cancel_job(job)
+            raise FuturesCancelledError()
+
+    def join(self) -> bool:
+        """相乗りする。キャンセル済み（全員が諦めた後）なら False。"""
+        with self._lock:
+            if self.cancelled:
+                return False
+            self.waiters += 1
+            return True
+
+    def leave(self, abandon: bool) -> None:
+        """待つのをやめる。abandon=True（timeout / キャンセル）で最後の 1 人ならジョブを止める。"""
+        with self._lock:
+            self.waiters -= 1
+            if not abandon or self.waiters > 0 or self.cancelled or self.future.done():
+                return
+            self.cancelled = True
+            jobs = list(self.jobs)
+        self.future.cancel()   # まだ待ち行列にいれば実行しない
+        for job in jobs:
+            _cancel_job(job)
+
+    def remaining(self, deadline: float) -> float:
+        return max(deadline - (time.monotonic() - self.started_at), 0.0)
+
+
+class BigQueryExecutor:
+    """BQ クエリを有界スレッドプール上で実行し、awaitable として返す実行器。
+
+    Usage:
+        df = await run_query(sql, [("season", "INT64", 2025)])
+    """
+
+    def __init__(
+        self,
+        max_workers: int = BQ_QUERY_MAX_WORKERS,
+        default_timeout: float = BQ_QUERY_TIMEOUT_SEC,
+        bq_client: Optional[Any] = None,
+        cache: Optional[QueryResultCache] = None,
+        bqstorage_client: Optional[Any] = None,
+        queue_timeout: float = BQ_QUERY_QUEUE_TIMEOUT_SEC,
+    ):
+        self.max_workers = max_workers
+        self.default_timeout = default_timeout
+        self.queue_timeout = queue_timeout
+        self._client = bq_client
+        self._bqstorage_client = bqstorage_client
+        self._cache = cache
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bq-query")
+
+    @property
+    def client(self) -> Any:
+        return self._client if self._client is not None else get_bq_client()
+
+    @property
+    def bqstorage_client(self) -> Optional[Any]:
+        """Storage Read API クライアント。共有クライアント利用時のみ共有インスタンスを使う。"""
+        if self._bqstorage_client is None and self._client is None:
+            self._bqstorage_client = get_bqstorage_client()
+        return self._bqstorage_client
+
+    def _execute(self, sql: str, job_config: bigquery.QueryJobConfig, timeout: float, run: _QueryRun) -> pd.DataFrame:
+        """ワーカースレッド側の本体。ジョブ参照を run に登録してキャンセル可能にする。"""
+        run.mark_started()
+        job = self.client.query(sql, job_config=job_config, timeout=timeout)
+        run.attach_job(job)
+        job.result(timeout=timeout)
+        return job.to_dataframe(bqstorage_client=self.bqstorage_client)
+
+    def _execute_arrow(self, sql: str, job_config: bigquery.QueryJobConfig, timeout: float, run: _QueryRun) -> Any:
+        """Storage Read API から Arrow RecordBatch を受け取り、pandas を経由せず Table にまとめる。"""
+        run.mark_started()
+        job = self.client.query(sql, job_config=job_config, timeout=timeout)
+        run.attach_job(job)
+        rows = job.result(timeout=timeout)
+        return rows.to_arrow(bqstorage_client=self.bqstorage_client)
+
+    def _load(
+        self, key: str, ttl: int, sql: str, job_config: bigquery.QueryJobConfig, timeout: float, run: _QueryRun
+    ) -> pd.DataFrame:
+        """キャッシュ経由の本体。L2 → BigQuery の順に引き、取得結果を L1/L2 に保存する。"""
+        run.mark_started()
+        df = self._cache.get_remote(key, ttl)
+        if df is not None:
+            return df
+        self._cache.record_miss()
+        df = self._execute(sql, job_config, timeout, run)
+        bytes_processed = getattr(run.jobs[-1], "total_bytes_processed", None) if run.jobs else None
+        self._cache.put(key, df, ttl, bytes_processed if isinstance(bytes_processed, int) else 0)
+        return df
+
+    def _prepare(
+        self, params: Optional[Sequence[QueryParam]], timeout: Optional[float]
+    ) -> Tuple[bigquery.QueryJobConfig, float]:
+        deadline = timeout if timeout is not None else self.default_timeout
+        job_config = build_job_config(params)
+        # クライアント側で待ちを打ち切っても BQ 側で走り続けないよう、サーバー側にも deadline を渡す
+        job_config.job_timeout_ms = int(deadline * 1000)
+        return job_config, deadline
+
+    def _start(self, fn: Any, *args: Any) -> _QueryRun:
+        run = _QueryRun()
+        run.future = self._pool.submit(fn, *args, run)
+        return run
+
+    def _submit(
+        self, sql: str, job_config: bigquery.QueryJobConfig, deadline: float, use_cache: bool
+    ) -> Tuple[Optional[_QueryRun], bool, Optional[pd.DataFrame]]:
+        """L1 を確認し、ミスならプールに投入する。同一クエリが実行中ならその実行に相乗りする。
+
+        Returns:
+            (run, shared, l1_hit_df)。
+            shared=True の実行結果は他の呼び出しと共有されるため、利用側で複製して返す。
+            L1 ヒット時は run が None。
+        """
+        if self._cache is None or not use_cache or not is_cacheable_sql(sql):
+            return self._start(self._execute, sql, job_config, deadline), False, None
+
+        key = make_query_cache_key(sql, job_config.query_parameters)
+        df = self._cache.get_local(key)
+        if df is not None:
+            return None, False, df
+        ttl = ttl_for_sql(sql)
+        run, _ = self._cache.join_or_start(
+            key,
+            lambda: self._start(self._load, key, ttl, sql, job_config, deadline),
+            join=lambda r: r.join(),
+        )
+        return run, True, None
+
+    async def run_query(
+        self,
+        sql: str,
+        params: Optional[Sequence[QueryParam]] = None,
+        *,
+        timeout: Optional[float] = None,
+        cache: bool = True,
+    ) -> pd.DataFrame:
+        """SQL を実行して DataFrame を返す。
+
+        Args:
+            sql: 実行する SQL（パラメータは @name で参照）
+            params: (name, type, value) タプル or QueryParameter のリスト
+            timeout: このクエリの deadline（秒、実行開始から）。省略時は BIGQUERY_TIMEOUT
+            cache: False で結果キャッシュを経由しない（鮮度が必要な読み取り用）
+
+        Raises:
+            QueryTimeoutError: 待ち行列 / deadline 超過（誰も待っていなければ BQ ジョブはキャンセル済み）
+        """
+        job_config, deadline = self._prepare(params, timeout)
+        run, shared, cached = self._submit(sql, job_config, deadline, cache)
+        if cached is not None:
+            return cached
+
+        df = await self._await(run, deadline)
+        return df.copy() if shared else df
+
+    def _queue_timeout_error(self) -> QueryTimeoutError:
+        return QueryTimeoutError(
+            f"BigQuery query did not start within {self.queue_timeout}s (executor pool saturated)"
+        )
+
+    async def _await(self, run: _QueryRun, deadline: float) -> Any:
+        # 結果の Future は共有物なので、この呼び出し元の timeout / キャンセルでは直接止めない（leave() に任せる）
+        result = asyncio.wrap_future(run.future)
+        abandon = True
+        try:
+            if run.started_at is None:
+                started = asyncio.wrap_future(run.started)
+                await asyncio.wait({result, started}, timeout=self.queue_timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not result.done() and not started.done():
+                    raise self._queue_timeout_error()
+            if not result.done():
+                await asyncio.wait_for(asyncio.shield(result), timeout=run.remaining(deadline))
+            value = result.result()
+            abandon = False
+            return value
+        except asyncio.TimeoutError as e:
+            raise QueryTimeoutError(f"BigQuery query exceeded deadline of {deadline}s", original_error=e) from e
+        finally:
+            # 例外（呼び出し元のキャンセル含む）で抜けたら諦めたものとして数える
+            run.leave(abandon)
+
+    def run_query_sync(
+        self,
+        sql: str,
+        params: Optional[Sequence[QueryParam]] = None,
+        *,
+        timeout: Optional[float] = None,
+        cache: bool = True,
+    ) -> pd.DataFrame:
+        """同期サービス層向け。run_query と同じプール・deadline・キャッシュで実行し、完了までブロックする。
+
+        イベントループ上から直接呼ばないこと（呼び出し側は asyncio.to_thread で包む）。
+        """
+        job_config, deadline = self._prepare(params, timeout)
+        run, shared, cached = self._submit(sql, job_config, deadline, cache)
+        if cached is not None:
+            return cached
+        df = self._wait(run, deadline)
+        return df.copy() if shared else df
+
+    def _wait(self, run: _QueryRun, deadline: float) -> Any:
+        abandon = True
+        try:
+            if run.started_at is None:
+                done, _ = futures_wait([run.future, run.started], timeout=self.queue_timeout,
+                                       return_when=FIRST_COMPLETED)
+                if not done:
+                    raise self._queue_timeout_error()
+            timeout = run.remaining(deadline) if run.started_at is not None else 0
+            value = run.future.result(timeout=timeout)
+            abandon = False
+            return value
+        except FuturesTimeoutError as e:
+            raise QueryTimeoutError(f"BigQuery query exceeded deadline of {deadline}s", original_error=e) from e
+        finally:
+            run.leave(abandon)
+
+    async def run_query_arrow(
+        self,
+        sql: str,
+        params: Optional[Sequence[QueryParam]] = None,
+        *,
+        timeout: Optional[float] = None,
+    ) -> Union["pa.Table", pd.DataFrame]:
+        """大量行向けの列指向取得。Storage Read API の Arrow バッチを pyarrow.Table で返す。
+
+        結果キャッシュは経由しない（statcast 規模の結果を L1/L2 に載せないため）。
+        pyarrow が無い環境では run_query() の DataFrame にフォールバックする。
+        変換は utils.columnar の関数がどちらの型も受け付ける。
+        """
+        if not _PYARROW_AVAILABLE:
+            return await self.run_query(sql, params, timeout=timeout)
+        job_config, deadline = self._prepare(params, timeout)
+        run = self._start(self._execute_arrow, sql, job_config, deadline)
+        return await self._await(run, deadline)
+
+    def run_query_arrow_sync(
+        self,
+        sql: str,
+        params: Optional[Sequence[QueryParam]] = None,
+        *,
+        timeout: Optional[float] = None,
+    ) -> Union["pa.Table", pd.DataFrame]:
+        """run_query_arrow の同期版。"""
+        if not _PYARROW_AVAILABLE:
+            return self.run_query_sync(sql, params, timeout=timeout)
+        job_config, deadline = self._prepare(params, timeout)
+        run = self._start(self._execute_arrow, sql, job_config, deadline)
+        return self._wait(run, deadline)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+
+_executor: Optional[BigQueryExecutor] = None
+
+
+def get_query_executor() -> BigQueryExecutor:
+    """共有 BigQueryExecutor を返す（初回のみ生成するシングルトン）。"""
+    global _executor
+    if _executor is None:
+        _executor = BigQueryExecutor(cache=get_query_cache() if QUERY_CACHE_ENABLED else None)
+    return _executor
+
+
+def shutdown_query_executor() -> None:
+    """lifespan 終了時に呼ぶ。実行中ジョブの完了を待ってプールを閉じる。"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown()
+        _executor = None
+
+
+async def run_query(
+    sql: str,
+    params: Optional[Sequence[QueryParam]] = None,
+    *,
+    timeout: Optional[float] = None,
+    cache: bool = True,
+) -> pd.DataFrame:
+    """共有実行器で SQL を実行する。サービス層からはこの関数を使う。"""
+    return await get_query_executor().run_query(sql, params, timeout=timeout, cache=cache)
+
+
+def run_query_sync(
+    sql: str,
+    params: Optional[Sequence[QueryParam]] = None,
+    *,
+    timeout: Optional[float] = None,
+    cache: bool = True,
+) -> pd.DataFrame:
+    """共有実行器で SQL を同期実行する。同期関数のサービスからはこの関数を使う。"""
+    return get_query_executor().run_query_sync(sql, params, timeout=timeout, cache=cache)
+
+
+async def run_query_arrow(
+    sql: str,
+    params: Optional[Sequence[QueryParam]] = None,
+    *,
+    timeout: Optional[float] = None,
+) -> Union["pa.Table", pd.DataFrame]:
+    """共有実行器で SQL を列指向（Arrow）取得する。大量行の取得はこちらを使う。"""
+    return await get_query_executor().run_query_arrow(sql, params, timeout=timeout)
+
+
+def run_query_arrow_sync(
+    sql: str,
+    params: Optional[Sequence[QueryParam]] = None,
+    *,
+    timeout: Optional[float] = None,
+) -> Union["pa.Table", pd.DataFrame]:
+    """run_query_arrow の同期版。"""
+    return get_query_executor().run_query_arrow_sync(sql, params, timeout=timeout)
@@ -6,7 +6,10 @@ import os
 import logging
 from datetime import date, timedelta
 from typing import Optional
-from google.cloud import bigquery
+
+import pandas as pd
+
+from backend.app.services.bigquery_service import run_query_sync
 
 PROJECT_ID = os.getenv("GCP_PROJECT_ID", "tksm-dash-test-25")
 DATASET_ID = os.getenv("BIGQUERY_DATASET_ID", "mlb_analytics_dash_25")
@@ -23,7 +26,6 @@ DRIFT_THRESHOLDS = {
 
 class BQDriftEmbeddingService:
     def __init__(self):
-        self.client = bigquery.Client(project=PROJECT_ID)
         self.project = PROJECT_ID
         self.dataset = DATASET_ID
 
@@ -73,9 +75,9 @@ class BQDriftEmbeddingService:
             SELECT MAX(week_start) AS latest
             FROM `{self.project}.{self.dataset}.pitcher_metrics_snapshots`
         """
-        result = self.client.query(query).result()
-        row = next(iter(result))
-        return row["latest"] or date.today()
+        df = run_query_sync(query, cache=False)
+        latest = df["latest"].iloc[0] if not df.empty else None
+        return date.today() if pd.isna(latest) else latest
 
     def _run_vector_search(self, current_week: date, baseline_weeks: int) -> float:
         """
@@ -115,17 +117,15 @@ class BQDriftEmbeddingService:
         # NOTE: BQでARRAY次元ごとのAVGは少し複雑なため、
         # シンプル版として VECTOR_SEARCH の distance をそのまま使うアプローチも可
 
-        job_config = bigquery.QueryJobConfig(
-            query_parameters=[
-                bigquery.ScalarQueryParameter("current_week", "DATE", str(current_week)),
-                bigquery.ScalarQueryParameter("baseline_start", "DATE", str(baseline_start)),
-            ]
-        )
-        result = self.client.query(query, job_config=job_config).result()
-        row = next(iter(result))
-        if row["cosine_distance"] is None:
+        params = [
+            ("current_week", "DATE", str(current_week)),
+            ("baseline_start", "DATE", str(baseline_start)),
+        ]
+        df = run_query_sync(query, params, cache=False)
+        distance = df["cosine_distance"].iloc[0] if not df.empty else None
+        if pd.isna(distance):
             raise ValueError("No snapshot data available for the specified week or baseline period")
-        return float(row["cosine_distance"])
+        return float(distance)
 
     def _classify(self, score: float) -> str:
         if score < DRIFT_THRESHOLDS["stable"]:
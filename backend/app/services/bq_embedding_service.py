@@ -6,8 +6,9 @@ BQ ML の ML.GENERATE_EMBEDDING + VECTOR_SEARCH を使い、
 """
 import os
 import logging
-from typing import Optional
-from google.cloud import bigquery
+from typing import List, Optional, Sequence
+from backend.app.services.bigquery_service import run_query_sync
+from backend.app.services.embedding_cache import get_embedding_cache
 
 logger = logging.getLogger(__name__)
 
@@ -23,16 +24,38 @@ SIMILARITY_THRESHOLD = 0.15
 TOP_K = 3
 
 
+def embedding_namespace(task_type: Optional[str] = None) -> str:
+    """EmbeddingCache の model キー。task_type が違えば別のベクトル空間として扱う。"""
+    return f"bq:{EMBEDDING_MODEL}:{task_type or 'default'}"
+
+
+def generate_embeddings(
+    texts: Sequence[str],
+    task_type: Optional[str] = None,
+) -> List[Optional[List[float]]]:
+    """ML.GENERATE_EMBEDDING で texts をまとめて 1 ジョブで埋め込む（texts と同じ順、失敗要素は None）。"""
+    task_option = f", '{task_type}' AS task_type" if task_type else ""
+    sql = f"""
+    SELECT content, ml_generate_embedding_result AS embedding
+    FROM ML.GENERATE_EMBEDDING(
+        MODEL `{EMBEDDING_MODEL}`,
+        (SELECT content FROM UNNEST(@texts) AS content),
+        STRUCT(TRUE AS flatten_json_output{task_option})
+    )
+    """
+    # 埋め込みは呼び出し側の EmbeddingCache が持つため、結果キャッシュには載せない
+    df = run_query_sync(sql, [("texts", "STRING", list(texts))], cache=False)
+    by_text = {
+        r.content: list(r.embedding)
+        for r in df.itertuples(index=False)
+        if r.embedding is not None and len(r.embedding)
+    }
+    return [by_text.get(t) for t in texts]
+
+
 class BQEmbeddingService:
     """Semantic search service using BQ ML Embeddings"""
 
-    def __init__(self):
-        try:
-            self.client = bigquery.Client(project=PROJECT_ID)
-        except Exception as e:
-            logger.warning(f"BQEmbeddingService init failed: {e}")
-            self.client = None
-
     def check_quality_warning(self, query_text: str) -> dict:
         """
         クエリテキストと類似した過去の低品質事例をBQ VECTOR_SEARCHで検索する。
@@ -46,14 +69,22 @@ class BQEmbeddingService:
                 "top_failure_category": str # 最も多い失敗カテゴリ
             }
         """
-        if not self.client or not query_text:
+        if not query_text:
             return {"has_warning": False, "similar_count": 0, "top_failure_category": None}
         
         try:
+            # クエリの埋め込みは共有キャッシュから取る（同じ文面は Vertex AI を 1 回しか呼ばない）
+            query_embedding = get_embedding_cache().get(
+                embedding_namespace(),
+                query_text,
+                lambda texts: generate_embeddings(texts),
+            )
+            if query_embedding is None:
+                return {"has_warning": False, "similar_count": 0, "top_failure_category": None}
+
             # VECTOR_SEARCH: BQ の組み込み関数。embedding テーブルに対して
             # ベクター化されたユーザークエリを保存するのでなく、保存された過去の低品質クエリを参照、比較する。
             # クエリのベクトルで近傍探索を行う。
-            # ML.GENERATE_EMBEDDING はここで1回だけ Vertex AI を呼ぶ（Pay-as-you-go
             sql = f"""
             SELECT
                 COUNT(*) AS similar_count
@@ -61,24 +92,15 @@ class BQEmbeddingService:
                 VECTOR_SEARCH(
                     TABLE `{EMBEDDINGS_TABLE}`,
                     'query_embedding',
-                    (
-                        SELECT ml_generate_embedding_result AS query_embedding
-                        FROM ML.GENERATE_EMBEDDING(
-                            MODEL `{EMBEDDING_MODEL}`,
-                            (SELECT @query_text AS content)
-                        )
-                    ),
+                    (SELECT @query_embedding AS query_embedding),
                     top_k => {TOP_K},
                     distance_threshold => {SIMILARITY_THRESHOLD}
                 )
             """
-            job_config = bigquery.QueryJobConfig(
-                query_parameters=[
-                    bigquery.ScalarQueryParameter("query_text", "STRING", query_text)
-                ]
+            df = run_query_sync(
+                sql, [("query_embedding", "FLOAT64", [float(v) for v in query_embedding])]
             )
-            result = self.client.query(sql, job_config=job_config).result()
-            row = next(iter(result), None)
+            row = next(df.itertuples(index=False), None)
 
             if row and row.similar_count > 0:
                 return {
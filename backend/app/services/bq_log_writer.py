@@ -0,0 +1,245 @@
+"""
+BigQuery ログ書き込みの共有パイプライン。
+
+LLM ログ・シャドー比較・ドリフト監視はこれまで 1 行ごとにスレッドを立てて
+insert_rows_json を呼んでいた。ここでは有界キュー + 単一ワーカースレッドに集約し、
+件数（BQ_LOG_BATCH_SIZE）か経過時間（BQ_LOG_FLUSH_INTERVAL_SEC）のどちらか早い方で
+テーブルごとに複数行まとめて insert_rows_json する。
+
+  - enqueue はイベントループ上から呼ばれるため待たない。キューが満杯ならその行を捨てて
+    dropped に数える（リクエスト処理・ループを止めないことを優先する）。
+  - 挿入は skip_invalid_rows=True で行い、不正な行だけを捨てる（行番号をログに出す）。
+    一時的なエラー（429 / 5xx・接続断、行単位の backendError など）は BQ_LOG_RETRY_ATTEMPTS 回まで
+    指数バックオフで再試行する。insertId を固定するため再試行で行が重複しない。
+  - 件数（enqueued / written / dropped / failed）は flush_metrics() で Cloud Monitoring に送る。
+  - shutdown() はキューに残った行を書き切ってからワーカーを止める（FastAPI lifespan から呼ぶ）。
+"""
+import logging
+import os
+import queue
+import random
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+from google.api_core import exceptions as api_exceptions
+
+logger = logging.getLogger(__name__)
+
+BQ_LOG_QUEUE_MAX = int(os.getenv("BQ_LOG_QUEUE_MAX", "10000"))
+BQ_LOG_BATCH_SIZE = int(os.getenv("BQ_LOG_BATCH_SIZE", "500"))
+BQ_LOG_FLUSH_INTERVAL_SEC = float(os.getenv("BQ_LOG_FLUSH_INTERVAL_SEC", "2.0"))
+BQ_LOG_SHUTDOWN_TIMEOUT_SEC = float(os.getenv("BQ_LOG_SHUTDOWN_TIMEOUT_SEC", "10"))
+BQ_LOG_RETRY_ATTEMPTS = int(os.getenv("BQ_LOG_RETRY_ATTEMPTS", "3"))
+BQ_LOG_RETRY_INITIAL_DELAY_SEC = float(os.getenv("BQ_LOG_RETRY_INITIAL_DELAY_SEC", "0.5"))
+BQ_LOG_RETRY_MAX_DELAY_SEC = float(os.getenv("BQ_LOG_RETRY_MAX_DELAY_SEC", "4"))
+
+# リクエスト全体が失敗したときに再試行する例外
+_TRANSIENT_ERRORS = (
+    api_exceptions.TooManyRequests,
+    api_exceptions.InternalServerError,
+    api_exceptions.BadGateway,
+    api_exceptions.ServiceUnavailable,
+    api_exceptions.GatewayTimeout,
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+)
+# 行単位のエラーのうち再試行する reason（stopped は同じリクエスト内の別の行のせいで入らなかった行）
+_TRANSIENT_ROW_REASONS = frozenset({"backendError", "internalError", "timeout", "rateLimitExceeded", "stopped"})
+
+# キュー要素: (BigQuery クライアント, テーブル ID, 行)
+_Item = Tuple[Any, str, Dict[str, Any]]
+
+
+class BQLogWriter:
+    """有界キューに溜めた行をバッチで BigQuery に書き込むワーカー。"""
+
+    def __init__(
+        self,
+        max_queue: int = BQ_LOG_QUEUE_MAX,
+        batch_size: int = BQ_LOG_BATCH_SIZE,
+        flush_interval: float = BQ_LOG_FLUSH_INTERVAL_SEC,
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[_Item]" = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {"enqueued": 0, "written": 0, "dropped": 0, "failed": 0}
+
+    # ── 投入側 ───────────────────────────────────────────
+    def enqueue(self, client: Any, table_id: str, rows: List[Dict[str, Any]]) -> int:
+        """行をキューに積む（ブロックしない）。積めた行数を返す（満杯で捨てた分は dropped に数える）。"""
+        if self._stop.is_set():
+            logger.warning(f"BQLogWriter is shut down, dropping {len(rows)} rows for {table_id}")
+            self._count("dropped", len(rows))
+            return 0
+        self._ensure_started()
+
+        accepted = 0
+        for row in rows:
+            try:
+                self._queue.put_nowait((client, table_id, row))
+                accepted += 1
+            except queue.Full:
+                self._count("dropped", len(rows) - accepted)
+                logger.warning(f"BQ log queue full, dropped {len(rows) - accepted} rows for {table_id}")
+                break
+        self._count("enqueued", accepted)
+        return accepted
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="bq-log-writer", daemon=True)
+                self._thread.start()
+
+    # ── ワーカー ─────────────────────────────────────────
+    def _run(self) -> None:
+        batch: List[_Item] = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            timeout = max(0.0, deadline - time.monotonic())
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                pass
+
+            if len(batch) >= self.batch_size or time.monotonic() >= deadline or self._stop.is_set():
+                # 停止要求後はキューを空にするまで書き続ける
+                while self._stop.is_set() and len(batch) < self.batch_size:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                if batch:
+                    self._flush(batch)
+                    batch = []
+                deadline = time.monotonic() + self.flush_interval
+                if self._stop.is_set() and self._queue.empty():
+                    return
+
+    def _flush(self, batch: List[_Item]) -> None:
+        """テーブル（とクライアント）ごとにまとめて 1 リクエストで挿入する。"""
+        groups: Dict[Tuple[int, str], Tuple[Any, List[Dict[str, Any]]]] = {}
+        for client, table_id, row in batch:
+            groups.setdefault((id(client), table_id), (client, []))[1].append(row)
+
+        for (_, table_id), (client, rows) in groups.items():
+            self._insert(client, table_id, rows)
+
+    def _insert(self, client: Any, table_id: str, rows: List[Dict[str, Any]]) -> None:
+        """1 テーブル分を挿入する。不正な行は捨て、一時的に失敗した行だけを再試行する。"""
+        row_ids = [uuid.uuid4().hex for _ in rows]
+        pending = list(range(len(rows)))
+        for attempt in range(BQ_LOG_RETRY_ATTEMPTS):
+            if attempt:
+                delay = min(BQ_LOG_RETRY_MAX_DELAY_SEC, BQ_LOG_RETRY_INITIAL_DELAY_SEC * 2 ** (attempt - 1))
+                time.sleep(delay * random.uniform(0.5, 1.0))
+            try:
+                errors = client.insert_rows_json(
+                    table_id,
+                    [rows[i] for i in pending],
+                    row_ids=[row_ids[i] for i in pending],
+                    skip_invalid_rows=True,
+                )
+            except _TRANSIENT_ERRORS as e:
+                logger.warning(
+                    f"Transient error writing {len(pending)} log rows to {table_id} "
+                    f"(attempt {attempt + 1}/{BQ_LOG_RETRY_ATTEMPTS}): {e}"
+                )
+                continue
+            except Exception as e:
+                # ロギング失敗はアプリを止めない
+                logger.error(f"Failed to write {len(pending)} log rows to {table_id}: {e}")
+                self._count("failed", len(pending))
+                return
+
+            retry: List[int] = []
+            invalid: List[int] = []
+            for err in errors or []:
+                index = pending[err["index"]]
+                reasons = {d.get("reason") for d in err.get("errors", [])}
+                (retry if reasons & _TRANSIENT_ROW_REASONS else invalid).append(index)
+            if invalid:
+                logger.error(
+                    f"BigQuery rejected {len(invalid)} log rows in {table_id} at indexes {sorted(invalid)}: "
+                    f"{errors[:5]}"
+                )
+                self._count("failed", len(invalid))
+            self._count("written", len(pending) - len(retry) - len(invalid))
+            pending = retry
+            if not pending:
+                return
+
+        logger.error(
+            f"Gave up writing {len(pending)} log rows to {table_id} "
+            f"after {BQ_LOG_RETRY_ATTEMPTS} attempts (indexes {pending[:20]})"
+        )
+        self._count("failed", len(pending))
+
+    # ── 停止・統計 ───────────────────────────────────────
+    def shutdown(self, timeout: float = BQ_LOG_SHUTDOWN_TIMEOUT_SEC) -> None:
+        """残りの行を書き切ってからワーカーを止める。timeout 超過分は諦める。"""
+        self._stop.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            thread.join(timeout)
+            if thread.is_alive():
+                logger.warning(f"BQLogWriter did not drain within {timeout}s ({self._queue.qsize()} rows left)")
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def _count(self, event: str, n: int) -> None:
+        if n <= 0:
+            return
+        with self._stats_lock:
+            self._stats[event] += n
+
+    def stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def flush_metrics(self) -> None:
+        """前回 flush 以降の差分とキュー長を Cloud Monitoring に書き出す。"""
+        with self._stats_lock:
+            snapshot = dict(self._stats)
+            for k in self._stats:
+                self._stats[k] = 0
+        depth = self.queue_depth()
+        if not any(snapshot.values()) and depth == 0:
+            return
+        from backend.app.services.monitoring_service import get_monitoring_service
+        get_monitoring_service().record_log_writer_stats(
+            written=snapshot["written"],
+            dropped=snapshot["dropped"],
+            failed=snapshot["failed"],
+            queue_depth=depth,
+        )
+
+
+_log_writer: Optional[BQLogWriter] = None
+_log_writer_lock = threading.Lock()
+
+
+def get_bq_log_writer() -> BQLogWriter:
+    """共有 BQLogWriter を返す（シングルトン）。"""
+    global _log_writer
+    if _log_writer is None:
+        with _log_writer_lock:
+            if _log_writer is None:
+                _log_writer = BQLogWriter()
+    return _log_writer
+
+
+def shutdown_bq_log_writer() -> None:
+    """lifespan 終了時に呼ぶ。未作成なら何もしない。"""
+    if _log_writer is not None:
+        _log_writer.shutdown()
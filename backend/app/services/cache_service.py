@@ -1,60 +1,325 @@
+"""
+BigQuery 読み取り結果のキャッシュ層。
+
+  L1: プロセス内 LRU（エントリ数・バイト数で上限、TTL はテーブル系統ごと）
+  L2: Redis（インスタンス間で共有。未接続時は L1 のみで動作）
+
+キーは「正規化した SQL + バインドパラメータ」のハッシュ。同一キーの同時リクエストは
+single-flight で 1 本の BigQuery ジョブにまとめる（実行側は bigquery_service.BigQueryExecutor）。
+"""
+import hashlib
 import json
-import redis
-import os
 import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import pandas as pd
+import redis
+
+try:
+    import pyarrow as pa
+    _PYARROW_AVAILABLE = True
+except ImportError:  # pragma: no cover - pyarrow は requirements.txt に含まれる
+    pa = None
+    _PYARROW_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+QUERY_CACHE_ENABLED = os.getenv("QUERY_CACHE_ENABLED", "true").lower() == "true"
+QUERY_CACHE_MAX_ENTRIES = int(os.getenv("QUERY_CACHE_MAX_ENTRIES", "1024"))
+QUERY_CACHE_MAX_BYTES = int(os.getenv("QUERY_CACHE_MAX_MB", "256")) * 1024 * 1024
+QUERY_CACHE_KEY_PREFIX = "bqcache:v2:"
 
-class StatsCache:
-    def __init__(self):
-        self.redis_client = redis.Redis(
-            host=os.getenv("REDIS_HOST", "localhost"),
-            port=int(os.getenv("REDIS_PORT", 6379)),
-            password=os.getenv("REDIS_PASSWORD", None),
-            decode_responses=True,
-            socket_connect_timeout=0.5,
-            socket_timeout=0.5
-        )
+# テーブル系統ごとの TTL（秒）。SQL 中に複数系統が含まれる場合は最短を採用する。
+# 並びはマッチ優先順ではなく、単に系統の一覧。
+TABLE_FAMILY_TTLS: Dict[str, int] = {
+    "dim_": 24 * 3600,          # 選手・チームマスタ
+    "mart_": 6 * 3600,          # dbt mart（日次バッチ）
+    "fact_": 6 * 3600,
+    "tbl_": 6 * 3600,
+    "statcast": 3 * 3600,       # 投球単位データ（日次追記）
+    "rolling": 30 * 60,         # hot/slump の直近 N 日ビュー
+    "flags": 30 * 60,
+}
+# 運用ログ系（ほぼリアルタイム）はテーブル名の完全一致で判定する（"log" を含むだけのテーブルを巻き込まない）
+LOG_TABLE_TTLS: Dict[str, int] = {
+    "llm_interaction_logs": 60,
+    "ml_drift_monitoring_logs": 60,
+}
+DEFAULT_QUERY_CACHE_TTL = int(os.getenv("QUERY_CACHE_DEFAULT_TTL", "3600"))
 
-        self.ttl = int(os.getenv("CACHE_TTL", 3600))
+# キャッシュ対象は読み取りのみ
+_READ_ONLY_SQL = re.compile(r"^\s*(SELECT|WITH)\b", re.IGNORECASE)
+_TABLE_REF = re.compile(r"`([^`]+)`")
+_LINE_COMMENT = re.compile(r"--[^\n]*")
+# 文字列リテラル・識別子（group 1）はそのまま残し、空白と行コメントの並び（group 2）だけを 1 つの空白にする
+_SQL_TOKEN = re.compile(
+    r"""('(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*"|`[^`]*`)|((?:\s|--[^\n]*)+)"""
+)
 
 
-    def _get_cache_key(self, player_name: str, season: int, query_type: str) -> str:
-        """
-        Generate cache key for a given player and query.
-        """
-        return f"stats:{player_name}:{season}:{query_type}"
+def normalize_sql(sql: str) -> str:
+    """コメント・空白の差だけの SQL を同一キーにする（引用符の中は変えない）。"""
+    return _SQL_TOKEN.sub(lambda m: m.group(1) or " ", sql).strip()
 
 
-    def get_player_stats(self, player_name: str, season: int, query_type: str):
-        """
-        """
-        key = self._get_cache_key(player_name, season, query_type)
+def is_cacheable_sql(sql: str) -> bool:
+    return bool(_READ_ONLY_SQL.match(_LINE_COMMENT.sub("", sql)))
+
+
+def ttl_for_sql(sql: str) -> int:
+    """SQL が参照するテーブル名から TTL を決める。"""
+    ttls = []
+    for ref in _TABLE_REF.findall(sql):
+        table = ref.rsplit(".", 1)[-1].lower()
+        if table in LOG_TABLE_TTLS:
+            ttls.append(LOG_TABLE_TTLS[table])
+        ttls.extend(ttl for family, ttl in TABLE_FAMILY_TTLS.items() if family in table)
+    return min(ttls) if ttls else DEFAULT_QUERY_CACHE_TTL
+
+
+def make_query_cache_key(sql: str, query_parameters: list) -> str:
+    """正規化 SQL + パラメータ（API 表現）から決定的なキーを作る。"""
+    params_repr = [p.to_api_repr() for p in query_parameters]
+    payload = json.dumps([normalize_sql(sql), params_repr], sort_keys=True, default=str)
+    return QUERY_CACHE_KEY_PREFIX + hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class TTLLRUCache:
+    """スレッドセーフな TTL 付き LRU。エントリ数とおおよそのバイト数で上限を持つ。"""
+
+    def __init__(self, max_entries: int = QUERY_CACHE_MAX_ENTRIES, max_bytes: Optional[int] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data: "OrderedDict[Hashable, Tuple[float, Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value, size = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self._bytes -= size
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: float, size: int = 0) -> None:
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            self._data[key] = (time.monotonic() + ttl, value, size)
+            self._bytes += size
+            while self._data and (
+                len(self._data) > self.max_entries
+                or (self.max_bytes is not None and self._bytes > self.max_bytes)
+            ):
+                _, (_, _, evicted_size) = self._data.popitem(last=False)
+                self._bytes -= evicted_size
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            entry = self._data.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry[2]
+
+    def purge_expired(self) -> int:
+        """期限切れのエントリを捨てる（get されないまま残った分のメモリを返す）。捨てた数を返す。"""
+        now = time.monotonic()
+        with self._lock:
+            expired = [k for k, (expires_at, _, _) in self._data.items() if expires_at <= now]
+            for k in expired:
+                self._bytes -= self._data.pop(k)[2]
+        return len(expired)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def _serialize_df(df: pd.DataFrame, bytes_processed: int) -> bytes:
+    # Arrow IPC は NUMERIC（Decimal）・日時・nullable 整数などの列型をそのまま保持する
+    # （JSON は Decimal を文字列に落とし、pickle は共有 Redis に置かない）
+    table = pa.Table.from_pandas(df)
+    table = table.replace_schema_metadata({
+        **(table.schema.metadata or {}),
+        b"bytes_processed": str(int(bytes_processed)).encode(),
+    })
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema, options=pa.ipc.IpcWriteOptions(compression="zstd")) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _deserialize_df(raw: bytes) -> Tuple[pd.DataFrame, int]:
+    table = pa.ipc.open_stream(pa.py_buffer(raw)).read_all()
+    bytes_processed = int((table.schema.metadata or {}).get(b"bytes_processed", b"0"))
+    return table.to_pandas(), bytes_processed
+
+
+class QueryResultCache:
+    """BigQuery 結果の L1 + L2 キャッシュと single-flight の管理。
+
+    統計値（hit/miss/bytes_saved）はプロセス内で積算し、flush_metrics() で
+    MonitoringService に差分を送る。
+    """
+
+    # Redis に繋がらなかった後、再接続を試みるまでの待ち（秒）
+    L2_RETRY_INTERVAL_SEC = 30
+
+    def __init__(self, l1: Optional[TTLLRUCache] = None, redis_client: Optional[Any] = None):
+        self.l1 = l1 if l1 is not None else TTLLRUCache(QUERY_CACHE_MAX_ENTRIES, QUERY_CACHE_MAX_BYTES)
+        self._redis = redis_client
+        self._l2_disabled_until = 0.0
+        self._inflight: Dict[str, Any] = {}
+        self._inflight_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {"l1_hit": 0, "l2_hit": 0, "coalesced": 0, "miss": 0, "bytes_saved": 0}
+
+    @property
+    def redis_client(self) -> Any:
+        if self._redis is None:
+            self._redis = redis.Redis(
+                host=os.getenv("REDIS_HOST", "localhost"),
+                port=int(os.getenv("REDIS_PORT", 6379)),
+                password=os.getenv("REDIS_PASSWORD", None),
+                socket_connect_timeout=0.5,
+                socket_timeout=0.5,
+            )
+        return self._redis
+
+    # ── 統計 ─────────────────────────────────────────────
+    def _count(self, event: str, bytes_saved: int = 0) -> None:
+        with self._stats_lock:
+            self._stats[event] += 1
+            self._stats["bytes_saved"] += bytes_saved
+
+    def stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def flush_metrics(self) -> None:
+        """前回 flush 以降の差分を Cloud Monitoring に書き出す。"""
+        with self._stats_lock:
+            snapshot = dict(self._stats)
+            for k in self._stats:
+                self._stats[k] = 0
+        if not any(snapshot.values()):
+            return
+        from backend.app.services.monitoring_service import get_monitoring_service
+        get_monitoring_service().record_query_cache_stats(
+            l1_hits=snapshot["l1_hit"],
+            l2_hits=snapshot["l2_hit"],
+            coalesced=snapshot["coalesced"],
+            misses=snapshot["miss"],
+            bytes_saved=snapshot["bytes_saved"],
+        )
+
+    # ── L1 / L2 ──────────────────────────────────────────
+    def get_local(self, key: str) -> Optional[pd.DataFrame]:
+        """L1 のみ参照（ブロックしないのでイベントループ上から呼んでよい）。"""
+        entry = self.l1.get(key)
+        if entry is None:
+            return None
+        df, bytes_processed = entry
+        self._count("l1_hit", bytes_processed)
+        return df.copy()
+
+    def _l2_available(self) -> bool:
+        # L2 の直列化は Arrow IPC。pyarrow が無い環境では L1 のみで動く
+        return _PYARROW_AVAILABLE and time.monotonic() >= self._l2_disabled_until
+
+    def _l2_failed(self, e: Exception) -> None:
+        self._l2_disabled_until = time.monotonic() + self.L2_RETRY_INTERVAL_SEC
+        logger.warning(f"⚠️ Query cache L2 (Redis) unavailable, falling back to L1 only: {e}")
+
+    def get_remote(self, key: str, ttl: int) -> Optional[pd.DataFrame]:
+        """L2 を参照し、ヒットしたら L1 に昇格する。ブロッキング I/O なのでワーカースレッドから呼ぶ。"""
+        if not self._l2_available():
+            return None
+        try:
+            raw = self.redis_client.get(key)
+        except redis.exceptions.RedisError as e:
+            self._l2_failed(e)
+            return None
+        if not raw:
+            return None
         try:
-            cached_data = self.redis_client.get(key)
-            if cached_data:
-                return json.loads(cached_data)
-        except redis.exceptions.ConnectionError:
-            logger.warning(f"⚠️ Redis connection failed when getting stats for {player_name}, season {season}, query {query_type}. Proceeding without cache.")
+            df, bytes_processed = _deserialize_df(raw)
         except Exception as e:
-            logger.error(f"❌ Unexpected error getting stats from cache: {e}")
-        
-        return None
-        
+            logger.warning(f"Query cache L2 entry could not be decoded, ignoring: {e}")
+            return None
+        self.l1.set(key, (df, bytes_processed), ttl, size=int(df.memory_usage(deep=True).sum()))
+        self._count("l2_hit", bytes_processed)
+        return df.copy()
 
-    def set_player_stats(self, player_name: str, season: int, query_type: str, data: dict):
+    def record_miss(self) -> None:
+        self._count("miss")
 
-        key = self._get_cache_key(player_name, season, query_type)
-
-        # save stats to cache
+    def put(self, key: str, df: pd.DataFrame, ttl: int, bytes_processed: int = 0) -> None:
+        """L1 と L2 に保存する。呼び出し側が df を書き換えても影響しないよう L1 には複製を置く。"""
+        self.l1.set(key, (df.copy(), bytes_processed), ttl, size=int(df.memory_usage(deep=True).sum()))
+        if not self._l2_available():
+            return
         try:
-            self.redis_client.setex(
-                key,
-                self.ttl,
-                json.dumps(data)
-            )
-        except redis.exceptions.ConnectionError:
-            logger.warning(f"⚠️ Redis connection failed when setting stats for {player_name}, season {season}, query {query_type}. Proceeding without cache.")
+            self.redis_client.setex(key, ttl, _serialize_df(df, bytes_processed))
+        except redis.exceptions.RedisError as e:
+            self._l2_failed(e)
         except Exception as e:
-            logger.error(f"❌ Unexpected error setting stats to cache: {e}")
\ No newline at end of file
+            logger.warning(f"Query cache L2 write skipped: {e}")
+
+    # ── single-flight ────────────────────────────────────
+    def join_or_start(
+        self, key: str, start: Callable[[], Any], join: Optional[Callable[[Any], bool]] = None
+    ) -> Tuple[Any, bool]:
+        """同一キーの実行中ハンドルがあればそれを返し、なければ start() で開始する。
+
+        ハンドルは Future か、add_done_callback を持つ実行オブジェクト。
+        join が渡されれば相乗りの可否をロック内で確認する（False なら新しく開始する）。
+
+        Returns:
+            (handle, is_leader)。
+        """
+        with self._inflight_lock:
+            handle = self._inflight.get(key)
+            if handle is not None and (join is None or join(handle)):
+                self._count("coalesced")
+                return handle, False
+            handle = start()
+            self._inflight[key] = handle
+        handle.add_done_callback(lambda _h: self._release(key, _h))
+        return handle, True
+
+    def _release(self, key: str, handle: Any) -> None:
+        with self._inflight_lock:
+            if self._inflight.get(key) is handle:
+                del self._inflight[key]
+
+    def clear(self) -> None:
+        self.l1.clear()
+
+
+_query_cache: Optional[QueryResultCache] = None
+
+
+def get_query_cache() -> QueryResultCache:
+    """共有 QueryResultCache を返す（シングルトン）。"""
+    global _query_cache
+    if _query_cache is None:
+        _query_cache = QueryResultCache()
+    return _query_cache
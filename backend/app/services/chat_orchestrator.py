@@ -1,6 +1,8 @@
 """
 ChatOrchestrator: チャット機能の唯一の入口。
-素の google-genai SDK + tool_use ループで、共通ツール (tools/) を順次呼び出す。
+素の google-genai SDK + tool_use ループで、共通ツール (tools/) を呼び出す。
+1 ターンに複数の function_call が来た場合は共有スレッドプールで並列実行し、
+結果は呼び出し順に並べ直して LLM に返す（レイテンシは合計ではなく最大値になる）。
 
 設計原則:
 - LangGraph には依存しない（StrategyAgent との結合を切る）
@@ -14,11 +16,14 @@ ChatOrchestrator: チャット機能の唯一の入口。
 - backend/app/services/security_guardrail  Prompt Injection 防御
 """
 import asyncio
+import contextvars
+import functools
 import json
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import Any, AsyncGenerator, Dict, List, Optional
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple
 
 from google import genai
 from google.genai import types
@@ -26,7 +31,8 @@ from google.genai import types
 from backend.app.config.prompt_registry import get_prompt_version
 from backend.app.config.settings import get_settings
 from backend.app.core.exceptions import PromptInjectionError
-from backend.app.services.llm_gateway_service import _calc_cost_usd
+from backend.app.middleware.request_context import add_bq_latency_ms, get_bq_latency_ms, reset_bq_latency_ms
+from backend.app.services.llm_gateway_service import _calc_cost_usd, get_genai_client
 from backend.app.services.llm_logger_service import LLMLogEntry, get_llm_logger
 from backend.app.services.online_judge_service import judge_and_log, should_sample
 from backend.app.services.security_guardrail import get_security_guardrail
@@ -46,6 +52,27 @@ logger = get_logger("chat-orchestrator")
 DEFAULT_MODEL = "gemini-2.5-flash"
 MAX_TOOL_ITERATIONS = 6
 
+# tool 実行用の共有プール。tool は同期関数（BQ / HTTP 待ち）なのでスレッドで並列化する。
+CHAT_TOOL_MAX_WORKERS = int(os.getenv("CHAT_TOOL_MAX_WORKERS", "8"))
+CHAT_TOOL_TIMEOUT_SEC = float(os.getenv("CHAT_TOOL_TIMEOUT_SEC", "30"))
+
+_tool_pool: Optional[ThreadPoolExecutor] = None
+
+
+def _get_tool_pool() -> ThreadPoolExecutor:
+    global _tool_pool
+    if _tool_pool is None:
+        _tool_pool = ThreadPoolExecutor(max_workers=CHAT_TOOL_MAX_WORKERS, thread_name_prefix="chat-tool")
+    return _tool_pool
+
+
+def shutdown_tool_pool() -> None:
+    """lifespan 終了時に呼ぶ。実行中の tool は待たずにプールを閉じる。"""
+    global _tool_pool
+    if _tool_pool is not None:
+        _tool_pool.shutdown(wait=False, cancel_futures=True)
+        _tool_pool = None
+
 
 def _get_valid_metric_keys() -> List[str]:
     """METRIC_MAP の正規キー名一覧を取得する。
@@ -360,7 +387,8 @@ class ChatOrchestrator:
         key = api_key or os.getenv("GEMINI_API_KEY_V2")
         if not key:
             raise RuntimeError("GEMINI_API_KEY_V2 is not configured for ChatOrchestrator")
-        self._client = genai.Client(api_key=key)
+        # リクエストごとに生成されるため、通常は gateway の共有クライアント（接続プール）を使う
+        self._client = genai.Client(api_key=key) if api_key else get_genai_client()
 
         # use_glossary_rag 未指定なら settings から取得 (env: USE_GLOSSARY_RAG)
         if use_glossary_rag is None:
@@ -434,6 +462,40 @@ class ChatOrchestrator:
         except Exception as e:
             logger.error(f"Tool execution failed: {name}", error=str(e), exc_info=True)
             return {"error": f"Tool {name} failed: {e}"}
+
+    async def _execute_tool_async(self, name: str, args: Dict[str, Any]) -> Tuple[Any, float]:
+        """_execute_tool を共有プールで実行し、(結果, tool 内で計上された BQ 時間 ms) を返す。
+
+        request_context の ContextVar（user_id 等）を tool 側で参照できるよう、
+        呼び出し時のコンテキストを複製して渡す。複製側で add_bq_latency_ms された値は
+        呼び出し元のコンテキストに戻らないため、BQ 時間は戻り値で返し、呼び出し元が加算する。
+        timeout 後もスレッド側の処理は止まらないが、結果は捨てて LLM には返さない（BQ 時間も 0 扱い）。
+        """
+        loop = asyncio.get_running_loop()
+        ctx = contextvars.copy_context()
+        ctx.run(reset_bq_latency_ms)
+        call = functools.partial(ctx.run, self._execute_tool, name, args)
+        try:
+            result = await asyncio.wait_for(
+                loop.run_in_executor(_get_tool_pool(), call),
+                timeout=CHAT_TOOL_TIMEOUT_SEC,
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"Tool execution timed out: {name}", timeout_sec=CHAT_TOOL_TIMEOUT_SEC)
+            return {"error": f"Tool {name} timed out after {CHAT_TOOL_TIMEOUT_SEC:.0f}s"}, 0.0
+        return result, ctx.run(get_bq_latency_ms)
+
+    async def _execute_tools(self, function_calls: List[Any]) -> List[Any]:
+        """同一ターンの function_call を並列実行し、呼び出し順の結果リストを返す。
+
+        tool 内の BQ 時間はこのコルーチンのコンテキスト（= 呼び出し元のリクエスト）に加算する。
+        """
+        outcomes = await asyncio.gather(*(
+            self._execute_tool_async(fc.name, dict(fc.args or {}))
+            for fc in function_calls
+        ))
+        add_bq_latency_ms(sum(bq_ms for _, bq_ms in outcomes))
+        return [result for result, _ in outcomes]
     
 
     async def run(self, user_query: str) -> Dict[str, Any]:
@@ -454,7 +516,7 @@ class ChatOrchestrator:
         tool_names_seen: set[str] = set()
 
         for iteration in range(MAX_TOOL_ITERATIONS):
-            response = self._client.models.generate_content(
+            response = await self._client.aio.models.generate_content(
                 model=self.model,
                 contents=contents,
                 config=self._gen_config,
@@ -483,9 +545,8 @@ class ChatOrchestrator:
                 role="model",
                 parts=[types.Part(function_call=fc) for fc in function_calls],
             ))
-            for fc in function_calls:
-                args = dict(fc.args or {})
-                result = self._execute_tool(fc.name, args)
+            results = await self._execute_tools(function_calls)
+            for fc, result in zip(function_calls, results):
                 tool_results_seen.append(result)
                 tool_names_seen.add(fc.name)
                 sanitized = _sanitize_tool_result(result)
@@ -572,13 +633,13 @@ class ChatOrchestrator:
             iter_text_parts: List[str] = []
             last_usage = None
             try:
-                stream = self._client.models.generate_content_stream(
+                stream = await self._client.aio.models.generate_content_stream(
                     model=self.model,
                     contents=contents,
                     config=self._gen_config,
                 )
 
-                for chunk in stream:
+                async for chunk in stream:
                     # 各 chunk に usage_metadata が累積で乗ってくる。最後のものを採用。
                     if getattr(chunk, "usage_metadata", None):
                         last_usage = chunk.usage_metadata
@@ -684,6 +745,8 @@ class ChatOrchestrator:
                 role="model",
                 parts=[types.Part(function_call=fc) for fc in function_calls],
             ))
+            # 全 tool を同時に開始し、完了した順に tool_end を送る。
+            # LLM に返す function_response は呼び出し順に並べ直す。
             for fc in function_calls:
                 yield {
                     "type": "tool_start",
@@ -692,21 +755,34 @@ class ChatOrchestrator:
                     "timestamp": _now_iso(),
                     "step_type": "tool_call",
                 }
-                args = dict(fc.args or {})
-                result = self._execute_tool(fc.name, args)
-                tool_results_seen.append(result)
-                tool_names_seen.add(fc.name)
+
+            async def _run_indexed(idx: int, fc: Any):
+                return idx, await self._execute_tool_async(fc.name, dict(fc.args or {}))
+
+            results: List[Any] = [None] * len(function_calls)
+            for done in asyncio.as_completed([
+                _run_indexed(i, fc) for i, fc in enumerate(function_calls)
+            ]):
+                idx, (result, bq_ms) = await done
+                # tool は複製コンテキストで動くため、BQ 時間はここ（ストリームを読むリクエスト側）で加算する
+                add_bq_latency_ms(bq_ms)
+                results[idx] = result
+                name = function_calls[idx].name
                 output_summary = ""
                 if isinstance(result, list):
                     output_summary = f"{len(result)}件のデータを取得"
                 yield {
                     "type": "tool_end",
-                    "tool_name": fc.name,
-                    "message": f"✅ {fc.name} 完了",
+                    "tool_name": name,
+                    "message": f"✅ {name} 完了",
                     "output_summary": output_summary,
                     "timestamp": _now_iso(),
                     "step_type": "tool_result",
                 }
+
+            for fc, result in zip(function_calls, results):
+                tool_results_seen.append(result)
+                tool_names_seen.add(fc.name)
                 sanitized = _sanitize_tool_result(result)
                 contents.append(types.Content(
                     role="user",
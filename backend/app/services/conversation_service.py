@@ -1,4 +1,5 @@
-from typing import List, Dict, Any, Optional
+from contextvars import ContextVar
+from typing import List, Dict, Any, Optional, Tuple
 # from llama_index.core.memory import ChatMemoryBuffer
 # from llama_index.llms.gemini import Gemini
 import redis
@@ -7,27 +8,57 @@ import logging
 from datetime import datetime
 import os
 
+from backend.app.middleware.request_context import get_request_id
 from backend.app.services.llm_gateway_service import call_gemini
 
 logger = logging.getLogger(__name__)
 
+# セッションごとに保持する最大メッセージ数（Redis リストを LTRIM で切り詰める）
+CHAT_HISTORY_MAX_MESSAGES = int(os.getenv("CHAT_HISTORY_MAX_MESSAGES", "10"))
+# resolve_context が LLM に渡す直近メッセージ数
+CHAT_CONTEXT_MESSAGES = int(os.getenv("CHAT_CONTEXT_MESSAGES", "5"))
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+
+# リクエスト内の履歴キャッシュ: (request_id, {session_id: (直近メッセージ, Redis の全件を持っているか)})
+# 1 リクエストの中で resolve_context → add_message(user) → add_message(assistant) と
+# 何度も読む履歴を 1 回の LRANGE で済ませる。request_id が変われば捨てる。
+_request_history: ContextVar[Optional[Tuple[str, Dict[str, Tuple[List[Dict[str, Any]], bool]]]]] = ContextVar(
+    "conversation_request_history", default=None
+)
+
+
+def _request_cache() -> Optional[Dict[str, Tuple[List[Dict[str, Any]], bool]]]:
+    """現在のリクエストの履歴キャッシュ（リクエスト外では None = キャッシュしない）"""
+    request_id = get_request_id()
+    if not request_id:
+        return None
+    current = _request_history.get()
+    if current is None or current[0] != request_id:
+        current = (request_id, {})
+        _request_history.set(current)
+    return current[1]
+
 
 class ConversationService:
     """Service for managging conversations using Redis as the backend."""
 
-    def __init__(self):
-        # Intitialize redis client
-        self.redis_client = redis.Redis(
-            host=os.getenv("REDIS_HOST", "localhost"),
-            port=int(os.getenv("REDIS_PORT", 6379)),
-            password=os.getenv("REDIS_PASSWORD", None),
-            decode_responses=True,
-            socket_connect_timeout=0.5, # 接続タイムアウトを短縮
-            socket_timeout=0.5          # 通信タイムアウトを短縮
+    def __init__(self, redis_client: Optional[redis.Redis] = None):
+        # Intitialize redis client（接続はプールして使い回す）
+        self.redis_client = redis_client or redis.Redis(
+            connection_pool=redis.ConnectionPool(
+                host=os.getenv("REDIS_HOST", "localhost"),
+                port=int(os.getenv("REDIS_PORT", 6379)),
+                password=os.getenv("REDIS_PASSWORD", None),
+                decode_responses=True,
+                socket_connect_timeout=0.5, # 接続タイムアウトを短縮
+                socket_timeout=0.5,         # 通信タイムアウトを短縮
+                max_connections=REDIS_MAX_CONNECTIONS,
+            )
         )
 
         # TTL
         self.ttl = int(os.getenv("CHAT_HISTORY_TTL", 3600))
+        self.max_messages = CHAT_HISTORY_MAX_MESSAGES
 
         # Gemini API Key (requests方式で使用)
         self.gemini_api_key = os.getenv("GEMINI_API_KEY_V2")
@@ -43,34 +74,48 @@ class ConversationService:
         """
         Generate Redis key for a given session ID
 
-        例: session_id="abc123" → "chat_history:abc123"
+        例: session_id="abc123" → "chat_history:v2:abc123"
+        値は 1 メッセージ = 1 要素（JSON 文字列）の Redis リスト。
+        v1（履歴全体を 1 つの JSON 文字列で持つ形式）とは型が違うためキーを分けている。
         """
-        return f"chat_history:{session_id}"
+        return f"chat_history:v2:{session_id}"
     
 
     # Method to get chat history
-    def get_chat_history(self, session_id: str) -> List[Dict[str, str]]:
+    def get_chat_history(self, session_id: str, limit: Optional[int] = None) -> List[Dict[str, str]]:
         """
         Retrieve chat history for a given session ID.
         
         Args:
             session_id (str): The session ID.
+            limit (Optional[int]): 直近 limit 件だけ取得する（None なら全件）
             
         Returns:
-            会話履歴のリスト（JSON形式）
+            会話履歴のリスト（JSON形式、古い順）
             例: [{"role": "user", "content": "大谷の成績は？"}, ...]
         """
+        cache = _request_cache()
+        if cache is not None and session_id in cache:
+            messages, complete = cache[session_id]
+            if complete or (limit is not None and limit <= len(messages)):
+                return list(messages if limit is None else messages[-limit:])
+
         key = self._get_session_key(session_id)
+        start = 0 if limit is None else -limit
         try:
-            history_json = self.redis_client.get(key)
-            if history_json:
-                return json.loads(history_json)
+            raw = self.redis_client.lrange(key, start, -1)
         except redis.exceptions.ConnectionError:
             logger.warning(f"⚠️ Redis connection failed when getting history for session {session_id}. Proceeding with empty context.")
+            return []
         except Exception as e:
             logger.error(f"❌ Unexpected error getting chat history: {e}")
-            
-        return []
+            return []
+
+        messages = [json.loads(item) for item in raw]
+        if cache is not None:
+            # limit より少なければ Redis 側の全件を持っている
+            cache[session_id] = (messages, limit is None or len(messages) < limit)
+        return list(messages)
     
     def add_message(
             self,
@@ -81,6 +126,7 @@ class ConversationService:
     ):
         """
         Add a message to the chat history for a given session ID.
+        RPUSH + LTRIM + EXPIRE を 1 パイプラインで送る（読み出し不要・同一セッションの同時書き込みも欠けない）。
         
         Args:
             session_id (str): The session ID.
@@ -89,7 +135,6 @@ class ConversationService:
             metadata (Optional[Dict[str, Any]]): Additional metadata for the message. （例: {"player_name": "大谷翔平", "query_type": "batting"}）
         """
         key = self._get_session_key(session_id)
-        history = self.get_chat_history(session_id)
 
         # Create new message entry
         message = {
@@ -99,20 +144,25 @@ class ConversationService:
             "metadata": metadata or {}
         }
 
-        history.append(message)
-
-        # Save updated history back to Redis only 10 latest messages
-        trimmed_history = history[-10:]
+        # Save to Redis, keeping only the latest max_messages
         try:
-            self.redis_client.setex(
-                key,
-                self.ttl,
-                json.dumps(trimmed_history, ensure_ascii=False) # JSON文字列化（日本語対応）
-            )
+            pipe = self.redis_client.pipeline(transaction=True)
+            pipe.rpush(key, json.dumps(message, ensure_ascii=False)) # JSON文字列化（日本語対応）
+            pipe.ltrim(key, -self.max_messages, -1)
+            pipe.expire(key, self.ttl)
+            pipe.execute()
         except redis.exceptions.ConnectionError:
             logger.warning(f"⚠️ Redis connection failed when adding message for session {session_id}. History not saved.")
+            return
         except Exception as e:
             logger.error(f"❌ Unexpected error adding message to chat history: {e}")
+            return
+
+        # リクエスト内キャッシュにも反映（読み込み済みの場合のみ）
+        cache = _request_cache()
+        if cache is not None and session_id in cache:
+            messages, complete = cache[session_id]
+            cache[session_id] = ((messages + [message])[-self.max_messages:], complete)
     
 
     def resolve_context(
@@ -138,14 +188,15 @@ class ConversationService:
                 "context_used": True
             }
         """
-        history = self.get_chat_history(session_id)
+        # 直近 CHAT_CONTEXT_MESSAGES 件だけ取得する
+        history = self.get_chat_history(session_id, limit=CHAT_CONTEXT_MESSAGES)
 
         if not history:
             return {"resolved_query": current_query, "context_used": False}
         
         # Convert history to text for LLM input （会話履歴をテキスト形式に変換）
         history_text = "\n".join([
-            f"{msg['role']}: {msg['content']}" for msg in history[-5:] # 直近5件のみ使用
+            f"{msg['role']}: {msg['content']}" for msg in history
         ])
 
         # Prepare prompt for LLM
@@ -206,6 +257,9 @@ class ConversationService:
         key = self._get_session_key(session_id)
         try:
             self.redis_client.delete(key)
+            cache = _request_cache()
+            if cache is not None:
+                cache.pop(session_id, None)
             logger.info(f"Session cleared: {session_id}")
         except redis.exceptions.ConnectionError:
             logger.warning(f"⚠️ Redis connection failed when clearing session {session_id}.")
@@ -15,12 +15,13 @@ import uuid
 import logging
 from dataclasses import dataclass, field, asdict
 from datetime import datetime, timezone
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import numpy as np
 import pandas as pd
 from scipy import stats
-from google.cloud import bigquery
+from backend.app.services.bigquery_service import run_query_sync
 from backend.app.config.settings import get_settings
+from backend.app.services.feature_encoder import encode_pitches
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -255,7 +256,6 @@ class DataDriftService:
         print(report.summary)
     """
     def __init__(self):
-        self.client = bigquery.Client(project=settings.gcp_project_id)
         self.psi_warning = settings.ml_drift_psi_warning_threshold
         self.psi_critical = settings.ml_drift_psi_critical_threshold
         self.ks_alpha = settings.ml_drift_ks_alpha
@@ -377,7 +377,7 @@ class DataDriftService:
             min_sample=config["min_sample"]
         )
         try:
-            df = self.client.query(query).to_dataframe()
+            df = run_query_sync(query, cache=False)
             logger.info(f"Fetched {len(df)} rows for season {season}")
             return df
         except Exception as e:
@@ -512,9 +512,6 @@ class DataDriftService:
 
         stuff_svc = StuffPlusService()
         artifact = stuff_svc._ensure_model_loaded(model_type)
-        xgb_model = artifact["model"]
-        encoded_columns = artifact["encoded_columns"]
-        features = artifact["features"]
         z_mu = artifact["z_score_mu"]
         z_sigma = artifact["z_score_sigma"]
 
@@ -524,12 +521,10 @@ class DataDriftService:
         )
 
         preds_baseline = self._predict_season(
-            xgb_model, encoded_columns, features,
-            model_type, baseline_season,
+            artifact, model_type, baseline_season,
         )
         preds_target = self._predict_season(
-            xgb_model, encoded_columns, features,
-            model_type, target_season,
+            artifact, model_type, target_season,
         )
 
         if preds_baseline is None or preds_target is None:
@@ -613,9 +608,6 @@ class DataDriftService:
 
         stuff_svc = StuffPlusService()
         artifact = stuff_svc._ensure_model_loaded(model_type)
-        xgb_model = artifact["model"]
-        encoded_columns = artifact["encoded_columns"]
-        features = artifact["features"]
 
         logger.info(
             f"Concept drift detection: {model_type} "
@@ -623,12 +615,10 @@ class DataDriftService:
         )
 
         metrics_base = self._compute_pred_vs_actual(
-            xgb_model, encoded_columns, features,
-            model_type, baseline_season,
+            artifact, model_type, baseline_season,
         )
         metrics_tgt = self._compute_pred_vs_actual(
-            xgb_model, encoded_columns, features,
-            model_type, target_season,
+            artifact, model_type, target_season,
         )
 
         if metrics_base is None or metrics_tgt is None:
@@ -696,13 +686,11 @@ class DataDriftService:
     # Private: シーズン全体の予測値を取得
     # ----------------------------------------------------------
 
-    def _predict_season(
-        self, model, encoded_columns, features,
-        model_type, season,
-    ) -> Optional[np.ndarray]:
-        """Statcast データを取得し、モデルで全ピッチの予測値を返す"""
+    def _score_season(
+        self, artifact, model_type, season,
+    ) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Statcast データを取得し、全ピッチの (予測値, 実績値) を返す"""
         from backend.app.services.stuff_plus_service import STATCAST_COLUMNS
-        import xgboost as xgb
 
         cols = ", ".join(STATCAST_COLUMNS)
         query = f"""
@@ -714,15 +702,8 @@ class DataDriftService:
                 AND delta_pitcher_run_exp IS NOT NULL
             LIMIT 200000
         """
-        from google.cloud import bigquery as bq
-        job_config = bq.QueryJobConfig(
-            query_parameters=[
-                bq.ScalarQueryParameter("season", "INT64", season),
-            ]
-        )
-
         try:
-            df = self.client.query(query, job_config=job_config).to_dataframe()
+            df = run_query_sync(query, [("season", "INT64", season)], cache=False)
         except Exception as e:
             logger.error(f"Failed to fetch data for season {season}: {e}")
             return None
@@ -730,150 +711,34 @@ class DataDriftService:
         if df.empty:
             return None
 
-        # plate_z_norm
-        sz_range = df["sz_top"] - df["sz_bot"]
-        df["plate_z_norm"] = np.where(
-            sz_range > 0,
-            (df["plate_z"] - df["sz_bot"]) / sz_range,
-            np.nan,
-        )
-
-        # Pitching++ 用特徴量
-        if model_type == "pitching_plus_plus":
-            df = df.sort_values(["game_pk", "at_bat_number", "pitch_number"])
-            grp = df.groupby(["game_pk", "at_bat_number"])
-            df["prev_release_pos_x"] = grp["release_pos_x"].shift(1)
-            df["prev_release_pos_z"] = grp["release_pos_z"].shift(1)
-            df["prev_release_speed"] = grp["release_speed"].shift(1)
-            df["prev_pfx_z"] = grp["pfx_z"].shift(1)
-            df["prev_pitch_type"] = grp["pitch_type"].shift(1)
-
-            df["release_diff"] = np.sqrt(
-                (df["release_pos_x"] - df["prev_release_pos_x"]) ** 2
-                + (df["release_pos_z"] - df["prev_release_pos_z"]) ** 2
-            )
-            df["speed_diff"] = df["release_speed"] - df["prev_release_speed"]
-            df["zone_distance"] = np.sqrt(
-                df["plate_x"] ** 2 + (df["plate_z_norm"] - 0.5) ** 2
-            )
-            df["release_diff"] = df["release_diff"].fillna(0)
-            df["speed_diff"] = df["speed_diff"].fillna(0)
-            df["prev_pfx_z"] = df["prev_pfx_z"].fillna(df["pfx_z"])
-            df["prev_pitch_type"] = df["prev_pitch_type"].fillna("NONE")
-
-        cat_cols = (
-            ["pitch_type", "prev_pitch_type"]
-            if model_type == "pitching_plus_plus"
-            else ["pitch_type"]
-        )
-
-        df_clean = df.dropna(
-            subset=features + ["delta_pitcher_run_exp"]
-        ).copy()
+        # 特徴量の派生・エンコードは学習・推論と同じエンコーダで行う
+        df_clean, X = encode_pitches(df, artifact, model_type)
         if df_clean.empty:
             return None
 
-        df_encoded = pd.get_dummies(
-            df_clean[features + cat_cols], columns=cat_cols
-        )
-        for col in encoded_columns:
-            if col not in df_encoded.columns:
-                df_encoded[col] = 0
-        df_encoded = df_encoded[encoded_columns]
+        predicted = artifact["model"].predict(X)
+        actual = df_clean["delta_pitcher_run_exp"].to_numpy(dtype=np.float64)
+        return predicted, actual
 
-        predictions = model.predict(df_encoded)
-        return predictions
+    def _predict_season(
+        self, artifact, model_type, season,
+    ) -> Optional[np.ndarray]:
+        """Statcast データを取得し、モデルで全ピッチの予測値を返す"""
+        scored = self._score_season(artifact, model_type, season)
+        return None if scored is None else scored[0]
 
     # ----------------------------------------------------------
     # Private: Predicted vs Actual の誤差メトリクス計算
     # ----------------------------------------------------------
 
     def _compute_pred_vs_actual(
-        self, model, encoded_columns, features,
-        model_type, season,
+        self, artifact, model_type, season,
     ) -> Optional[Dict]:
         """予測と実績の RMSE / MAE / 相関を計算"""
-        from backend.app.services.stuff_plus_service import STATCAST_COLUMNS
-
-        cols = ", ".join(STATCAST_COLUMNS)
-        query = f"""
-            SELECT {cols}
-            FROM `{settings.get_table_full_name('statcast_master')}`
-            WHERE game_year = @season
-                AND pitch_type IS NOT NULL
-                AND release_speed IS NOT NULL
-                AND delta_pitcher_run_exp IS NOT NULL
-            LIMIT 200000
-        """
-        from google.cloud import bigquery as bq
-        job_config = bq.QueryJobConfig(
-            query_parameters=[
-                bq.ScalarQueryParameter("season", "INT64", season),
-            ]
-        )
-
-        try:
-            df = self.client.query(query, job_config=job_config).to_dataframe()
-        except Exception as e:
-            logger.error(f"Failed to fetch data for season {season}: {e}")
-            return None
-
-        if df.empty:
+        scored = self._score_season(artifact, model_type, season)
+        if scored is None:
             return None
-
-        # plate_z_norm
-        sz_range = df["sz_top"] - df["sz_bot"]
-        df["plate_z_norm"] = np.where(
-            sz_range > 0,
-            (df["plate_z"] - df["sz_bot"]) / sz_range,
-            np.nan,
-        )
-
-        # Pitching++ 用特徴量
-        if model_type == "pitching_plus_plus":
-            df = df.sort_values(["game_pk", "at_bat_number", "pitch_number"])
-            grp = df.groupby(["game_pk", "at_bat_number"])
-            df["prev_release_pos_x"] = grp["release_pos_x"].shift(1)
-            df["prev_release_pos_z"] = grp["release_pos_z"].shift(1)
-            df["prev_release_speed"] = grp["release_speed"].shift(1)
-            df["prev_pfx_z"] = grp["pfx_z"].shift(1)
-            df["prev_pitch_type"] = grp["pitch_type"].shift(1)
-
-            df["release_diff"] = np.sqrt(
-                (df["release_pos_x"] - df["prev_release_pos_x"]) ** 2
-                + (df["release_pos_z"] - df["prev_release_pos_z"]) ** 2
-            )
-            df["speed_diff"] = df["release_speed"] - df["prev_release_speed"]
-            df["zone_distance"] = np.sqrt(
-                df["plate_x"] ** 2 + (df["plate_z_norm"] - 0.5) ** 2
-            )
-            df["release_diff"] = df["release_diff"].fillna(0)
-            df["speed_diff"] = df["speed_diff"].fillna(0)
-            df["prev_pfx_z"] = df["prev_pfx_z"].fillna(df["pfx_z"])
-            df["prev_pitch_type"] = df["prev_pitch_type"].fillna("NONE")
-
-        cat_cols = (
-            ["pitch_type", "prev_pitch_type"]
-            if model_type == "pitching_plus_plus"
-            else ["pitch_type"]
-        )
-
-        df_clean = df.dropna(
-            subset=features + ["delta_pitcher_run_exp"]
-        ).copy()
-        if df_clean.empty:
-            return None
-
-        df_encoded = pd.get_dummies(
-            df_clean[features + cat_cols], columns=cat_cols
-        )
-        for col in encoded_columns:
-            if col not in df_encoded.columns:
-                df_encoded[col] = 0
-        df_encoded = df_encoded[encoded_columns]
-
-        predicted = model.predict(df_encoded)
-        actual = df_clean["delta_pitcher_run_exp"].values
+        predicted, actual = scored
 
         rmse = float(np.sqrt(np.mean((predicted - actual) ** 2)))
         mae = float(np.mean(np.abs(predicted - actual)))
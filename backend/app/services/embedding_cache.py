@@ -0,0 +1,187 @@
+"""
+埋め込みベクトルの共有キャッシュ（内容アドレス方式）。
+
+用語集検索（GlossaryRAGService）、品質警告チェック（BQEmbeddingService）、
+レガシー RAG（MLBKnowledgeRAG の SentenceTransformer）は、同じユーザー質問をそれぞれ
+独立に埋め込んでいた。ここでは (埋め込みモデル, 正規化テキスト) をキーに
+
+  - プロセス内 LRU（TTLLRUCache）
+  - 永続ストア（EMBEDDING_CACHE_BACKEND=redis のとき Redis。float32 バイト列で保存）
+
+の順に引き、どちらにも無い分だけをまとめて 1 回のバッチで埋め込む。
+同じキーの同時ミスは single-flight で 1 回にまとめるので、1 回のチャットターンで
+並列に走る検索が同じ文面を二重に埋め込むことはない。
+
+model は「同じベクトル空間」を表す名前空間文字列にする（task_type・次元数が違えば別の名前）。
+返すベクトルは共有される。呼び出し側で書き換えないこと。
+"""
+import hashlib
+import logging
+import os
+import threading
+import unicodedata
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import redis
+
+from backend.app.config.settings import get_settings
+from backend.app.services.cache_service import TTLLRUCache
+from backend.app.utils.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_CACHE_BACKEND = os.getenv("EMBEDDING_CACHE_BACKEND", "memory")  # "memory" / "redis"
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "20000"))
+EMBEDDING_CACHE_TTL_SEC = int(os.getenv("EMBEDDING_CACHE_TTL_SEC", str(7 * 86400)))
+EMBEDDING_CACHE_KEY_PREFIX = "emb:v1:"
+
+# 埋め込み関数: テキストのリスト → 同じ順のベクトル（失敗した要素は None）
+BatchEmbedFn = Callable[[List[str]], Sequence[Optional[Sequence[float]]]]
+
+
+def normalize_text(text: str) -> str:
+    """全角半角・空白の違いだけのテキストを同一視する（大小文字は埋め込みが変わりうるので揃えない）。"""
+    return " ".join(unicodedata.normalize("NFKC", text or "").split())
+
+
+class EmbeddingCache:
+    """(model, 正規化テキスト) → float32 ベクトル。"""
+
+    def __init__(
+        self,
+        store: Optional[redis.Redis] = None,
+        max_entries: int = EMBEDDING_CACHE_MAX_ENTRIES,
+        ttl: int = EMBEDDING_CACHE_TTL_SEC,
+    ):
+        self.store = store
+        self.ttl = ttl
+        self._memory = TTLLRUCache(max_entries=max_entries)
+        self._flight = SingleFlight(name="embedding_cache")
+        self._stats_lock = threading.Lock()
+        self._stats = {"hit": 0, "store_hit": 0, "miss": 0, "embedded": 0, "failed": 0}
+
+    def _count(self, **deltas: int) -> None:
+        with self._stats_lock:
+            for event, n in deltas.items():
+                self._stats[event] += n
+
+    def stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return dict(self._stats)
+
+    @staticmethod
+    def _store_key(model: str, text: str) -> str:
+        digest = hashlib.sha256(f"{model}\x00{text}".encode("utf-8")).hexdigest()
+        return f"{EMBEDDING_CACHE_KEY_PREFIX}{digest}"
+
+    # ── 読み出し ─────────────────────────────────────────
+    def get(self, model: str, text: str, embed_batch: BatchEmbedFn) -> Optional[np.ndarray]:
+        """1 件版。失敗時 None。"""
+        return self.get_many(model, [text], embed_batch)[0]
+
+    def get_many(
+        self, model: str, texts: Sequence[str], embed_batch: BatchEmbedFn
+    ) -> List[Optional[np.ndarray]]:
+        """texts と同じ順のベクトルを返す。キャッシュに無い分は embed_batch を 1 回だけ呼ぶ。"""
+        keys = [normalize_text(t) for t in texts]
+        found: Dict[str, np.ndarray] = {}
+
+        missing = []
+        for key in dict.fromkeys(keys):
+            vector = self._memory.get((model, key))
+            if vector is not None:
+                found[key] = vector
+            else:
+                missing.append(key)
+        self._count(hit=len(found))
+
+        if missing and self.store is not None:
+            for key, vector in self._store_get(model, missing).items():
+                found[key] = vector
+                self._memory.set((model, key), vector, ttl=self.ttl)
+                self._count(store_hit=1)
+            missing = [k for k in missing if k not in found]
+
+        if missing:
+            self._count(miss=len(missing))
+            embedded = self._flight.do_sync(
+                (model, tuple(missing)), self._embed_and_store, model, missing, embed_batch
+            )
+            found.update(embedded)
+
+        return [found.get(key) for key in keys]
+
+    # ── 埋め込み ─────────────────────────────────────────
+    def _embed_and_store(
+        self, model: str, texts: List[str], embed_batch: BatchEmbedFn
+    ) -> Dict[str, np.ndarray]:
+        try:
+            vectors = embed_batch(texts)
+        except Exception as e:
+            logger.warning(f"Embedding failed ({model}, {len(texts)} texts): {e}")
+            self._count(failed=len(texts))
+            return {}
+
+        result: Dict[str, np.ndarray] = {}
+        for text, values in zip(texts, vectors):
+            if values is None or len(values) == 0:
+                continue
+            vector = np.asarray(values, dtype=np.float32)
+            vector.setflags(write=False)
+            result[text] = vector
+            self._memory.set((model, text), vector, ttl=self.ttl)
+        self._count(embedded=len(result), failed=len(texts) - len(result))
+
+        if result and self.store is not None:
+            self._store_set(model, result)
+        return result
+
+    # ── 永続ストア ───────────────────────────────────────
+    def _store_get(self, model: str, texts: List[str]) -> Dict[str, np.ndarray]:
+        try:
+            raw = self.store.mget([self._store_key(model, t) for t in texts])
+        except redis.exceptions.RedisError as e:
+            logger.warning(f"Embedding store read failed: {e}")
+            return {}
+        result = {}
+        for text, value in zip(texts, raw):
+            if value:
+                vector = np.frombuffer(value, dtype=np.float32)
+                vector.setflags(write=False)
+                result[text] = vector
+        return result
+
+    def _store_set(self, model: str, vectors: Dict[str, np.ndarray]) -> None:
+        try:
+            pipe = self.store.pipeline(transaction=False)
+            for text, vector in vectors.items():
+                pipe.set(self._store_key(model, text), vector.tobytes(), ex=self.ttl)
+            pipe.execute()
+        except redis.exceptions.RedisError as e:
+            # 永続化の失敗はプロセス内キャッシュだけで続行する
+            logger.warning(f"Embedding store write failed: {e}")
+
+
+def _default_store() -> Optional[redis.Redis]:
+    if EMBEDDING_CACHE_BACKEND != "redis":
+        return None
+    settings = get_settings()
+    return redis.Redis(
+        host=settings.redis_host,
+        port=settings.redis_port,
+        password=settings.redis_password,
+        socket_connect_timeout=0.2,
+        socket_timeout=0.2,
+    )
+
+
+_embedding_cache: Optional[EmbeddingCache] = None
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """共有 EmbeddingCache を返す（シングルトン）。永続ストアは EMBEDDING_CACHE_BACKEND で選ぶ。"""
+    global _embedding_cache
+    if _embedding_cache is None:
+        _embedding_cache = EmbeddingCache(store=_default_store())
+    return _embedding_cache
@@ -0,0 +1,262 @@
+"""
+学習と推論で共通の特徴量エンコーダ。
+
+Stuff+ / Pitching+ / Pitching++（XGBoost）、ドリフト監視、whiff 予測（LightGBM）は
+それぞれ pd.get_dummies で One-Hot 化し、学習時の encoded_columns に無い列を Python ループで 0 埋め、
+列を並べ替えていた。get_dummies はバッチに出現したカテゴリしか列を作らないため、
+バッチの中身によって列の作り方が変わる（drop_first では落ちる列まで変わる）うえ、
+DataFrame の中間コピーを何度も作る。
+
+FeatureEncoder は学習時に一度だけ列の並び（= encoded_columns）を確定し、
+  - 数値列 → 固定の列番号にそのまま書き込む
+  - カテゴリ列 → カテゴリ値ごとに固定の列番号を持ち、該当セルに 1 を立てる
+として、あらかじめ確保した float32 の NumPy 行列 1 枚に直接書き込む。
+学習時に無かったカテゴリ値（と drop_first で落とした基準カテゴリ）は全列 0 になる。
+
+エンコーダは学習スクリプトでモデルアーティファクトに "encoder" として保存する。
+保存前に登録されたモデルは encoded_columns から同じエンコーダを組み立てる（from_columns）。
+"""
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+class FeatureEncoder:
+    """固定の列配置で DataFrame を float32 行列に変換する。pickle してアーティファクトに保存できる。"""
+
+    def __init__(
+        self,
+        numeric: Sequence[str],
+        categories: Dict[str, Sequence[str]],
+        columns: Sequence[str],
+    ):
+        self.numeric = list(numeric)
+        # カテゴリ列 → 列を持つカテゴリ値（文字列で比較する。get_dummies の列名と同じ表記）
+        self.categories = {col: [str(v) for v in values] for col, values in categories.items()}
+        self.columns = list(columns)
+        self._build_index()
+
+    def _build_index(self) -> None:
+        position = {name: i for i, name in enumerate(self.columns)}
+        self._numeric_index: List[Tuple[str, int]] = [
+            (col, position[col]) for col in self.numeric if col in position
+        ]
+        self._category_index: Dict[str, Tuple[pd.Index, np.ndarray]] = {}
+        for col, values in self.categories.items():
+            present = [v for v in values if f"{col}_{v}" in position]
+            self._category_index[col] = (
+                pd.Index(present),
+                np.array([position[f"{col}_{v}"] for v in present], dtype=np.intp),
+            )
+        self._numeric_positions = np.array([idx for _, idx in self._numeric_index], dtype=np.intp)
+
+    # ── pickle（インデックスは復元時に作り直す）────────────
+    def __getstate__(self):
+        return {"numeric": self.numeric, "categories": self.categories, "columns": self.columns}
+
+    def __setstate__(self, state):
+        self.numeric = state["numeric"]
+        self.categories = state["categories"]
+        self.columns = state["columns"]
+        self._build_index()
+
+    # ── 構築 ─────────────────────────────────────────────
+    @classmethod
+    def fit(
+        cls,
+        df: pd.DataFrame,
+        numeric: Sequence[str],
+        categorical: Sequence[str],
+        drop_first: bool = False,
+    ) -> "FeatureEncoder":
+        """学習データから列配置を決める。列の並びは pd.get_dummies と同じ（数値列 → カテゴリ列）。"""
+        categories: Dict[str, List[str]] = {}
+        columns = list(numeric)
+        for col in categorical:
+            values = sorted(df[col].dropna().unique().tolist())
+            values = [str(v) for v in (values[1:] if drop_first else values)]
+            categories[col] = values
+            columns.extend(f"{col}_{v}" for v in values)
+        return cls(numeric, categories, columns)
+
+    @classmethod
+    def from_columns(
+        cls,
+        columns: Sequence[str],
+        numeric: Sequence[str],
+        categorical: Sequence[str],
+    ) -> "FeatureEncoder":
+        """get_dummies で作った既存の encoded_columns からエンコーダを復元する。
+
+        どれにも当てはまらない列は常に 0（従来の 0 埋めと同じ）。
+        """
+        numeric_set = set(numeric)
+        # 長い列名から照合する（"count" と "count_situation" のような前方一致の取り違え防止）
+        prefixes = sorted(categorical, key=len, reverse=True)
+        categories: Dict[str, List[str]] = {col: [] for col in categorical}
+        for name in columns:
+            if name in numeric_set:
+                continue
+            for col in prefixes:
+                if name.startswith(f"{col}_"):
+                    categories[col].append(name[len(col) + 1:])
+                    break
+        return cls(numeric, categories, columns)
+
+    # ── 変換 ─────────────────────────────────────────────
+    def transform(self, df: pd.DataFrame, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """(行数, len(columns)) の float32 行列を返す。数値の欠損は NaN のまま。"""
+        n = len(df)
+        if out is None:
+            out = np.zeros((n, len(self.columns)), dtype=np.float32)
+        else:
+            out[:] = 0.0
+
+        for col, idx in self._numeric_index:
+            out[:, idx] = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=np.float32, na_value=np.nan)
+
+        rows = np.arange(n)
+        for col, (values, positions) in self._category_index.items():
+            if len(values) == 0:
+                continue
+            series = df[col]
+            if series.dtype != object:
+                series = series.astype(str)
+            codes = values.get_indexer(series)
+            hit = codes >= 0
+            out[rows[hit], positions[codes[hit]]] = 1.0
+        return out
+
+    def valid_rows(self, X: np.ndarray) -> np.ndarray:
+        """数値特徴量に欠損が無い行のマスク（dropna(subset=数値特徴量) に相当）。"""
+        if self._numeric_positions.size == 0:
+            return np.ones(X.shape[0], dtype=bool)
+        return ~np.isnan(X[:, self._numeric_positions]).any(axis=1)
+
+
+# ============================================================
+# 投球（statcast）用の特徴量
+# ============================================================
+
+# モデルごとの One-Hot 対象カテゴリ列
+PITCH_CATEGORICAL_COLUMNS = {
+    "stuff_plus": ["pitch_type"],
+    "pitching_plus": ["pitch_type"],
+    "pitching_plus_plus": ["pitch_type", "prev_pitch_type"],
+}
+
+# 同一打席内の前球から作る列（Pitching++ のトンネル特徴量）
+_PREV_NUMERIC_COLUMNS = ["release_pos_x", "release_pos_z", "release_speed", "pfx_z"]
+
+
+def pitch_categorical_columns(model_type: str) -> List[str]:
+    return PITCH_CATEGORICAL_COLUMNS.get(model_type, ["pitch_type"])
+
+
+def _add_prev_pitch_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """打席内で 1 球前の値を prev_* 列に入れる（SQL の LAG 相当）。打席最初の球は欠損。
+
+    前球: release_pos_x / release_pos_z / release_speed / pfx_z / pitch_type
+    """
+    order = np.lexsort((
+        df["pitch_number"].to_numpy(),
+        df["at_bat_number"].to_numpy(),
+        df["game_pk"].to_numpy(),
+    ))
+    df = df.iloc[order].copy()
+    game = df["game_pk"].to_numpy()
+    at_bat = df["at_bat_number"].to_numpy()
+    same_at_bat = np.zeros(len(df), dtype=bool)
+    same_at_bat[1:] = (game[1:] == game[:-1]) & (at_bat[1:] == at_bat[:-1])
+
+    first_of_at_bat = ~same_at_bat
+    for col in _PREV_NUMERIC_COLUMNS:
+        values = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+        prev = np.empty_like(values)
+        prev[0:1] = np.nan
+        prev[1:] = values[:-1]
+        prev[first_of_at_bat] = np.nan
+        df[f"prev_{col}"] = prev
+
+    pitch_type = df["pitch_type"].to_numpy(dtype=object)
+    prev_type = np.empty(len(pitch_type), dtype=object)
+    prev_type[1:] = pitch_type[:-1]
+    prev_type[first_of_at_bat] = None
+    df["prev_pitch_type"] = prev_type
+    return df
+
+
+def add_pitch_features(df: pd.DataFrame, model_type: str) -> pd.DataFrame:
+    """
+    statcast の投球行に派生特徴量を足す（学習スクリプト・推論・ドリフト監視で共通）
+      plate_z_norm: 打者ストライクゾーンで正規化した plate_z
+      Pitching++:   zone_distance / release_diff / speed_diff / prev_pfx_z / prev_pitch_type
+    prev_* 列が無ければ game_pk / at_bat_number / pitch_number から作る。
+    """
+    def col(name: str) -> np.ndarray:
+        return df[name].to_numpy(dtype=np.float64, na_value=np.nan)
+
+    sz_bot = col("sz_bot")
+    sz_range = col("sz_top") - sz_bot
+    with np.errstate(divide="ignore", invalid="ignore"):
+        plate_z_norm = np.where(sz_range > 0, (col("plate_z") - sz_bot) / sz_range, np.nan)
+    df = df.assign(plate_z_norm=plate_z_norm)
+
+    if model_type != "pitching_plus_plus":
+        return df
+
+    if "prev_release_pos_x" not in df.columns:
+        df = _add_prev_pitch_columns(df)
+
+    release_diff = np.sqrt(
+        (col("release_pos_x") - col("prev_release_pos_x")) ** 2
+        + (col("release_pos_z") - col("prev_release_pos_z")) ** 2
+    )
+    speed_diff = col("release_speed") - col("prev_release_speed")
+    prev_pfx_z = col("prev_pfx_z")
+
+    # 打席の最初の球（prev = NULL）はデフォルト値で埋める
+    df["zone_distance"] = np.sqrt(col("plate_x") ** 2 + (plate_z_norm - 0.5) ** 2)
+    df["release_diff"] = np.nan_to_num(release_diff, nan=0.0)   # トンネル無し
+    df["speed_diff"] = np.nan_to_num(speed_diff, nan=0.0)        # 球速変化なし
+    df["prev_pfx_z"] = np.where(np.isnan(prev_pfx_z), col("pfx_z"), prev_pfx_z)  # 自球の変化量
+    df["prev_pitch_type"] = df["prev_pitch_type"].fillna("NONE")  # 前球なし
+    return df
+
+
+@lru_cache(maxsize=32)
+def _encoder_from_columns(
+    columns: Tuple[str, ...], numeric: Tuple[str, ...], categorical: Tuple[str, ...]
+) -> FeatureEncoder:
+    return FeatureEncoder.from_columns(columns, numeric, categorical)
+
+
+def pitch_encoder(artifact: Dict, model_type: str) -> FeatureEncoder:
+    """アーティファクトのエンコーダ。encoder を持たない旧アーティファクトは encoded_columns から組み立てる。"""
+    encoder = artifact.get("encoder")
+    if encoder is not None:
+        return encoder
+    return _encoder_from_columns(
+        tuple(artifact["encoded_columns"]),
+        tuple(artifact["features"]),
+        tuple(pitch_categorical_columns(model_type)),
+    )
+
+
+def encode_pitches(
+    df: pd.DataFrame, artifact: Dict, model_type: str, target: str = "delta_pitcher_run_exp"
+) -> Tuple[pd.DataFrame, np.ndarray]:
+    """
+    派生特徴量の追加 → エンコード → 欠損行の除外までをまとめて行う
+    Returns:
+        (有効な投球行, それに対応する float32 特徴量行列)
+    """
+    df = add_pitch_features(df, model_type)
+    encoder = pitch_encoder(artifact, model_type)
+    X = encoder.transform(df)
+    valid = encoder.valid_rows(X) & df[target].notna().to_numpy()
+    if valid.all():
+        return df, X
+    return df.loc[valid], X[valid]
@@ -5,6 +5,11 @@ docs/knowledge/*.md 由来の用語集チャンクを BigQuery 上でセマン
 サーバレス・Pay-as-you-go: 検索 1 回につき Vertex AI の埋め込み API を 1 コールのみ。
 
 設計:
+  - 埋め込みテーブルは起動時にメモリへ読み込み（GlossaryVectorIndex）、
+    GLOSSARY_INDEX_POLL_SEC ごとに行数・最終取り込み時刻を見て変わっていれば読み直す。
+    検索はローカルの行列演算で行い、クエリ埋め込みだけを ML.GENERATE_EMBEDDING で取る
+    （同じ文面の埋め込みは embedding_cache で共有する）。
+  - インデックス未ロード時・クエリ埋め込み失敗時は、従来どおり BQ の ML.DISTANCE で検索する。
   - VECTOR_SEARCH ではなく ML.DISTANCE を使う。
     VECTOR_SEARCH は第 1 引数がテーブル固定でサブクエリを取れず、
     category による事前フィルタができないため（打者の質問に投手チャンクが
@@ -15,11 +20,15 @@ docs/knowledge/*.md 由来の用語集チャンクを BigQuery 上でセマン
 """
 from __future__ import annotations
 
+import asyncio
 import os
+import threading
 from typing import Optional
 
-from google.cloud import bigquery
-
+from backend.app.services.bigquery_service import run_query_sync
+from backend.app.services.bq_embedding_service import embedding_namespace, generate_embeddings
+from backend.app.services.embedding_cache import get_embedding_cache
+from backend.app.services.glossary_vector_index import GlossaryVectorIndex
 from backend.app.utils.structured_logger import get_logger
 
 logger = get_logger("glossary-rag")
@@ -51,22 +60,19 @@ EXCLUDED_CATEGORIES = ("rules",)
 
 DEFAULT_RERANK_CANDIDATES = 10   # リランク時に取得する候補数
 
+GLOSSARY_INDEX_POLL_SEC = float(os.getenv("GLOSSARY_INDEX_POLL_SEC", "600"))
+GLOSSARY_INDEX_ENABLED = os.getenv("GLOSSARY_INDEX_ENABLED", "true").lower() == "true"
+# 文書側 'RETRIEVAL_DOCUMENT' と対になるクエリ側の task_type
+QUERY_TASK_TYPE = "RETRIEVAL_QUERY"
+
 
 class GlossaryRAGService:
     """用語集チャンクのセマンティック検索"""
 
     def __init__(self) -> None:
-        self._client: Optional[bigquery.Client] = None
-    
-    @property
-    def client(self) -> Optional[bigquery.Client]:
-        if self._client is None:
-            try:
-                self._client = bigquery.Client(project=PROJECT_ID)
-            except Exception as e:
-                logger.warning(f"BigQuery client init failed: {e}")
-                return None
-        return self._client
+        self._index: Optional[GlossaryVectorIndex] = None
+        self._index_lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
     
     def search(
         self,
@@ -90,7 +96,7 @@ class GlossaryRAGService:
             [{"section", "source", "category", "chunk_text", "distance"}, ...]
             距離の昇順。該当なし・失敗時は空リスト（fail-open）。
         """
-        if not self.client or not query_text or not query_text.strip():
+        if not query_text or not query_text.strip():
             return []
 
         # 未知の category はフィルタなしに倒す（誤った値で 0 件になるより良い）
@@ -102,6 +108,51 @@ class GlossaryRAGService:
         # リランクする場合は候補を広めに取る。並べ直す材料がないと意味がないため。
         fetch_k = max(top_k, DEFAULT_RERANK_CANDIDATES) if rerank else top_k
 
+        rows = self._search_local(query_text, fetch_k, category)
+        if rows is None:
+            rows = self._search_bq(query_text, fetch_k, category)
+        
+        if not rows:
+            return []
+        
+        # 閾値は SQL ではなく Python 側で適用する。
+        # 「何位まで惜しかったか」をログに残せるようにするため（Phase C の材料）。
+        logger.info(
+            f"glossary search: q='{query_text[:40]}' category={category} "
+            f"top_distance={rows[0]['distance']:.4f} hits={len(rows)}"
+        )
+
+        hits = [r for r in rows if r["distance"] <= distance_threshold]
+
+        if not rerank or not hits:
+            return hits[:top_k]
+
+        # 閾値を適用した後にリランクする。
+        # 無関係な候補を LLM に読ませてもトークンを消費するだけのため。
+        # 循環 import を避けるため関数内で import する。
+        from backend.app.services.rerank_service import rerank_hits
+
+        return rerank_hits(query_text, hits, top_k=top_k)
+
+    # ----------------------------------------------------------------
+    # 検索の実体
+    # ----------------------------------------------------------------
+    def _search_local(
+        self, query_text: str, top_k: int, category: Optional[str]
+    ) -> Optional[list[dict]]:
+        """インメモリのインデックスで検索する。使えない場合は None（BQ 検索に倒す）。"""
+        index = self._index
+        if index is None:
+            return None
+        query_vector = self._embed_query(query_text)
+        if query_vector is None:
+            return None
+        return index.search(query_vector, top_k, category)
+
+    def _search_bq(
+        self, query_text: str, top_k: int, category: Optional[str]
+    ) -> list[dict]:
+        """BQ 上で ML.DISTANCE の全件計算で検索する（インデックス未ロード時のフォールバック）。"""
         sql = f"""
         WITH q AS (
           SELECT ml_generate_embedding_result AS qv
@@ -123,35 +174,21 @@ class GlossaryRAGService:
         ORDER BY distance ASC
         LIMIT @top_k
         """
-        job_config = bigquery.QueryJobConfig(
-            query_parameters=[
-                bigquery.ScalarQueryParameter("query_text", "STRING", query_text),
-                bigquery.ScalarQueryParameter("category", "STRING", category),
-                bigquery.ScalarQueryParameter("top_k", "INT64", fetch_k),
-                bigquery.ArrayQueryParameter(
-                    "excluded", "STRING", list(EXCLUDED_CATEGORIES)
-                ),
-            ]
-        )
+        params = [
+            ("query_text", "STRING", query_text),
+            ("category", "STRING", category),
+            ("top_k", "INT64", top_k),
+            ("excluded", "STRING", list(EXCLUDED_CATEGORIES)),
+        ]
 
         try:
-            rows = list(self.client.query(sql, job_config=job_config).result())
+            df = run_query_sync(sql, params)
         except Exception as e:
             # 検索の失敗は本来のレスポンスをブロックしない
             logger.error(f"glossary search failed: {e}")
             return []
-        
-        if not rows:
-            return []
-        
-        # 閾値は SQL ではなく Python 側で適用する。
-        # 「何位まで惜しかったか」をログに残せるようにするため（Phase C の材料）。
-        logger.info(
-            f"glossary search: q='{query_text[:40]}' category={category} "
-            f"top_distance={rows[0].distance:.4f} hits={len(rows)}"
-        )
 
-        hits = [
+        return [
             {
                 "section": r.section,
                 "source": r.source,
@@ -159,18 +196,81 @@ class GlossaryRAGService:
                 "chunk_text": r.chunk_text,
                 "distance": float(r.distance),
             }
-            for r in rows if r.distance <= distance_threshold
+            for r in df.itertuples(index=False)
         ]
 
-        if not rerank or not hits:
-            return hits[:top_k]
+    def _embed_query(self, query_text: str) -> Optional[list[float]]:
+        """クエリ埋め込み（RETRIEVAL_QUERY）を共有キャッシュ経由で返す。失敗時 None。"""
+        return get_embedding_cache().get(
+            embedding_namespace(QUERY_TASK_TYPE),
+            query_text,
+            lambda texts: generate_embeddings(texts, task_type=QUERY_TASK_TYPE),
+        )
 
-        # 閾値を適用した後にリランクする。
-        # 無関係な候補を LLM に読ませてもトークンを消費するだけのため。
-        # 循環 import を避けるため関数内で import する。
-        from backend.app.services.rerank_service import rerank_hits
+    # ----------------------------------------------------------------
+    # インデックスの読み込み・更新
+    # ----------------------------------------------------------------
+    def _table_signature(self) -> tuple:
+        """埋め込みテーブルの状態（行数・最終取り込み時刻）。取り込みのたびに変わる。"""
+        sql = f"""
+        SELECT COUNT(*) AS n, MAX(ingested_at) AS last_ingested
+        FROM `{EMBEDDINGS_TABLE}`
+        """
+        row = next(run_query_sync(sql, cache=False).itertuples(index=False))
+        return (row.n, row.last_ingested)
 
-        return rerank_hits(query_text, hits, top_k=top_k)
+    def refresh_index(self) -> bool:
+        """テーブルが変わっていればインデックスを作り直して差し替える。差し替えたら True。"""
+        with self._index_lock:
+            signature = self._table_signature()
+            current = self._index
+            if current is not None and current.signature == signature:
+                return False
+
+            sql = f"""
+            SELECT section, source, category, chunk_text, embedding
+            FROM `{EMBEDDINGS_TABLE}`
+            WHERE category NOT IN UNNEST(@excluded)
+            """
+            df = run_query_sync(sql, [("excluded", "STRING", list(EXCLUDED_CATEGORIES))], cache=False)
+            rows = [
+                {
+                    "section": r.section,
+                    "source": r.source,
+                    "category": r.category,
+                    "chunk_text": r.chunk_text,
+                    "embedding": list(r.embedding),
+                }
+                for r in df.itertuples(index=False)
+            ]
+            # 参照の差し替え 1 回で入れ替える（検索中の読み手は旧インデックスを使い切る）
+            self._index = GlossaryVectorIndex(rows, signature=signature)
+        logger.info(f"glossary index loaded: {len(rows)} chunks (signature={signature})")
+        return True
+
+    def start(self) -> None:
+        """lifespan 起動時に呼ぶ。インデックスを読み込み、以後 GLOSSARY_INDEX_POLL_SEC ごとに変更を確認する。"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._poll_loop())
+
+    async def _poll_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self.refresh_index)
+            except Exception as e:
+                # 読み込めなくても BQ 検索で動き続ける
+                logger.warning(f"glossary index refresh failed: {e}")
+            await asyncio.sleep(GLOSSARY_INDEX_POLL_SEC)
+
+    async def stop(self) -> None:
+        """lifespan 終了時に呼ぶ。"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
 
 
 # Singleton
@@ -182,3 +282,8 @@ def get_glossary_rag_service() -> GlossaryRAGService:
     if _glossary_service is None:
         _glossary_service = GlossaryRAGService()
     return _glossary_service
+
+
+async def stop_glossary_rag_service() -> None:
+    if _glossary_service is not None:
+        await _glossary_service.stop()
@@ -0,0 +1,66 @@
+"""
+用語集埋め込みのインメモリ・ベクトルインデックス。
+
+glossary_embeddings は数百〜千行程度しかないため、HNSW のような近似索引は使わず、
+L2 正規化した float32 行列 1 枚に対する内積（= コサイン類似度）の全件計算で足りる。
+1 クエリあたり行列・ベクトル積 1 回 + argpartition で、BigQuery の ML.DISTANCE 全件スキャン
+（1 ジョブ数秒）を置き換える。距離は ML.DISTANCE(..., 'COSINE') と同じ 1 - cos。
+"""
+from __future__ import annotations
+
+from typing import Optional, Sequence
+
+import numpy as np
+
+
+class GlossaryVectorIndex:
+    """用語集チャンクの埋め込み行列とメタデータ。構築後は読み取り専用（スレッド間で共有してよい）。"""
+
+    def __init__(self, rows: Sequence[dict], signature: Optional[tuple] = None):
+        """
+        Args:
+            rows: [{"section", "source", "category", "chunk_text", "embedding"}, ...]
+            signature: 構築元テーブルの状態（変更検知用。行数・最終取り込み時刻など）
+        """
+        self.signature = signature
+        self.rows = [
+            {k: r[k] for k in ("section", "source", "category", "chunk_text")}
+            for r in rows
+        ]
+        self.categories = np.array([r["category"] for r in rows], dtype=object)
+        if rows:
+            matrix = np.asarray([r["embedding"] for r in rows], dtype=np.float32)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            self.matrix = matrix / norms
+        else:
+            self.matrix = np.empty((0, 0), dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def search(
+        self,
+        query_vector: Sequence[float],
+        top_k: int,
+        category: Optional[str] = None,
+    ) -> list[dict]:
+        """コサイン距離の昇順に最大 top_k 件を返す（各行に "distance" を付ける）。"""
+        if not self.rows or top_k <= 0:
+            return []
+        q = np.asarray(query_vector, dtype=np.float32)
+        norm = float(np.linalg.norm(q))
+        if q.shape[0] != self.matrix.shape[1] or norm == 0.0:
+            return []
+
+        distances = 1.0 - self.matrix @ (q / norm)
+        if category is not None:
+            distances = np.where(self.categories == category, distances, np.inf)
+
+        k = min(top_k, len(distances))
+        candidates = np.argpartition(distances, k - 1)[:k]
+        order = candidates[np.argsort(distances[candidates], kind="stable")]
+        return [
+            {**self.rows[i], "distance": float(distances[i])}
+            for i in order if np.isfinite(distances[i])
+        ]
@@ -7,8 +7,9 @@ from typing import Optional, List, Dict, Any
 from google.cloud import bigquery
 from google.cloud.exceptions import GoogleCloudError
 
+from backend.app.services.bigquery_service import run_query_sync
 from backend.app.services.base import (
-    client, logger,
+    logger,
     PROJECT_ID, DATASET_ID,
     BATTER_PERFORMANCE_FLAGS_7DAYS_TABLE_ID,
     BATTER_PERFORMANCE_FLAGS_15DAYS_TABLE_ID,
@@ -152,11 +153,9 @@ def get_hot_slump_batters(
         LIMIT {top_n}
     """
 
-    job_config = bigquery.QueryJobConfig(query_parameters=params)
-
     try:
-        hot_df = client.query(hot_query, job_config=job_config).to_dataframe()
-        slump_df = client.query(slump_query, job_config=job_config).to_dataframe()
+        hot_df = run_query_sync(hot_query, params)
+        slump_df = run_query_sync(slump_query, params)
 
         hot_list = _rows_to_list(hot_df)
         slump_list = _rows_to_list(slump_df)
@@ -197,7 +196,7 @@ def get_available_dates(period: int = 7) -> Optional[List[str]]:
         LIMIT 30
     """
     try:
-        df = client.query(query).to_dataframe()
+        df = run_query_sync(query)
         if df.empty:
             return []
         return [str(d) for d in df['game_date'].tolist()]
@@ -0,0 +1,186 @@
+"""
+モデル推論のマイクロバッチ実行器（プロセス共有）。
+
+whiff 予測（LightGBM）と Stuff+ のその場推論（XGBoost）は、リクエストごとに
+model.predict を呼んでいた（whiff はイベントループ上で直接）。ここではモデル種別ごとに
+キュー + 専用ワーカースレッドを 1 本持ち、
+
+  - 最初の要求が来てから INFERENCE_BATCH_WINDOW_MS だけ後続の要求を待ち、
+  - 同じモデルオブジェクト宛ての特徴量行列を縦に連結して predict を 1 回だけ呼び、
+  - 結果を要求ごとの行範囲に切り分けて各 Future に返す。
+
+行数が INFERENCE_BATCH_MAX_ROWS に達したら窓を待たずに実行する。
+モデルの hot-swap 中は新旧のモデルが同じ窓に混ざりうるので、モデルオブジェクトごとに分けて呼ぶ。
+呼び出し側は await するだけで、推論中もイベントループは塞がない。
+"""
+import asyncio
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+INFERENCE_BATCH_WINDOW_MS = float(os.getenv("INFERENCE_BATCH_WINDOW_MS", "3"))
+INFERENCE_BATCH_MAX_ROWS = int(os.getenv("INFERENCE_BATCH_MAX_ROWS", "50000"))
+INFERENCE_SHUTDOWN_TIMEOUT_SEC = float(os.getenv("INFERENCE_SHUTDOWN_TIMEOUT_SEC", "5"))
+
+# キュー要素: (モデル, 特徴量行列, 結果を返す Future, その Future のイベントループ)
+_Item = Tuple[Any, np.ndarray, asyncio.Future, asyncio.AbstractEventLoop]
+
+
+class InferenceBatcher:
+    """同時に届いた推論要求をまとめて 1 回の predict で処理するワーカー。"""
+
+    def __init__(
+        self,
+        name: str,
+        window_ms: float = INFERENCE_BATCH_WINDOW_MS,
+        max_rows: int = INFERENCE_BATCH_MAX_ROWS,
+    ):
+        self.name = name
+        self.window = window_ms / 1000.0
+        self.max_rows = max_rows
+        self._queue: "queue.Queue[Optional[_Item]]" = queue.Queue()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {"requests": 0, "batches": 0, "rows": 0, "failed": 0}
+
+    # ── 投入側 ───────────────────────────────────────────
+    async def predict(self, model: Any, X: np.ndarray) -> np.ndarray:
+        """model.predict(X) と同じ結果を返す。実際の predict はワーカースレッドでまとめて行う。"""
+        if len(X) == 0:
+            return np.empty(0, dtype=np.float32)
+        if self._stop.is_set():
+            raise RuntimeError(f"InferenceBatcher '{self.name}' is shut down")
+        self._ensure_started()
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.put((model, X, future, loop))
+        return await future
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name=f"inference-{self.name}", daemon=True
+                )
+                self._thread.start()
+
+    # ── ワーカー ─────────────────────────────────────────
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch: List[_Item] = [item]
+            rows = len(item[1])
+            # 最初の要求から window だけ後続を待つ（行数上限に達したら即実行）
+            deadline = time.monotonic() + self.window
+            stopping = False
+            while rows < self.max_rows:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    nxt = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if nxt is None:
+                    stopping = True
+                    break
+                batch.append(nxt)
+                rows += len(nxt[1])
+            self._flush(batch)
+            if stopping:
+                return
+
+    def _flush(self, batch: List[_Item]) -> None:
+        """モデルオブジェクトごとに行列を連結して predict し、要求ごとに切り分けて返す。"""
+        groups: Dict[int, Tuple[Any, List[_Item]]] = {}
+        for item in batch:
+            groups.setdefault(id(item[0]), (item[0], []))[1].append(item)
+
+        for model, items in groups.values():
+            try:
+                if len(items) == 1:
+                    outputs = [np.asarray(model.predict(items[0][1]))]
+                else:
+                    predicted = np.asarray(model.predict(np.concatenate([x for _, x, _, _ in items])))
+                    offsets = np.cumsum([len(x) for _, x, _, _ in items])[:-1]
+                    outputs = np.split(predicted, offsets)
+            except Exception as e:
+                logger.error(f"Batched inference failed ({self.name}, {len(items)} requests): {e}")
+                self._count(failed=len(items))
+                for _, _, future, loop in items:
+                    loop.call_soon_threadsafe(_set_exception, future, e)
+                continue
+
+            self._count(requests=len(items), batches=1, rows=sum(len(x) for _, x, _, _ in items))
+            for (_, _, future, loop), output in zip(items, outputs):
+                loop.call_soon_threadsafe(_set_result, future, output)
+
+    # ── 停止・統計 ───────────────────────────────────────
+    def shutdown(self, timeout: float = INFERENCE_SHUTDOWN_TIMEOUT_SEC) -> None:
+        """キューに残った要求を処理してからワーカーを止める。"""
+        self._stop.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            self._queue.put(None)
+            thread.join(timeout)
+            if thread.is_alive():
+                logger.warning(f"InferenceBatcher '{self.name}' did not stop within {timeout}s")
+
+    def _count(self, **deltas: int) -> None:
+        with self._stats_lock:
+            for event, n in deltas.items():
+                self._stats[event] += n
+
+    def stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return dict(self._stats)
+
+
+def _set_result(future: asyncio.Future, value: np.ndarray) -> None:
+    # 呼び出し側がキャンセル済みなら捨てる
+    if not future.done():
+        future.set_result(value)
+
+
+def _set_exception(future: asyncio.Future, exc: Exception) -> None:
+    if not future.done():
+        future.set_exception(exc)
+
+
+_batchers: Dict[str, InferenceBatcher] = {}
+_batchers_lock = threading.Lock()
+
+
+def get_inference_batcher(name: str) -> InferenceBatcher:
+    """モデル種別ごとの共有 InferenceBatcher を返す（シングルトン）。"""
+    batcher = _batchers.get(name)
+    if batcher is None:
+        with _batchers_lock:
+            batcher = _batchers.get(name)
+            if batcher is None:
+                batcher = InferenceBatcher(name)
+                _batchers[name] = batcher
+    return batcher
+
+
+def shutdown_inference_batchers() -> None:
+    """lifespan 終了時に呼ぶ。作成済みのワーカーをすべて止める。"""
+    with _batchers_lock:
+        batchers = list(_batchers.values())
+        _batchers.clear()
+    for batcher in batchers:
+        batcher.shutdown()
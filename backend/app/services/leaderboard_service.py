@@ -1,14 +1,16 @@
 """
 Leaderboard service for fetching player and team statistics for various leaderboards.
 """
+from functools import partial
 from typing import Optional, List, Dict, Any
 from google.cloud import bigquery
 from google.cloud.exceptions import GoogleCloudError
-from functools import lru_cache
 import pandas as pd
 from backend.app.api.schemas import * # For Development, add backend. path
+from .bigquery_service import run_query_sync
+from .leaderboard_snapshot import SeasonSnapshot, SnapshotSpec, get_leaderboard_snapshot_store
 from .base import (
-    get_bq_client, client, logger,
+    logger,
     PROJECT_ID, DATASET_ID,
     BATTING_STATS_TABLE_ID,
     PITCHING_STATS_TABLE_ID,
@@ -20,41 +22,62 @@ from .base import (
 )
 
 
-@lru_cache(maxsize=128)
-def get_batting_leaderboard(season: int, league: str, min_pa: int, metric_order: str) -> Optional[List[PlayerBattingSeasonStats]]:
+# ── シーズンスナップショットの定義 ────────────────────────────────────────────
+# 並べ替え可能な指標 → True なら降順。従来の CASE @metric_order と同じ組み合わせ。
+_BATTING_FACT_SPEC = SnapshotSpec(
+    threshold_column="pa",
+    id_column="idfg",
+    metrics={m: True for m in (
+        "avg", "obp", "slg", "ops", "wrcplus", "woba", "war", "hr", "rbi", "h", "r", "iso",
+        "sb", "bb", "so", "hardhitpct", "barrelpct", "batting_average_at_risp",
+        "slugging_percentage_at_risp", "home_runs_at_risp",
+    )},
+    default_metric="ops",
+)
+_BATTING_MART_SPEC = SnapshotSpec(
+    threshold_column="pa",
+    id_column="mlbid",
+    metrics={m: True for m in (
+        "avg", "obp", "slg", "ops", "wrcplus", "woba", "hr", "rbi", "h", "r", "bb", "so",
+        "hardhitpct", "barrelpct", "batting_average_at_risp",
+    )},
+    default_metric="ops",
+)
+_PITCHING_FACT_SPEC = SnapshotSpec(
+    threshold_column="ip",
+    id_column="idfg",
+    metrics={
+        **{m: False for m in ("era", "whip", "fip", "bb_9", "hr_9", "avg", "barrelpct", "hardhitpct")},
+        **{m: True for m in ("w", "so", "k_9", "war", "ip", "k_bb", "sv", "l", "g", "gs")},
+    },
+    default_metric="era",
+)
+# mart にはリーグ列がないため NL/AL フィルタは不可。どのタブでも全選手を返す。
+_PITCHING_MART_SPEC = SnapshotSpec(
+    threshold_column="ip",
+    id_column="mlbid",
+    metrics={
+        **{m: False for m in ("era", "whip", "fip", "bb_9", "barrelpct", "hardhitpct")},
+        **{m: True for m in ("so", "k_9", "ip", "g", "gs")},
+    },
+    default_metric="era",
+    filter_league=False,
+)
+
+
+def _batting_snapshot_query(season: int) -> str:
     """
-    指定されたシーズン、リーグ、および最小打席数に基づいて、打撃リーダーボードを取得します。
+    打撃スナップショット用 SQL。シーズン全行をフィルタ・並べ替えなしで読む。
     2026年以降: mart_batter_season_stats を使用
     2025年以前: fact_batting_stats_with_risp を使用
     """
-    adjusted_min_pa = 280 if season == 2025 else min_pa
-
-    processed_league = league.lower()
-    if processed_league == 'mlb':
-        league_filtered_clause = "AND league IN ('al', 'nl')"
-    else:
-        league_filtered_clause = "AND league = @league"
-
-    league_params = (
-        [] if processed_league == 'mlb'
-        else [bigquery.ScalarQueryParameter("league", "STRING", processed_league)]
-    )
-
-    # ── 2026年以降: mart テーブル ──────────────────────────────────────────────
     if season >= 2026:
         _MART = f"`{PROJECT_ID}.{DATASET_ID}.{MART_BATTER_SEASON_STATS_TABLE_ID}`"
         _TEAMS = f"`{PROJECT_ID}.{DATASET_ID}.dim_teams`"
 
-        # mart はリーグ列を持たないため dim_teams と JOIN してフィルタ
+        # mart はリーグ列を持たないため dim_teams と JOIN して league_key を作る
         # dim_teams.league はフルネーム ("American League" / "National League")
-        if processed_league == 'mlb':
-            mart_league_clause = "AND LOWER(t.league) IN ('american league', 'national league')"
-        elif processed_league == 'al':
-            mart_league_clause = "AND LOWER(t.league) = 'american league'"
-        else:  # nl
-            mart_league_clause = "AND LOWER(t.league) = 'national league'"
-
-        mart_query = f"""
+        return f"""
             SELECT
                 m.batter                         AS mlbid,
                 CAST(NULL AS INT64)              AS idfg,
@@ -84,56 +107,17 @@ def get_batting_leaderboard(season: int, league: str, min_pa: int, metric_order:
                 m.barrelpct,
                 m.risp_avg                       AS batting_average_at_risp,
                 CAST(NULL AS FLOAT64)            AS slugging_percentage_at_risp,
-                CAST(NULL AS INT64)              AS home_runs_at_risp
+                CAST(NULL AS INT64)              AS home_runs_at_risp,
+                CASE LOWER(t.league)
+                    WHEN 'american league' THEN 'al'
+                    WHEN 'national league' THEN 'nl'
+                END                              AS league_key
             FROM {_MART} m
             LEFT JOIN {_TEAMS} t ON m.team = t.abbreviation
             WHERE m.season = @season
-              AND m.pa >= @min_pa
-              {mart_league_clause}
-            ORDER BY
-                CASE @metric_order
-                    WHEN 'avg'                        THEN m.avg
-                    WHEN 'obp'                        THEN m.obp
-                    WHEN 'slg'                        THEN m.slg
-                    WHEN 'ops'                        THEN m.ops
-                    WHEN 'wrcplus'                    THEN m.wrc_plus
-                    WHEN 'woba'                       THEN m.woba
-                    WHEN 'hr'                         THEN m.hr
-                    WHEN 'rbi'                        THEN m.rbi
-                    WHEN 'h'                          THEN m.h
-                    WHEN 'r'                          THEN m.runs
-                    WHEN 'bb'                         THEN m.bb
-                    WHEN 'so'                         THEN m.so
-                    WHEN 'hardhitpct'                 THEN m.hardhitpct
-                    WHEN 'barrelpct'                  THEN m.barrelpct
-                    WHEN 'batting_average_at_risp'    THEN m.risp_avg
-                    ELSE m.ops
-                END DESC
         """
-        mart_params = [
-            bigquery.ScalarQueryParameter("season",       "INT64", season),
-            bigquery.ScalarQueryParameter("min_pa",       "INT64", adjusted_min_pa),
-            bigquery.ScalarQueryParameter("metric_order", "STRING", metric_order),
-        ]
-        mart_job_config = bigquery.QueryJobConfig(query_parameters=mart_params)
-        try:
-            df = client.query(mart_query, job_config=mart_job_config).to_dataframe()
-            if df.empty:
-                return []
-            results: List[PlayerBattingSeasonStats] = []
-            for _, row in df.iterrows():
-                row_dict = {k: (None if pd.isna(v) else v) for k, v in row.to_dict().items()}
-                results.append(PlayerBattingSeasonStats(**row_dict))
-            return results
-        except GoogleCloudError as e:
-            print(f"ERROR: mart batting leaderboard query failed for season {season}: {e}")
-            return None
-        except Exception as e:
-            print(f"ERROR: mart batting leaderboard unexpected error for season {season}: {e}")
-            return None
-
-    # ── 2025年以前: fact テーブル ─────────────────────────────────────────────
-    query = f"""
+
+    return f"""
         SELECT
             idfg,
             mlbid,
@@ -163,58 +147,50 @@ def get_batting_leaderboard(season: int, league: str, min_pa: int, metric_order:
             barrelpct,
             batting_average_at_risp,
             slugging_percentage_at_risp,
-            home_runs_at_risp
+            home_runs_at_risp,
+            LOWER(TRIM(league)) AS league_key
         FROM
             `{PROJECT_ID}.{DATASET_ID}.{BATTING_STATS_TABLE_ID}`
         WHERE
             season = @season
-            AND pa >= @min_pa
-            {league_filtered_clause}
-        ORDER BY
-            CASE @metric_order
-                WHEN 'avg'                        THEN avg
-                WHEN 'obp'                        THEN obp
-                WHEN 'slg'                        THEN slg
-                WHEN 'ops'                        THEN ops
-                WHEN 'wrcplus'                    THEN wrcplus
-                WHEN 'woba'                       THEN woba
-                WHEN 'war'                        THEN war
-                WHEN 'hr'                         THEN hr
-                WHEN 'rbi'                        THEN rbi
-                WHEN 'h'                          THEN h
-                WHEN 'r'                          THEN r
-                WHEN 'iso'                        THEN iso
-                WHEN 'sb'                         THEN sb
-                WHEN 'bb'                         THEN bb
-                WHEN 'so'                         THEN so
-                WHEN 'hardhitpct'                 THEN hardhitpct
-                WHEN 'barrelpct'                  THEN barrelpct
-                WHEN 'batting_average_at_risp'    THEN batting_average_at_risp
-                WHEN 'slugging_percentage_at_risp' THEN slugging_percentage_at_risp
-                WHEN 'home_runs_at_risp'          THEN home_runs_at_risp
-                ELSE ops
-            END DESC
     """
-    job_config = bigquery.QueryJobConfig(
-        query_parameters=[
-            bigquery.ScalarQueryParameter("season",       "INT64", season),
-            *league_params,
-            bigquery.ScalarQueryParameter("min_pa",       "INT64", adjusted_min_pa),
-            bigquery.ScalarQueryParameter("metric_order", "STRING", metric_order),
-        ]
+
+
+def _load_season_snapshot(table_type: str, season: int) -> SeasonSnapshot:
+    """BigQuery からシーズン全行を読み、SeasonSnapshot を作る。"""
+    if table_type == 'batting':
+        query = _batting_snapshot_query(season)
+        spec = _BATTING_MART_SPEC if season >= 2026 else _BATTING_FACT_SPEC
+        model_cls = PlayerBattingSeasonStats
+    else:
+        query = _pitching_snapshot_query(season)
+        spec = _PITCHING_MART_SPEC if season >= 2026 else _PITCHING_FACT_SPEC
+        model_cls = PlayerPitchingSeasonStats
+
+    # スナップショット自体がキャッシュなので、結果キャッシュには載せない
+    df = run_query_sync(
+        query, [bigquery.ScalarQueryParameter("season", "INT64", season)], cache=False
+    )
+    return SeasonSnapshot(df, spec, model_cls)
+
+
+def _season_snapshot(table_type: str, season: int) -> SeasonSnapshot:
+    return get_leaderboard_snapshot_store().get(
+        (table_type, season), partial(_load_season_snapshot, table_type, season)
     )
 
-    try:
-        df = client.query(query, job_config=job_config).to_dataframe()
-        if df.empty:
-            print(f"DEBUG: No batting leaderboard data found for season {season}, league {processed_league}, min_pa {adjusted_min_pa}")
-            return []
-        results: List[PlayerBattingSeasonStats] = []
-        for _, row in df.iterrows():
-            row_dict = {k: (None if pd.isna(v) else v) for k, v in row.to_dict().items()}
-            results.append(PlayerBattingSeasonStats(**row_dict))
-        return results
 
+def get_batting_leaderboard(season: int, league: str, min_pa: int, metric_order: str) -> Optional[List[PlayerBattingSeasonStats]]:
+    """
+    指定されたシーズン、リーグ、および最小打席数に基づいて、打撃リーダーボードを取得します。
+    BigQuery にはシーズン単位のスナップショット読み込み時だけアクセスし、
+    リーグ・最小打席数・並べ替えはスナップショット上で処理します。
+    """
+    adjusted_min_pa = 280 if season == 2025 else min_pa
+    processed_league = league.lower()
+
+    try:
+        snapshot = _season_snapshot('batting', season)
     except GoogleCloudError as e:
         print(f"ERROR: BigQuery query for batting leaderboard failed for season {season}, league {processed_league}, min_pa {adjusted_min_pa}: {e}")
         return None
@@ -222,6 +198,8 @@ def get_batting_leaderboard(season: int, league: str, min_pa: int, metric_order:
         print(f"ERROR: An unexpected error occurred while fetching batting leaderboard for season {season}, league {processed_league}, min_pa {adjusted_min_pa}: {e}")
         return None
 
+    return snapshot.select(processed_league, adjusted_min_pa, metric_order)
+
 
 # @lru_cache(maxsize=128)
 # def get_batter_split_stats_leaderboard(season: int, league: str, min_pa: int, split_type: str) -> Optional[List[PlayerBattingSplitStats]]:
@@ -329,33 +307,16 @@ def get_batting_leaderboard(season: int, league: str, min_pa: int, metric_order:
 #         return None
 
 
-
-@lru_cache(maxsize=128)
-def get_pitching_leaderboard(season: int, league: str, min_ip: int, metric_order: str) -> Optional[List[PlayerPitchingSeasonStats]]:
+def _pitching_snapshot_query(season: int) -> str:
     """
-    指定されたシーズン、リーグ、および最小投球回数に基づいて、投球リーダーボードを取得します。
+    投球スナップショット用 SQL。シーズン全行をフィルタ・並べ替えなしで読む。
     2026年以降: mart_pitcher_season_stats を使用
     2025年以前: fact_pitching_stats_master を使用
     """
-    adjusted_min_ip = 75 if season == 2025 else min_ip
-
-    processed_league = league.lower()
-    if processed_league == 'mlb':
-        league_filtered_clause = "AND league IN ('al', 'nl')"
-    elif processed_league == 'al' or processed_league == 'nl':
-        league_filtered_clause = "AND league = @league"
-
-    league_params = (
-        [] if processed_league == 'mlb'
-        else [bigquery.ScalarQueryParameter("league", "STRING", processed_league)]
-    )
-
-    # ── 2026年以降: mart テーブル ──────────────────────────────────────────────
-    # mart にはリーグ列がないため NL/AL フィルタは不可。MLB タブは全選手を返す。
     if season >= 2026:
         _MART = f"`{PROJECT_ID}.{DATASET_ID}.{MART_PITCHER_SEASON_STATS_TABLE_ID}`"
 
-        mart_query = f"""
+        return f"""
             SELECT
                 pitcher                          AS mlbid,
                 CAST(NULL AS INT64)              AS idfg,
@@ -388,48 +349,9 @@ def get_pitching_leaderboard(season: int, league: str, min_ip: int, metric_order
                 hardhitpct
             FROM {_MART}
             WHERE season = @season
-              AND ip >= @min_ip
-            ORDER BY
-                CASE @metric_order
-                    WHEN 'era'        THEN -era
-                    WHEN 'whip'       THEN -whip
-                    WHEN 'fip'        THEN -fip
-                    WHEN 'bb_9'       THEN -bb_9
-                    WHEN 'barrelpct'  THEN -barrelpct
-                    WHEN 'hardhitpct' THEN -hardhitpct
-                    WHEN 'so'         THEN CAST(so AS FLOAT64)
-                    WHEN 'k_9'        THEN k_9
-                    WHEN 'ip'         THEN ip
-                    WHEN 'g'          THEN CAST(g  AS FLOAT64)
-                    WHEN 'gs'         THEN CAST(gs AS FLOAT64)
-                    ELSE -era
-                END DESC
         """
-        mart_params = [
-            bigquery.ScalarQueryParameter("season",       "INT64",   season),
-            bigquery.ScalarQueryParameter("min_ip",       "FLOAT64", float(adjusted_min_ip)),
-            bigquery.ScalarQueryParameter("metric_order", "STRING",  metric_order),
-        ]
-        mart_job_config = bigquery.QueryJobConfig(query_parameters=mart_params)
-        try:
-            df = client.query(mart_query, job_config=mart_job_config).to_dataframe()
-            if df.empty:
-                return []
-            results: List[PlayerPitchingSeasonStats] = []
-            for _, row in df.iterrows():
-                row_dict = {k: (None if pd.isna(v) else v) for k, v in row.to_dict().items()}
-                results.append(PlayerPitchingSeasonStats(**row_dict))
-            return results
-        except GoogleCloudError as e:
-            logger.error(f"mart pitching leaderboard BQ error for season {season}: {e}", exc_info=True)
-            return None
-        except Exception as e:
-            logger.error(f"mart pitching leaderboard error for season {season}: {e}", exc_info=True)
-            return None
-
-    # ── 2025年以前: fact テーブル ─────────────────────────────────────────────
-
-    query = f"""
+
+    return f"""
         SELECT
             idfg,
             mlbid,
@@ -459,79 +381,35 @@ def get_pitching_leaderboard(season: int, league: str, min_ip: int, metric_order
             hr_9,
             avg,
             barrelpct,
-            hardhitpct
+            hardhitpct,
+            LOWER(TRIM(league)) AS league_key
         FROM
             `{PROJECT_ID}.{DATASET_ID}.fact_pitching_stats_master`
         WHERE
             season = @season
-            AND ip >= @min_ip
-            {league_filtered_clause}
-        ORDER BY
-            CASE 
-                -- For ASC metrics (lower is better)
-                WHEN @metric_order IN ('era', 'whip', 'fip', 'bb_9', 'hr_9', 'avg', 'barrelpct', 'hardhitpct') THEN
-                    CASE @metric_order
-                        WHEN 'era' THEN era
-                        WHEN 'whip' THEN whip
-                        WHEN 'fip' THEN fip
-                        WHEN 'bb_9' THEN bb_9
-                        WHEN 'hr_9' THEN hr_9
-                        WHEN 'avg' THEN avg
-                        WHEN 'barrelpct' THEN barrelpct
-                        WHEN 'hardhitpct' THEN hardhitpct
-                        ELSE era
-                    END
-                -- For DESC metrics (higher is better), use negative values to reverse sort
-                ELSE
-                    -CASE @metric_order
-                        WHEN 'w' THEN w
-                        WHEN 'so' THEN so
-                        WHEN 'k_9' THEN k_9
-                        WHEN 'war' THEN war
-                        WHEN 'ip' THEN ip
-                        WHEN 'k_bb' THEN k_bb
-                        WHEN 'sv' THEN sv
-                        WHEN 'l' THEN l -- for losses, we want fewer (smaller values), so negative makes it work
-                        WHEN 'g' THEN g
-                        WHEN 'gs' THEN gs
-                        ELSE era -- default to era for unknown metrics
-                    END
-            END ASC
     """
 
-    job_config = bigquery.QueryJobConfig(
-        query_parameters=[
-            bigquery.ScalarQueryParameter("season",       "INT64", season),
-            *league_params,
-            bigquery.ScalarQueryParameter("min_ip",       "INT64", adjusted_min_ip),
-            bigquery.ScalarQueryParameter("metric_order", "STRING", metric_order),
-        ]
-    )
 
-    # # ★★★ デバッグログの追加 ★★★
-    # print(f"DEBUG: Executing BigQuery query for pitching leaderboard:")
-    # print(f"DEBUG: Query: {query}")
-    # print(f"DEBUG: Parameters: {job_config.query_parameters}")
-    # # ★★★ デバッグログの追加ここまで ★★★
+def get_pitching_leaderboard(season: int, league: str, min_ip: int, metric_order: str) -> Optional[List[PlayerPitchingSeasonStats]]:
+    """
+    指定されたシーズン、リーグ、および最小投球回数に基づいて、投球リーダーボードを取得します。
+    BigQuery にはシーズン単位のスナップショット読み込み時だけアクセスし、
+    リーグ・最小投球回・並べ替えはスナップショット上で処理します。
+    """
+    adjusted_min_ip = 75 if season == 2025 else min_ip
+    processed_league = league.lower()
 
     try:
-        df = client.query(query, job_config=job_config).to_dataframe()
-        if df.empty:
-            print(f"DEBUG: No pitching leaderboard data found for season {season}, league {processed_league}, min_ip {adjusted_min_ip}")
-            return []
-        
-        results: List[PlayerPitchingSeasonStats] = [] # PlayerPitchingSeasonStatsのリストとして初期化
-        for _, row in df.iterrows():
-            results.append(PlayerPitchingSeasonStats(**row.to_dict()))
-        return results
-
+        snapshot = _season_snapshot('pitching', season)
     except GoogleCloudError as e:
-        print(f"ERROR: BigQuery query for pitching leaderboard failed for season {season}, league {processed_league}, min_ip {adjusted_min_ip}: {e}")
+        logger.error(f"Pitching leaderboard BQ error for season {season}: {e}", exc_info=True)
         return None
     except Exception as e:
-        print(f"ERROR: An unexpected error occurred while fetching pitching leaderboard for season {season}, league {processed_league}, min_ip {adjusted_min_ip}: {e}")
+        logger.error(f"Pitching leaderboard error for season {season}: {e}", exc_info=True)
         return None
 
+    return snapshot.select(processed_league, adjusted_min_ip, metric_order)
+
 
 # # Service function to get team batting stats leaderboard
 # @lru_cache(maxsize=128)
@@ -726,7 +604,6 @@ def get_pitching_leaderboard(season: int, league: str, min_ip: int, metric_order
  
 
 # Funtion to get number of eligible players for ranking
-@lru_cache(maxsize=128)
 def get_total_eligible_players(
     season: int,
     league: Optional[str] = None, # 'al', 'nl', or 'mlb'
@@ -736,73 +613,24 @@ def get_total_eligible_players(
 ) -> int:
     """
     指定されたシーズン、リーグ、およびテーブルタイプに基づいて、ランキング対象の選手数を取得します。
+    リーダーボードと同じシーズンスナップショットから数えます。
     """
-    client = get_bq_client()
-
-    # Create league filter clause based on league input
-    processed_league = league.lower()
-    league_filter_clause = ""
-    if processed_league == 'mlb':
-        league_filter_clause = "AND TRIM(league) IN ('al', 'nl')"
-    elif processed_league == 'al' or processed_league == 'nl':
-        league_filter_clause = "AND TRIM(league) = @league"
-
-    # Create minimum threshold clause based on table type
     if table_type == 'batting':
-        if min_pa is None:
-            min_threshold_clause = f"AND pa >= @min_pa"
+        if min_pa is not None:
+            min_threshold = min_pa
         else: # set default minimum PA if not provided
-            if season <= 2024:
-                min_threshold_clause = "AND pa >= 350"
-            elif season == 2025:
-                min_threshold_clause = "AND pa >= 150" # TODO: Need to confirm this value for 2025 season
-        table_id = BATTING_STATS_TABLE_ID
+            min_threshold = 350 if season <= 2024 else 150 # TODO: Need to confirm this value for 2025 season
     elif table_type == 'pitching':
-        if min_ip is None:
-            min_threshold_clause = f"AND ip >= @min_ip"
+        if min_ip is not None:
+            min_threshold = min_ip
         else: # set default minimum IP if not provided
-            if season <= 2024:
-                min_threshold_clause = "AND ip >= 100"
-            elif season == 2025:
-                min_threshold_clause = "AND ip >= 50" # TODO: Need to confirm this value for 2025 season
-        table_id = PITCHING_STATS_TABLE_ID
+            min_threshold = 100 if season <= 2024 else 50 # TODO: Need to confirm this value for 2025 season
     else:
         logger.error(f"Invalid table_type: {table_type}. Must be 'batting' or 'pitching'.")
         return 0
-    
-    query = f"""
-        SELECT COUNT(DISTINCT idfg) as total_players
-        FROM `{PROJECT_ID}.{DATASET_ID}.{table_id}`
-        WHERE season = @season
-            {league_filter_clause}
-            {min_threshold_clause}
-    """
-
-    job_config = bigquery.QueryJobConfig(
-        query_parameters=[
-            bigquery.ScalarQueryParameter("season", "INT64", season),
-            *([] if processed_league == 'mlb' else [bigquery.ScalarQueryParameter("league", "STRING", processed_league)]),
-            *([] if min_pa is None else [bigquery.ScalarQueryParameter("min_pa", "INT64", min_pa)]),
-            *([] if min_ip is None else [bigquery.ScalarQueryParameter("min_ip", "INT64", min_ip)])
-        ]
-    )
-
-    # logger.debug(f"Executing BigQuery query for total eligible players: {query}")
-    # logger.debug(f"Parameters: {job_config.query_parameters}")
 
     try:
-        df = client.query(query, job_config=job_config).to_dataframe()
-
-        # # ★★★ デバッグログの追加 ★★★
-        # logger.debug(f"Total Eligible Players DataFrame fetched. Shape: {df.shape}")
-        # if not df.empty:
-        #     logger.debug(f"Total Eligible Players DataFrame head:\n{df.head().to_string()}")
-        # # ★★★ ここまで ★★★
-
-        if not df.empty and 'total_players' in df.columns:
-            return int(df['total_players'].iloc[0])
-        return 0
+        return _season_snapshot(table_type, season).count(league or 'mlb', min_threshold)
     except Exception as e:
         logger.error(f"Error fetching total eligible players for season {season}, league {league}, table {table_type}: {e}", exc_info=True)
         return 0
- 
\ No newline at end of file
@@ -0,0 +1,229 @@
+"""
+リーダーボード用のシーズン別スナップショット（プロセス共有）。
+
+get_batting_leaderboard / get_pitching_leaderboard は (season, league, min_pa, metric_order) の
+組み合わせごとに BigQuery ジョブを投げ、CASE @metric_order の ORDER BY をサーバー側で評価していた。
+並べ替え列を OPS → HR に変えるだけ、リーグを AL → NL に変えるだけでも、同じ数百行のシーズン表を
+読み直していた。ここではシーズン × 種別（打撃 / 投球）ごとに
+
+  - 全行をフィルタなしで 1 回だけ読み込み、レスポンス用の Pydantic モデルを作っておき、
+  - 閾値列（PA / IP）・リーグ・選手 ID を NumPy 配列で持ち、
+  - 並べ替え可能な指標ごとの argsort 順を事前計算しておく
+
+ことで、リーグ・最小 PA/IP・並べ替え・対象選手数をすべてプロセス内で返す。
+スナップショットは LEADERBOARD_SNAPSHOT_REFRESH_SEC ごとに裏で読み直し、読み終えた組への参照を
+差し替える（読み手が作り途中のものを見ることはない）。
+
+返すモデルは共有される。呼び出し側で書き換えないこと。
+ストアは SeasonSnapshot 以外にも、loaded_at と __len__ を持つ読み取り専用の表（Snapshot）を保持できる
+（advanced_score_table.ScoreLongTable もここに載せて同じポーラーで読み直す）。
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, List, Optional, Protocol, Tuple, Type
+
+import numpy as np
+import pandas as pd
+
+from backend.app.utils.columnar import to_records
+from backend.app.utils.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+LEADERBOARD_SNAPSHOT_REFRESH_SEC = float(os.getenv("LEADERBOARD_SNAPSHOT_REFRESH_SEC", "900"))
+# ポーラーが動いていない環境（スクリプト・テスト）でも、これより古ければ取得時に読み直す
+LEADERBOARD_SNAPSHOT_MAX_AGE_SEC = float(
+    os.getenv("LEADERBOARD_SNAPSHOT_MAX_AGE_SEC", str(LEADERBOARD_SNAPSHOT_REFRESH_SEC * 2))
+)
+
+LEAGUE_KEY_COLUMN = "league_key"  # 'al' / 'nl' / NULL。レスポンスには含めない
+
+
+@dataclass(frozen=True)
+class SnapshotSpec:
+    """スナップショットの並べ替え・フィルタ定義。"""
+
+    threshold_column: str          # 最小 PA / IP を比較する列
+    id_column: str                 # 対象選手数の重複排除に使う ID 列
+    metrics: Dict[str, bool]       # 並べ替え可能な指標 → True なら降順
+    default_metric: str            # 未知の metric_order のときの並べ替え
+    filter_league: bool = True     # False なら league 指定を無視する（リーグ情報を持たない mart）
+
+
+class SeasonSnapshot:
+    """1 シーズン分の行と、指標ごとの並び順。構築後は読み取り専用（スレッド間で共有してよい）。"""
+
+    def __init__(self, df: pd.DataFrame, spec: SnapshotSpec, model_cls: Type[Any]):
+        self.spec = spec
+        self.loaded_at = time.monotonic()
+        self.items = [
+            model_cls(**row)
+            for row in to_records(df.drop(columns=[LEAGUE_KEY_COLUMN], errors="ignore"))
+        ]
+
+        self._threshold = _numeric(df, spec.threshold_column)
+        if LEAGUE_KEY_COLUMN in df.columns:
+            self._league = df[LEAGUE_KEY_COLUMN].astype(object).where(
+                df[LEAGUE_KEY_COLUMN].notna(), None
+            ).to_numpy()
+        else:
+            self._league = np.full(len(df), None, dtype=object)
+        self._ids = df[spec.id_column].to_numpy() if spec.id_column in df.columns else np.arange(len(df))
+
+        # 降順・昇順とも NULL は末尾（安定ソートなので同値は読み込み順）
+        self._order: Dict[str, np.ndarray] = {}
+        for metric, descending in spec.metrics.items():
+            values = _numeric(df, metric)
+            self._order[metric] = np.argsort(-values if descending else values, kind="stable")
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def _mask(self, league: str, min_value: float) -> np.ndarray:
+        with np.errstate(invalid="ignore"):
+            mask = self._threshold >= min_value
+        league = (league or "mlb").lower()
+        if self.spec.filter_league:
+            if league == "mlb":
+                mask &= np.isin(self._league, ["al", "nl"])
+            else:
+                mask &= self._league == league
+        return mask
+
+    def select(self, league: str, min_value: float, metric_order: str) -> List[Any]:
+        """リーグ・最小閾値で絞り、metric_order の順に並べた行を返す。"""
+        mask = self._mask(league, min_value)
+        order = self._order.get(metric_order)
+        if order is None:
+            order = self._order[self.spec.default_metric]
+        return [self.items[i] for i in order[mask[order]]]
+
+    def count(self, league: str, min_value: float) -> int:
+        """リーグ・最小閾値を満たす選手数（ID の重複は 1 人）。"""
+        ids = pd.Series(self._ids[self._mask(league, min_value)])
+        return int(ids.nunique())
+
+
+def _numeric(df: pd.DataFrame, column: str) -> np.ndarray:
+    """列を float64 配列にする（NULL・列なしは NaN）。"""
+    if column not in df.columns:
+        return np.full(len(df), np.nan)
+    return pd.to_numeric(df[column], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+class Snapshot(Protocol):
+    """ストアに載せられる読み取り専用の表。"""
+
+    loaded_at: float
+
+    def __len__(self) -> int: ...
+
+
+_Loader = Callable[[], Snapshot]
+
+
+class LeaderboardSnapshotStore:
+    """キー（種別, シーズン）→ SeasonSnapshot などの Snapshot。初回は同期ロードし、以後は裏で定期的に読み直す。"""
+
+    def __init__(
+        self,
+        refresh_interval: float = LEADERBOARD_SNAPSHOT_REFRESH_SEC,
+        max_age: float = LEADERBOARD_SNAPSHOT_MAX_AGE_SEC,
+    ):
+        self.refresh_interval = refresh_interval
+        self.max_age = max_age
+        self._entries: Dict[Hashable, Tuple[Snapshot, _Loader]] = {}
+        self._lock = threading.Lock()
+        self._flight = SingleFlight(name="leaderboard_snapshot")
+        self._task: Optional[asyncio.Task] = None
+
+    def get(self, key: Hashable, loader: _Loader) -> Snapshot:
+        """スナップショットを返す。無い・古すぎる場合は loader で読み込む（同じキーの同時ロードは 1 回）。
+
+        読み込みに失敗したとき、古いスナップショットがあればそれを返し、無ければ例外をそのまま投げる。
+        """
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry[0].loaded_at < self.max_age:
+            return entry[0]
+        try:
+            return self._flight.do_sync(key, self._load, key, loader)
+        except Exception as e:
+            if entry is None:
+                raise
+            logger.warning(f"Leaderboard snapshot reload failed for {key}, serving stale: {e}")
+            return entry[0]
+
+    def _load(self, key: Hashable, loader: _Loader) -> Snapshot:
+        t0 = time.time()
+        snapshot = loader()
+        with self._lock:
+            self._entries[key] = (snapshot, loader)
+        logger.info(
+            f"Leaderboard snapshot loaded: {key} ({len(snapshot)} rows, {time.time() - t0:.2f}s)"
+        )
+        return snapshot
+
+    def refresh_stale(self) -> int:
+        """refresh_interval より古いスナップショットを読み直す。読み直した件数を返す。"""
+        now = time.monotonic()
+        with self._lock:
+            stale = [
+                (key, loader) for key, (snapshot, loader) in self._entries.items()
+                if now - snapshot.loaded_at >= self.refresh_interval
+            ]
+        refreshed = 0
+        for key, loader in stale:
+            try:
+                self._flight.do_sync(key, self._load, key, loader)
+                refreshed += 1
+            except Exception as e:
+                # 失敗しても古いスナップショットで応答を続ける
+                logger.warning(f"Leaderboard snapshot refresh failed for {key}: {e}")
+        return refreshed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def start(self) -> None:
+        """lifespan 起動時に呼ぶ。以後 refresh_interval ごとに読み込み済みのスナップショットを更新する。"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._poll_loop())
+
+    async def _poll_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await asyncio.to_thread(self.refresh_stale)
+            except Exception as e:
+                logger.warning(f"Leaderboard snapshot refresh loop error: {e}")
+
+    async def stop(self) -> None:
+        """lifespan 終了時に呼ぶ。"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+
+# Singleton
+_snapshot_store: Optional[LeaderboardSnapshotStore] = None
+
+
+def get_leaderboard_snapshot_store() -> LeaderboardSnapshotStore:
+    global _snapshot_store
+    if _snapshot_store is None:
+        _snapshot_store = LeaderboardSnapshotStore()
+    return _snapshot_store
+
+
+async def stop_leaderboard_snapshot_store() -> None:
+    if _snapshot_store is not None:
+        await _snapshot_store.stop()
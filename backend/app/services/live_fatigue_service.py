@@ -1,6 +1,6 @@
 from datetime import datetime
-from google.cloud import bigquery
 from backend.app.config.settings import get_settings
+from backend.app.services.bigquery_service import run_query_sync
 
 settings = get_settings()
 
@@ -15,9 +15,6 @@ def _to_bq_name(name: str) -> str:
 
 
 class LiveFatigueService:
-    def __init__(self):
-        self.client = bigquery.Client()
-
     def get_pitcher_baselines(self, pitcher_names: list[str], season: int = None) -> dict:
         if season is None:
             season = datetime.now().year
@@ -54,7 +51,7 @@ class LiveFatigueService:
         """
 
         try:
-            df = self.client.query(query).to_dataframe()
+            df = run_query_sync(query)
             result = {}
             for _, row in df.iterrows():
                 original_name = name_map.get(row["pitcher_name"])
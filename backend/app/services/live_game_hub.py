@@ -0,0 +1,184 @@
+"""
+ライブ試合状態のハブ（インスタンスごとに 1 つ）。
+
+/live/games/today をタブごとにポーリングすると、閲覧者数 × 試合数 の上流呼び出しになる。
+ハブはバックグラウンドの 1 本のポーラーで LiveGameService.get_today_live_games() を回し、
+gamePk をキーにした状態ストアを更新して、購読者（SSE）には前回からの差分だけを配る。
+
+  snapshot: 購読開始時（と取りこぼし後の再同期時）に送る全量
+  diff:     変化した試合（upsert）、Live でなくなった試合（removed）、
+            終了・予定試合の一覧（変わったときだけ final / preview）
+
+ポーラーは最初の購読で起動し、購読者がいない状態が LIVE_HUB_IDLE_STOP_SEC 続くと止まる。
+/live/games/today もハブのスナップショットを返すため、上流呼び出しは閲覧者数に依存しない。
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Any, AsyncGenerator, Dict, List, Optional, Set
+
+from backend.app.services.live_game_service import LiveGameService
+from backend.app.utils.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+LIVE_HUB_POLL_INTERVAL_SEC = float(os.getenv("LIVE_HUB_POLL_INTERVAL_SEC", "10"))
+LIVE_HUB_IDLE_STOP_SEC = float(os.getenv("LIVE_HUB_IDLE_STOP_SEC", "120"))
+LIVE_HUB_HEARTBEAT_SEC = float(os.getenv("LIVE_HUB_HEARTBEAT_SEC", "15"))
+# 購読者ごとの未送信イベント上限。溢れたら捨ててスナップショットで再同期する
+LIVE_HUB_SUBSCRIBER_QUEUE = int(os.getenv("LIVE_HUB_SUBSCRIBER_QUEUE", "32"))
+
+
+class LiveGameHub:
+    """ライブ試合状態ストアと SSE 購読者への配信を管理する。"""
+
+    def __init__(
+        self,
+        service: Optional[LiveGameService] = None,
+        poll_interval: float = LIVE_HUB_POLL_INTERVAL_SEC,
+        idle_stop: float = LIVE_HUB_IDLE_STOP_SEC,
+    ):
+        self.service = service or LiveGameService()
+        self.poll_interval = poll_interval
+        self.idle_stop = idle_stop
+        self._live: Dict[int, Dict[str, Any]] = {}
+        self._final: List[Dict[str, Any]] = []
+        self._preview: List[Dict[str, Any]] = []
+        self._version = 0
+        self._refreshed_at = 0.0
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._idle_since: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+        self._flight = SingleFlight(name="live_game_hub")
+
+    # ── 状態 ────────────────────────────────────────────
+    def snapshot(self) -> Dict[str, Any]:
+        """/live/games/today と同じ形の全量。"""
+        return {"live": list(self._live.values()), "final": self._final, "preview": self._preview}
+
+    def _snapshot_event(self) -> Dict[str, Any]:
+        return {"type": "snapshot", "version": self._version, **self.snapshot()}
+
+    async def get_snapshot(self) -> Dict[str, Any]:
+        """直近の取得が poll_interval 以内ならそれを返し、古ければ更新してから返す。"""
+        if time.monotonic() - self._refreshed_at >= self.poll_interval:
+            await self.refresh()
+        return self.snapshot()
+
+    async def refresh(self) -> None:
+        """上流から取り直して差分を配る。同時に呼ばれても上流へは 1 回だけ。"""
+        await self._flight.do("today", self._refresh)
+
+    async def _refresh(self) -> None:
+        result = await self.service.get_today_live_games()
+        self._apply(result)
+        self._refreshed_at = time.monotonic()
+
+    def _apply(self, result: Dict[str, Any]) -> None:
+        live = {g["gamePk"]: g for g in result.get("live", []) if g.get("gamePk") is not None}
+        upsert = [g for pk, g in live.items() if self._live.get(pk) != g]
+        removed = [pk for pk in self._live if pk not in live]
+        final = result.get("final", [])
+        preview = result.get("preview", [])
+
+        diff: Dict[str, Any] = {}
+        if upsert:
+            diff["upsert"] = upsert
+        if removed:
+            diff["removed"] = removed
+        if final != self._final:
+            diff["final"] = final
+        if preview != self._preview:
+            diff["preview"] = preview
+
+        self._live, self._final, self._preview = live, final, preview
+        if not diff:
+            return
+        self._version += 1
+        self._broadcast({"type": "diff", "version": self._version, **diff})
+
+    # ── 配信 ────────────────────────────────────────────
+    def _broadcast(self, event: Dict[str, Any]) -> None:
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # 取りこぼした購読者は溜まった差分を捨て、全量で再同期させる
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(self._snapshot_event())
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    async def subscribe(self, heartbeat: float = LIVE_HUB_HEARTBEAT_SEC) -> AsyncGenerator[Optional[Dict[str, Any]], None]:
+        """購読者 1 人分のイベント列。最初に snapshot、以降は diff を返す。
+
+        heartbeat 秒イベントが無ければ None を返す（呼び出し側で keep-alive を送る）。
+        """
+        if self._refreshed_at == 0.0:
+            await self.refresh()
+        # 登録からスナップショット送出までの間に await を挟まない（差分との取り違え防止）
+        queue: asyncio.Queue = asyncio.Queue(maxsize=LIVE_HUB_SUBSCRIBER_QUEUE)
+        self._subscribers.add(queue)
+        self._idle_since = None
+        self._ensure_poller()
+        try:
+            yield self._snapshot_event()
+            while True:
+                try:
+                    yield await asyncio.wait_for(queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            self._subscribers.discard(queue)
+            if not self._subscribers:
+                self._idle_since = time.monotonic()
+
+    # ── ポーラー ─────────────────────────────────────────
+    def _ensure_poller(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._poll_loop())
+
+    async def _poll_loop(self) -> None:
+        logger.info("Live game hub poller started")
+        try:
+            while True:
+                await asyncio.sleep(self.poll_interval)
+                if not self._subscribers and self._idle_since is not None \
+                        and time.monotonic() - self._idle_since >= self.idle_stop:
+                    break
+                try:
+                    await self.refresh()
+                except Exception as e:
+                    logger.warning(f"Live game hub refresh failed: {e}")
+        finally:
+            logger.info("Live game hub poller stopped")
+
+    async def stop(self) -> None:
+        """lifespan 終了時に呼ぶ。"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+
+_live_game_hub: Optional[LiveGameHub] = None
+
+
+def get_live_game_hub() -> LiveGameHub:
+    """共有 LiveGameHub を返す（シングルトン）。"""
+    global _live_game_hub
+    if _live_game_hub is None:
+        _live_game_hub = LiveGameHub()
+    return _live_game_hub
+
+
+async def stop_live_game_hub() -> None:
+    if _live_game_hub is not None:
+        await _live_game_hub.stop()
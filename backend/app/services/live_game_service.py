@@ -1,19 +1,18 @@
 import asyncio
 import logging
-import time
 from datetime import datetime
 from zoneinfo import ZoneInfo
 from typing import Dict, List, Optional, Tuple
 
-import httpx
+from backend.app.services.cache_service import TTLLRUCache
+from backend.app.services.mlb_stats_client import MLB_BASE, get_mlb_stats_client
 
 logger = logging.getLogger(__name__)
 
-MLB_BASE = "https://statsapi.mlb.com"
-
 
 class LiveGameService:
-    _team_stats_cache: Dict[int, Tuple[float, Dict]] = {}
+    # シーズン → チーム成績。endpoint と GameSummaryService の両インスタンスで共有するためクラス属性
+    _team_stats_cache = TTLLRUCache(max_entries=8)
     _TEAM_STATS_TTL_SEC = 600
 
     async def get_today_live_games(self) -> Dict:
@@ -45,10 +44,7 @@ class LiveGameService:
         """指定日のスケジュールから Live の gamePk リスト、Final、Preview のサマリーを返す"""
         url = f"{MLB_BASE}/api/v1/schedule"
         params = {"sportId": 1, "date": date, "hydrate": "linescore"}
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            resp = await client.get(url, params=params)
-            resp.raise_for_status()
-            data = resp.json()
+        data = await get_mlb_stats_client().get_json(url, params=params, timeout=10.0)
 
         jst = ZoneInfo("Asia/Tokyo")
         live_pks = []
@@ -107,10 +103,7 @@ class LiveGameService:
         mlb_date = (datetime.fromisoformat(date) - timedelta(days=1)).strftime("%Y-%m-%d")
         url = f"{MLB_BASE}/api/v1/schedule"
         params = {"sportId": 1, "date": mlb_date}
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            resp = await client.get(url, params=params)
-            resp.raise_for_status()
-            data = resp.json()
+        data = await get_mlb_stats_client().get_json(url, params=params, timeout=10.0)
 
         jst = ZoneInfo("Asia/Tokyo")
         games = []
@@ -154,10 +147,7 @@ class LiveGameService:
 
         url = f"{MLB_BASE}/api/v1/schedule"
         params = {"sportId": 1, "date": mlb_date, "hydrate": "linescore"}
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            resp = await client.get(url, params=params)
-            resp.raise_for_status()
-            data = resp.json()
+        data = await get_mlb_stats_client().get_json(url, params=params, timeout=10.0)
 
         final_pks = []
         walkoff_pks = set()
@@ -211,10 +201,7 @@ class LiveGameService:
     async def _fetch_boxscore_highlights(self, game_pk: int, is_walkoff: bool = False) -> List[Dict]:
         """単一試合のboxscoreからハイライト条件に合う記録を抽出する"""
         url = f"{MLB_BASE}/api/v1/game/{game_pk}/boxscore"
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            resp = await client.get(url)
-            resp.raise_for_status()
-            data = resp.json()
+        data = await get_mlb_stats_client().get_json(url, timeout=15.0)
 
         highlights = []
         teams = data.get("teams", {})
@@ -261,10 +248,8 @@ class LiveGameService:
         if is_walkoff:
             home_abbr = teams.get("home", {}).get("team", {}).get("abbreviation", "")
             try:
-                async with httpx.AsyncClient(timeout=10.0) as client:
-                    pbp_resp = await client.get(f"{MLB_BASE}/api/v1/game/{game_pk}/playByPlay")
-                    pbp_resp.raise_for_status()
-                    all_plays = pbp_resp.json().get("allPlays", [])
+                pbp = await get_mlb_stats_client().get_json(f"{MLB_BASE}/api/v1/game/{game_pk}/playByPlay")
+                all_plays = pbp.get("allPlays", [])
                 for play in reversed(all_plays):
                     if play.get("about", {}).get("isScoringPlay", False):
                         batter = play.get("matchup", {}).get("batter", {}).get("fullName", "")
@@ -279,11 +264,7 @@ class LiveGameService:
 
     async def get_boxscore(self, game_pk: int) -> Dict:
         """終了試合のボックススコア（投手・野手スタッツ + RISP/LOB）を返す"""
-        url = f"{MLB_BASE}/api/v1.1/game/{game_pk}/feed/live"
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            resp = await client.get(url)
-            resp.raise_for_status()
-            data = resp.json()
+        data = await get_mlb_stats_client().get_live_feed(game_pk, timeout=15.0)
 
         live_data = data.get("liveData", {})
         teams = live_data.get("boxscore", {}).get("teams", {})
@@ -392,11 +373,7 @@ class LiveGameService:
 
     async def _fetch_game_state(self, game_pk: int) -> Optional[Dict]:
         """単一試合のライブフィードから現在状態を整形して返す"""
-        url = f"{MLB_BASE}/api/v1.1/game/{game_pk}/feed/live"
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            resp = await client.get(url)
-            resp.raise_for_status()
-            data = resp.json()
+        data = await get_mlb_stats_client().get_live_feed(game_pk, timeout=15.0)
         game_data = data.get("gameData", {})
         live_data = data.get("liveData", {})
         # チーム情報
@@ -611,10 +588,7 @@ class LiveGameService:
             "standingsTypes": "regularSeason",
             "hydrate": "team,league,division,record(splits=[H,A,lastTen])",
         }
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            resp = await client.get(url, params=params)
-            resp.raise_for_status()
-            data = resp.json()
+        data = await get_mlb_stats_client().get_json(url, params=params, timeout=10.0)
 
         standings = []
         for record in data.get("records", []):
@@ -663,10 +637,9 @@ class LiveGameService:
         if season is None:
             season = date_cls.today().year
 
-        now = time.time()
         cached = self._team_stats_cache.get(season)
-        if cached and (now - cached[0]) < self._TEAM_STATS_TTL_SEC:
-            return cached[1]
+        if cached is not None:
+            return cached
 
         base = f"{MLB_BASE}/api/v1/teams/stats"
         common = {"season": season, "sportId": 1}
@@ -675,16 +648,13 @@ class LiveGameService:
         params_risp = {**common, "group": "hitting", "stats": "statSplits", "sitCodes": "risp"}
         params_bl = {**common, "group": "hitting", "stats": "statSplits", "sitCodes": "r123"}
 
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            responses = await asyncio.gather(
-                client.get(base, params=params_hit),
-                client.get(base, params=params_pit),
-                client.get(base, params=params_risp),
-                client.get(base, params=params_bl),
-            )
-        for r in responses:
-            r.raise_for_status()
-        hit_data, pit_data, risp_data, bl_data = [r.json() for r in responses]
+        mlb = get_mlb_stats_client()
+        hit_data, pit_data, risp_data, bl_data = await asyncio.gather(
+            mlb.get_json(base, params=params_hit, timeout=15.0),
+            mlb.get_json(base, params=params_pit, timeout=15.0),
+            mlb.get_json(base, params=params_risp, timeout=15.0),
+            mlb.get_json(base, params=params_bl, timeout=15.0),
+        )
 
         def _index_by_team(payload: Dict) -> Dict[int, Dict]:
             out: Dict[int, Dict] = {}
@@ -769,5 +739,5 @@ class LiveGameService:
             })
 
         result = {"season": season, "teams": teams_out}
-        self._team_stats_cache[season] = (now, result)
+        self._team_stats_cache.set(season, result, self._TEAM_STATS_TTL_SEC)
         return result
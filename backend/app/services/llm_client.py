@@ -5,10 +5,11 @@ AI処理を独立させることで、将来的にLLMを変更しやすくする
 """
 import json
 import logging
-import requests
 from typing import Optional, Dict, Any
 import pandas as pd
 
+from backend.app.services.llm_gateway_service import call_gemini
+
 logger = logging.getLogger(__name__)
 
 
@@ -26,13 +27,6 @@ class GeminiClient:
         
         self.api_key = api_key
         self.model = model
-        self.base_url = "https://generativelanguage.googleapis.com/v1beta/models"
-    
-    def _build_url(self) -> str:
-        """API URLを構築
-        Helper method to build the full API URL.
-        """
-        return f"{self.base_url}/{self.model}:generateContent?key={self.api_key}"
     
     def _make_request(
             self,
@@ -50,31 +44,14 @@ class GeminiClient:
         Returns:
             LLMからのレスポンステキスト（失敗時はNone）
         """
-        url = self._build_url()
-        headers = {"Content-Type": "application/json"}
-        payload = {
-            "contents": [{"parts": [{"text": prompt}]}],
-            "generationConfig": {"responseMimeType": response_mime_type}
-        }
+        # 通信とコスト記録は gateway に集約（接続プールも gateway 側で共有）
+        return call_gemini(
+            prompt=prompt,
+            model=self.model,
+            response_mime_type=response_mime_type,
+            feature="gemini_client",
+        )
 
-        try:
-            response = requests.post(url, headers=headers, data=json.dumps(payload))
-            response.raise_for_status()
-
-            result = response.json()
-            if result.get("candidates"):
-                return result["candidates"][0]["content"]["parts"][0]["text"]
-            
-            logger.warning("No candidates in Gemini response")
-            return None
-        
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Gemini API request failed: {e}", exc_info=True)
-            return None
-        except (KeyError, IndexError, json.JSONDecodeError) as e:
-            logger.error(f"Failed to parse Gemini response: {e}", exc_info=True)
-            return None
-    
     def parse_query(self, query: str, season: Optional[int] = None) -> Optional[Dict[str, Any]]:
         """
         自然言語クエリをパラメータに変換
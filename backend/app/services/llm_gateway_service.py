@@ -8,14 +8,16 @@ LLM Gateway Service
 - try-finally で成功/失敗・例外時も必ず log を書く
 - 戻り値は既存 _make_request と互換 (テキストまたは None)、Phase3 の機械的移行を担保
 - 例外は内部で握り、None を返す (既存 Caller の None 判定パターンを維持)
+- async ハンドラ向けに acall_gemini / acall_gemini_stream を用意。HTTP 接続は共有クライアントでプールする
 """
 
 import os
 import time
 import logging
 from pathlib import Path
-from typing import Callable, Dict, Optional
+from typing import AsyncIterator, Callable, Dict, List, Optional
 
+import httpx
 from dotenv import load_dotenv
 from google import genai
 from google.genai import types
@@ -30,6 +32,8 @@ load_dotenv(dotenv_path=_env_path)
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY_V2", "")
 DEFAULT_MODEL = "gemini-2.5-flash"
+DEFAULT_EMBEDDING_MODEL = os.getenv("GEMINI_EMBEDDING_MODEL", "gemini-embedding-001")
+DEFAULT_EMBEDDING_DIM = int(os.getenv("GEMINI_EMBEDDING_DIM", "768"))
 
 # ==================================
 # PRICING Map
@@ -71,22 +75,59 @@ def _calc_cost_usd(
 # ==================================
 # Lazy genai client
 # ==================================
+# 同期・非同期とも 1 つの genai.Client を共有し、HTTP 接続はプールして再利用する。
+# async 側は httpx の transport を明示する（aiohttp が入っていても httpx を使わせるため）。
+# 429 / 5xx の指数バックオフ + ジッター再試行は、副作用のない生成・埋め込み呼び出しにだけリクエスト単位で付ける
+# （ストリーミングはレスポンス開始前の失敗のみ）。caches.create() など共有クライアントを使う他の呼び出しは再試行しない。
+GEMINI_HTTP_MAX_CONNECTIONS = int(os.getenv("GEMINI_HTTP_MAX_CONNECTIONS", "200"))
+GEMINI_HTTP_MAX_KEEPALIVE = int(os.getenv("GEMINI_HTTP_MAX_KEEPALIVE", "50"))
+GEMINI_HTTP_RETRY_ATTEMPTS = int(os.getenv("GEMINI_HTTP_RETRY_ATTEMPTS", "3"))
+GEMINI_HTTP_RETRY_INITIAL_DELAY_SEC = float(os.getenv("GEMINI_HTTP_RETRY_INITIAL_DELAY_SEC", "0.5"))
+GEMINI_HTTP_RETRY_MAX_DELAY_SEC = float(os.getenv("GEMINI_HTTP_RETRY_MAX_DELAY_SEC", "8"))
+GEMINI_HTTP_RETRY_STATUS_CODES = [408, 429, 500, 502, 503, 504]
+
 _genai_client: Optional[genai.Client] = None
 
 
+def _build_http_options() -> types.HttpOptions:
+    limits = httpx.Limits(
+        max_connections=GEMINI_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=GEMINI_HTTP_MAX_KEEPALIVE,
+    )
+    return types.HttpOptions(
+        client_args={"limits": limits},
+        async_client_args={"transport": httpx.AsyncHTTPTransport(limits=limits)},
+    )
+
+
+def _build_retry_http_options() -> types.HttpOptions:
+    """読み取り系（generate_content / embed_content）の config に付ける再試行設定"""
+    return types.HttpOptions(
+        retry_options=types.HttpRetryOptions(
+            attempts=GEMINI_HTTP_RETRY_ATTEMPTS,
+            initial_delay=GEMINI_HTTP_RETRY_INITIAL_DELAY_SEC,
+            max_delay=GEMINI_HTTP_RETRY_MAX_DELAY_SEC,
+            exp_base=2,
+            jitter=1,
+            http_status_codes=GEMINI_HTTP_RETRY_STATUS_CODES,
+        ),
+    )
+
+
 def _get_genai_client() -> genai.Client:
     """genai SDK クライアントを lazy 初期化 (起動時に API key 未設定でも import を許容)"""
     global _genai_client
     if _genai_client is None:
         if not GEMINI_API_KEY:
             raise RuntimeError("GEMINI_API_KEY is not configured")
-        _genai_client = genai.Client(api_key=GEMINI_API_KEY)
+        _genai_client = genai.Client(api_key=GEMINI_API_KEY, http_options=_build_http_options())
     return _genai_client
 
 
 def get_genai_client() -> genai.Client:
     """Public accessor for the shared genai client.
     prompt_cache_service 等、gateway 外から caches.create() を呼ぶ用途で利用する。
+    ChatOrchestrator も接続プールを共有するためにこれを使う。
     """
     return _get_genai_client()
 
@@ -94,6 +135,95 @@ def get_genai_client() -> genai.Client:
 # ==================================
 # Gateway 本体
 # ==================================
+def _new_entry(
+    *,
+    model: str,
+    feature: Optional[str],
+    user_id: str,
+    endpoint: Optional[str],
+    request_id: Optional[str],
+    prompt_name: Optional[str],
+    prompt_version: Optional[str],
+    user_query: Optional[str],
+    resolved_query: Optional[str],
+) -> LLMLogEntry:
+    entry = LLMLogEntry()
+    # 明示引数は ContextVar auto-populate を上書きする (auto は __init__ 内)
+    if user_id:
+        entry.user_id = user_id
+    if endpoint is not None:
+        entry.endpoint = endpoint
+    if request_id is not None:
+        entry.request_id = request_id
+    entry.model = model
+    entry.feature = feature
+    entry.prompt_name = prompt_name
+    entry.prompt_version = prompt_version
+    entry.user_query = (user_query or "")[:500]
+    entry.resolved_query = resolved_query
+    return entry
+
+
+def _build_config(response_mime_type: str, cached_content_name: Optional[str]) -> types.GenerateContentConfig:
+    config_kwargs = {"response_mime_type": response_mime_type, "http_options": _build_retry_http_options()}
+    if cached_content_name:
+        config_kwargs["cached_content"] = cached_content_name
+    return types.GenerateContentConfig(**config_kwargs)
+
+
+def _record_usage(entry: LLMLogEntry, model: str, um) -> None:
+    """usage_metadata からトークン数とコストを entry に詰める"""
+    entry.input_tokens = (um.prompt_token_count if um else None) or 0
+    entry.output_tokens = (um.candidates_token_count if um else None) or 0
+    entry.cached_tokens = (
+        getattr(um, "cached_content_token_count", None) if um else None
+    )
+    entry.estimated_cost_usd = _calc_cost_usd(
+        model=model,
+        input_tokens=entry.input_tokens or 0,
+        output_tokens=entry.output_tokens or 0,
+        cached_tokens=entry.cached_tokens or 0,
+    )
+
+
+def _record_text(
+    entry: LLMLogEntry,
+    text: Optional[str],
+    post_response_hook: Optional[Callable[[str, LLMLogEntry], None]],
+) -> None:
+    if text is None:
+        entry.success = False
+        entry.error_type = "no_text"
+        entry.error_message = "SDK returned response with text=None"
+        logger.warning("Gemini SDK returned no text")
+        return
+    entry.success = True
+    entry.response_answer = text
+    # caller が derived field (parsed_*) を log entry に書き込めるフック。
+    # フック内例外は本処理に伝播させない (ロギングは best-effort)。
+    if post_response_hook is not None:
+        try:
+            post_response_hook(text, entry)
+        except Exception as e:
+            logger.warning(f"post_response_hook failed (suppressed): {e}")
+
+
+def _record_error(entry: LLMLogEntry, e: Exception) -> None:
+    entry.success = False
+    entry.error_type = type(e).__name__
+    entry.error_message = str(e)[:500]
+    logger.error(f"Gemini gateway call failed: {e}", exc_info=True)
+
+
+def _write_log(entry: LLMLogEntry, t0: float) -> None:
+    entry.llm_latency_ms = (time.time() - t0) * 1000.0
+    try:
+        get_llm_logger().log(entry)
+    except Exception as e:
+        # ロギング失敗はアプリ機能に影響させない
+        logger.error(f"Failed to log gateway entry: {e}")
+
+
 def call_gemini(
     prompt: str,
     *,
@@ -134,85 +264,173 @@ def call_gemini(
     Returns:
         生成テキスト、または失敗時 None (既存 _make_request と互換)
     """
-    entry = LLMLogEntry()
-    # 明示引数は ContextVar auto-populate を上書きする (auto は __init__ 内)
-    if user_id:
-        entry.user_id = user_id
-    if endpoint is not None:
-        entry.endpoint = endpoint
-    if request_id is not None:
-        entry.request_id = request_id
-    entry.model = model
-    entry.feature = feature
-    entry.prompt_name = prompt_name
-    entry.prompt_version = prompt_version
-    entry.user_query = (user_query or "")[:500]
-    entry.resolved_query = resolved_query
+    entry = _new_entry(
+        model=model, feature=feature, user_id=user_id, endpoint=endpoint,
+        request_id=request_id, prompt_name=prompt_name, prompt_version=prompt_version,
+        user_query=user_query, resolved_query=resolved_query,
+    )
 
     text: Optional[str] = None
     t0 = time.time()
     try:
         client = _get_genai_client()
-        config_kwargs = {"response_mime_type": response_mime_type}
-        if cached_content_name:
-            config_kwargs["cached_content"] = cached_content_name
-        config = types.GenerateContentConfig(**config_kwargs)
-
         response = client.models.generate_content(
             model=model,
             contents=prompt,
-            config=config,
+            config=_build_config(response_mime_type, cached_content_name),
         )
+        _record_usage(entry, model, response.usage_metadata)
+        text = response.text
+        _record_text(entry, text, post_response_hook)
+    except Exception as e:
+        _record_error(entry, e)
+        text = None
+    finally:
+        _write_log(entry, t0)
+
+    return text
 
-        # usage_metadata 抽出
-        um = response.usage_metadata
-        entry.input_tokens = (um.prompt_token_count if um else None) or 0
-        entry.output_tokens = (um.candidates_token_count if um else None) or 0
-        entry.cached_tokens = (
-            getattr(um, "cached_content_token_count", None) if um else None
+
+async def acall_gemini(
+    prompt: str,
+    *,
+    model: str = DEFAULT_MODEL,
+    response_mime_type: str = "text/plain",
+    feature: Optional[str] = None,
+    user_id: str = "",
+    endpoint: Optional[str] = None,
+    request_id: Optional[str] = None,
+    prompt_name: Optional[str] = None,
+    prompt_version: Optional[str] = None,
+    user_query: Optional[str] = None,
+    resolved_query: Optional[str] = None,
+    post_response_hook: Optional[Callable[[str, LLMLogEntry], None]] = None,
+    cached_content_name: Optional[str] = None,
+) -> Optional[str]:
+    """
+    call_gemini の非同期版。引数・戻り値・ログ内容は call_gemini と同じ。
+    async ハンドラから呼ぶ場合はこちらを使う（LLM 待ちの間ワーカーを塞がない）。
+    """
+    entry = _new_entry(
+        model=model, feature=feature, user_id=user_id, endpoint=endpoint,
+        request_id=request_id, prompt_name=prompt_name, prompt_version=prompt_version,
+        user_query=user_query, resolved_query=resolved_query,
+    )
+
+    text: Optional[str] = None
+    t0 = time.time()
+    try:
+        client = _get_genai_client()
+        response = await client.aio.models.generate_content(
+            model=model,
+            contents=prompt,
+            config=_build_config(response_mime_type, cached_content_name),
         )
+        _record_usage(entry, model, response.usage_metadata)
+        text = response.text
+        _record_text(entry, text, post_response_hook)
+    except Exception as e:
+        _record_error(entry, e)
+        text = None
+    finally:
+        _write_log(entry, t0)
 
-        # コスト計算
-        entry.estimated_cost_usd = _calc_cost_usd(
+    return text
+
+
+async def acall_gemini_stream(
+    prompt: str,
+    *,
+    model: str = DEFAULT_MODEL,
+    response_mime_type: str = "text/plain",
+    feature: Optional[str] = None,
+    user_id: str = "",
+    endpoint: Optional[str] = None,
+    request_id: Optional[str] = None,
+    prompt_name: Optional[str] = None,
+    prompt_version: Optional[str] = None,
+    user_query: Optional[str] = None,
+    resolved_query: Optional[str] = None,
+    post_response_hook: Optional[Callable[[str, LLMLogEntry], None]] = None,
+    cached_content_name: Optional[str] = None,
+) -> AsyncIterator[str]:
+    """
+    ストリーミング生成。テキスト断片を受信順に yield する。
+    ログはストリーム終了時に 1 行だけ書く（usage_metadata は最後の chunk の累計値）。
+    失敗時は例外を送出せず、そこまでの断片で打ち切る。
+    """
+    entry = _new_entry(
+        model=model, feature=feature, user_id=user_id, endpoint=endpoint,
+        request_id=request_id, prompt_name=prompt_name, prompt_version=prompt_version,
+        user_query=user_query, resolved_query=resolved_query,
+    )
+
+    parts: List[str] = []
+    last_usage = None
+    t0 = time.time()
+    try:
+        client = _get_genai_client()
+        stream = await client.aio.models.generate_content_stream(
             model=model,
-            input_tokens=entry.input_tokens or 0,
-            output_tokens=entry.output_tokens or 0,
-            cached_tokens=entry.cached_tokens or 0,
+            contents=prompt,
+            config=_build_config(response_mime_type, cached_content_name),
         )
+        async for chunk in stream:
+            if getattr(chunk, "usage_metadata", None):
+                last_usage = chunk.usage_metadata
+            if chunk.text:
+                parts.append(chunk.text)
+                yield chunk.text
+        _record_usage(entry, model, last_usage)
+        _record_text(entry, "".join(parts) if parts else None, post_response_hook)
+    except Exception as e:
+        _record_error(entry, e)
+    finally:
+        _write_log(entry, t0)
 
-        text = response.text
-        if text is None:
-            entry.success = False
-            entry.error_type = "no_text"
-            entry.error_message = "SDK returned response with text=None"
-            logger.warning("Gemini SDK returned no text")
-        else:
-            entry.success = True
-            entry.response_answer = text
-            # caller が derived field (parsed_*) を log entry に書き込めるフック。
-            # フック内例外は本処理に伝播させない (ロギングは best-effort)。
-            if post_response_hook is not None:
-                try:
-                    post_response_hook(text, entry)
-                except Exception as e:
-                    logger.warning(f"post_response_hook failed (suppressed): {e}")
 
+def embed_text(
+    text: str,
+    *,
+    model: str = DEFAULT_EMBEDDING_MODEL,
+    task_type: str = "SEMANTIC_SIMILARITY",
+    output_dimensionality: int = DEFAULT_EMBEDDING_DIM,
+    feature: Optional[str] = None,
+) -> Optional[List[float]]:
+    """
+    テキスト埋め込みの単一窓口。call_gemini と同じく失敗時は None を返し、BQ ログを書く。
+    埋め込み API は usage_metadata を返さないため、ログはレイテンシと成否のみ。
+    """
+    entry = LLMLogEntry()
+    entry.model = model
+    entry.feature = feature
+    entry.user_query = (text or "")[:500]
+
+    values: Optional[List[float]] = None
+    t0 = time.time()
+    try:
+        client = _get_genai_client()
+        response = client.models.embed_content(
+            model=model,
+            contents=text,
+            config=types.EmbedContentConfig(
+                task_type=task_type,
+                output_dimensionality=output_dimensionality,
+                http_options=_build_retry_http_options(),
+            ),
+        )
+        values = list(response.embeddings[0].values)
+        entry.success = True
     except Exception as e:
         entry.success = False
         entry.error_type = type(e).__name__
         entry.error_message = str(e)[:500]
-        logger.error(f"Gemini gateway call failed: {e}", exc_info=True)
-        text = None
-
+        logger.warning(f"Gemini embedding call failed: {e}")
+        values = None
     finally:
-        entry.llm_latency_ms = (time.time() - t0) * 1000.0
-        try:
-            get_llm_logger().log(entry)
-        except Exception as e:
-            # ロギング失敗はアプリ機能に影響させない
-            logger.error(f"Failed to log gateway entry: {e}")
+        _write_log(entry, t0)
 
-    return text
+    return values
 
 
 # ==================================
@@ -1,18 +1,18 @@
 """
 LLM Interaction Logger Service
 LLMの入出力を BigQuery に記録するサービス。
-非同期でログを書き込むため、メインのレスポンスには影響を与えません。
+共有の書き込みキュー（bq_log_writer）経由でバッチ書き込みするため、メインのレスポンスには影響を与えません。
 """
 
 import os
 import uuid
-import threading
 from datetime import datetime, timezone
 from typing import Optional, Dict, Any
 from google.cloud import bigquery
 import json
 import logging
 
+from backend.app.services.bq_log_writer import get_bq_log_writer
 from backend.app.middleware.request_context import (
     get_endpoint,
     get_request_id,
@@ -160,20 +160,14 @@ class LLMLoggerService:
     
     def log(self, entry: LLMLogEntry):
         """
-        ログエントリを非同期で BigQuery に書き込む。
-        メインのAPIレスポンスをブロックしないよう、別スレッドで実行する。
+        ログエントリを BigQuery 書き込みキューに積む。
+        書き込みは共有ワーカー（bq_log_writer）がバッチで行うため、レスポンスはブロックしない。
         """
         if not self.client:
             logger.warning("LLMLoggerService not initialized, skipping log")
             return
-        
-        # 別スレッドで書き込み（レスポンス速度に影響を与えない）
-        thread = threading.Thread(
-            target=self._write_to_bigquery,
-            args=(entry.to_dict(),),
-            daemon=True # メインプロセス終了時に自動的に終了
-        )
-        thread.start()
+
+        self._write_to_bigquery(entry.to_dict())
     
     def update_feedback(
         self, 
@@ -183,16 +177,11 @@ class LLMLoggerService:
         category: Optional[str] = None,
         reason: Optional[str] = None
         ):
-        """非同期で既存のログにフィードバックを更新する"""
+        """既存のログへのフィードバック行を書き込みキューに積む"""
         if not self.client:
             return
-        
-        thread = threading.Thread(
-            target=self._update_bigquery_feedback,
-            args=(request_id, session_id, user_rating, category, reason),
-            daemon=True
-        )
-        thread.start()
+
+        self._update_bigquery_feedback(request_id, session_id, user_rating, category, reason)
     
     def _update_bigquery_feedback(self, request_id: str, session_id: str, user_rating: str, category: Optional[str], reason: Optional[str]):
         """BigQueryにフィードバック用の追記行をINSERT (UPDATEできないStreaming Buffer仕様への対応)"""
@@ -216,7 +205,7 @@ class LLMLoggerService:
                 "success": True
             }
             
-            logger.info(f"Inserting feedback row for request {request_id}")
+            logger.info(f"Queueing feedback row for request {request_id}")
             self._write_to_bigquery(feedback_entry)
             
         except Exception as e:
@@ -224,19 +213,12 @@ class LLMLoggerService:
 
     
     def _write_to_bigquery(self, row_data: Dict[str, Any]):
-        """BigQuery にRow を挿入（内部用）"""
+        """BigQuery 書き込みキューに Row を積む（内部用）"""
         try:
-            errors = self.client.insert_rows_json(
-                FULL_TABLE_ID,
-                [row_data]
-            )
-            if errors:
-                logger.error(f"BigQuery insert errors: {errors}")
-            else:
-                logger.debug(f"LLM log written: {row_data['log_id']}")
+            get_bq_log_writer().enqueue(self.client, FULL_TABLE_ID, [row_data])
         except Exception as e:
             # ロギング失敗はアプリを止めない
-            logger.error(f"Failed to write LLM log: {e}")
+            logger.error(f"Failed to queue LLM log: {e}")
 
 # Singleton instance
 _logger_instance: Optional[LLMLoggerService] = None
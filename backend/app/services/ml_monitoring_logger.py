@@ -3,19 +3,20 @@ ML Monitoring Logger Service
 ドリフト検知結果を BigQuery に非同期で記録するサービス。
 
 llm_logger_service.py と同じパターン:
-- 非同期書き込み (threading)
+- 共有の書き込みキュー（bq_log_writer）経由のバッチ書き込み
 - シングルトンインスタンス
 - メインスレッドをブロックしない設計
 """
 import os
 import uuid
-import threading
 import logging
 from datetime import datetime, timezone
 from typing import Optional, Dict, Any, List
 from dataclasses import asdict
 from google.cloud import bigquery
 
+from backend.app.services.bq_log_writer import get_bq_log_writer
+
 logger = logging.getLogger(__name__)
 
 # BigQuery 設定
@@ -38,7 +39,7 @@ class MLMonitoringLogger:
     
     def log_drift_report(self, report) -> None:
         """
-        DriftReport を非同期で BigQuery に書き込む。
+        DriftReport を BigQuery 書き込みキューに積む。
 
         drift_type に応じて記録形式を変える:
         - "feature": 各特徴量を個別行として記録
@@ -128,12 +129,7 @@ class MLMonitoringLogger:
             )
             return
 
-        thread = threading.Thread(
-            target=self._write_rows_to_bigquery,
-            args=(rows,),
-            daemon=True,
-        )
-        thread.start()
+        self._write_rows_to_bigquery(rows)
     
     def get_drift_history(
         self, model_type: str, limit: int = 30
@@ -216,17 +212,11 @@ class MLMonitoringLogger:
             return None
     
     def _write_rows_to_bigquery(self, rows: List[Dict]) -> None:
-        """BigQuery に複数行を挿入（内部用・別スレッドで実行）"""
+        """BigQuery 書き込みキューに複数行を積む（内部用）"""
         try:
-            errors = self.client.insert_rows_json(FULL_TABLE_ID, rows)
-            if errors:
-                logger.error(f"BigQuery insert errors: {errors}")
-            else:
-                logger.debug(
-                    f"ML drift log written: {len(rows)} rows"
-                )
+            get_bq_log_writer().enqueue(self.client, FULL_TABLE_ID, rows)
         except Exception as e:
-            logger.error(f"Failed to write ML drift log: {e}")
+            logger.error(f"Failed to queue ML drift log: {e}")
 
 
 # Singleton instance
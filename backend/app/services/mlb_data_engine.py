@@ -6,10 +6,12 @@ import pandas as pd
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from google.cloud.exceptions import GoogleCloudError
-from google.cloud.bigquery import QueryJobConfig, ScalarQueryParameter, ArrayQueryParameter
+from google.cloud.bigquery import ScalarQueryParameter, ArrayQueryParameter
 
-from .bigquery_service import client
+from .bigquery_service import run_query_sync
 from .llm_gateway_service import call_gemini
+from .nl_query_cache_service import cached_parse
+from ..config.prompt_registry import get_prompt_version
 from ..config.query_maps import (
     QUERY_TYPE_CONFIG, METRIC_MAP, DECIMAL_FORMAT_COLUMNS,
     MAIN_BATTING_STATS, MAIN_PITCHING_STATS, MAIN_CAREER_BATTING_STATS,
@@ -41,7 +43,20 @@ class MLBDataEngine:
     def _parse_query_with_llm(self, query: str, season: Optional[int]) -> Optional[Dict[str, Any]]:
         """
         [Step 1] 自然言語から検索パラメータ（JSON）を抽出する
+        繰り返しの質問は nl_query_cache_service のキャッシュから返す（検証済みのみ登録）
         """
+        return cached_parse(
+            namespace="mlb_data_engine",
+            query=query,
+            season=season,
+            # インラインプロンプト。変更したら prompt_registry の版を上げる（キャッシュが破棄される）
+            prompt_version=get_prompt_version("parse_query_data_engine"),
+            parse_fn=lambda: self._parse_query_with_llm_uncached(query, season),
+            validate_fn=self._validate_query_params,
+        )
+
+    def _parse_query_with_llm_uncached(self, query: str, season: Optional[int]) -> Optional[Dict[str, Any]]:
+        """LLM で検索パラメータを抽出する本体"""
         if not self.api_key:
             logger.error("GEMINI_API_KEY_V2 is not set.")
             return None
@@ -371,8 +386,7 @@ class MLBDataEngine:
         # BigQuery実行
         try:
             bq_params = self._convert_to_bq_parameters(sql_params)
-            job_config = QueryJobConfig(query_parameters=bq_params)
-            df = client.query(sql_query, job_config=job_config).to_dataframe()
+            df = run_query_sync(sql_query, bq_params)
             logger.info(f"✅ Fetched {len(df)} rows from BigQuery")
             return df
         except GoogleCloudError as e:
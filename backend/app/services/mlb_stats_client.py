@@ -0,0 +1,295 @@
+"""
+MLB Stats API（statsapi.mlb.com）用の共有 HTTP クライアント。
+
+  - プロセス共有の httpx.AsyncClient（HTTP/2・keep-alive）。呼び出しごとの TLS ハンドシェイクをなくす
+  - 条件付き GET: 前回の ETag / Last-Modified を送り、304 なら手元の JSON を返す
+  - ライブフィード: 2 回目以降は feed/live/diffPatch に前回の timecode を渡し、差分（JSON Patch）だけ受け取る
+
+返す dict はキャッシュと共有される。呼び出し側で書き換えないこと。
+ライブフィードは試合ごとに 1 つだけ持ち、次のポーリングでその場更新する。
+await をまたいで中身を参照し続ける場合や書き換える場合は、呼び出し側でコピーすること。
+"""
+import asyncio
+import copy
+import logging
+import os
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import httpx
+
+from backend.app.services.cache_service import TTLLRUCache
+from backend.app.utils.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+MLB_BASE = "https://statsapi.mlb.com"
+
+MLB_HTTP_MAX_CONNECTIONS = int(os.getenv("MLB_HTTP_MAX_CONNECTIONS", "50"))
+MLB_HTTP_MAX_KEEPALIVE = int(os.getenv("MLB_HTTP_MAX_KEEPALIVE", "20"))
+# 条件付き GET 用に保持するレスポンスの数と保持期間
+MLB_CONDITIONAL_CACHE_MAX_ENTRIES = int(os.getenv("MLB_CONDITIONAL_CACHE_MAX_ENTRIES", "512"))
+MLB_CONDITIONAL_CACHE_TTL_SEC = int(os.getenv("MLB_CONDITIONAL_CACHE_TTL_SEC", str(6 * 3600)))
+# diffPatch の基準として保持するライブフィード。最後のポーリングからこの秒数で捨てる（終了した試合は即座に捨てる）
+MLB_LIVE_FEED_IDLE_TTL_SEC = int(os.getenv("MLB_LIVE_FEED_IDLE_TTL_SEC", "600"))
+
+try:
+    import h2  # noqa: F401  httpx の HTTP/2 サポートに必要
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
+
+
+class JsonPatchError(Exception):
+    """diffPatch の適用に失敗した（フル取得に切り替える）"""
+
+
+def _split_pointer(path: str) -> List[str]:
+    if path == "":
+        return []
+    if not path.startswith("/"):
+        raise JsonPatchError(f"invalid JSON pointer: {path}")
+    return [p.replace("~1", "/").replace("~0", "~") for p in path[1:].split("/")]
+
+
+def _resolve_parent(doc: Any, path: str) -> Tuple[Any, str]:
+    parts = _split_pointer(path)
+    if not parts:
+        raise JsonPatchError("patching the document root is not supported")
+    target = doc
+    for part in parts[:-1]:
+        try:
+            target = target[int(part)] if isinstance(target, list) else target[part]
+        except (KeyError, IndexError, ValueError) as e:
+            raise JsonPatchError(f"path not found: {path}") from e
+    return target, parts[-1]
+
+
+def _get(doc: Any, path: str) -> Any:
+    parent, key = _resolve_parent(doc, path)
+    try:
+        return parent[int(key)] if isinstance(parent, list) else parent[key]
+    except (KeyError, IndexError, ValueError) as e:
+        raise JsonPatchError(f"path not found: {path}") from e
+
+
+def _add(doc: Any, path: str, value: Any) -> None:
+    parent, key = _resolve_parent(doc, path)
+    if isinstance(parent, list):
+        if key == "-":
+            parent.append(value)
+        else:
+            parent.insert(int(key), value)
+    else:
+        parent[key] = value
+
+
+def _remove(doc: Any, path: str) -> Any:
+    parent, key = _resolve_parent(doc, path)
+    try:
+        return parent.pop(int(key)) if isinstance(parent, list) else parent.pop(key)
+    except (KeyError, IndexError, ValueError) as e:
+        raise JsonPatchError(f"path not found: {path}") from e
+
+
+def apply_json_patch(doc: Dict[str, Any], operations: List[Dict[str, Any]]) -> None:
+    """RFC 6902 の JSON Patch を doc にその場で適用する。"""
+    for op in operations:
+        kind = op.get("op")
+        path = op.get("path", "")
+        if kind == "add":
+            _add(doc, path, op.get("value"))
+        elif kind == "replace":
+            parent, key = _resolve_parent(doc, path)
+            if isinstance(parent, list):
+                parent[int(key)] = op.get("value")
+            else:
+                parent[key] = op.get("value")
+        elif kind == "remove":
+            _remove(doc, path)
+        elif kind == "move":
+            _add(doc, path, _remove(doc, op["from"]))
+        elif kind == "copy":
+            _add(doc, path, copy.deepcopy(_get(doc, op["from"])))
+        elif kind == "test":
+            if _get(doc, path) != op.get("value"):
+                raise JsonPatchError(f"test failed at {path}")
+        else:
+            raise JsonPatchError(f"unsupported op: {kind}")
+
+
+class MLBStatsClient:
+    """statsapi.mlb.com への GET をまとめる。インスタンスは get_mlb_stats_client() で共有する。"""
+
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+        # URL → (validators, JSON)
+        self._conditional = TTLLRUCache(max_entries=MLB_CONDITIONAL_CACHE_MAX_ENTRIES)
+        # gamePk → (timecode, フィード)
+        self._live_feeds = TTLLRUCache(max_entries=64)
+        self._feed_flight = SingleFlight(name="mlb_live_feed")
+        self._stats = {"not_modified": 0, "diff_patch": 0, "full_feed": 0}
+        # 閉じている途中の古い AsyncClient（タスクが GC されないよう保持する）
+        self._closing: Set[asyncio.Task] = set()
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """接続プールはイベントループに紐づくため、ループが変わったら作り直す。"""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._client_loop is not loop:
+            if self._client is not None and not self._client.is_closed:
+                self._close_stale_client(self._client, self._client_loop)
+            self._client = httpx.AsyncClient(
+                base_url=MLB_BASE,
+                http2=_HTTP2_AVAILABLE and self._transport is None,
+                transport=self._transport,
+                limits=httpx.Limits(
+                    max_connections=MLB_HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=MLB_HTTP_MAX_KEEPALIVE,
+                ),
+                timeout=10.0,
+            )
+            self._client_loop = loop
+        return self._client
+
+    def _close_stale_client(
+        self, client: httpx.AsyncClient, loop: Optional[asyncio.AbstractEventLoop]
+    ) -> None:
+        """前のループの AsyncClient を閉じる。ループがまだ動いていればそのループ上で、止まっていれば今のループで閉じる。"""
+        if loop is not None and loop.is_running() and not loop.is_closed():
+            asyncio.run_coroutine_threadsafe(_aclose_quietly(client), loop)
+            return
+        task = asyncio.get_running_loop().create_task(_aclose_quietly(client))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def aclose(self) -> None:
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self._stats)
+
+    async def get_json(self, path: str, params: Optional[Dict[str, Any]] = None, timeout: float = 10.0) -> Any:
+        """GET して JSON を返す。前回の ETag / Last-Modified があれば条件付きで問い合わせる。"""
+        request = self.client.build_request("GET", path, params=params, timeout=timeout)
+        key = str(request.url)
+        cached = self._conditional.get(key)
+        if cached is not None:
+            validators, _ = cached
+            if validators.get("etag"):
+                request.headers["If-None-Match"] = validators["etag"]
+            if validators.get("last_modified"):
+                request.headers["If-Modified-Since"] = validators["last_modified"]
+
+        resp = await self.client.send(request)
+        if resp.status_code == 304 and cached is not None:
+            self._stats["not_modified"] += 1
+            return cached[1]
+        resp.raise_for_status()
+        data = resp.json()
+
+        validators = {
+            "etag": resp.headers.get("ETag"),
+            "last_modified": resp.headers.get("Last-Modified"),
+        }
+        if validators["etag"] or validators["last_modified"]:
+            self._conditional.set(key, (validators, data), ttl=MLB_CONDITIONAL_CACHE_TTL_SEC)
+        return data
+
+    async def get_live_feed(self, game_pk: int, timeout: float = 15.0) -> Dict[str, Any]:
+        """GUMBO ライブフィードを返す。前回取得分があれば diffPatch で差分だけ取り寄せて更新する。
+
+        同じ試合の同時呼び出しは 1 回にまとめる。
+        """
+        return await self._feed_flight.do(game_pk, self._refresh_live_feed, game_pk, timeout)
+
+    async def _refresh_live_feed(self, game_pk: int, timeout: float) -> Dict[str, Any]:
+        # ポーリングされなくなった試合のフィードを捨てる（数 MB ずつあるため LRU の上限まで待たない）
+        self._live_feeds.purge_expired()
+        state = self._live_feeds.get(game_pk)
+        if state is not None:
+            timecode, feed = state
+            try:
+                patched = await self._apply_diff_patch(game_pk, timecode, feed, timeout)
+                if patched is not None:
+                    return patched
+            except (JsonPatchError, httpx.HTTPStatusError, ValueError, TypeError) as e:
+                logger.warning(f"diffPatch for game {game_pk} failed, refetching full feed: {e}")
+
+        # diffPatch の基準として別に持つため、条件付き GET のキャッシュとは共有しない
+        resp = await self.client.get(f"/api/v1.1/game/{game_pk}/feed/live", timeout=timeout)
+        resp.raise_for_status()
+        feed = resp.json()
+        self._stats["full_feed"] += 1
+        self._remember_feed(game_pk, feed)
+        return feed
+
+    async def _apply_diff_patch(
+        self, game_pk: int, timecode: str, feed: Dict[str, Any], timeout: float
+    ) -> Optional[Dict[str, Any]]:
+        """diffPatch を適用したフィードを返す。差分が取れない場合は None（フル取得に任せる）。"""
+        resp = await self.client.get(
+            f"/api/v1.1/game/{game_pk}/feed/live/diffPatch",
+            params={"startTimecode": timecode},
+            timeout=timeout,
+        )
+        resp.raise_for_status()
+        body = resp.json()
+
+        # 差分が大きすぎる場合、MLB はフルフィードをそのまま返す
+        if isinstance(body, dict):
+            if "gameData" not in body:
+                return None
+            self._stats["full_feed"] += 1
+            self._remember_feed(game_pk, body)
+            return body
+        if not isinstance(body, list):
+            return None
+
+        # 試合ごとに 1 つだけ持つフィードをその場で更新する（読み手は await を挟まずに読み切る）。
+        # 途中で失敗したら中途半端なフィードを残さないよう捨て、フル取得に任せる
+        try:
+            for patch in body:
+                apply_json_patch(feed, patch.get("diff", []))
+        except Exception:
+            self._live_feeds.delete(game_pk)
+            raise
+        self._stats["diff_patch"] += 1
+        self._remember_feed(game_pk, feed)
+        return feed
+
+    def _remember_feed(self, game_pk: int, feed: Dict[str, Any]) -> None:
+        """次回の diffPatch の基準として保持する。終了した試合は差分が出ないため持たない。"""
+        timecode = feed.get("metaData", {}).get("timeStamp")
+        final = feed.get("gameData", {}).get("status", {}).get("abstractGameState") == "Final"
+        if timecode and not final:
+            self._live_feeds.set(game_pk, (timecode, feed), ttl=MLB_LIVE_FEED_IDLE_TTL_SEC)
+        else:
+            self._live_feeds.delete(game_pk)
+
+
+async def _aclose_quietly(client: httpx.AsyncClient) -> None:
+    try:
+        await client.aclose()
+    except Exception as e:
+        logger.debug(f"Closing stale MLB stats client failed: {e}")
+
+
+_mlb_stats_client: Optional[MLBStatsClient] = None
+
+
+def get_mlb_stats_client() -> MLBStatsClient:
+    """共有 MLBStatsClient を返す（シングルトン）。"""
+    global _mlb_stats_client
+    if _mlb_stats_client is None:
+        _mlb_stats_client = MLBStatsClient()
+    return _mlb_stats_client
+
+
+async def close_mlb_stats_client() -> None:
+    """lifespan 終了時に呼ぶ。"""
+    if _mlb_stats_client is not None:
+        await _mlb_stats_client.aclose()
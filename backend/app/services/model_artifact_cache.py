@@ -0,0 +1,228 @@
+"""
+Model Registry のアーティファクトキャッシュ（プロセス共有）。
+
+これまで StuffPlusService / PlayerSegmentationService / DataDriftService はプロセスごとの初回利用時に
+GCS から pickle を落として joblib.load していた。コールドスタート直後の最初のリクエストがその待ちを払い、
+promote_version で昇格したバージョンも再起動するまで反映されなかった。
+
+  - メモリ層:   model_type → (artifact, ModelVersion)。入れ替えは「完全にロードし終えた組」への
+               参照の差し替え 1 回で行うため、読み手がロード途中のモデルを見ることはない
+  - ディスク層: MODEL_CACHE_DIR/{model_type}/{version}/model.joblib。GCS から落とした同じバージョンは
+               再ダウンロードしない。joblib の mmap_mode でロードし、numpy 配列（KMeans の重心・
+               スケーラーの統計量など）はページキャッシュ上のファイルをそのまま参照する
+  - 先読み:     起動時に全 model_type の active バージョンをバックグラウンドでロードする
+  - ポーリング: MODEL_REGISTRY_POLL_SEC ごとに active バージョンを確認し、変わっていれば裏でロードしてから差し替える
+
+返す artifact は共有される。呼び出し側で書き換えないこと。
+"""
+import asyncio
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import joblib
+
+from backend.app.services.model_registry_service import (
+    MODEL_TRAINING_CONFIG,
+    ModelRegistryService,
+    ModelVersion,
+)
+
+logger = logging.getLogger(__name__)
+
+MODEL_CACHE_DIR = os.getenv(
+    "MODEL_CACHE_DIR", os.path.join(tempfile.gettempdir(), "diamond_lens_models")
+)
+MODEL_REGISTRY_POLL_SEC = float(os.getenv("MODEL_REGISTRY_POLL_SEC", "300"))
+MODEL_CACHE_PREFETCH_ENABLED = os.getenv("MODEL_CACHE_PREFETCH_ENABLED", "true").lower() == "true"
+
+_Entry = Tuple[Dict[str, Any], ModelVersion]
+
+
+class ModelArtifactCache:
+    """active バージョンのアーティファクトを保持し、バージョン変更時に差し替える。
+
+    load_model() は ModelRegistryService.load_model() と同じ (artifact, ModelVersion) を返す。
+    """
+
+    def __init__(
+        self,
+        registry: Optional[ModelRegistryService] = None,
+        cache_dir: str = MODEL_CACHE_DIR,
+        poll_interval: float = MODEL_REGISTRY_POLL_SEC,
+    ):
+        # BigQuery / GCS クライアントの生成は初回ロードまで遅らせる
+        self._registry = registry
+        self.cache_dir = cache_dir
+        self.poll_interval = poll_interval
+        self._entries: Dict[str, _Entry] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {"hit": 0, "miss": 0, "disk_hit": 0, "download": 0, "swap": 0}
+
+    @property
+    def registry(self) -> ModelRegistryService:
+        if self._registry is None:
+            self._registry = ModelRegistryService()
+        return self._registry
+
+    def _lock_for(self, model_type: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(model_type, threading.Lock())
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self._stats)
+
+    def versions(self) -> Dict[str, str]:
+        """ロード済みの model_type → version。"""
+        return {model_type: meta.version for model_type, (_, meta) in self._entries.items()}
+
+    # ── 読み出し ─────────────────────────────────────────
+    def load_model(self, model_type: str) -> _Entry:
+        """ロード済みならそれを返し、未ロードなら active バージョンをロードして返す。
+
+        Raises:
+            FileNotFoundError: active バージョンが存在しない場合
+        """
+        entry = self._entries.get(model_type)
+        if entry is not None:
+            self._stats["hit"] += 1
+            return entry
+        self._stats["miss"] += 1
+        # 同じ model_type の同時ロードは 1 回にまとめる
+        with self._lock_for(model_type):
+            entry = self._entries.get(model_type)
+            if entry is not None:
+                return entry
+            self.refresh(model_type)
+            entry = self._entries.get(model_type)
+        if entry is None:
+            raise FileNotFoundError(
+                f"No active model found for {model_type}. "
+                f"Train and promote a version first."
+            )
+        return entry
+
+    # ── 更新 ────────────────────────────────────────────
+    def refresh(self, model_type: str) -> bool:
+        """active バージョンを確認し、変わっていればロードして差し替える。差し替えたら True。"""
+        active = self.registry.get_active_version(model_type)
+        if active is None:
+            return False
+        current = self._entries.get(model_type)
+        if current is not None and current[1].version == active.version:
+            return False
+
+        # 差し替えは完全にロードできてから。失敗したら旧バージョンを使い続ける
+        artifact = self._load_artifact(active)
+        self._entries[model_type] = (artifact, active)
+        self._stats["swap"] += 1
+        if current is not None:
+            logger.info(f"Model hot-swapped: {model_type} {current[1].version} -> {active.version}")
+        else:
+            logger.info(f"Model cached: {model_type} {active.version} (season {active.training_season})")
+        self._prune(model_type, keep=active.version)
+        return True
+
+    def refresh_all(self, model_types: Optional[Iterable[str]] = None) -> None:
+        """全 model_type を refresh する。個別の失敗はログに残して続ける。"""
+        for model_type in model_types or MODEL_TRAINING_CONFIG:
+            try:
+                with self._lock_for(model_type):
+                    self.refresh(model_type)
+            except Exception as e:
+                logger.warning(f"Model cache refresh failed for {model_type}: {e}")
+
+    def invalidate(self, model_type: Optional[str] = None) -> None:
+        """メモリ層を捨てる（ディスク層は残す）。次の load_model で取り直す。"""
+        if model_type is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(model_type, None)
+
+    # ── ディスク層 ───────────────────────────────────────
+    def _local_path(self, version: ModelVersion) -> str:
+        return os.path.join(self.cache_dir, version.model_type, version.version, "model.joblib")
+
+    def _load_artifact(self, version: ModelVersion) -> Dict[str, Any]:
+        path = self._local_path(version)
+        if os.path.exists(path):
+            self._stats["disk_hit"] += 1
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # 別プロセス・別スレッドが途中のファイルを読まないよう、一時ファイルに落としてから rename
+            fd, tmp_path = tempfile.mkstemp(suffix=".part", dir=os.path.dirname(path))
+            os.close(fd)
+            try:
+                self.registry.download_model_file(version.gcs_path, tmp_path)
+                os.replace(tmp_path, path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            self._stats["download"] += 1
+        return joblib.load(path, mmap_mode="r")
+
+    def _prune(self, model_type: str, keep: str) -> None:
+        """使わなくなった旧バージョンのファイルを消す（mmap 中でも Linux ではマップは生きたまま）。"""
+        model_dir = os.path.join(self.cache_dir, model_type)
+        try:
+            for name in os.listdir(model_dir):
+                if name != keep:
+                    shutil.rmtree(os.path.join(model_dir, name), ignore_errors=True)
+        except OSError:
+            pass
+
+    # ── バックグラウンド ──────────────────────────────────
+    def start(self, prefetch: bool = MODEL_CACHE_PREFETCH_ENABLED) -> None:
+        """lifespan 起動時に呼ぶ。先読みの後、poll_interval ごとにバージョン変更を確認する。"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._poll_loop(prefetch))
+
+    async def _poll_loop(self, prefetch: bool) -> None:
+        if prefetch:
+            await asyncio.to_thread(self.refresh_all)
+            logger.info(f"Model cache prefetch done: {self.versions()}")
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            await asyncio.to_thread(self.refresh_all)
+
+    async def stop(self) -> None:
+        """lifespan 終了時に呼ぶ。"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+
+_model_artifact_cache: Optional[ModelArtifactCache] = None
+_model_artifact_cache_lock = threading.Lock()
+
+
+def get_model_artifact_cache() -> ModelArtifactCache:
+    """共有 ModelArtifactCache を返す（シングルトン）。"""
+    global _model_artifact_cache
+    if _model_artifact_cache is None:
+        with _model_artifact_cache_lock:
+            if _model_artifact_cache is None:
+                _model_artifact_cache = ModelArtifactCache()
+    return _model_artifact_cache
+
+
+def refresh_cached_model(model_type: str) -> None:
+    """キャッシュ作成済みのプロセスでだけ、model_type を取り直す（promote_version 用）。"""
+    if _model_artifact_cache is None:
+        return
+    with _model_artifact_cache._lock_for(model_type):
+        _model_artifact_cache.refresh(model_type)
+
+
+async def stop_model_artifact_cache() -> None:
+    if _model_artifact_cache is not None:
+        await _model_artifact_cache.stop()
@@ -381,6 +381,13 @@ class ModelRegistryService:
         )
         self.bq_client.query(query, job_config=job_config).result()
         logger.info(f"Promoted {model_type} to version: {version}")
+
+        # このプロセスのアーティファクトキャッシュにも即時反映（他インスタンスはポーリングで追従）
+        from backend.app.services.model_artifact_cache import refresh_cached_model
+        try:
+            refresh_cached_model(model_type)
+        except Exception as e:
+            logger.warning(f"Model cache refresh after promotion failed: {e}")
     
     # ----------------------------------------------------------
     # Public: バージョン一覧 / Active 取得
@@ -453,6 +460,11 @@ class ModelRegistryService:
             blob.download_to_filename(f.name)
             return joblib.load(f.name)
     
+    def download_model_file(self, gcs_path: str, local_path: str) -> None:
+        """gs:// パス（または bucket 相対パス）のモデルファイルを local_path に保存する"""
+        gcs_relative = gcs_path.replace(f"gs://{self.bucket_name}/", "")
+        self.bucket.blob(gcs_relative).download_to_filename(local_path)
+
     def _upload_json(self, gcs_path: str, data: Dict) -> None:
         """Upload JSON to GCS"""
         blob = self.bucket.blob(gcs_path)
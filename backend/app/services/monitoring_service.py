@@ -19,6 +19,7 @@ class MonitoringService:
     - API error rate
     - Query processing time
     - BigQuery query latency
+    - BigQuery result cache hit / miss / bytes saved
     """
 
     def __init__(self):
@@ -155,6 +156,50 @@ class MonitoringService:
             },
         )
 
+    def record_query_cache_stats(
+        self, l1_hits: int, l2_hits: int, coalesced: int, misses: int, bytes_saved: int
+    ):
+        """
+        Record BigQuery result cache counters (delta since the last flush)
+
+        Args:
+            l1_hits: Hits served from the in-process cache
+            l2_hits: Hits served from Redis
+            coalesced: Requests that joined an in-flight identical query
+            misses: Queries that reached BigQuery
+            bytes_saved: Sum of total_bytes_processed avoided by cache hits
+        """
+        for layer, count in (("l1", l1_hits), ("l2", l2_hits), ("coalesced", coalesced)):
+            if count:
+                self._write_time_series(
+                    metric_type="bigquery/cache_hits",
+                    value=float(count),
+                    labels={"layer": layer},
+                )
+        if misses:
+            self._write_time_series(metric_type="bigquery/cache_misses", value=float(misses))
+        if bytes_saved:
+            self._write_time_series(metric_type="bigquery/cache_bytes_saved", value=float(bytes_saved))
+
+    def record_log_writer_stats(self, written: int, dropped: int, failed: int, queue_depth: int):
+        """
+        Record BigQuery log pipeline counters (delta since the last flush)
+
+        Args:
+            written: Rows inserted into BigQuery
+            dropped: Rows discarded because the queue was full
+            failed: Rows rejected by BigQuery or lost to insert errors
+            queue_depth: Rows waiting in the queue at flush time
+        """
+        for outcome, count in (("written", written), ("dropped", dropped), ("failed", failed)):
+            if count:
+                self._write_time_series(
+                    metric_type="log_writer/rows",
+                    value=float(count),
+                    labels={"outcome": outcome},
+                )
+        self._write_time_series(metric_type="log_writer/queue_depth", value=float(queue_depth))
+
 
 # Singleton instance
 _monitoring_instance: Optional[MonitoringService] = None
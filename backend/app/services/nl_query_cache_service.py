@@ -0,0 +1,343 @@
+"""
+自然言語クエリ → 構造化パラメータのキャッシュ。
+
+_parse_query_with_llm の Gemini 呼び出し（1〜3 秒）を繰り返しの質問で省く。
+
+  Tier 1 (exact):    正規化した質問文 + シーズンヒント + 現在年 の完全一致
+  Tier 2 (semantic): 質問文の埋め込みのコサイン類似度が閾値以上、かつ数字（年・イニング等）と
+                     選手名・チーム名の候補語が一致（既定では無効: NL_QUERY_SEMANTIC_CACHE_ENABLED=true で有効化）
+
+保存するのは validate_query_params を通過したパラメータのみ。
+キーにプロンプトバージョンを含め、prompt_registry のバージョンが変わった名前空間は丸ごと破棄する。
+バージョンの無い（registry 未登録の）プロンプトはキャッシュしない。
+
+注意: 選手名だけが違う質問（「大谷の HR」と「ジャッジの HR」）は埋め込みがほぼ同じになる。
+類似度だけでは別選手のパラメータを返してしまうため、Tier 2 は名前の候補語（カタカナ・漢字の連なり、
+英単語から指標・定型語を除いたもの）が完全に一致する場合だけヒットとする。
+埋め込みはリクエストのスレッドでは取らない。lookup は NL_QUERY_SEMANTIC_LOOKUP_TIMEOUT_SEC だけ待ち、
+間に合わなければ miss として LLM に回す。store 側の登録は裏で行う。
+"""
+import copy
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from concurrent.futures import wait as futures_wait
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from backend.app.services.cache_service import TTLLRUCache
+
+logger = logging.getLogger(__name__)
+
+NL_QUERY_CACHE_ENABLED = os.getenv("NL_QUERY_CACHE_ENABLED", "true").lower() == "true"
+NL_QUERY_SEMANTIC_CACHE_ENABLED = os.getenv("NL_QUERY_SEMANTIC_CACHE_ENABLED", "false").lower() == "true"
+NL_QUERY_CACHE_TTL_SEC = int(os.getenv("NL_QUERY_CACHE_TTL_SEC", str(6 * 3600)))
+NL_QUERY_CACHE_MAX_ENTRIES = int(os.getenv("NL_QUERY_CACHE_MAX_ENTRIES", "2048"))
+NL_QUERY_SEMANTIC_THRESHOLD = float(os.getenv("NL_QUERY_SEMANTIC_THRESHOLD", "0.95"))
+NL_QUERY_SEMANTIC_LOOKUP_TIMEOUT_SEC = float(os.getenv("NL_QUERY_SEMANTIC_LOOKUP_TIMEOUT_SEC", "0.2"))
+
+# 末尾の「？」「。」や空白の違いだけの質問を同一視する
+_TRAILING_PUNCT = re.compile(r"[?？!！。．.、,，\s]+$")
+_WHITESPACE = re.compile(r"\s+")
+_DIGITS = re.compile(r"\d+")
+# 選手名・チーム名の候補: カタカナ・漢字の 2 文字以上の連なりと英単語（ひらがな・数字・記号は含めない）
+_NAME_CANDIDATE = re.compile(r"[ァ-ヺー]{2,}|[一-龯々]{2,}|[a-z][a-z.'\-]*[a-z]")
+# 名前ではない指標・定型語。ここに無い語は名前として扱う（一致条件が厳しくなるだけで誤ヒットはしない）
+_NON_NAME_TERMS = frozenset({
+    "ホームラン", "ヒット", "ランキング", "トップ", "シーズン", "イニング", "スタッツ", "チーム",
+    "ランナー", "ストライク", "ボール", "カウント", "ベスト",
+    "打率", "本塁打", "打点", "安打", "盗塁", "四球", "三振", "奪三振", "防御率", "勝利", "勝利数",
+    "登板", "投球回", "成績", "投手", "打者", "選手", "一番", "最多", "最高", "通算", "今季", "今年",
+    "昨年", "去年", "得点圏", "満塁", "左投手", "右投手", "何本", "何人", "何勝", "上位", "長打率",
+    "出塁率", "被打率", "月別", "先発", "救援", "打席", "打数", "順位", "記録", "数字",
+    "the", "of", "in", "on", "and", "for", "who", "what", "how", "many", "much", "most", "top", "best",
+    "was", "is", "are", "has", "had", "did", "does", "hit", "hits", "home", "run", "runs", "hr", "hrs",
+    "avg", "ops", "obp", "slg", "era", "whip", "war", "rbi", "rbis", "season", "stats", "batting",
+    "pitching", "average", "leader", "leaders", "strikeouts", "wins", "year", "career", "vs",
+})
+
+
+def normalize_query(query: str) -> str:
+    """全角半角・大小文字・空白・末尾の句読点を揃える。"""
+    text = unicodedata.normalize("NFKC", query or "").lower()
+    text = _WHITESPACE.sub(" ", text).strip()
+    return _TRAILING_PUNCT.sub("", text)
+
+
+def numeric_signature(normalized: str) -> Tuple[str, ...]:
+    """質問中の数字列。年やイニングが違う質問を Tier 2 で取り違えないためのガード。"""
+    return tuple(_DIGITS.findall(normalized))
+
+
+def name_signature(normalized: str) -> Tuple[str, ...]:
+    """質問中の選手名・チーム名の候補語（重複なし・ソート済み）。別の選手の質問を Tier 2 で取り違えないためのガード。"""
+    return tuple(sorted({t for t in _NAME_CANDIDATE.findall(normalized) if t not in _NON_NAME_TERMS}))
+
+
+def _semantic_signature(normalized: str, season: Optional[int]) -> Tuple[Any, ...]:
+    return (season, numeric_signature(normalized), name_signature(normalized))
+
+
+class _SemanticIndex:
+    """正規化済み埋め込みのリングバッファ。総当たりの内積で最近傍を引く。"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._vectors: Optional[np.ndarray] = None
+        self._meta: List[Optional[Tuple[Tuple[Any, ...], Dict[str, Any], float]]] = [None] * max_entries
+        self._next = 0
+        self._size = 0
+
+    def add(self, vector: np.ndarray, signature: Tuple[Any, ...], params: Dict[str, Any], ttl: float) -> None:
+        if self._vectors is None:
+            self._vectors = np.zeros((self.max_entries, vector.shape[0]), dtype=np.float32)
+        elif vector.shape[0] != self._vectors.shape[1]:
+            return
+        self._vectors[self._next] = vector
+        self._meta[self._next] = (signature, params, time.monotonic() + ttl)
+        self._next = (self._next + 1) % self.max_entries
+        self._size = min(self._size + 1, self.max_entries)
+
+    def search(
+        self, vector: np.ndarray, signature: Tuple[Any, ...], threshold: float
+    ) -> Optional[Tuple[float, Dict[str, Any]]]:
+        if self._vectors is None or self._size == 0 or vector.shape[0] != self._vectors.shape[1]:
+            return None
+        scores = self._vectors[: self._size] @ vector
+        now = time.monotonic()
+        for idx in np.argsort(scores)[::-1]:
+            score = float(scores[idx])
+            if score < threshold:
+                break
+            meta = self._meta[idx]
+            if meta is None:
+                continue
+            sig, params, expires_at = meta
+            if expires_at > now and sig == signature:
+                return score, params
+        return None
+
+
+class NLQueryCache:
+    """名前空間（呼び出し元の機能）ごとに Tier 1 / Tier 2 を持つ。"""
+
+    def __init__(
+        self,
+        embed_fn: Optional[Callable[[str], Optional[List[float]]]] = None,
+        threshold: float = NL_QUERY_SEMANTIC_THRESHOLD,
+        ttl: float = NL_QUERY_CACHE_TTL_SEC,
+        max_entries: int = NL_QUERY_CACHE_MAX_ENTRIES,
+        semantic_enabled: bool = NL_QUERY_SEMANTIC_CACHE_ENABLED,
+        lookup_timeout: float = NL_QUERY_SEMANTIC_LOOKUP_TIMEOUT_SEC,
+    ):
+        self._embed_fn = embed_fn
+        self.threshold = threshold
+        self.lookup_timeout = lookup_timeout
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.semantic_enabled = semantic_enabled
+        self._exact: Dict[str, TTLLRUCache] = {}
+        self._semantic: Dict[str, _SemanticIndex] = {}
+        self._versions: Dict[str, Optional[str]] = {}
+        # 同じ質問の埋め込みを lookup と store で 2 回取らないための小さなキャッシュ
+        self._embeddings = TTLLRUCache(max_entries=256)
+        # 埋め込み API はリクエストのスレッドで待たない（Tier 2 のための呼び出しで応答を遅らせない）
+        self._embed_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="nl-embed")
+        self._pending: set = set()
+        self._lock = threading.Lock()
+        self._stats = {"exact_hit": 0, "semantic_hit": 0, "miss": 0}
+
+    def _embed(self, normalized: str) -> Optional[np.ndarray]:
+        """埋め込みを取る（ワーカースレッド側）。失敗時は None。"""
+        cached = self._embeddings.get(normalized)
+        if cached is not None:
+            return cached
+        embed_fn = self._embed_fn
+        if embed_fn is None:
+            from backend.app.services.llm_gateway_service import embed_text
+            embed_fn = lambda text: embed_text(text, feature="nl_query_cache")  # noqa: E731
+        try:
+            values = embed_fn(normalized)
+        except Exception as e:
+            logger.warning(f"NL query cache embedding failed: {e}")
+            return None
+        if not values:
+            return None
+        vector = np.asarray(values, dtype=np.float32)
+        norm = float(np.linalg.norm(vector))
+        if norm == 0.0:
+            return None
+        vector = vector / norm
+        self._embeddings.set(normalized, vector, ttl=self.ttl)
+        return vector
+
+    def _embed_within(self, normalized: str, timeout: float) -> Optional[np.ndarray]:
+        """埋め込みを裏で取り、timeout 秒だけ待つ。間に合わなければ None（取得自体は続け、次回に使う）。"""
+        cached = self._embeddings.get(normalized)
+        if cached is not None:
+            return cached
+        try:
+            return self._embed_pool.submit(self._embed, normalized).result(timeout=timeout)
+        except FuturesTimeoutError:
+            logger.debug("NL query cache embedding not ready, skipping semantic tier")
+            return None
+
+    def _index(self, semantic: "_SemanticIndex", normalized: str, signature: Tuple[Any, ...],
+               params: Dict[str, Any]) -> None:
+        vector = self._embed(normalized)
+        if vector is not None:
+            with self._lock:
+                semantic.add(vector, signature, params, self.ttl)
+
+    def _forget(self, fut: Future) -> None:
+        with self._lock:
+            self._pending.discard(fut)
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """裏で実行中の Tier 2 登録の完了を待つ（テスト・シャットダウン用）。"""
+        with self._lock:
+            pending = list(self._pending)
+        futures_wait(pending, timeout=timeout)
+
+    def _tiers(self, namespace: str, prompt_version: Optional[str]) -> Tuple[TTLLRUCache, _SemanticIndex]:
+        """名前空間の Tier を返す。プロンプトバージョンが変わっていれば作り直す。"""
+        with self._lock:
+            if namespace not in self._exact or self._versions.get(namespace) != prompt_version:
+                if namespace in self._exact:
+                    logger.info(
+                        f"NL query cache invalidated: {namespace} prompt "
+                        f"{self._versions.get(namespace)} -> {prompt_version}"
+                    )
+                self._exact[namespace] = TTLLRUCache(max_entries=self.max_entries)
+                self._semantic[namespace] = _SemanticIndex(self.max_entries)
+                self._versions[namespace] = prompt_version
+            return self._exact[namespace], self._semantic[namespace]
+
+    @staticmethod
+    def _exact_key(normalized: str, season: Optional[int]) -> Tuple[Any, ...]:
+        # プロンプトは現在年を埋め込むため、年が変わったら別キー
+        return (datetime.now().year, season, normalized)
+
+    def _count(self, event: str) -> None:
+        with self._lock:
+            self._stats[event] += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
+
+    def lookup(
+        self, namespace: str, query: str, season: Optional[int], prompt_version: Optional[str]
+    ) -> Optional[Dict[str, Any]]:
+        """キャッシュ済みパラメータの複製を返す。無ければ None。"""
+        normalized = normalize_query(query)
+        if not normalized:
+            return None
+        exact, semantic = self._tiers(namespace, prompt_version)
+
+        params = exact.get(self._exact_key(normalized, season))
+        if params is not None:
+            self._count("exact_hit")
+            logger.info(f"NL query cache exact hit: {namespace}")
+            return copy.deepcopy(params)
+
+        if self.semantic_enabled:
+            vector = self._embed_within(normalized, self.lookup_timeout)
+            if vector is not None:
+                with self._lock:
+                    found = semantic.search(vector, _semantic_signature(normalized, season), self.threshold)
+                if found is not None:
+                    score, params = found
+                    self._count("semantic_hit")
+                    logger.info(f"NL query cache semantic hit: {namespace} similarity={score:.4f}")
+                    # 次回以降は Tier 1 で当たるようにする
+                    exact.set(self._exact_key(normalized, season), params, ttl=self.ttl)
+                    return copy.deepcopy(params)
+
+        self._count("miss")
+        return None
+
+    def store(
+        self,
+        namespace: str,
+        query: str,
+        season: Optional[int],
+        prompt_version: Optional[str],
+        params: Dict[str, Any],
+    ) -> None:
+        """検証済みパラメータを両 Tier に登録する。"""
+        normalized = normalize_query(query)
+        if not normalized:
+            return
+        exact, semantic = self._tiers(namespace, prompt_version)
+        frozen = copy.deepcopy(params)
+        exact.set(self._exact_key(normalized, season), frozen, ttl=self.ttl)
+
+        if self.semantic_enabled:
+            fut = self._embed_pool.submit(
+                self._index, semantic, normalized, _semantic_signature(normalized, season), frozen
+            )
+            with self._lock:
+                self._pending.add(fut)
+            fut.add_done_callback(self._forget)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._exact.clear()
+            self._semantic.clear()
+            self._versions.clear()
+        self._embeddings.clear()
+
+
+def cached_parse(
+    namespace: str,
+    query: str,
+    season: Optional[int],
+    prompt_version: Optional[str],
+    parse_fn: Callable[[], Optional[Dict[str, Any]]],
+    validate_fn: Callable[[Dict[str, Any]], bool],
+) -> Optional[Dict[str, Any]]:
+    """
+    キャッシュを引き、無ければ parse_fn（LLM 解析）を実行して検証済みの結果だけを登録する。
+    キャッシュ無効時・プロンプトバージョンが無い（変更を検知できない）ときは parse_fn をそのまま呼ぶ。
+    """
+    if not NL_QUERY_CACHE_ENABLED:
+        return parse_fn()
+    if prompt_version is None:
+        logger.warning(f"NL query cache skipped for {namespace}: prompt has no registry version")
+        return parse_fn()
+
+    cache = get_nl_query_cache()
+    try:
+        cached = cache.lookup(namespace, query, season, prompt_version)
+    except Exception as e:
+        logger.warning(f"NL query cache lookup failed, calling LLM: {e}")
+        cached = None
+    if cached is not None:
+        return cached
+
+    params = parse_fn()
+    if params and validate_fn(params):
+        try:
+            cache.store(namespace, query, season, prompt_version, params)
+        except Exception as e:
+            logger.warning(f"NL query cache store skipped: {e}")
+    return params
+
+
+_nl_query_cache: Optional[NLQueryCache] = None
+
+
+def get_nl_query_cache() -> NLQueryCache:
+    """共有 NLQueryCache を返す（シングルトン）。"""
+    global _nl_query_cache
+    if _nl_query_cache is None:
+        _nl_query_cache = NLQueryCache()
+    return _nl_query_cache
@@ -52,16 +52,15 @@ async def judge_and_log(
         
         source_data = _truncate(json.dumps(tool_results, ensure_ascii=False, default=str))
 
-        # Judge 本体は同期 I/O のため、イベントループを塞がないよう別スレッドへ逃がす
-        verdict = await asyncio.to_thread(
-            _get_judge().evaluate_output,
+        verdict = await _get_judge().aevaluate_output(
             case_id=request_id,
             user_query=user_query,
             source_data=source_data,
             synthesizer_output=_truncate(final_answer),
             synthesizer_path="chat_orchestrator",
         )
-        _write_to_bq(request_id, verdict)
+        # BQ 書き込みは同期 I/O のため、イベントループを塞がないよう別スレッドへ逃がす
+        await asyncio.to_thread(_write_to_bq, request_id, verdict)
     except Exception as e:
         # 本流に伝播させない。ログだけ残す。
         logger.warning(f"online judge failed (request_id={request_id}): {e}")
@@ -1,16 +1,13 @@
 import pandas as pd
 import numpy as np
-from google.cloud import bigquery
 from backend.app.config.settings import get_settings
+from backend.app.services.bigquery_service import run_query_sync
 
 
 settings = get_settings()
 
 
 class PitcherFatigueService:
-    def __init__(self):
-        self.client = bigquery.Client()
-
     def get_pitcher_fatigue_analysis(self, pitcher_name: str, season: int = 2025):
         """Fetch and analyze pitcher fatigue data from BigQuery."""
         # 名前フォーマット変換: "Yoshinobu Yamamoto" → "Yamamoto, Yoshinobu"
@@ -61,7 +58,7 @@ class PitcherFatigueService:
         """
 
         try:
-            df = self.client.query(query).to_dataframe()
+            df = run_query_sync(query)
 
             if df.empty:
                 # 投手名の存在確認
@@ -72,7 +69,7 @@ class PitcherFatigueService:
                 AND pitcher_name LIKE '%{pitcher_name.split()[0]}%'
                 LIMIT 10
                 """
-                suggestions = self.client.query(check_query).to_dataframe()
+                suggestions = run_query_sync(check_query)
                 suggestion_list = suggestions['pitcher_name'].tolist() if not suggestions.empty else []
 
                 return {
@@ -173,7 +170,7 @@ class PitcherFatigueService:
         """
         
         try:
-            df = self.client.query(query).to_dataframe()
+            df = run_query_sync(query)
 
             if df.empty:
                 return {"error": True, "message": f"No league data found for season {season}."}
@@ -6,22 +6,30 @@ import os
 import logging
 import pandas as pd
 import lightgbm as lgb
-from google.cloud import bigquery
 from typing import List, Dict, Optional
-from backend.app.services.base import get_bq_client
+from backend.app.services.bigquery_service import run_query
 from backend.app.config.settings import get_settings
+from backend.app.services.feature_encoder import FeatureEncoder
+from backend.app.services.inference_batcher import get_inference_batcher
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# One-Hot 対象のカテゴリ特徴量（学習時は drop_first=True で One-Hot 化）
+WHIFF_CATEGORICAL_FEATURES = [
+    'batter_stand', 'inning', 'order_thru',
+    'runner_situation', 'batter_level', 'pitch_name',
+    'count_situation', 'pitch_count_group'
+]
+
 
 class PitcherPredictionService:
     """投手whiff率予測サービス"""
 
     def __init__(self):
-        self.client = get_bq_client()
         self.model = None
         self.train_features = None
+        self._encoders: Dict[tuple, FeatureEncoder] = {}
         self._load_model()
 
     def _load_model(self):
@@ -56,6 +64,20 @@ class PitcherPredictionService:
             logger.error(f"❌ Failed to load model: {str(e)}")
             raise
 
+    def _get_encoder(self, df: pd.DataFrame, numerical_features: List[str]) -> FeatureEncoder:
+        """train_features の列配置のエンコーダ（数値特徴量の組ごとに 1 回だけ組み立てる）"""
+        if not self.train_features:
+            # 特徴量リストが無い場合はバッチから組み立てる（従来の get_dummies 相当）
+            return FeatureEncoder.fit(df, numerical_features, WHIFF_CATEGORICAL_FEATURES, drop_first=True)
+        key = tuple(numerical_features)
+        encoder = self._encoders.get(key)
+        if encoder is None:
+            encoder = FeatureEncoder.from_columns(
+                self.train_features, numerical_features, WHIFF_CATEGORICAL_FEATURES
+            )
+            self._encoders[key] = encoder
+        return encoder
+
     async def predict_whiff(
         self,
         pitcher_name: str,
@@ -154,14 +176,14 @@ class PitcherPredictionService:
               COUNT(*) as pitch_count
 
             FROM `{settings.get_table_full_name('pitcher_batter_features_integrated')}`
-            WHERE pitcher_name = '{pitcher_name}'
-              {f"AND batter_stand = '{batter_stand}'" if batter_stand else ""}
-              {f"AND inning = {inning}" if inning else ""}
-              {f"AND order_thru = {order_thru}" if order_thru else ""}
-              {f"AND runner_situation = '{runner_situation}'" if runner_situation else ""}
-              {f"AND batter_level = '{batter_level}'" if batter_level else ""}
-              {f"AND count_situation = '{count_situation}'" if count_situation else ""}
-              {f"AND pitch_count_group = '{pitch_count_group}'" if pitch_count_group else ""}
+            WHERE pitcher_name = @pitcher_name
+              {"AND batter_stand = @batter_stand" if batter_stand else ""}
+              {"AND inning = @inning" if inning else ""}
+              {"AND order_thru = @order_thru" if order_thru else ""}
+              {"AND runner_situation = @runner_situation" if runner_situation else ""}
+              {"AND batter_level = @batter_level" if batter_level else ""}
+              {"AND count_situation = @count_situation" if count_situation else ""}
+              {"AND pitch_count_group = @pitch_count_group" if pitch_count_group else ""}
               AND is_whiff IS NOT NULL
             GROUP BY
               pitcher_name, batter_stand, inning, order_thru,
@@ -169,36 +191,31 @@ class PitcherPredictionService:
             HAVING COUNT(*) >= 5
             """
 
-            df_pitcher = self.client.query(query).to_dataframe()
+            params = [("pitcher_name", "STRING", pitcher_name)]
+            optional_filters = [
+                ("batter_stand", "STRING", batter_stand),
+                ("inning", "INT64", inning),
+                ("order_thru", "INT64", order_thru),
+                ("runner_situation", "STRING", runner_situation),
+                ("batter_level", "STRING", batter_level),
+                ("count_situation", "STRING", count_situation),
+                ("pitch_count_group", "STRING", pitch_count_group),
+            ]
+            params += [p for p in optional_filters if p[2]]
+
+            df_pitcher = await run_query(query, params)
 
             if df_pitcher.empty:
                 raise ValueError(f"指定された状況のデータが見つかりません: {pitcher_name}")
 
-            # 特徴量エンコーディング
-            categorical_features = [
-                'batter_stand', 'inning', 'order_thru',
-                'runner_situation', 'batter_level', 'pitch_name',
-                'count_situation', 'pitch_count_group'
-            ]
-
+            # 特徴量エンコーディング（学習時の列配置に直接書き込む）
             numerical_features = [col for col in df_pitcher.columns
-                                if col not in categorical_features + ['pitcher_name', 'actual_whiff_rate', 'pitch_count']]
-
-            df_encoded = pd.get_dummies(
-                df_pitcher[categorical_features + numerical_features],
-                columns=categorical_features,
-                drop_first=True
-            )
-
-            # トレーニング時の特徴量と合わせる
-            if self.train_features:
-                for col in self.train_features:
-                    if col not in df_encoded.columns:
-                        df_encoded[col] = 0
-                df_encoded = df_encoded[self.train_features]
+                                if col not in WHIFF_CATEGORICAL_FEATURES + ['pitcher_name', 'actual_whiff_rate', 'pitch_count']]
+            encoder = self._get_encoder(df_pitcher, numerical_features)
+            df_encoded = encoder.transform(df_pitcher)
 
-            # 予測実行
-            predicted_whiff_rate = self.model.predict(df_encoded)
+            # 予測実行（同時リクエストとまとめてワーカースレッドで predict）
+            predicted_whiff_rate = await get_inference_batcher("whiff").predict(self.model, df_encoded)
             df_pitcher['predicted_whiff_rate'] = predicted_whiff_rate
 
             # 球種別の実際のwhiff率を取得
@@ -208,11 +225,11 @@ class PitcherPredictionService:
               AVG(CAST(is_whiff AS FLOAT64)) as actual_whiff_rate,
               COUNT(*) as pitch_count
             FROM `{settings.get_table_full_name('pitcher_batter_features_integrated')}`
-            WHERE pitcher_name = '{pitcher_name}'
+            WHERE pitcher_name = @pitcher_name
               AND is_whiff IS NOT NULL
             GROUP BY pitch_name
             """
-            df_actual = self.client.query(query_actual).to_dataframe()
+            df_actual = await run_query(query_actual, [("pitcher_name", "STRING", pitcher_name)])
 
             # 球種ごとに予測値を平均化（複数の条件がある場合）
             df_pitcher_agg = df_pitcher.groupby('pitch_name').agg({
@@ -293,7 +310,7 @@ class PitcherPredictionService:
             WHERE pitcher_name IS NOT NULL
             ORDER BY pitcher_name
             """
-            df = self.client.query(query).to_dataframe()
+            df = await run_query(query)
             return df['pitcher_name'].tolist()
         except Exception as e:
             logger.error(f"❌ Failed to get pitchers: {str(e)}")
@@ -1,9 +1,9 @@
 import pandas as pd
 import numpy as np
-from google.cloud import bigquery
 import joblib
 import os
 from backend.app.config.settings import get_settings
+from backend.app.services.bigquery_service import run_query_sync
 
 
 settings = get_settings()
@@ -11,8 +11,6 @@ settings = get_settings()
 
 class PitcherSubstitutionMLService:
     def __init__(self):
-        self.client = bigquery.Client()
-
         # 1. Load the pre-trained ML model, scaler, and features
         model_dir = os.path.join(os.path.dirname(__file__), '..', 'models')
         self.model = joblib.load(os.path.join(model_dir, 'pitcher_fatigue_model.pkl'))
@@ -69,7 +67,7 @@ class PitcherSubstitutionMLService:
 
         try:
             print(f"Querying for: {pitcher_name}, season: {season}")
-            df = self.client.query(query).to_dataframe()
+            df = run_query_sync(query)
             print(f"Query returned {len(df)} rows")
 
             if df.empty:
@@ -81,7 +79,7 @@ class PitcherSubstitutionMLService:
                 AND pitcher_name LIKE '%{pitcher_name.split()[0]}%'
                 LIMIT 10
                 """
-                suggestions = self.client.query(check_query).to_dataframe()
+                suggestions = run_query_sync(check_query)
                 suggestion_list = suggestions['pitcher_name'].tolist() if not suggestions.empty else []
 
                 return {
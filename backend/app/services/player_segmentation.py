@@ -1,10 +1,10 @@
 from typing import Dict, List, Optional
-from google.cloud import bigquery
 import pandas as pd
 from sklearn.cluster import KMeans
 from sklearn.preprocessing import StandardScaler
 from backend.app.config.settings import get_settings
-from backend.app.services.model_registry_service import ModelRegistryService
+from backend.app.services.model_artifact_cache import get_model_artifact_cache
+from backend.app.services.bigquery_service import run_query
 import numpy as np
 import logging
 import httpx
@@ -17,11 +17,9 @@ class PlayerSegmentationService:
     """Service for player segmentation using k-means clustering."""
 
     def __init__(self):
-        self.client = bigquery.Client()
-
-        # Model Registry Service（ロード失敗時は None → fallback to fit）
+        # Model Registry のアーティファクトキャッシュ（ロード失敗時は None → fallback to fit）
         try:
-            self.model_registry = ModelRegistryService()
+            self.model_registry = get_model_artifact_cache()
         except Exception:
             self.model_registry = None
 
@@ -236,13 +234,16 @@ class PlayerSegmentationService:
             pa,
             ab
         FROM `{settings.get_table_full_name('fact_batting_stats_with_risp')}`
-        WHERE season = {season}
-            AND pa >= {min_pa}
+        WHERE season = @season
+            AND pa >= @min_pa
         ORDER BY ops DESC
         """
 
         try:
-            df = self.client.query(query).to_dataframe()
+            df = await run_query(query, [
+                ("season", "INT64", season),
+                ("min_pa", "INT64", min_pa),
+            ])
 
             if df.empty:
                 return {"error": True, "message": "No data found"}
@@ -352,13 +353,16 @@ class PlayerSegmentationService:
             ip,
             gs
         FROM `{settings.get_table_full_name('fact_pitching_stats_master')}`
-        WHERE season = {season}
-            AND gs > 0 AND ip > {min_ip} -- only starting pitchers
+        WHERE season = @season
+            AND gs > 0 AND ip > @min_ip -- only starting pitchers
         ORDER BY era ASC
         """
 
         try:
-            df = self.client.query(query).to_dataframe()
+            df = await run_query(query, [
+                ("season", "INT64", season),
+                ("min_ip", "INT64", min_ip),
+            ])
 
             if df.empty:
                 return {"error": True, "message": "No data found"}
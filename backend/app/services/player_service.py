@@ -5,10 +5,10 @@ from typing import Optional, List
 from google.cloud import bigquery
 from google.cloud.exceptions import GoogleCloudError
 import pandas as pd
-from functools import lru_cache
 from backend.app.api.schemas import * # For Development, add backend. path
+from .bigquery_service import run_query_sync
 from .base import (
-    get_bq_client, client, logger,
+    logger,
     PROJECT_ID, DATASET_ID,
     DIM_PLAYERS_MASTER_TABLE_ID,
 )
@@ -466,7 +466,6 @@ from .base import (
 #     return None
 
 
-@lru_cache(maxsize=128)
 def get_players_by_name(player_name: str) -> Optional[List[PlayerSearchItem]]:
     """
     選手名に基づいて選手情報を検索します。dim_players_master を使用し mlbid を主キーとする。
@@ -508,10 +507,9 @@ def get_players_by_name(player_name: str) -> Optional[List[PlayerSearchItem]]:
             p.last_name ASC, p.first_name ASC
         LIMIT 10000
     """
-    job_config = bigquery.QueryJobConfig(query_parameters=query_parameters)
 
     try:
-        df = client.query(query, job_config=job_config).to_dataframe()
+        df = run_query_sync(query, query_parameters)
 
         if 'mlbid' in df.columns:
             df['mlbid'] = df['mlbid'].replace({pd.NA: None, float('nan'): None}).astype(object)
@@ -544,23 +542,19 @@ def get_player_name_by_id(player_id: int) -> Optional[str]:
     """
     FanGraphs ID (idfg) または MLB ID を使用して選手のフルネームを取得します。
     """
-    client = get_bq_client()
     query = f"""
         SELECT full_name
         FROM `{PROJECT_ID}.{DATASET_ID}.{DIM_PLAYERS_MASTER_TABLE_ID}`
         WHERE mlbid = @player_id
         LIMIT 1
     """
-    job_config = bigquery.QueryJobConfig(
-        query_parameters=[
-            bigquery.ScalarQueryParameter("player_id", "INT64", player_id),
-        ]
-    )
+    query_params = [
+        bigquery.ScalarQueryParameter("player_id", "INT64", player_id),
+    ]
     try:
-        query_job = client.query(query, job_config=job_config)
-        result = query_job.result()
-        for row in result:
-            return row["full_name"]
+        df = run_query_sync(query, query_params)
+        if not df.empty:
+            return df["full_name"].iloc[0]
     except Exception as e:
         logger.error(f"Error fetching player name for ID {player_id}: {e}", exc_info=True)
         return None
@@ -0,0 +1,106 @@
+"""
+独立した複数の SELECT を 1 つの BigQuery ジョブにまとめる（クエリバンドル）。
+
+同じパラメータ（@mlbid / @season など）で引く小さな SELECT を別々のジョブで投げると、
+ジョブ 1 本ごとに起動・スケジューリング・結果取得の往復がかかる。ここでは
+usage_stats_service.get_dashboard_all と同じく、各 SELECT を
+
+    SELECT
+      ARRAY(SELECT AS STRUCT * FROM (<monthly の SELECT>) ORDER BY game_month) AS monthly,
+      ARRAY(SELECT AS STRUCT * FROM (<clutch の SELECT>) ORDER BY ...)        AS clutch,
+      ...
+
+の 1 行 1 列ずつに詰めて 1 回で実行し、列ごとに行 dict のリストへ戻す（demultiplex）。
+
+  - 並び順は ARRAY サブクエリ側の ORDER BY でのみ保証されるため、ORDER BY は sql に書かず order_by に分ける
+  - バンドル全体が失敗したら（1 テーブルの権限・スキーマ変更など）SELECT ごとに実行し直し、
+    失敗した SELECT だけを None にする（1 セクションの不具合でページ全体を空にしない）
+  - 1 行に全結果が載るため、数千行規模の SELECT（statcast の生投球など）は混ぜないこと
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .base import logger
+from .bigquery_service import QueryParam, run_query_sync
+
+
+@dataclass(frozen=True)
+class BundledSelect:
+    """バンドルする SELECT 1 本。name は結果の列名（SQL 識別子）になる。"""
+
+    name: str
+    sql: str                        # 単独でも実行できる SELECT（ORDER BY は含めない）
+    order_by: Optional[str] = None  # 出力列名で書いた ORDER BY 句の中身（例: "inning ASC"）
+
+
+def _order_clause(select: BundledSelect) -> str:
+    return f"ORDER BY {select.order_by}" if select.order_by else ""
+
+
+def build_bundle_sql(selects: Sequence[BundledSelect]) -> str:
+    """SELECT ごとに ARRAY<STRUCT> 列を 1 つ持つ、1 行だけのクエリを組み立てる。"""
+    names = [s.name for s in selects]
+    if not selects or len(set(names)) != len(names):
+        raise ValueError(f"Bundled selects need unique names: {names}")
+    columns = ",\n".join(
+        f"ARRAY(SELECT AS STRUCT * FROM ({s.sql}) {_order_clause(s)}) AS {s.name}"
+        for s in selects
+    )
+    return f"SELECT\n{columns}"
+
+
+def _standalone_sql(select: BundledSelect) -> str:
+    return f"SELECT * FROM ({select.sql}) {_order_clause(select)}"
+
+
+def _clean(value: Any) -> Any:
+    if isinstance(value, (float, np.floating)) and np.isnan(value):
+        return None
+    return value
+
+
+def _struct_rows(cell: Any) -> List[Dict[str, Any]]:
+    """ARRAY<STRUCT> のセル（list / ndarray of dict）を行 dict のリストにする。"""
+    if _clean(cell) is None:
+        return []
+    return [{k: _clean(v) for k, v in dict(row).items()} for row in cell]
+
+
+def run_bundle(
+    selects: Sequence[BundledSelect],
+    params: Optional[Sequence[QueryParam]] = None,
+    *,
+    fallback: bool = True,
+) -> Dict[str, Optional[List[Dict[str, Any]]]]:
+    """selects を 1 ジョブで実行し、name → 行 dict のリスト を返す。
+
+    バンドルが失敗した場合、fallback=True なら SELECT ごとに実行し、失敗したものは None にする。
+    fallback=False なら例外をそのまま投げる。
+    """
+    if not selects:
+        return {}
+    try:
+        records = run_query_sync(build_bundle_sql(selects), params).to_dict("records")
+        row = records[0] if records else {}
+        return {s.name: _struct_rows(row.get(s.name)) for s in selects}
+    except Exception as e:
+        if not fallback:
+            raise
+        logger.warning(
+            f"Bundled query failed ({', '.join(s.name for s in selects)}), "
+            f"falling back to per-section queries: {e}"
+        )
+
+    results: Dict[str, Optional[List[Dict[str, Any]]]] = {}
+    for select in selects:
+        try:
+            df = run_query_sync(_standalone_sql(select), params)
+            results[select.name] = [
+                {k: _clean(v) for k, v in rec.items()} for rec in df.to_dict("records")
+            ]
+        except Exception as e:
+            logger.warning(f"Bundled section '{select.name}' failed: {e}")
+            results[select.name] = None
+    return results
@@ -1,15 +1,22 @@
+import asyncio
 import chromadb
 from chromadb.config import Settings
 from sentence_transformers import SentenceTransformer
-import requests
-import json
 import os
-from typing import List, Dict, Any, Optional
+from typing import AsyncIterator, List, Dict, Any, Optional
 import logging
 from pathlib import Path
 
+from backend.app.services.embedding_cache import get_embedding_cache
+from backend.app.services.llm_gateway_service import acall_gemini_stream, call_gemini
+
 logger = logging.getLogger(__name__)
 
+LOCAL_EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+# SentenceTransformer.encode のバッチサイズと torch の CPU スレッド数（0 なら torch の既定）
+LOCAL_EMBEDDING_BATCH_SIZE = int(os.getenv("LOCAL_EMBEDDING_BATCH_SIZE", "64"))
+LOCAL_EMBEDDING_THREADS = int(os.getenv("LOCAL_EMBEDDING_THREADS", "0"))
+
 
 class MLBKnowledgeRAG:
     """MLB用語集をRAGで検索・回答するサービス"""
@@ -39,10 +46,29 @@ class MLBKnowledgeRAG:
 
         # Embeddingモデルの初期化（テキスト→ベクトル変換）
         logger.info("Loading sentence transformer model...")
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+        if LOCAL_EMBEDDING_THREADS > 0:
+            import torch
+            torch.set_num_threads(LOCAL_EMBEDDING_THREADS)
+        self.embedding_model = SentenceTransformer(LOCAL_EMBEDDING_MODEL)
         logger.info("MLBKnowledgeRAG initialized successfully")
     
 
+    def _encode_batch(self, texts: List[str]) -> List[List[float]]:
+        """SentenceTransformer でまとめて埋め込む（EmbeddingCache のミス分だけが来る）"""
+        return self.embedding_model.encode(
+            texts,
+            batch_size=LOCAL_EMBEDDING_BATCH_SIZE,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+        )
+
+    def embed(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """テキストを埋め込む。同じ文面は共有キャッシュから返す。"""
+        vectors = get_embedding_cache().get_many(
+            f"st:{LOCAL_EMBEDDING_MODEL}", texts, self._encode_batch
+        )
+        return [None if v is None else v.tolist() for v in vectors]
+
     def index_documents(self, documents: List[Dict[str, str]]) -> None:
         """
         Step 1: ドキュメントをベクトルDBにインデックス化
@@ -57,10 +83,13 @@ class MLBKnowledgeRAG:
         
         logger.info(f"Indexing {len(documents)} documents...")
 
-        for idx, doc in enumerate(documents):
+        # encode document texts to vectors（まとめて 1 回の encode）
+        embeddings = self.embed([doc["content"] for doc in documents])
+
+        for idx, (doc, embedding) in enumerate(zip(documents, embeddings)):
             try:
-                # encode document text to vector
-                embedding = self.embedding_model.encode(doc["content"]).tolist()
+                if embedding is None:
+                    raise ValueError("embedding failed")
 
                 # add document to vector DB
                 self.collection.add(
@@ -98,7 +127,9 @@ class MLBKnowledgeRAG:
         logger.info(f"Searching for: {query}")
 
         # encode query to vector
-        query_embedding = self.embedding_model.encode(query).tolist()
+        query_embedding = self.embed([query])[0]
+        if query_embedding is None:
+            return {"documents": [[]], "metadatas": [[]], "distances": [[]]}
 
         # ベクトルDBで類似検索
         results = self.collection.query(
@@ -109,48 +140,29 @@ class MLBKnowledgeRAG:
         logger.info(f"Found {len(results['documents'][0])} results")
         return results
     
-    def generate_answer_with_context(
-        self,
-        query: str,
-        gemini_api_key: str,
-        n_results: int = 3
-    ) -> Dict[str, Any]:
+    def _build_context(self, query: str, n_results: int) -> Optional[Dict[str, Any]]:
         """
-        Step 3: RAG 検索結果とLLMを組み合わせて回答生成
-        
-        Args:
-            query: ユーザーの質問
-            gemini_api_key: Gemini API キー
-            n_results: 検索する関連ドキュメント数
-            
+        Step 3-1 / 3-2: 関連ドキュメントを検索し、プロンプトと情報源を組み立てる
+
         Returns:
-            answer: LLMが生成した回答
-            sources: 情報源のリスト
-            context_used: 使用したコンテキスト
+            prompt / sources / context（関連ドキュメントが無ければ None）
         """
-        # Step 3-1: 関連ドキュメント検索
         search_results = self.search_knowledge(query, n_results)
 
         if not search_results['documents'][0]:
             logger.warning("No relevant documents found")
-            return {
-                "answer": "関連する情報が見つかりませんでした。",
-                "sources": [],
-                "context_used": []
-            }
-        
-        # Step 3-2: 検索結果をコンテキストとして結合
+            return None
+
         # 検索した複数のドキュメントを結合
         context_parts = []
         for idx, (doc, metadata) in enumerate(
             zip(search_results["documents"][0], search_results["metadatas"][0])
         ):
             context_parts.append(f"【情報源 {idx+1}: {metadata['source']}】\n{doc}")
-        
+
         context = "\n\n".join(context_parts)
         logger.debug(f"Context length: {len(context)} characters")
 
-        # Step 3-3: Gemini APIで回答生成
         prompt = f"""
         あなたはMLB野球の専門家です。以下の知識ベースを参考に、ユーザーの質問に日本語で回答してください。
 
@@ -167,51 +179,82 @@ class MLBKnowledgeRAG:
 
         【回答】
         """
+
+        # 情報源リストの作成（重複を除去）
+        sources = list(set(metadata["source"] for metadata in search_results["metadatas"][0]))
+        return {"prompt": prompt, "sources": sources, "context": context}
+
+    def generate_answer_with_context(
+        self,
+        query: str,
+        gemini_api_key: Optional[str] = None,
+        n_results: int = 3
+    ) -> Dict[str, Any]:
+        """
+        Step 3: RAG 検索結果とLLMを組み合わせて回答生成
         
-        GEMINI_API_URL = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent?key={gemini_api_key}"
-        headers = {"Content-Type": "application/json"}
-        payload = {
-            "contents": [{"parts": [{"text": prompt}]}]
-        }
-        
-        try:
-            response = requests.post(
-                GEMINI_API_URL, 
-                headers=headers, 
-                data=json.dumps(payload),
-                timeout=30
-            )
-            response.raise_for_status()
-            result = response.json()
-
-            if result.get("candidates"):
-                generated_text = result["candidates"][0]["content"]["parts"][0]["text"]
-                
-                # 情報源リストの作成
-                sources = [
-                    metadata["source"] 
-                    for metadata in search_results["metadatas"][0]
-                ]
-                
-                return {
-                    "answer": generated_text,
-                    "sources": list(set(sources)),  # 重複を除去
-                    "context_used": context
-                }
-            else:
-                logger.warning("No candidates in Gemini response")
-                return {
-                    "answer": "回答を生成できませんでした。",
-                    "sources": [],
-                    "context_used": context
-                }
-        
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Gemini API error: {e}", exc_info=True)
+        Args:
+            query: ユーザーの質問
+            gemini_api_key: 互換のため残している（接続・APIキーは llm_gateway の共有クライアントを使う）
+            n_results: 検索する関連ドキュメント数
+            
+        Returns:
+            answer: LLMが生成した回答
+            sources: 情報源のリスト
+            context_used: 使用したコンテキスト
+        """
+        built = self._build_context(query, n_results)
+        if built is None:
             return {
-                "answer": f"APIエラーが発生しました: {str(e)}",
+                "answer": "関連する情報が見つかりませんでした。",
                 "sources": [],
-                "context_used": context
+                "context_used": []
             }
-        
-        
+
+        # Step 3-3: Gemini で回答生成（接続プール・リトライ・コスト記録は gateway に集約）
+        generated_text = call_gemini(prompt=built["prompt"], feature="rag_answer", user_query=query)
+        if not generated_text:
+            return {
+                "answer": "回答を生成できませんでした。",
+                "sources": [],
+                "context_used": built["context"]
+            }
+
+        return {
+            "answer": generated_text,
+            "sources": built["sources"],
+            "context_used": built["context"]
+        }
+
+    async def stream_answer_with_context(
+        self,
+        query: str,
+        n_results: int = 3
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        generate_answer_with_context のストリーミング版（stream_json_events に渡すイベントを yield）
+
+        Yields:
+            {"type": "sources", "sources": [...]}
+            {"type": "token", "content": 断片}
+            {"type": "final_answer", "answer": 回答全文, "sources": [...]}
+        """
+        # ベクトル検索・埋め込みは同期処理なのでスレッドで行う
+        built = await asyncio.to_thread(self._build_context, query, n_results)
+        if built is None:
+            yield {"type": "final_answer", "answer": "関連する情報が見つかりませんでした。", "sources": []}
+            return
+
+        yield {"type": "sources", "sources": built["sources"]}
+
+        parts = []
+        async for text in acall_gemini_stream(prompt=built["prompt"], feature="rag_answer", user_query=query):
+            parts.append(text)
+            yield {"type": "token", "content": text}
+
+        answer = "".join(parts)
+        yield {
+            "type": "final_answer",
+            "answer": answer or "回答を生成できませんでした。",
+            "sources": built["sources"] if answer else [],
+        }
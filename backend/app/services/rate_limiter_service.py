@@ -0,0 +1,253 @@
+"""
+レートリミットのバックエンド（GCRA: Generic Cell Rate Algorithm）。
+
+キーごとに「理論上の次回到着時刻（TAT）」を 1 つだけ持つ。rate 件 / period 秒 の制限なら
+1 件あたり period / rate 秒ずつ TAT を進め、TAT - period が現在時刻を超えたら拒否する。
+固定ウィンドウと違って境界直後のバースト（最大 2 倍）が起きず、保存する状態もキーあたり 1 値で済む。
+
+  - redis:  Lua スクリプトで複数キーを 1 往復・アトミックに判定する。時刻は Redis の TIME を使うので
+            Cloud Run のインスタンス数に関係なく制限が共有される。
+  - memory: 同じアルゴリズムのプロセス内版。Redis 未設定時、または Redis 障害中のフォールバック。
+
+check() は全キーが許容範囲のときだけ消費する（global は通ったが session で弾かれた、という
+リクエストが global 枠だけ消費することはない）。charge() は無条件に消費する。LLM トークンのように
+コストが応答後にしか分からないものは charge() で後から計上し、次のリクエストの check()（cost=0）で
+超過分を返済し終えるまで弾く。
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+import redis
+
+from backend.app.config.settings import get_settings
+from backend.app.utils.structured_logger import get_logger
+
+logger = get_logger("rate_limiter")
+
+RATE_LIMIT_KEY_PREFIX = "ratelimit:v2:"
+GLOBAL_KEY = "global"
+TOKENS_KEY_PREFIX = "tokens:"
+# 1 回の check で掃除する期限切れキーの上限（ホットパスを O(1) に保つ）
+_SWEEP_BATCH = 64
+
+# KEYS[i] ごとに ARGV[3i-2]=1 件あたりの間隔(ms) ARGV[3i-1]=period(ms) ARGV[3i]=cost、末尾 ARGV=mode
+_GCRA_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local mode = ARGV[#ARGV]
+local new_tats = {}
+for i, key in ipairs(KEYS) do
+  local interval = tonumber(ARGV[3 * i - 2])
+  local period = tonumber(ARGV[3 * i - 1])
+  local cost = tonumber(ARGV[3 * i])
+  local tat = tonumber(redis.call('GET', key) or now)
+  if tat < now then tat = now end
+  local new_tat = tat + interval * cost
+  if mode == 'check' and new_tat - period > now then
+    return {0, i, math.ceil(new_tat - period - now)}
+  end
+  new_tats[i] = new_tat
+end
+for i, key in ipairs(KEYS) do
+  local ttl = math.ceil(new_tats[i] - now)
+  if ttl > 0 then
+    redis.call('SET', key, string.format('%.3f', new_tats[i]), 'PX', ttl)
+  end
+end
+return {1, 0, 0}
+"""
+
+
+def session_key(identity: str) -> str:
+    return f"session:{identity}"
+
+
+def session_tokens_key(identity: str) -> str:
+    return f"{TOKENS_KEY_PREFIX}{identity}"
+
+
+@dataclass(frozen=True)
+class Limit:
+    """1 つの制限。rate 単位 / period 秒。cost はこのリクエストで消費する量。"""
+    key: str
+    rate: float
+    period: float = 60.0
+    cost: float = 1.0
+
+    @property
+    def interval(self) -> float:
+        return self.period / self.rate
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    allowed: bool
+    retry_after: float = 0.0
+    # 拒否の原因になった Limit（allowed=True なら None）
+    rejected: Optional[Limit] = None
+
+
+ALLOWED = RateLimitResult(allowed=True)
+
+
+class InMemoryGCRA:
+    """プロセス内 GCRA。
+
+    イベントループ上から呼ぶ前提でロックは取らない（await を挟まないので判定と更新の間に
+    他のリクエストが割り込まない）。別スレッドからの charge と競合した場合に 1 件分ずれうるが、
+    濫用防止の目的では許容する。
+    """
+
+    def __init__(self):
+        # key -> TAT（monotonic 秒）。更新順に並べ、先頭から期限切れを少しずつ捨てる
+        self._tats: "OrderedDict[str, float]" = OrderedDict()
+
+    def check(self, limits: Sequence[Limit]) -> RateLimitResult:
+        now = time.monotonic()
+        new_tats: List[float] = []
+        for limit in limits:
+            tat = max(self._tats.get(limit.key, now), now)
+            new_tat = tat + limit.interval * limit.cost
+            if new_tat - limit.period > now:
+                return RateLimitResult(False, new_tat - limit.period - now, limit)
+            new_tats.append(new_tat)
+        for limit, new_tat in zip(limits, new_tats):
+            self._store(limit.key, new_tat)
+        self._sweep(now)
+        return ALLOWED
+
+    def charge(self, limit: Limit) -> None:
+        now = time.monotonic()
+        tat = max(self._tats.get(limit.key, now), now)
+        self._store(limit.key, tat + limit.interval * limit.cost)
+
+    def _store(self, key: str, tat: float) -> None:
+        self._tats[key] = tat
+        self._tats.move_to_end(key)
+
+    def _sweep(self, now: float) -> None:
+        for _ in range(_SWEEP_BATCH):
+            if not self._tats:
+                return
+            key, tat = next(iter(self._tats.items()))
+            if tat > now:
+                return
+            del self._tats[key]
+
+    def __len__(self) -> int:
+        return len(self._tats)
+
+
+class RedisGCRA:
+    """Redis + Lua の GCRA。接続エラーは呼び出し側（RateLimiter）に送出する。"""
+
+    def __init__(self, redis_client: redis.Redis):
+        self._redis = redis_client
+        self._script = redis_client.register_script(_GCRA_LUA)
+
+    def _run(self, limits: Sequence[Limit], mode: str) -> RateLimitResult:
+        args: List[float] = []
+        for limit in limits:
+            args.extend((limit.interval * 1000.0, limit.period * 1000.0, limit.cost))
+        allowed, index, retry_ms = self._script(
+            keys=[RATE_LIMIT_KEY_PREFIX + limit.key for limit in limits],
+            args=args + [mode],
+        )
+        if allowed:
+            return ALLOWED
+        return RateLimitResult(False, int(retry_ms) / 1000.0, limits[int(index) - 1])
+
+    def check(self, limits: Sequence[Limit]) -> RateLimitResult:
+        return self._run(limits, "check")
+
+    def charge(self, limit: Limit) -> None:
+        self._run([limit], "charge")
+
+
+class RateLimiter:
+    """バックエンドの選択と Redis 障害時のフォールバックを受け持つ窓口。"""
+
+    # Redis に繋がらなかった後、再接続を試みるまでの待ち（秒）
+    REDIS_RETRY_INTERVAL_SEC = 30
+
+    def __init__(self, backend: str = "memory", redis_client: Optional[redis.Redis] = None):
+        self.memory = InMemoryGCRA()
+        self.remote: Optional[RedisGCRA] = None
+        self._remote_disabled_until = 0.0
+        if backend == "redis":
+            self.remote = RedisGCRA(redis_client or _default_redis_client())
+        elif backend != "memory":
+            raise ValueError(f"Unknown rate limit backend: {backend}")
+
+    @property
+    def backend(self) -> str:
+        return "redis" if self.remote is not None else "memory"
+
+    def _remote_available(self) -> bool:
+        return self.remote is not None and time.monotonic() >= self._remote_disabled_until
+
+    def _remote_failed(self, e: Exception) -> None:
+        self._remote_disabled_until = time.monotonic() + self.REDIS_RETRY_INTERVAL_SEC
+        logger.warning(f"Rate limit backend (Redis) unavailable, falling back to in-memory: {e}")
+
+    def check(self, limits: Sequence[Limit]) -> RateLimitResult:
+        """同期版。Redis 利用時はブロッキング I/O になるためワーカースレッドから呼ぶ。"""
+        if self._remote_available():
+            try:
+                return self.remote.check(limits)
+            except redis.exceptions.RedisError as e:
+                self._remote_failed(e)
+        return self.memory.check(limits)
+
+    async def acheck(self, limits: Sequence[Limit]) -> RateLimitResult:
+        """ミドルウェア用。メモリ判定はイベントループ上でそのまま、Redis はスレッドに逃がす。"""
+        if self._remote_available():
+            try:
+                return await asyncio.to_thread(self.remote.check, limits)
+            except redis.exceptions.RedisError as e:
+                self._remote_failed(e)
+        return self.memory.check(limits)
+
+    def charge(self, limit: Limit) -> None:
+        """後払いのコストを計上する（best-effort）。イベントループ上から呼ばれた場合も塞がない。"""
+        if not self._remote_available():
+            self.memory.charge(limit)
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._charge_remote(limit)
+        else:
+            loop.run_in_executor(None, self._charge_remote, limit)
+
+    def _charge_remote(self, limit: Limit) -> None:
+        try:
+            self.remote.charge(limit)
+        except redis.exceptions.RedisError as e:
+            self._remote_failed(e)
+            self.memory.charge(limit)
+
+
+def _default_redis_client() -> redis.Redis:
+    settings = get_settings()
+    return redis.Redis(
+        host=settings.redis_host,
+        port=settings.redis_port,
+        password=settings.redis_password,
+        socket_connect_timeout=0.2,
+        socket_timeout=0.2,
+    )
+
+
+_rate_limiter: Optional[RateLimiter] = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    """共有 RateLimiter を返す（シングルトン）。バックエンドは settings.rate_limit_backend で選ぶ。"""
+    global _rate_limiter
+    if _rate_limiter is None:
+        _rate_limiter = RateLimiter(backend=get_settings().rate_limit_backend)
+    return _rate_limiter
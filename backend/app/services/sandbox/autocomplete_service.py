@@ -19,7 +19,6 @@ from typing import Dict, List, Optional, Tuple
 import pandas as pd
 
 from backend.app.services.base import (
-    client,
     PROJECT_ID,
     DATASET_ID,
     DIM_PLAYERS_MASTER_TABLE_ID,
@@ -29,6 +28,8 @@ from backend.app.services.base import (
     MART_BATTER_SEASON_STATS_TABLE_ID,
     MART_PITCHER_SEASON_STATS_TABLE_ID,
 )
+from backend.app.services.bigquery_service import run_query_arrow_sync
+from backend.app.utils.columnar import to_records
 from backend.app.utils.structured_logger import get_logger
 
 logger = logging.getLogger(__name__)
@@ -184,11 +185,12 @@ class AutocompleteService:
     def build(self) -> None:
         sql = self._build_load_sql()
         started = time.monotonic()
-        df = client.query(sql).to_dataframe()
+        # 全選手分を Storage Read API の Arrow バッチで受け取り、行 dict へ一括変換する
+        rows = to_records(run_query_arrow_sync(sql))
         elapsed_query = time.monotonic() - started
 
         loaded = 0
-        for _, row in df.iterrows():
+        for row in rows:
             entry = self._row_to_entry(row)
             if entry is None:
                 continue
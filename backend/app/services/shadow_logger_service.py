@@ -3,13 +3,12 @@ Shadow Comparison Logger Service
 シャドー評価のペア比較ログを BigQuery に非同期書き込みするサービス。
 
 設計方針:
-- llm_logger_service.py と同じ「別スレッド + daemon=True」パターンで非同期書き込み
+- llm_logger_service.py と同じく共有の書き込みキュー（bq_log_writer）経由でバッチ書き込み
 - 例外は内部で握り潰し、本番フローには絶対に伝播させない（シャドー評価の鉄則）
 - JSON カラム（active_output / shadow_output）には dict を json.dumps で文字列化して渡す
 """
 
 import uuid
-import threading
 from datetime import datetime, timezone
 from typing import Optional, Dict, Any
 from google.cloud import bigquery
@@ -17,6 +16,7 @@ import json
 import logging
 
 from backend.app.config.settings import get_settings
+from backend.app.services.bq_log_writer import get_bq_log_writer
 from backend.app.middleware.request_context import get_trace_id
 
 logger = logging.getLogger(__name__)
@@ -115,28 +115,16 @@ class ShadowLoggerService:
             logger.warning(f"Failed to initialize ShadowLoggerService: {e}")
 
     def log(self, entry: ShadowComparisonEntry):
-        """ペア比較ログを別スレッドで書き込み（メイン応答をブロックしない）"""
+        """ペア比較ログを書き込みキューに積む（メイン応答をブロックしない）"""
         if not self.client:
             logger.warning("ShadowLoggerService not initialized, skipping log")
             return
 
-        thread = threading.Thread(
-            target=self._write_to_bigquery,
-            args=(entry.to_dict(),),
-            daemon=True,
-        )
-        thread.start()
-
-    def _write_to_bigquery(self, row_data: Dict[str, Any]):
         try:
-            errors = self.client.insert_rows_json(FULL_TABLE_ID, [row_data])
-            if errors:
-                logger.error(f"Shadow comparison insert errors: {errors}")
-            else:
-                logger.debug(f"Shadow comparison written: {row_data['comparison_id']}")
+            get_bq_log_writer().enqueue(self.client, FULL_TABLE_ID, [entry.to_dict()])
         except Exception as e:
             # ロギング失敗はアプリを止めない（シャドー評価の鉄則）
-            logger.error(f"Failed to write shadow comparison: {e}")
+            logger.error(f"Failed to queue shadow comparison: {e}")
 
 
 # Singleton
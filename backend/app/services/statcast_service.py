@@ -6,10 +6,10 @@ from google.cloud import bigquery
 from google.cloud.exceptions import GoogleCloudError
 import pandas as pd
 import numpy as np
-from functools import lru_cache
 from backend.app.api.schemas import * 
+from .bigquery_service import run_query_sync
 from .base import (
-    get_bq_client, client, logger,
+    logger,
     PROJECT_ID, DATASET_ID,
 )
 from .query_parts import CORE_SPLITS_METRICS_QUERY
@@ -121,7 +121,6 @@ from .query_parts import CORE_SPLITS_METRICS_QUERY
 #         return None
 
 # Function to get Statcast data for a batter
-@lru_cache(maxsize=128)
 def get_batter_splits_stats_advanced(
     batter_id: int, 
     season: Optional[int],
@@ -221,18 +220,16 @@ def get_batter_splits_stats_advanced(
         {group_by_clause}
         {order_by_clause}
     """
-    job_config = bigquery.QueryJobConfig(
-        query_parameters=[
-            bigquery.ScalarQueryParameter("batter_id", "INT64", batter_id),
-            *([] if season is None else [bigquery.ScalarQueryParameter("season", "INT64", season)]),
-            *([] if innings is None else [bigquery.ArrayQueryParameter("innings", "INT64", innings)]),
-            *([] if strikes is None else [bigquery.ScalarQueryParameter("strikes", "INT64", strikes)]),
-            *([] if balls is None else [bigquery.ScalarQueryParameter("balls", "INT64", balls)]),
-            *([] if p_throws is None else [bigquery.ScalarQueryParameter("p_throws", "STRING", p_throws)]),
-            *([] if runners is None else [bigquery.ArrayQueryParameter("runners", "STRING", runners)]),
-            *([] if pitch_types is None else [bigquery.ArrayQueryParameter("pitch_types", "STRING", pitch_types)]),
-        ]
-    )
+    query_params = [
+        bigquery.ScalarQueryParameter("batter_id", "INT64", batter_id),
+        *([] if season is None else [bigquery.ScalarQueryParameter("season", "INT64", season)]),
+        *([] if innings is None else [bigquery.ArrayQueryParameter("innings", "INT64", innings)]),
+        *([] if strikes is None else [bigquery.ScalarQueryParameter("strikes", "INT64", strikes)]),
+        *([] if balls is None else [bigquery.ScalarQueryParameter("balls", "INT64", balls)]),
+        *([] if p_throws is None else [bigquery.ScalarQueryParameter("p_throws", "STRING", p_throws)]),
+        *([] if runners is None else [bigquery.ArrayQueryParameter("runners", "STRING", runners)]),
+        *([] if pitch_types is None else [bigquery.ArrayQueryParameter("pitch_types", "STRING", pitch_types)]),
+    ]
 
     # # print() デバッグログはそのまま残す
     # print(f"DEBUG: Executing BigQuery query for get_batter_statcast_data (player_service):")
@@ -245,7 +242,7 @@ def get_batter_splits_stats_advanced(
     # # ★★★ ここまで ★★★
 
     try:
-        df = client.query(query, job_config=job_config).to_dataframe()
+        df = run_query_sync(query, query_params)
 
         # # ★★★ 修正箇所: logger.debug を print() に一時的に置き換え ★★★
         # print(f"DEBUG: Statcast DataFrame fetched for batter_id {batter_id}, season {season}. Shape: {df.shape}")
@@ -1,8 +1,8 @@
 from typing import Dict, List, Optional
-from google.cloud import bigquery
 import pandas as pd
 import numpy as np
 from backend.app.config.settings import get_settings
+from backend.app.services.bigquery_service import run_query_sync
 
 
 settings = get_settings()
@@ -11,9 +11,6 @@ settings = get_settings()
 class StatisticalAnalysisService:
     """Service for performing statistical analysis on baseball data."""
 
-    def __init__(self):
-        self.client = bigquery.Client()
-    
     def predict_winrate_from_ops(
             self, 
             team_ops: float,
@@ -50,7 +47,7 @@ class StatisticalAnalysisService:
         """
 
         try:
-            result = self.client.query(query).to_dataframe()
+            result = run_query_sync(query)
             predicted_win_rate = result['predicted_winrate'].values[0]
             expected_wins = result['expected_wins_per_season'].values[0]
 
@@ -64,7 +61,7 @@ class StatisticalAnalysisService:
                 MODEL `{settings.get_table_full_name('predict_winrate_from_ops_multivariate')}`
             )
             """
-            eval_result = self.client.query(eval_query).to_dataframe()
+            eval_result = run_query_sync(eval_query)
             r2_score = eval_result['r2_score'].values[0]
             mse = eval_result['mean_squared_error'].values[0]
             mae = eval_result['mean_absolute_error'].values[0]
@@ -147,7 +144,7 @@ class StatisticalAnalysisService:
         ORDER BY input_ops
         """
 
-        result = self.client.query(query).to_dataframe()
+        result = run_query_sync(query)
 
         return [
             {
@@ -177,7 +174,7 @@ class StatisticalAnalysisService:
             MODEL `{settings.get_table_full_name('predict_winrate_from_ops_multivariate')}`
         )
         """
-        eval_result = self.client.query(eval_query).to_dataframe()
+        eval_result = run_query_sync(eval_query)
 
         # Regression coefficients
         weights_query = f"""
@@ -189,7 +186,7 @@ class StatisticalAnalysisService:
         )
         WHERE processed_input != '__INTERCEPT__'
         """
-        weights_result = self.client.query(weights_query).to_dataframe()
+        weights_result = run_query_sync(weights_query)
 
         # Intercept
         intercept_query = f"""
@@ -200,7 +197,7 @@ class StatisticalAnalysisService:
         )
         WHERE processed_input = '__INTERCEPT__'
         """
-        intercept_result = self.client.query(intercept_query).to_dataframe()
+        intercept_result = run_query_sync(intercept_query)
 
         # processed_inputで係数を特定（インデックスではなく名前でアクセス）
         weights_dict = dict(zip(weights_result['processed_input'], weights_result['weight']))
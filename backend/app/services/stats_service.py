@@ -7,7 +7,6 @@ from google.cloud import bigquery
 from google.cloud.exceptions import GoogleCloudError
 import pandas as pd
 import numpy as np
-from functools import lru_cache
 from backend.app.api.schemas import ( # For Development, add backend. path
     PlayerMonthlyOffensiveStats,
     PlayerBatterPerformanceAtRISPMonthly,
@@ -16,8 +15,9 @@ from backend.app.api.schemas import ( # For Development, add backend. path
     PlayerPitchingSeasonStats,
     PlayerBattingSplitStats
 )
+from .bigquery_service import run_query_sync
 from .base import (
-    get_bq_client, client, logger,
+    logger,
     PROJECT_ID, DATASET_ID,
     BATTING_STATS_TABLE_ID,
     BATTING_OFFENSIVE_STATS_TABLE_ID,
@@ -29,7 +29,6 @@ from .base import (
 )
 
 
-@lru_cache(maxsize=128)
 def get_season_batting_stats(
     player_id: int,
     season: Optional[int],  # Allow None for all seasons
@@ -74,18 +73,16 @@ def get_season_batting_stats(
         ORDER BY
             season ASC
     """
-    
-    job_config = bigquery.QueryJobConfig(query_parameters=query_parameters)
 
     # ★★★ デバッグログの追加 ★★★
     logger.debug(f"Executing BigQuery query for season batting stats:")
     logger.debug(f"Player ID: {player_id}, Season: {season}, Metrics: {metrics}")
     logger.debug(f"Generated SQL Query: {query}")
-    logger.debug(f"Parameters: {job_config.query_parameters}")
+    logger.debug(f"Parameters: {query_parameters}")
     # ★★★ デバッグログの追加ここまで ★★★
 
     try:
-        df = client.query(query, job_config=job_config).to_dataframe()
+        df = run_query_sync(query, query_parameters)
 
         # ★★★ デバッグログの追加: データフレームの内容を確認 ★★★
         logger.debug(f"DataFrame fetched. Shape: {df.shape}")
@@ -111,7 +108,6 @@ def get_season_batting_stats(
 
 
 # function to get batter monthly offensive stats
-@lru_cache(maxsize=128)
 def get_monthly_batting_stats(
     player_id: int,
     season: int, 
@@ -142,18 +138,16 @@ def get_monthly_batting_stats(
         ORDER BY
             game_year ASC, game_month ASC
     """
-    job_config = bigquery.QueryJobConfig(
-        query_parameters=[
-            bigquery.ScalarQueryParameter("player_id", "INT64", player_id),
-            bigquery.ScalarQueryParameter("season", "INT64", season),
-        ]
-    )
+    query_params = [
+        bigquery.ScalarQueryParameter("player_id", "INT64", player_id),
+        bigquery.ScalarQueryParameter("season", "INT64", season),
+    ]
 
     # Debugging
     logger.debug(f"Executing BigQuery query for batter monthly batting stats: {query}")
 
     try:
-        df = client.query(query, job_config=job_config).to_dataframe()
+        df = run_query_sync(query, query_params)
 
         # Debugging
         logger.debug(f"Batter Monthly Batting Stats DataFrame fetched. Shape: {df.shape} First row: {df.iloc[0] if not df.empty else 'N/A'}")
@@ -183,7 +177,6 @@ def get_monthly_batting_stats(
 
 
 # function to get season batting splits stats
-@lru_cache(maxsize=128)
 def get_batter_season_splits_stats(
     player_id: int,
     season: Optional[int],
@@ -233,10 +226,9 @@ def get_batter_season_splits_stats(
         ORDER BY
             game_year ASC
     """
-    job_config = bigquery.QueryJobConfig(query_parameters=query_parameters)
 
     try:
-        df = client.query(query, job_config=job_config).to_dataframe()
+        df = run_query_sync(query, query_parameters)
         if df.empty:
             print(f"DEBUG: No batting splits stats found for player {player_id} in season {season}")
             return []
@@ -263,7 +255,6 @@ def get_batter_season_splits_stats(
 
 # NOTE: This will be deprecated
 # function to get batter monthly offensive stats
-@lru_cache(maxsize=128)
 def get_batter_monthly_offensive_stats(
     player_id: int,
     season: int, 
@@ -295,15 +286,13 @@ def get_batter_monthly_offensive_stats(
         ORDER BY
             game_year ASC, game_month ASC
     """
-    job_config = bigquery.QueryJobConfig(
-        query_parameters=[
-            bigquery.ScalarQueryParameter("player_id", "INT64", player_id),
-            bigquery.ScalarQueryParameter("season", "INT64", season),
-        ]
-    )
+    query_params = [
+        bigquery.ScalarQueryParameter("player_id", "INT64", player_id),
+        bigquery.ScalarQueryParameter("season", "INT64", season),
+    ]
 
     try:
-        df = client.query(query, job_config=job_config).to_dataframe()
+        df = run_query_sync(query, query_params)
         if df.empty:
             print(f"DEBUG: No monthly offensive stats found for player {player_id} in season {season}")
             return []
@@ -328,7 +317,6 @@ def get_batter_monthly_offensive_stats(
         return None
 
 
-@lru_cache(maxsize=128)
 def get_season_pitching_stats(
     player_id: int,
     season: Optional[int],  # Allow None for all seasons
@@ -372,18 +360,16 @@ def get_season_pitching_stats(
         ORDER BY
             season ASC
     """
-    
-    job_config = bigquery.QueryJobConfig(query_parameters=query_parameters)
 
     # ★★★ デバッグログの追加 ★★★
     logger.debug(f"Executing BigQuery query for season pitching stats:")
     logger.debug(f"Player ID: {player_id}, Season: {season}, Metrics: {metrics}")
     logger.debug(f"Generated SQL Query: {query}")
-    logger.debug(f"Parameters: {job_config.query_parameters}")
+    logger.debug(f"Parameters: {query_parameters}")
     # ★★★ デバッグログの追加ここまで ★★★
 
     try:
-        df = client.query(query, job_config=job_config).to_dataframe()
+        df = run_query_sync(query, query_parameters)
 
         # ★★★ デバッグログの追加: データフレームの内容を確認 ★★★
         logger.debug(f"DataFrame fetched. Shape: {df.shape}")
@@ -454,7 +440,7 @@ def get_season_pitching_stats(
 #     # # ★★★ デバッグログの追加 ★★★
 #     # logger.debug(f"Executing BigQuery query for strike count performance:")
 #     # logger.debug(f"Query: {query}")
-#     # logger.debug(f"Parameters: {job_config.query_parameters}")
+#     # logger.debug(f"Parameters: {query_parameters}")
 #     # # ★★★ ここまで ★★★
 
 #     try:
@@ -497,7 +483,6 @@ def get_season_pitching_stats(
 
 
 # Function to get batter performance at RISP
-@lru_cache(maxsize=128)
 def get_batter_performance_at_risp(
     player_id: int, 
     season: int,
@@ -531,21 +516,19 @@ def get_batter_performance_at_risp(
         ORDER BY
             game_year ASC, game_month ASC
     """
-    job_config = bigquery.QueryJobConfig(
-        query_parameters=[
-            bigquery.ScalarQueryParameter("player_id", "INT64", player_id),
-            *([] if season is None else [bigquery.ScalarQueryParameter("season", "INT64", season)])
-        ]
-    )
+    query_params = [
+        bigquery.ScalarQueryParameter("player_id", "INT64", player_id),
+        *([] if season is None else [bigquery.ScalarQueryParameter("season", "INT64", season)])
+    ]
 
     # # ★★★ デバッグログの追加 ★★★
     # logger.debug(f"Executing BigQuery query for RISP performance:")
     # logger.debug(f"Query: {query}")
-    # logger.debug(f"Parameters: {job_config.query_parameters}")
+    # logger.debug(f"Parameters: {query_parameters}")
     # # ★★★ デバッグログの追加ここまで ★★★
 
     try:
-        df = client.query(query, job_config=job_config).to_dataframe()
+        df = run_query_sync(query, query_params)
 
         # # ★★★ デバッグログの追加: データフレームの内容を確認 ★★★
         # logger.debug(f"RISP DataFrame fetched. Shape: {df.shape}")
@@ -630,7 +613,7 @@ def get_batter_performance_at_risp(
 #     # Debugging: log the query and parameters
 #     logger.debug(f"Executing BigQuery query for batter performance flags for {days} days.")
 #     logger.debug(f"Query: {query}")
-#     logger.debug(f"Parameters: {job_config.query_parameters}")
+#     logger.debug(f"Parameters: {query_parameters}")
 
 
 #     try:
@@ -764,7 +747,7 @@ def get_batter_performance_at_risp(
 #     """
     
 #     try:
-#         df = client.query(query).to_dataframe()
+#         df = run_query_sync(query)
 
 #         # Debugging: log the DataFrame shape and columns
 #         logger.debug(f"DEBUG: Fetched latest game date DataFrame shape: {df.shape}, columns: {df.columns.tolist()}")
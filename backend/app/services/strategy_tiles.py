@@ -0,0 +1,443 @@
+"""
+対戦戦略レポート用の事前計算タイル（ヒートゾーン / 打球方向 / カウント別配球）。
+
+heat-zone / spray / count-matrix は、リクエストのたびに statcast_master から
+選手 × シーズンの全投球をスキャンして集計していた。ここでは日次バッチ
+（POST /internal/strategy-report/tiles/build）がシーズン全選手分を種類ごとに 1 クエリで集計し、
+選手 × シーズンごとの固定長バイナリ（タイル）としてストアに保存する。
+
+  タイル = ヘッダ（magic + 種類 ID）+ 固定 shape の配列を順に並べたバイト列
+    - heat_zone:    xwoba float16[5,5]（NaN = サンプルなし）+ 件数 uint16[5,5]        … 105 バイト
+    - spray:        [PULL, CENTER, OPPO] × [打球数, 総塁打] uint16[3,2]              …  17 バイト
+    - count_matrix: 12 カウントの最頻球種 S3[12] + [最頻球種の球数, 総球数] uint16[12,2] …  89 バイト
+
+  率（xwOBA）は float16 で持つ（0〜1 付近で小数 3 桁の表示には十分。1 を超える値は ±0.001 程度の誤差）。
+  件数は uint16（上限 65535 で飽和）。
+
+保存先は STRATEGY_TILE_BACKEND=local（STRATEGY_TILE_DIR 配下のファイル）または gcs
+（settings.gcs_bucket_name の STRATEGY_TILE_GCS_PREFIX 配下）。読み出しはプロセス内 LRU を前段に置く。
+タイルが無い選手（バッチ後に初登場・バッチ未実行）は従来どおりその場で集計し、同じ形式のタイルにして返す
+（集計 SQL はバッチと共通。選手で絞るかどうかだけが違う）。
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from backend.app.config.settings import get_settings
+from backend.app.services.bigquery_service import run_query
+from backend.app.services.cache_service import TTLLRUCache
+from backend.app.utils.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+STRATEGY_TILE_BACKEND = os.getenv("STRATEGY_TILE_BACKEND", "local")
+STRATEGY_TILE_DIR = os.getenv("STRATEGY_TILE_DIR", "/tmp/diamond-lens/strategy_tiles")
+STRATEGY_TILE_GCS_PREFIX = os.getenv("STRATEGY_TILE_GCS_PREFIX", "strategy_tiles")
+STRATEGY_TILE_CACHE_MAX_ENTRIES = int(os.getenv("STRATEGY_TILE_CACHE_MAX_ENTRIES", "20000"))
+# 事前計算タイルは日次で作り直すため、それまでの間はプロセス内・ブラウザ側で使い回す
+STRATEGY_TILE_TTL_SEC = int(os.getenv("STRATEGY_TILE_TTL_SEC", "21600"))
+# その場集計のタイルはバッチで置き換わるまでの短期キャッシュ
+STRATEGY_TILE_ON_DEMAND_TTL_SEC = int(os.getenv("STRATEGY_TILE_ON_DEMAND_TTL_SEC", "300"))
+STRATEGY_TILE_UPLOAD_WORKERS = int(os.getenv("STRATEGY_TILE_UPLOAD_WORKERS", "8"))
+
+_MAGIC = b"DLT1"
+_HEADER = struct.Struct("<4sB")   # magic, 種類 ID
+
+SPRAY_ZONES = ("PULL", "CENTER", "OPPO")
+COUNT_CELLS = tuple((b, s) for b in range(4) for s in range(3))   # 0-0, 0-1, ..., 3-2
+
+
+@dataclass(frozen=True)
+class TileLayout:
+    """タイル 1 種類のバイナリ形式。arrays は (名前, dtype, shape) をバイト列に並べる順で持つ。"""
+
+    kind: str
+    kind_id: int
+    arrays: Tuple[Tuple[str, str, Tuple[int, ...]], ...]
+
+    @property
+    def size(self) -> int:
+        return _HEADER.size + sum(
+            np.dtype(dtype).itemsize * int(np.prod(shape)) for _, dtype, shape in self.arrays
+        )
+
+
+HEAT_ZONE = TileLayout("heat_zone", 1, (("xwoba", "<f2", (5, 5)), ("counts", "<u2", (5, 5))))
+SPRAY = TileLayout("spray", 2, (("bip_tb", "<u2", (3, 2)),))
+COUNT_MATRIX = TileLayout("count_matrix", 3, (("calls", "S3", (12,)), ("pitches", "<u2", (12, 2))))
+LAYOUTS = {layout.kind: layout for layout in (HEAT_ZONE, SPRAY, COUNT_MATRIX)}
+
+
+def encode_tile(layout: TileLayout, arrays: Dict[str, np.ndarray]) -> bytes:
+    parts = [_HEADER.pack(_MAGIC, layout.kind_id)]
+    for name, dtype, shape in layout.arrays:
+        arr = np.asarray(arrays[name])
+        if arr.shape != shape:
+            raise ValueError(f"{layout.kind}.{name}: expected shape {shape}, got {arr.shape}")
+        if np.dtype(dtype).kind == "u":
+            arr = np.clip(np.nan_to_num(arr), 0, np.iinfo(dtype).max)
+        parts.append(np.ascontiguousarray(arr, dtype=dtype).tobytes())
+    return b"".join(parts)
+
+
+def decode_tile(layout: TileLayout, data: bytes) -> Dict[str, np.ndarray]:
+    if len(data) != layout.size:
+        raise ValueError(f"{layout.kind}: expected {layout.size} bytes, got {len(data)}")
+    magic, kind_id = _HEADER.unpack_from(data)
+    if magic != _MAGIC or kind_id != layout.kind_id:
+        raise ValueError(f"{layout.kind}: bad tile header {magic!r}/{kind_id}")
+    arrays: Dict[str, np.ndarray] = {}
+    offset = _HEADER.size
+    for name, dtype, shape in layout.arrays:
+        count = int(np.prod(shape))
+        arrays[name] = np.frombuffer(data, dtype=dtype, count=count, offset=offset).reshape(shape)
+        offset += np.dtype(dtype).itemsize * count
+    return arrays
+
+
+# ── 集計 SQL（{player_filter} が空ならシーズン全選手、バッチ用）────────────────────
+
+def _heat_zone_sql(statcast_table: str, player_filter: str) -> str:
+    return f"""
+    WITH zoned AS (
+      SELECT
+        batter AS player_id,
+        CASE
+          WHEN plate_x < -0.6 THEN 0
+          WHEN plate_x < -0.2 THEN 1
+          WHEN plate_x <  0.2 THEN 2
+          WHEN plate_x <  0.6 THEN 3
+          ELSE                     4
+        END AS col,
+        CASE
+          WHEN plate_z >= 3.5 THEN 0
+          WHEN plate_z >= 3.0 THEN 1
+          WHEN plate_z >= 2.5 THEN 2
+          WHEN plate_z >= 2.0 THEN 3
+          ELSE                     4
+        END AS row_idx,
+        estimated_woba_using_speedangle,
+        woba_value,
+        woba_denom
+      FROM `{statcast_table}`
+      WHERE game_year = @season
+        {player_filter}
+        AND game_type = 'R'
+        AND plate_x IS NOT NULL
+        AND plate_z IS NOT NULL
+        AND woba_denom > 0
+    )
+    SELECT
+      player_id,
+      row_idx,
+      col,
+      ROUND(SAFE_DIVIDE(
+        SUM(COALESCE(estimated_woba_using_speedangle, woba_value)),
+        SUM(woba_denom)
+      ), 3) AS xwoba,
+      COUNT(*) AS n
+    FROM zoned
+    GROUP BY player_id, row_idx, col
+    """
+
+
+def _spray_sql(statcast_table: str, player_filter: str) -> str:
+    # 境界値は mart_batter_performance_hit_loc_quality.sql に準拠（Pull/Oppo は stand で反転）
+    return f"""
+    WITH classified AS (
+      SELECT
+        batter AS player_id,
+        CASE
+          WHEN (stand = 'R' AND hc_x < 100) OR (stand = 'L' AND hc_x > 155) THEN 'PULL'
+          WHEN hc_x BETWEEN 100 AND 155                                      THEN 'CENTER'
+          ELSE                                                                    'OPPO'
+        END AS spray_zone,
+        events
+      FROM `{statcast_table}`
+      WHERE game_year = @season
+        {player_filter}
+        AND game_type = 'R'
+        AND hc_x IS NOT NULL
+        AND bb_type IS NOT NULL
+    )
+    SELECT
+      player_id,
+      spray_zone,
+      COUNT(*) AS bip,
+      SUM(
+        CASE
+          WHEN events = 'single'   THEN 1
+          WHEN events = 'double'   THEN 2
+          WHEN events = 'triple'   THEN 3
+          WHEN events = 'home_run' THEN 4
+          ELSE 0
+        END
+      ) AS tb
+    FROM classified
+    GROUP BY player_id, spray_zone
+    """
+
+
+def _count_matrix_sql(statcast_table: str, player_filter: str) -> str:
+    return f"""
+    WITH agg AS (
+      SELECT pitcher AS player_id, balls, strikes, pitch_type, COUNT(*) AS pitch_count
+      FROM `{statcast_table}`
+      WHERE game_year  = @season
+        {player_filter}
+        AND game_type  = 'R'
+        AND balls   BETWEEN 0 AND 3
+        AND strikes BETWEEN 0 AND 2
+        AND pitch_type IS NOT NULL
+        AND pitch_type != ''
+      GROUP BY player_id, balls, strikes, pitch_type
+    ),
+    ranked AS (
+      SELECT
+        player_id,
+        balls,
+        strikes,
+        pitch_type,
+        pitch_count,
+        SUM(pitch_count) OVER (PARTITION BY player_id, balls, strikes) AS total_pitches,
+        ROW_NUMBER() OVER (
+          PARTITION BY player_id, balls, strikes
+          ORDER BY pitch_count DESC, pitch_type
+        ) AS rn
+      FROM agg
+    )
+    SELECT player_id, balls, strikes, pitch_type, pitch_count, total_pitches
+    FROM ranked
+    WHERE rn = 1
+    """
+
+
+_TILE_SQL = {
+    HEAT_ZONE.kind: (_heat_zone_sql, "batter"),
+    SPRAY.kind: (_spray_sql, "batter"),
+    COUNT_MATRIX.kind: (_count_matrix_sql, "pitcher"),
+}
+
+
+def tile_sql(layout: TileLayout, player_id: Optional[int] = None) -> str:
+    """player_id を渡せばその選手だけ（その場集計）、None ならシーズン全選手（バッチ）の集計 SQL。"""
+    builder, id_column = _TILE_SQL[layout.kind]
+    player_filter = f"AND {id_column} = @player_id" if player_id is not None else ""
+    return builder(get_settings().get_table_full_name("statcast_master"), player_filter)
+
+
+# ── 集計結果（1 選手分の行）→ タイル配列 ─────────────────────────────────────────
+
+def _int_column(df: pd.DataFrame, column: str) -> np.ndarray:
+    return pd.to_numeric(df[column], errors="coerce").fillna(0).to_numpy(dtype=np.int64)
+
+
+def heat_zone_arrays(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    xwoba = np.full((5, 5), np.nan, dtype=np.float32)
+    counts = np.zeros((5, 5), dtype=np.int64)
+    if not df.empty:
+        rows, cols = _int_column(df, "row_idx"), _int_column(df, "col")
+        ok = (rows >= 0) & (rows < 5) & (cols >= 0) & (cols < 5)
+        xwoba[rows[ok], cols[ok]] = pd.to_numeric(df["xwoba"], errors="coerce").to_numpy(dtype=np.float32)[ok]
+        counts[rows[ok], cols[ok]] = _int_column(df, "n")[ok]
+    return {"xwoba": xwoba, "counts": counts}
+
+
+def spray_arrays(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    bip_tb = np.zeros((3, 2), dtype=np.int64)
+    if not df.empty:
+        for zone, bip, tb in zip(df["spray_zone"], _int_column(df, "bip"), _int_column(df, "tb")):
+            zone = str(zone or "").upper()
+            if zone in SPRAY_ZONES:
+                bip_tb[SPRAY_ZONES.index(zone)] = (bip, tb)
+    return {"bip_tb": bip_tb}
+
+
+def count_matrix_arrays(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    calls = np.zeros(12, dtype="S3")
+    pitches = np.zeros((12, 2), dtype=np.int64)
+    if not df.empty:
+        balls, strikes = _int_column(df, "balls"), _int_column(df, "strikes")
+        counts, totals = _int_column(df, "pitch_count"), _int_column(df, "total_pitches")
+        for i, code in enumerate(df["pitch_type"]):
+            cell = (int(balls[i]), int(strikes[i]))
+            if cell in COUNT_CELLS:
+                idx = COUNT_CELLS.index(cell)
+                calls[idx] = str(code or "").upper().encode("ascii", "ignore")[:3]
+                pitches[idx] = (counts[i], totals[i])
+    return {"calls": calls, "pitches": pitches}
+
+
+_TILE_ARRAYS = {
+    HEAT_ZONE.kind: heat_zone_arrays,
+    SPRAY.kind: spray_arrays,
+    COUNT_MATRIX.kind: count_matrix_arrays,
+}
+
+
+def build_tile(layout: TileLayout, df: pd.DataFrame) -> bytes:
+    """1 選手分の集計行をタイルにする。"""
+    return encode_tile(layout, _TILE_ARRAYS[layout.kind](df))
+
+
+# ── 保存先 ─────────────────────────────────────────────────────────────────
+
+def tile_key(layout: TileLayout, player_id: int, season: int) -> str:
+    return f"{layout.kind}/{int(season)}/{int(player_id)}.bin"
+
+
+class LocalTileBackend:
+    """ローカルディレクトリに 1 タイル 1 ファイルで保存する（開発・単一インスタンス向け）。"""
+
+    def __init__(self, root: str = STRATEGY_TILE_DIR):
+        self.root = root
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            with open(os.path.join(self.root, key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, key: str, data: bytes) -> None:
+        path = os.path.join(self.root, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)   # 読み手が書き途中のファイルを見ないように差し替える
+
+
+class GcsTileBackend:
+    """GCS バケットに 1 タイル 1 オブジェクトで保存する（Cloud Run の複数インスタンスで共有）。"""
+
+    def __init__(self, bucket_name: Optional[str] = None, prefix: str = STRATEGY_TILE_GCS_PREFIX):
+        self.bucket_name = bucket_name or get_settings().gcs_bucket_name
+        self.prefix = prefix
+        self._bucket = None
+
+    @property
+    def bucket(self):
+        if self._bucket is None:
+            from google.cloud import storage
+            self._bucket = storage.Client(project=get_settings().gcp_project_id).bucket(self.bucket_name)
+        return self._bucket
+
+    def get(self, key: str) -> Optional[bytes]:
+        from google.api_core.exceptions import NotFound
+        try:
+            return self.bucket.blob(f"{self.prefix}/{key}").download_as_bytes()
+        except NotFound:
+            return None
+
+    def put(self, key: str, data: bytes) -> None:
+        self.bucket.blob(f"{self.prefix}/{key}").upload_from_string(
+            data, content_type="application/octet-stream"
+        )
+
+
+@dataclass(frozen=True)
+class Tile:
+    """読み出したタイル。etag はバイト列のハッシュ（HTTP の ETag に使う）。"""
+
+    layout: TileLayout
+    arrays: Dict[str, np.ndarray]
+    etag: str
+    precomputed: bool   # False ならその場集計（バッチのタイルがまだ無い）
+
+    @property
+    def max_age(self) -> int:
+        return STRATEGY_TILE_TTL_SEC if self.precomputed else STRATEGY_TILE_ON_DEMAND_TTL_SEC
+
+
+def _make_tile(layout: TileLayout, data: bytes, precomputed: bool) -> Tile:
+    etag = hashlib.sha256(data).hexdigest()[:16]
+    return Tile(layout, decode_tile(layout, data), etag, precomputed)
+
+
+class StrategyTileStore:
+    """タイルの読み出し（LRU → 保存先 → その場集計）と、バッチからの一括書き込み。"""
+
+    def __init__(self, backend=None, max_entries: int = STRATEGY_TILE_CACHE_MAX_ENTRIES):
+        self.backend = backend or LocalTileBackend()
+        self._cache = TTLLRUCache(max_entries=max_entries)
+        self._flight = SingleFlight(name="strategy_tiles")
+
+    async def get(self, layout: TileLayout, player_id: int, season: int) -> Tile:
+        key = tile_key(layout, player_id, season)
+        tile = self._cache.get(key)
+        if tile is not None:
+            return tile
+        return await self._flight.do(key, self._load, layout, player_id, season, key)
+
+    async def _load(self, layout: TileLayout, player_id: int, season: int, key: str) -> Tile:
+        data = None
+        try:
+            data = await asyncio.to_thread(self.backend.get, key)
+        except Exception as e:
+            logger.warning(f"Strategy tile read failed for {key}, aggregating on demand: {e}")
+
+        tile = None
+        if data is not None:
+            try:
+                tile = _make_tile(layout, data, precomputed=True)
+            except ValueError as e:
+                logger.warning(f"Strategy tile {key} is corrupt, aggregating on demand: {e}")
+        if tile is None:
+            df = await run_query(tile_sql(layout, player_id), [
+                ("player_id", "INT64", int(player_id)),
+                ("season", "INT64", int(season)),
+            ])
+            tile = _make_tile(layout, build_tile(layout, df), precomputed=False)
+
+        self._cache.set(key, tile, tile.max_age)
+        return tile
+
+    def put_many(self, tiles: Dict[str, bytes]) -> None:
+        """key → バイト列 をまとめて保存し、プロセス内キャッシュの同じキーを捨てる。"""
+        items = list(tiles.items())
+        with ThreadPoolExecutor(max_workers=STRATEGY_TILE_UPLOAD_WORKERS) as pool:
+            list(pool.map(lambda kv: self.backend.put(*kv), items))
+        self._cache.clear()
+
+    async def build_season(self, season: int, layouts: Optional[List[TileLayout]] = None) -> Dict[str, int]:
+        """
+        シーズン全選手のタイルを種類ごとに 1 クエリで集計して保存する（日次バッチ）。
+        種類 → 書き込んだタイル数 を返す。
+        """
+        written: Dict[str, int] = {}
+        for layout in layouts or list(LAYOUTS.values()):
+            df = await run_query(tile_sql(layout), [("season", "INT64", int(season))], cache=False)
+            tiles = {
+                tile_key(layout, int(player_id), season): build_tile(layout, group)
+                for player_id, group in df.groupby("player_id", sort=False)
+            } if not df.empty else {}
+            await asyncio.to_thread(self.put_many, tiles)
+            written[layout.kind] = len(tiles)
+            logger.info(f"Strategy tiles built: {layout.kind} season={season} ({len(tiles)} players)")
+        return written
+
+
+def _default_backend():
+    if STRATEGY_TILE_BACKEND == "gcs":
+        return GcsTileBackend()
+    return LocalTileBackend()
+
+
+# Singleton
+_tile_store: Optional[StrategyTileStore] = None
+
+
+def get_strategy_tile_store() -> StrategyTileStore:
+    global _tile_store
+    if _tile_store is None:
+        _tile_store = StrategyTileStore(_default_backend())
+    return _tile_store
@@ -0,0 +1,201 @@
+"""
+Stuff+ / Pitching+ の事前計算スコアストア。
+
+投手詳細・月別推移のたびに statcast_master から 1 シーズン分の投球を取り、特徴量を作って
+XGBoost で推論していた。ここでは日次バッチ（StuffPlusService.score_new_pitches）が
+モデルバージョンごとに未スコアの投球を 1 回だけ推論し、
+  (model_type, model_version, season, pitcher, pitch_name, game_date)
+単位の合計値（投球数・予測/実測 run value・球速・回転数の和）として保存する。
+
+合計値で持つので、シーズン通算も月別も SUM の再集約だけで出せ、日を足していく追記もできる。
+読み出し側は「スコア済みの最終日（scored_through）」以前をストアから、それより後の
+未スコア分だけをその場で推論して合算する。
+"""
+import logging
+import os
+from datetime import date
+from typing import Optional
+
+import pandas as pd
+from google.cloud import bigquery
+
+from backend.app.config.settings import get_settings
+from backend.app.services.bigquery_service import get_bq_client, run_query
+from backend.app.services.cache_service import TTLLRUCache
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+SCORES_TABLE = settings.get_table_full_name("stuff_plus_pitch_scores")
+SCORES_STAGING_TABLE = settings.get_table_full_name("stuff_plus_pitch_scores_staging")
+
+# scored_through をプロセス内に保持する秒数。古くても読み出しはこの日付で
+# ストア / その場推論を切り分けるため、二重計上にはならない（その場推論が少し増えるだけ）
+STUFF_PLUS_SCORED_THROUGH_TTL_SEC = int(os.getenv("STUFF_PLUS_SCORED_THROUGH_TTL_SEC", "600"))
+
+# 日別合計の列
+SUM_COLUMNS = ["pitch_count", "pred_run_exp_sum", "actual_run_exp_sum", "velo_sum", "spin_sum"]
+DAILY_COLUMNS = ["pitcher", "player_name", "pitch_name", "game_date"] + SUM_COLUMNS
+
+
+def to_daily_sums(scored: pd.DataFrame) -> pd.DataFrame:
+    """推論済みの投球行（predicted_run_exp 付き）を 投手 × 球種 × 日 の合計にまとめる"""
+    if scored.empty:
+        return pd.DataFrame(columns=DAILY_COLUMNS)
+    daily = (
+        scored
+        .groupby(["pitcher", "player_name", "pitch_name", "game_date"])
+        .agg(
+            pitch_count=("predicted_run_exp", "count"),
+            pred_run_exp_sum=("predicted_run_exp", "sum"),
+            actual_run_exp_sum=("delta_pitcher_run_exp", "sum"),
+            velo_sum=("release_speed", "sum"),
+            spin_sum=("release_spin_rate", "sum"),
+        )
+        .reset_index()
+    )
+    daily["game_date"] = pd.to_datetime(daily["game_date"]).dt.date
+    return daily[DAILY_COLUMNS]
+
+
+class StuffPlusScoreStore:
+    """stuff_plus_pitch_scores テーブルの読み書き"""
+
+    def __init__(self):
+        self._scored_through = TTLLRUCache(max_entries=64)
+
+    # ----------------------------------------------------------
+    # 読み出し
+    # ----------------------------------------------------------
+    async def scored_through(
+        self, model_type: str, model_version: str, season: int
+    ) -> Optional[date]:
+        """このモデルバージョンでスコア済みの最終日。未スコアなら None"""
+        key = (model_type, model_version, season)
+        cached = self._scored_through.get(key)
+        if cached is not None:
+            return cached[0]
+
+        query = f"""
+            SELECT MAX(game_date) AS scored_through
+            FROM `{SCORES_TABLE}`
+            WHERE model_type = @model_type
+                AND model_version = @model_version
+                AND season = @season
+        """
+        try:
+            df = await run_query(query, [
+                ("model_type", "STRING", model_type),
+                ("model_version", "STRING", model_version),
+                ("season", "INT64", season),
+            ])
+        except Exception as e:
+            # テーブル未作成・一時障害時はその場推論に倒す（キャッシュしない）
+            logger.warning(f"Stuff+ score store unavailable, falling back to on-request inference: {e}")
+            return None
+
+        value = df["scored_through"].iloc[0] if not df.empty else None
+        through = None if value is None or pd.isna(value) else pd.Timestamp(value).date()
+        # None もキャッシュしたいのでタプルに包む
+        self._scored_through.set(key, (through,), ttl=STUFF_PLUS_SCORED_THROUGH_TTL_SEC)
+        return through
+
+    async def lookup(
+        self,
+        pitcher_id: int,
+        model_type: str,
+        model_version: str,
+        season: int,
+        through: date,
+    ) -> pd.DataFrame:
+        """投手の日別合計（through 以前）を返す"""
+        query = f"""
+            SELECT {", ".join(DAILY_COLUMNS)}
+            FROM `{SCORES_TABLE}`
+            WHERE model_type = @model_type
+                AND model_version = @model_version
+                AND season = @season
+                AND pitcher = @pitcher_id
+                AND game_date <= @through
+        """
+        return await run_query(query, [
+            ("model_type", "STRING", model_type),
+            ("model_version", "STRING", model_version),
+            ("season", "INT64", season),
+            ("pitcher_id", "INT64", pitcher_id),
+            ("through", "DATE", through),
+        ])
+
+    def invalidate_scored_through(self) -> None:
+        self._scored_through.clear()
+
+    # ----------------------------------------------------------
+    # 書き込み（日次バッチ）
+    # ----------------------------------------------------------
+    def replace_from(
+        self,
+        daily: pd.DataFrame,
+        model_type: str,
+        model_version: str,
+        season: int,
+        from_date: Optional[date],
+    ) -> None:
+        """from_date 以降の行を daily で置き換える（None なら当該バージョン・シーズン全体）。
+
+        ステージングテーブルにロードしてから DELETE + INSERT を 1 トランザクションで流すため、
+        読み手が削除済み・未挿入の中間状態を見ることはない。
+        """
+        client = get_bq_client()
+        df_out = daily.copy()
+        df_out["model_type"] = model_type
+        df_out["model_version"] = model_version
+        df_out["season"] = season
+        df_out["scored_at"] = pd.Timestamp.now(tz="UTC")
+
+        load_config = bigquery.LoadJobConfig(
+            write_disposition=bigquery.WriteDisposition.WRITE_TRUNCATE,
+        )
+        client.load_table_from_dataframe(
+            df_out, SCORES_STAGING_TABLE, job_config=load_config
+        ).result()
+
+        script = f"""
+            CREATE TABLE IF NOT EXISTS `{SCORES_TABLE}`
+            PARTITION BY RANGE_BUCKET(season, GENERATE_ARRAY(2015, 2100, 1))
+            CLUSTER BY model_type, model_version, pitcher
+            AS SELECT * FROM `{SCORES_STAGING_TABLE}` WHERE FALSE;
+
+            BEGIN TRANSACTION;
+            DELETE FROM `{SCORES_TABLE}`
+            WHERE model_type = @model_type
+                AND model_version = @model_version
+                AND season = @season
+                AND (@from_date IS NULL OR game_date >= @from_date);
+            INSERT INTO `{SCORES_TABLE}` SELECT * FROM `{SCORES_STAGING_TABLE}`;
+            COMMIT TRANSACTION;
+        """
+        job_config = bigquery.QueryJobConfig(
+            query_parameters=[
+                bigquery.ScalarQueryParameter("model_type", "STRING", model_type),
+                bigquery.ScalarQueryParameter("model_version", "STRING", model_version),
+                bigquery.ScalarQueryParameter("season", "INT64", season),
+                bigquery.ScalarQueryParameter("from_date", "DATE", from_date),
+            ]
+        )
+        client.query(script, job_config=job_config).result()
+        self.invalidate_scored_through()
+        logger.info(
+            f"Stuff+ scores written: {model_type} {model_version} season={season} "
+            f"from={from_date} rows={len(df_out)}"
+        )
+
+
+_score_store: Optional[StuffPlusScoreStore] = None
+
+
+def get_stuff_plus_score_store() -> StuffPlusScoreStore:
+    """共有 StuffPlusScoreStore を返す（シングルトン）"""
+    global _score_store
+    if _score_store is None:
+        _score_store = StuffPlusScoreStore()
+    return _score_store
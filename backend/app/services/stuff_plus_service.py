@@ -2,17 +2,29 @@
 Stuff+ / Pitching+ 推論サービス
 事前計算済みランキングの取得と、個別投手のリアルタイム推論を提供
 """
+import asyncio
 import logging
-from typing import Dict, List, Optional
+import os
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
 
 import joblib
 import numpy as np
 import pandas as pd
 import xgboost as xgb
 
-from backend.app.services.base import get_bq_client
-from backend.app.services.model_registry_service import ModelRegistryService
+from backend.app.services.bigquery_service import run_query, run_query_arrow
+from backend.app.services.feature_encoder import encode_pitches
+from backend.app.services.inference_batcher import get_inference_batcher
+from backend.app.services.model_artifact_cache import get_model_artifact_cache
+from backend.app.services.stuff_plus_score_store import (
+    DAILY_COLUMNS,
+    SUM_COLUMNS,
+    get_stuff_plus_score_store,
+    to_daily_sums,
+)
 from backend.app.config.settings import get_settings
+from backend.app.utils.columnar import num_rows, to_pandas, to_records
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -35,36 +47,44 @@ STATCAST_COLUMNS = [
     "balls", "strikes",
 ]
 
+# 日次スコアリングで取り直す日数（statcast の遅延到着分を拾う）
+STUFF_PLUS_RESCORE_DAYS = int(os.getenv("STUFF_PLUS_RESCORE_DAYS", "2"))
+# シーズン全体を取り直す場合があるため、通常の API クエリより長く待つ
+STUFF_PLUS_SCORE_TIMEOUT_SEC = float(os.getenv("STUFF_PLUS_SCORE_TIMEOUT_SEC", "600"))
+
+
+def score_pitches(df: pd.DataFrame, artifact: Dict, model_type: str) -> pd.DataFrame:
+    """
+    statcast の投球行に特徴量を足して推論する（日次バッチとその場推論で共通）
+    Returns:
+        欠損行を除いた投球行 + predicted_run_exp 列
+    """
+    xgb_model: xgb.XGBRegressor = artifact["model"]
+    df_clean, X = encode_pitches(df, artifact, model_type)
+    predicted = xgb_model.predict(X) if len(df_clean) else np.empty(0, dtype=np.float32)
+    return df_clean.assign(predicted_run_exp=predicted)
 
 class StuffPlusService:
     """Stuff+ / Pitching+ の推論とランキング取得"""
 
     def __init__(self):
-        self.client = get_bq_client()
-        self.registry = ModelRegistryService()
-        # モデルアーティファクト（遅延ロード）
-        self._models: Dict[str, Dict] = {}
+        # モデルアーティファクトはプロセス共有キャッシュから取る（起動時に先読み、昇格時は差し替え）
+        self.registry = get_model_artifact_cache()
+        # 事前計算済みの投手 × 球種 × 日 の合計
+        self.store = get_stuff_plus_score_store()
 
     # ----------------------------------------------------------
     # モデルロード（遅延ロード）
     # ----------------------------------------------------------
     def _ensure_model_loaded(self, model_type: str) -> Dict:
         """
-        Model Registry から active バージョンのモデルをロード（未ロード時のみ）
+        active バージョンのモデルを返す（キャッシュ未ロード時のみ Model Registry からロード）
         Returns:
             artifact dict: {"model", "features", "encoded_columns",
                             "z_score_mu", "z_score_sigma", "min_pitches"}
         """
-        if model_type in self._models:
-            return self._models[model_type]
-
         try:
-            artifact, version_meta = self.registry.load_model(model_type)
-            self._models[model_type] = artifact
-            logger.info(
-                f"Loaded {model_type} model: version={version_meta.version}, "
-                f"season={version_meta.training_season}"
-            )
+            artifact, _ = self.registry.load_model(model_type)
             return artifact
         except FileNotFoundError:
             logger.warning(f"No active model found for {model_type}")
@@ -144,21 +164,18 @@ class StuffPlusService:
         if min_pitches > 0:
             base_params.append(("min_pitches", "INT64", min_pitches))
 
-        job_config = self._make_job_config(
-            base_params + [
-                ("limit", "INT64", limit),
-                ("offset", "INT64", offset),
-            ]
-        )
+        page_params = base_params + [
+            ("limit", "INT64", limit),
+            ("offset", "INT64", offset),
+        ]
 
         try:
-            # 件数取得
-            count_config = self._make_job_config(base_params)
-            count_result = list(self.client.query(count_query, job_config=count_config))
-            total = count_result[0]["total"] if count_result else 0
-
-            # ランキング取得
-            df = self.client.query(query, job_config=job_config).to_dataframe()
+            # 件数取得とランキング取得は独立しているので並列に投げる
+            count_df, df = await asyncio.gather(
+                run_query(count_query, base_params),
+                run_query(query, page_params),
+            )
+            total = int(count_df["total"].iloc[0]) if not count_df.empty else 0
 
             rankings = []
             for _, row in df.iterrows():
@@ -189,134 +206,121 @@ class StuffPlusService:
             raise
 
     # ----------------------------------------------------------
-    # 個別投手の球種別スコア（リアルタイム推論）
+    # 投手の日別合計（スコアストア + 未スコア分のその場推論）
     # ----------------------------------------------------------
-    async def predict_single_pitcher(
-        self,
-        pitcher_id: int,
-        model_type: str = "stuff_plus",
-        season: int = 2025,
-    ) -> Dict:
-        """
-        特定投手の球種別 Stuff+ / Pitching+ をリアルタイム推論
-
-        Returns:
-            {"pitcher_id", "player_name", "model_type", "pitches": [...]}
-        """
-        artifact = self._ensure_model_loaded(model_type)
-        xgb_model: xgb.XGBRegressor = artifact["model"]
-        encoded_columns: List[str] = artifact["encoded_columns"]
-        z_mu: float = artifact["z_score_mu"]
-        z_sigma: float = artifact["z_score_sigma"]
-        min_pitches: int = artifact["min_pitches"]
-        features: List[str] = artifact["features"]
-
-        # BigQuery から該当投手のデータ取得
-        cols = ", ".join(STATCAST_COLUMNS)
+    async def _fetch_pitches(
+        self, pitcher_id: int, season: int, after: Optional[date]
+    ) -> pd.DataFrame:
+        """statcast_master から投手の投球を取得（after 指定時はその翌日以降のみ）"""
+        cols = ", ".join(STATCAST_COLUMNS + ["game_date"])
         query = f"""
             SELECT {cols}
             FROM `{settings.get_table_full_name('statcast_master')}`
             WHERE pitcher = @pitcher_id
                 AND game_year = @season
+                AND (@after IS NULL OR game_date > @after)
                 AND pitch_type IS NOT NULL
                 AND release_speed IS NOT NULL
                 AND delta_pitcher_run_exp IS NOT NULL
         """
-        job_config = self._make_job_config([
+        # 投球単位で行数が多いため列指向（Arrow）で取得し、特徴量計算の直前に pandas 化する
+        table = await run_query_arrow(query, [
             ("pitcher_id", "INT64", pitcher_id),
             ("season", "INT64", season),
+            ("after", "DATE", after),
         ])
+        return to_pandas(table) if num_rows(table) > 0 else pd.DataFrame(columns=STATCAST_COLUMNS + ["game_date"])
 
-        df = self.client.query(query, job_config=job_config).to_dataframe()
-        if df.empty:
-            raise ValueError(f"No data found for pitcher_id={pitcher_id}, season={season}")
-
-        player_name = self._format_name(df["player_name"].iloc[0])
+    async def _pitcher_daily_sums(
+        self, pitcher_id: int, model_type: str, season: int
+    ) -> Tuple[pd.DataFrame, str, Dict]:
+        """
+        投手 × 球種 × 日 の合計を返す。
+        scored_through 以前はスコアストアの引き当て、それより後（当日分や未バッチ分・
+        バッチ未実行の新バージョン）だけ statcast_master から取ってその場で推論する。
 
-        # plate_z を打者ストライクゾーンで正規化
-        sz_range = df["sz_top"] - df["sz_bot"]
-        df["plate_z_norm"] = np.where(
-            sz_range > 0,
-            (df["plate_z"] - df["sz_bot"]) / sz_range,
-            np.nan,
-        )
+        Returns:
+            (daily_sums, player_name, artifact)
+        """
+        artifact, version = self.registry.load_model(model_type)
+        through = await self.store.scored_through(model_type, version.version, season)
 
-        # Pitching++ 用: トンネル・カウント・ゾーン特徴量
-        if model_type == "pitching_plus_plus":
-            df = df.sort_values(["game_pk", "at_bat_number", "pitch_number"])
-            grp = df.groupby(["game_pk", "at_bat_number"])
-            df["prev_release_pos_x"] = grp["release_pos_x"].shift(1)
-            df["prev_release_pos_z"] = grp["release_pos_z"].shift(1)
-            df["prev_release_speed"] = grp["release_speed"].shift(1)
-            df["prev_pfx_z"] = grp["pfx_z"].shift(1)
-            df["prev_pitch_type"] = grp["pitch_type"].shift(1)
-
-            df["release_diff"] = np.sqrt(
-                (df["release_pos_x"] - df["prev_release_pos_x"]) ** 2
-                + (df["release_pos_z"] - df["prev_release_pos_z"]) ** 2
+        if through is not None:
+            stored, tail = await asyncio.gather(
+                self.store.lookup(pitcher_id, model_type, version.version, season, through),
+                self._fetch_pitches(pitcher_id, season, after=through),
             )
-            df["speed_diff"] = df["release_speed"] - df["prev_release_speed"]
-            df["zone_distance"] = np.sqrt(
-                df["plate_x"] ** 2 + (df["plate_z_norm"] - 0.5) ** 2
+        else:
+            stored, tail = pd.DataFrame(columns=DAILY_COLUMNS), await self._fetch_pitches(
+                pitcher_id, season, after=None
             )
 
-            df["release_diff"] = df["release_diff"].fillna(0)
-            df["speed_diff"] = df["speed_diff"].fillna(0)
-            df["prev_pfx_z"] = df["prev_pfx_z"].fillna(df["pfx_z"])
-            df["prev_pitch_type"] = df["prev_pitch_type"].fillna("NONE")
+        if stored.empty and tail.empty:
+            raise ValueError(f"No data found for pitcher_id={pitcher_id}, season={season}")
 
-        # カテゴリカルカラム決定
-        cat_cols = (
-            ["pitch_type", "prev_pitch_type"]
-            if model_type == "pitching_plus_plus"
-            else ["pitch_type"]
-        )
+        raw_name = stored["player_name"].iloc[0] if not stored.empty else tail["player_name"].iloc[0]
+        frames = [stored] if not stored.empty else []
+        if not tail.empty:
+            scored = await self._score_on_request(tail, artifact, model_type)
+            frames.append(to_daily_sums(scored))
+            logger.info(
+                f"Stuff+ on-request inference: pitcher={pitcher_id} {model_type} "
+                f"rows={len(tail)} (scored_through={through})"
+            )
+        daily = pd.concat(frames, ignore_index=True)
+        for col in SUM_COLUMNS:
+            daily[col] = pd.to_numeric(daily[col])
+        return daily, self._format_name(raw_name), artifact
 
-        # 特徴量作成
-        df_clean = df.dropna(subset=features + ["delta_pitcher_run_exp"]).copy()
-        df_encoded = pd.get_dummies(
-            df_clean[features + cat_cols], columns=cat_cols
+    @staticmethod
+    async def _score_on_request(tail: pd.DataFrame, artifact: Dict, model_type: str) -> pd.DataFrame:
+        """その場推論。エンコードはスレッドで、predict は同時リクエストとまとめてワーカーで行う"""
+        df_clean, X = await asyncio.to_thread(encode_pitches, tail, artifact, model_type)
+        predicted = await get_inference_batcher(model_type).predict(artifact["model"], X)
+        return df_clean.assign(predicted_run_exp=predicted)
+
+    @staticmethod
+    def _summarize(sums: pd.DataFrame, by: List[str], artifact: Dict, score_col: str) -> pd.DataFrame:
+        """日別合計を by 単位に再集約し、平均値と z-score スコアを付ける"""
+        agg = sums.groupby(by)[SUM_COLUMNS].sum().reset_index()
+        count = agg["pitch_count"].astype(float)
+        agg["mean_pred_run_exp"] = agg["pred_run_exp_sum"] / count
+        agg["actual_run_exp"] = agg["actual_run_exp_sum"] / count
+        agg["avg_velo"] = agg["velo_sum"] / count
+        agg["avg_spin"] = agg["spin_sum"] / count
+        agg[score_col] = (
+            100 + (artifact["z_score_mu"] - agg["mean_pred_run_exp"]) / artifact["z_score_sigma"] * 15
         )
+        return agg
 
-        # encoded_columns に合わせる（存在しないカラムは 0 埋め）
-        for col in encoded_columns:
-            if col not in df_encoded.columns:
-                df_encoded[col] = 0
-        df_encoded = df_encoded[encoded_columns]
+    # ----------------------------------------------------------
+    # 個別投手の球種別スコア（事前計算 + 未スコア分のみリアルタイム推論）
+    # ----------------------------------------------------------
+    async def predict_single_pitcher(
+        self,
+        pitcher_id: int,
+        model_type: str = "stuff_plus",
+        season: int = 2025,
+    ) -> Dict:
+        """
+        特定投手の球種別 Stuff+ / Pitching+ を取得
 
-        # 予測
-        df_clean["predicted_run_exp"] = xgb_model.predict(df_encoded)
+        Returns:
+            {"pitcher_id", "player_name", "model_type", "pitches": [...]}
+        """
+        daily, player_name, artifact = await self._pitcher_daily_sums(pitcher_id, model_type, season)
 
         # 球種ごとに集約
-        score_col = model_type
-        agg = (
-            df_clean
-            .groupby("pitch_name")
-            .agg(
-                mean_pred_run_exp=("predicted_run_exp", "mean"),
-                actual_run_exp=("delta_pitcher_run_exp", "mean"),
-                pitch_count=("predicted_run_exp", "count"),
-                avg_velo=("release_speed", "mean"),
-                avg_spin=("release_spin_rate", "mean"),
-            )
-            .reset_index()
+        agg = self._summarize(daily, ["pitch_name"], artifact, "score")
+        agg["sufficient_sample"] = agg["pitch_count"] >= artifact["min_pitches"]
+        agg = agg.sort_values("score", ascending=False, kind="stable")
+        pitches = to_records(
+            agg,
+            columns=["pitch_name", "score", "pitch_count", "avg_velo", "avg_spin",
+                     "mean_pred_run_exp", "actual_run_exp", "sufficient_sample"],
+            round_digits={"score": 1, "avg_velo": 1, "avg_spin": 0,
+                          "mean_pred_run_exp": 6, "actual_run_exp": 6},
         )
-        agg[score_col] = 100 + (z_mu - agg["mean_pred_run_exp"]) / z_sigma * 15
-
-        pitches = []
-        for _, row in agg.iterrows():
-            pitches.append({
-                "pitch_name": row["pitch_name"],
-                "score": round(float(row[score_col]), 1),
-                "pitch_count": int(row["pitch_count"]),
-                "avg_velo": round(float(row["avg_velo"]), 1),
-                "avg_spin": round(float(row["avg_spin"]), 0),
-                "mean_pred_run_exp": round(float(row["mean_pred_run_exp"]), 6),
-                "actual_run_exp": round(float(row["actual_run_exp"]), 6),
-                "sufficient_sample": row["pitch_count"] >= min_pitches,
-            })
-
-        pitches.sort(key=lambda x: x["score"], reverse=True)
 
         return {
             "pitcher_id": pitcher_id,
@@ -342,106 +346,16 @@ class StuffPlusService:
             {"pitcher_id", "player_name", "model_type", "season",
              "pitch_names": [...], "monthly": [{month, pitch_name: score, ...}]}
         """
-        artifact = self._ensure_model_loaded(model_type)
-        xgb_model: xgb.XGBRegressor = artifact["model"]
-        encoded_columns: List[str] = artifact["encoded_columns"]
-        z_mu: float = artifact["z_score_mu"]
-        z_sigma: float = artifact["z_score_sigma"]
-        features: List[str] = artifact["features"]
-
-        # game_date を追加取得（月の抽出に使用）
-        cols = ", ".join(STATCAST_COLUMNS + ["game_date"])
-        query = f"""
-            SELECT {cols}
-            FROM `{settings.get_table_full_name('statcast_master')}`
-            WHERE pitcher = @pitcher_id
-                AND game_year = @season
-                AND pitch_type IS NOT NULL
-                AND release_speed IS NOT NULL
-                AND delta_pitcher_run_exp IS NOT NULL
-        """
-        job_config = self._make_job_config([
-            ("pitcher_id", "INT64", pitcher_id),
-            ("season", "INT64", season),
-        ])
-
-        df = self.client.query(query, job_config=job_config).to_dataframe()
-        if df.empty:
-            raise ValueError(f"No data found for pitcher_id={pitcher_id}, season={season}")
-
-        player_name = self._format_name(df["player_name"].iloc[0])
-
-        # 月を抽出
-        df["month"] = pd.to_datetime(df["game_date"]).dt.month
-
-        # plate_z_norm
-        sz_range = df["sz_top"] - df["sz_bot"]
-        df["plate_z_norm"] = np.where(
-            sz_range > 0,
-            (df["plate_z"] - df["sz_bot"]) / sz_range,
-            np.nan,
-        )
-
-        # Pitching++ 用特徴量
-        if model_type == "pitching_plus_plus":
-            df = df.sort_values(["game_pk", "at_bat_number", "pitch_number"])
-            grp = df.groupby(["game_pk", "at_bat_number"])
-            df["prev_release_pos_x"] = grp["release_pos_x"].shift(1)
-            df["prev_release_pos_z"] = grp["release_pos_z"].shift(1)
-            df["prev_release_speed"] = grp["release_speed"].shift(1)
-            df["prev_pfx_z"] = grp["pfx_z"].shift(1)
-            df["prev_pitch_type"] = grp["pitch_type"].shift(1)
-
-            df["release_diff"] = np.sqrt(
-                (df["release_pos_x"] - df["prev_release_pos_x"]) ** 2
-                + (df["release_pos_z"] - df["prev_release_pos_z"]) ** 2
-            )
-            df["speed_diff"] = df["release_speed"] - df["prev_release_speed"]
-            df["zone_distance"] = np.sqrt(
-                df["plate_x"] ** 2 + (df["plate_z_norm"] - 0.5) ** 2
-            )
-
-            df["release_diff"] = df["release_diff"].fillna(0)
-            df["speed_diff"] = df["speed_diff"].fillna(0)
-            df["prev_pfx_z"] = df["prev_pfx_z"].fillna(df["pfx_z"])
-            df["prev_pitch_type"] = df["prev_pitch_type"].fillna("NONE")
-
-        cat_cols = (
-            ["pitch_type", "prev_pitch_type"]
-            if model_type == "pitching_plus_plus"
-            else ["pitch_type"]
-        )
-
-        df_clean = df.dropna(subset=features + ["delta_pitcher_run_exp"]).copy()
-        df_encoded = pd.get_dummies(
-            df_clean[features + cat_cols], columns=cat_cols
-        )
-
-        for col in encoded_columns:
-            if col not in df_encoded.columns:
-                df_encoded[col] = 0
-        df_encoded = df_encoded[encoded_columns]
-
-        # 予測
-        df_clean["predicted_run_exp"] = xgb_model.predict(df_encoded)
+        daily, player_name, artifact = await self._pitcher_daily_sums(pitcher_id, model_type, season)
 
         # 月 × 球種に集約
         score_col = model_type
-        monthly = (
-            df_clean
-            .groupby(["month", "pitch_name"])
-            .agg(
-                mean_pred_run_exp=("predicted_run_exp", "mean"),
-                actual_run_exp=("delta_pitcher_run_exp", "mean"),
-                pitch_count=("predicted_run_exp", "count"),
-            )
-            .reset_index()
-        )
-        monthly[score_col] = 100 + (z_mu - monthly["mean_pred_run_exp"]) / z_sigma * 15
+        daily["month"] = pd.to_datetime(daily["game_date"]).dt.month
+        monthly = self._summarize(daily, ["month", "pitch_name"], artifact, score_col)
 
         # フロントエンド用フォーマット: [{month, pitch1_score, pitch1_count, ...}]
         pitch_names = sorted(
-            n for n in df_clean["pitch_name"].unique() if n != "Pitch Out"
+            n for n in daily["pitch_name"].unique() if n != "Pitch Out"
         )
 
         months_data = []
@@ -468,6 +382,64 @@ class StuffPlusService:
             "monthly": months_data,
         }
 
+    # ----------------------------------------------------------
+    # 日次バッチ: 未スコアの投球を推論してスコアストアに保存
+    # ----------------------------------------------------------
+    async def score_new_pitches(
+        self,
+        model_type: str = "stuff_plus",
+        season: int = 2025,
+        rescore_days: int = STUFF_PLUS_RESCORE_DAYS,
+    ) -> Dict:
+        """
+        active バージョンで未スコアの投球（前日まで）を推論し、日別合計をストアに書き込む。
+        statcast の遅延到着に備えて scored_through の rescore_days 日前から取り直す。
+        新バージョンに昇格した直後はシーズン全体をスコアする。
+
+        Returns:
+            {"model_type", "model_version", "season", "from_date", "pitches", "rows"}
+        """
+        artifact, version = self.registry.load_model(model_type)
+        self.store.invalidate_scored_through()
+        through = await self.store.scored_through(model_type, version.version, season)
+        from_date = through - timedelta(days=rescore_days) if through is not None else None
+
+        cols = ", ".join(STATCAST_COLUMNS + ["game_date"])
+        query = f"""
+            SELECT {cols}
+            FROM `{settings.get_table_full_name('statcast_master')}`
+            WHERE game_year = @season
+                AND (@from_date IS NULL OR game_date >= @from_date)
+                AND game_date < CURRENT_DATE()
+                AND pitch_type IS NOT NULL
+                AND release_speed IS NOT NULL
+                AND delta_pitcher_run_exp IS NOT NULL
+        """
+        table = await run_query_arrow(
+            query,
+            [("season", "INT64", season), ("from_date", "DATE", from_date)],
+            timeout=STUFF_PLUS_SCORE_TIMEOUT_SEC,
+        )
+        result = {
+            "model_type": model_type,
+            "model_version": version.version,
+            "season": season,
+            "from_date": from_date.isoformat() if from_date else None,
+            "pitches": num_rows(table),
+            "rows": 0,
+        }
+        if num_rows(table) == 0:
+            logger.info(f"Stuff+ scoring: no new pitches for {model_type} season={season}")
+            return result
+
+        scored = await asyncio.to_thread(score_pitches, to_pandas(table), artifact, model_type)
+        daily = to_daily_sums(scored)
+        await asyncio.to_thread(
+            self.store.replace_from, daily, model_type, version.version, season, from_date
+        )
+        result["rows"] = len(daily)
+        return result
+
     # ----------------------------------------------------------
     # Stuff+ vs Pitching+ 比較（gap分析）
     # ----------------------------------------------------------
@@ -570,14 +542,14 @@ class StuffPlusService:
             ORDER BY player_name
             LIMIT @limit
         """
-        job_config = self._make_job_config([
+        params = [
             ("season", "INT64", season),
             ("name_pattern", "STRING", f"%{name}%"),
             ("limit", "INT64", limit),
-        ])
+        ]
 
         try:
-            df = self.client.query(query, job_config=job_config).to_dataframe()
+            df = await run_query(query, params)
             results = []
             seen = set()
             for _, row in df.iterrows():
@@ -596,16 +568,3 @@ class StuffPlusService:
             logger.error(f"Failed to search pitchers: {e}")
             raise
 
-    # ----------------------------------------------------------
-    # ヘルパー
-    # ----------------------------------------------------------
-    @staticmethod
-    def _make_job_config(params: List[tuple]):
-        """BigQuery parameterized query 用の JobConfig を作成"""
-        from google.cloud import bigquery as bq
-        return bq.QueryJobConfig(
-            query_parameters=[
-                bq.ScalarQueryParameter(name, type_, value)
-                for name, type_, value in params
-            ]
-        )
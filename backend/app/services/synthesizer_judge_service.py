@@ -12,7 +12,7 @@ from dataclasses import dataclass, field, asdict
 from typing import Optional, Dict, Any, List
 from datetime import datetime, timezone
 
-from backend.app.services.llm_gateway_service import call_gemini
+from backend.app.services.llm_gateway_service import acall_gemini, call_gemini
 
 logger = logging.getLogger(__name__)
 
@@ -94,14 +94,39 @@ class SynthesizerJudgeService:
         start_time = datetime.now()
         try:
             response = self._call_gemini(prompt)
-            latency_ms = (datetime.now() - start_time).total_seconds() * 1000
+            return self._finalize_verdict(response, case_id, user_query, synthesizer_path, start_time)
+        except Exception as e:
+            logger.error(f"Synthesizer Judge failed for {case_id}: {e}")
+            return SynthesizerVerdict(
+                case_id=case_id,
+                user_query=user_query,
+                reasoning=f"Judge evaluation error: {str(e)}",
+            )
+
+    async def aevaluate_output(
+        self,
+        case_id: str,
+        user_query: str,
+        source_data: str,
+        synthesizer_output: str,
+        synthesizer_path: str = "agent",
+    ) -> SynthesizerVerdict:
+        """evaluate_output の非同期版。オンライン Judge（応答返却後の評価）から使う。"""
+        if not self.api_key:
+            return SynthesizerVerdict(
+                case_id=case_id,
+                user_query=user_query,
+                reasoning="API key not configured",
+            )
 
-            verdict = self._parse_judge_response(response, case_id, user_query)
-            verdict.latency_ms = latency_ms
-            verdict.synthesizer_path = synthesizer_path
-            verdict.judge_model = self.model_name
-            return verdict
+        prompt = self._build_judge_prompt(
+            user_query, source_data, synthesizer_output, synthesizer_path
+        )
 
+        start_time = datetime.now()
+        try:
+            response = await self._acall_gemini(prompt)
+            return self._finalize_verdict(response, case_id, user_query, synthesizer_path, start_time)
         except Exception as e:
             logger.error(f"Synthesizer Judge failed for {case_id}: {e}")
             return SynthesizerVerdict(
@@ -110,6 +135,21 @@ class SynthesizerJudgeService:
                 reasoning=f"Judge evaluation error: {str(e)}",
             )
 
+    def _finalize_verdict(
+        self,
+        response: Dict[str, Any],
+        case_id: str,
+        user_query: str,
+        synthesizer_path: str,
+        start_time: datetime,
+    ) -> SynthesizerVerdict:
+        latency_ms = (datetime.now() - start_time).total_seconds() * 1000
+        verdict = self._parse_judge_response(response, case_id, user_query)
+        verdict.latency_ms = latency_ms
+        verdict.synthesizer_path = synthesizer_path
+        verdict.judge_model = self.model_name
+        return verdict
+
     def _build_judge_prompt(
         self,
         user_query: str,
@@ -219,6 +259,19 @@ class SynthesizerJudgeService:
             raise ValueError("Gateway returned no text from Gemini")
         return json.loads(text)
 
+    async def _acall_gemini(self, prompt: str) -> Dict[str, Any]:
+        """_call_gemini の非同期版"""
+        text = await acall_gemini(
+            prompt=prompt,
+            model=self.model_name,
+            response_mime_type="application/json",
+            feature="synthesizer_judge",
+            user_id="",
+        )
+        if not text:
+            raise ValueError("Gateway returned no text from Gemini")
+        return json.loads(text)
+
     def _parse_judge_response(
         self,
         response: Dict[str, Any],
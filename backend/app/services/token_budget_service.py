@@ -13,6 +13,8 @@ from datetime import datetime, timezone
 from typing import Dict, Literal
 
 from backend.app.config.settings import get_settings
+from backend.app.middleware.request_context import get_rate_limit_identity
+from backend.app.services.rate_limiter_service import Limit, get_rate_limiter, session_tokens_key
 from backend.app.utils.structured_logger import get_logger
 
 logger = get_logger("token-budget")
@@ -33,6 +35,7 @@ class TokenBudgetService:
         # プール別使用量
         self._usage: Dict[str, int] = {"chat": 0, "report": 0}
         self._current_date: str = ""
+        self.session_tokens_per_minute = settings.rate_limit_session_tokens_per_minute
         self._lock = threading.Lock()
 
     def _today(self) -> str:
@@ -65,6 +68,23 @@ class TokenBudgetService:
                 pool_usage=self._usage[pool],
                 pool_remaining=max(0, self.daily_budget[pool] - self._usage[pool]),
             )
+        self._charge_rate_limit(tokens_used)
+
+    def _charge_rate_limit(self, tokens_used: int) -> None:
+        """呼び出し元の識別子（user / IP）の分単位トークン枠にも後払いで計上する。
+
+        日次予算はインスタンス全体のコスト上限、こちらは特定ユーザーによる短時間の濫用対策。
+        超過中はレートリミットミドルウェアが次の LLM リクエストを 429 にする。
+        """
+        identity = get_rate_limit_identity()
+        if not identity:
+            return
+        try:
+            get_rate_limiter().charge(
+                Limit(session_tokens_key(identity), self.session_tokens_per_minute, 60, cost=tokens_used)
+            )
+        except Exception as e:
+            logger.warning("token_rate_limit_charge_failed", error=str(e))
 
     def get_usage(self, pool: Pool = "chat") -> int:
         """指定プールの本日の使用量を取得。"""
@@ -1,8 +1,8 @@
 from langchain_core.tools import tool
-from google.cloud.bigquery import QueryJobConfig, ScalarQueryParameter
+from google.cloud.bigquery import ScalarQueryParameter
 
 from backend.app.utils.structured_logger import get_logger
-from ..bigquery_service import client
+from ..bigquery_service import run_query_sync
 
 logger = get_logger("tools.matchup_analytics")
 
@@ -48,10 +48,8 @@ def mlb_matchup_analytics_tool(batter_name: str, pitcher_name: str):
         ScalarQueryParameter("pitcher_part", "STRING", p_part)
     ]
 
-    job_config = QueryJobConfig(query_parameters=query_parameters)
-
     try:
-        df = client.query(query, job_config=job_config).to_dataframe()
+        df = run_query_sync(query, query_parameters)
         return df.to_dict(orient='records')
     except Exception as e:
         logger.error(f"Error in mlb_matchup_analytics_tool: {e}")
@@ -1,10 +1,9 @@
 from langchain_core.tools import tool
-from google.cloud.bigquery import QueryJobConfig, ScalarQueryParameter
+from google.cloud.bigquery import ScalarQueryParameter
 
 from backend.app.core.exceptions import DataFetchError
 from backend.app.utils.structured_logger import get_logger
-from ..bigquery_service import client
-from ..cache_service import StatsCache
+from ..bigquery_service import run_query_sync
 
 logger = get_logger("tools.matchup_history")
 
@@ -55,21 +54,10 @@ def mlb_matchup_history_tool(batter_name: str, pitcher_name: str):
         ScalarQueryParameter("pitcher_part", "STRING", p_part)
     ]
 
-    job_config = QueryJobConfig(query_parameters=query_parameters)
-
-    # Check cache first
-    cache = StatsCache()
-    cached_data = cache.get_player_stats(player_name=batter_name, season=2024, query_type=f"matchup_{pitcher_name}")
-    if cached_data:
-        logger.info("Cache HIT")
-        return cached_data
-    
+    # キャッシュ（L1 / Redis）は run_query_sync 側で SQL + パラメータをキーに処理される
     try:
-        df = client.query(query, job_config=job_config).to_dataframe()
+        df = run_query_sync(query, query_parameters)
         logger.info(f"✅ Matchup history found", row_count=len(df), batter_name=batter_name, pitcher_name=pitcher_name)
-        result = df.to_dict(orient='records')
-        # Save to Redis
-        cache.set_player_stats(player_name=batter_name, season=2024, query_type=f"matchup_{pitcher_name}", data=result)
-        return result
+        return df.to_dict(orient='records')
     except Exception as e:
         raise DataFetchError("対戦履歴の取得に失敗しました", original_error=e) from e
\ No newline at end of file
@@ -13,9 +13,7 @@ import os
 import logging
 from typing import Any, Dict, List
 
-from google.cloud import bigquery
-
-from backend.app.services.bigquery_service import client
+from backend.app.services.bigquery_service import run_query_sync
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +25,17 @@ FULL_TABLE_ID = f"`{PROJECT_ID}.{DATASET_ID}.{TABLE_ID}`"
 DEFAULT_TZ = "Asia/Tokyo"
 
 
+def _records(sql: str, params: List[tuple]) -> List[Dict[str, Any]]:
+    """共有実行器でクエリを実行し、行を dict のリストで返す（NULL は None）。"""
+    df = run_query_sync(sql, params)
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
+
+def _items(value) -> List[Any]:
+    """ARRAY 列の値をリストにする（DataFrame 上では ndarray、NULL は None）。"""
+    return [] if value is None else list(value)
+
+
 def get_dashboard_all(
     target_year: int,
     target_month: int,
@@ -156,18 +165,16 @@ def get_dashboard_all(
         LIMIT @recent_limit
       ) AS recent
     """
-    job_config = bigquery.QueryJobConfig(
-        query_parameters=[
-            bigquery.ScalarQueryParameter("target_year", "INT64", target_year),
-            bigquery.ScalarQueryParameter("target_month", "INT64", target_month),
-            bigquery.ScalarQueryParameter("prev_year", "INT64", prev_year),
-            bigquery.ScalarQueryParameter("prev_month", "INT64", prev_month),
-            bigquery.ScalarQueryParameter("days", "INT64", trend_days),
-            bigquery.ScalarQueryParameter("recent_limit", "INT64", recent_limit),
-            bigquery.ScalarQueryParameter("tz", "STRING", DEFAULT_TZ),
-        ]
-    )
-    rows = list(client.query(sql, job_config=job_config).result())
+    params = [
+        ("target_year", "INT64", target_year),
+        ("target_month", "INT64", target_month),
+        ("prev_year", "INT64", prev_year),
+        ("prev_month", "INT64", prev_month),
+        ("days", "INT64", trend_days),
+        ("recent_limit", "INT64", recent_limit),
+        ("tz", "STRING", DEFAULT_TZ),
+    ]
+    rows = _records(sql, params)
     if not rows:
         return _empty_dashboard(target_year, target_month, prev_year, prev_month)
     r = rows[0]
@@ -196,7 +203,7 @@ def get_dashboard_all(
                 "input_tokens": int(m["input_tokens"] or 0),
                 "output_tokens": int(m["output_tokens"] or 0),
             }
-            for m in (r["by_model"] or [])
+            for m in _items(r["by_model"])
         ],
         "by_feature": [
             {
@@ -207,7 +214,7 @@ def get_dashboard_all(
                 "output_tokens": int(f["output_tokens"] or 0),
                 "avg_latency_ms": float(f["avg_latency_ms"] or 0),
             }
-            for f in (r["by_feature"] or [])
+            for f in _items(r["by_feature"])
         ],
         "daily": [
             {
@@ -216,7 +223,7 @@ def get_dashboard_all(
                 "cost_usd": float(d["cost_usd"] or 0),
                 "tokens": int(d["tokens"] or 0),
             }
-            for d in (r["daily"] or [])
+            for d in _items(r["daily"])
         ],
         "recent": [
             {
@@ -232,7 +239,7 @@ def get_dashboard_all(
                 "error_type": rec["error_type"],
                 "endpoint": rec["endpoint"],
             }
-            for rec in (r["recent"] or [])
+            for rec in _items(r["recent"])
         ],
     }
 
@@ -266,14 +273,12 @@ def get_monthly_summary(year: int, month: int) -> Dict[str, Any]:
       AND EXTRACT(YEAR FROM timestamp AT TIME ZONE @tz) = @year
       AND EXTRACT(MONTH FROM timestamp AT TIME ZONE @tz) = @month
     """
-    job_config = bigquery.QueryJobConfig(
-        query_parameters=[
-            bigquery.ScalarQueryParameter("year", "INT64", year),
-            bigquery.ScalarQueryParameter("month", "INT64", month),
-            bigquery.ScalarQueryParameter("tz", "STRING", DEFAULT_TZ),
-        ]
-    )
-    rows = list(client.query(sql, job_config=job_config).result())
+    params = [
+        ("year", "INT64", year),
+        ("month", "INT64", month),
+        ("tz", "STRING", DEFAULT_TZ),
+    ]
+    rows = _records(sql, params)
     if not rows:
         return _empty_summary(year, month)
     r = rows[0]
@@ -306,13 +311,11 @@ def get_monthly_by_model(year: int, month: int) -> List[Dict[str, Any]]:
     GROUP BY model
     ORDER BY cost_usd DESC
     """
-    job_config = bigquery.QueryJobConfig(
-        query_parameters=[
-            bigquery.ScalarQueryParameter("year", "INT64", year),
-            bigquery.ScalarQueryParameter("month", "INT64", month),
-            bigquery.ScalarQueryParameter("tz", "STRING", DEFAULT_TZ),
-        ]
-    )
+    params = [
+        ("year", "INT64", year),
+        ("month", "INT64", month),
+        ("tz", "STRING", DEFAULT_TZ),
+    ]
     return [
         {
             "model": r["model"],
@@ -321,7 +324,7 @@ def get_monthly_by_model(year: int, month: int) -> List[Dict[str, Any]]:
             "input_tokens": int(r["input_tokens"] or 0),
             "output_tokens": int(r["output_tokens"] or 0),
         }
-        for r in client.query(sql, job_config=job_config).result()
+        for r in _records(sql, params)
     ]
 
 
@@ -342,13 +345,11 @@ def get_monthly_by_feature(year: int, month: int) -> List[Dict[str, Any]]:
     GROUP BY feature
     ORDER BY cost_usd DESC
     """
-    job_config = bigquery.QueryJobConfig(
-        query_parameters=[
-            bigquery.ScalarQueryParameter("year", "INT64", year),
-            bigquery.ScalarQueryParameter("month", "INT64", month),
-            bigquery.ScalarQueryParameter("tz", "STRING", DEFAULT_TZ),
-        ]
-    )
+    params = [
+        ("year", "INT64", year),
+        ("month", "INT64", month),
+        ("tz", "STRING", DEFAULT_TZ),
+    ]
     return [
         {
             "feature": r["feature"],
@@ -358,7 +359,7 @@ def get_monthly_by_feature(year: int, month: int) -> List[Dict[str, Any]]:
             "output_tokens": int(r["output_tokens"] or 0),
             "avg_latency_ms": float(r["avg_latency_ms"] or 0),
         }
-        for r in client.query(sql, job_config=job_config).result()
+        for r in _records(sql, params)
     ]
 
 
@@ -389,12 +390,10 @@ def get_daily_trend(trend_days: int = 30) -> List[Dict[str, Any]]:
     LEFT JOIN agg a USING (date)
     ORDER BY r.date ASC
     """
-    job_config = bigquery.QueryJobConfig(
-        query_parameters=[
-            bigquery.ScalarQueryParameter("days", "INT64", trend_days),
-            bigquery.ScalarQueryParameter("tz", "STRING", DEFAULT_TZ),
-        ]
-    )
+    params = [
+        ("days", "INT64", trend_days),
+        ("tz", "STRING", DEFAULT_TZ),
+    ]
     return [
         {
             "date": r["date"].isoformat(),
@@ -402,7 +401,7 @@ def get_daily_trend(trend_days: int = 30) -> List[Dict[str, Any]]:
             "cost_usd": float(r["cost_usd"] or 0),
             "tokens": int(r["tokens"] or 0),
         }
-        for r in client.query(sql, job_config=job_config).result()
+        for r in _records(sql, params)
     ]
 
 
@@ -426,11 +425,9 @@ def get_recent_invocations(limit: int = 10) -> List[Dict[str, Any]]:
     ORDER BY timestamp DESC
     LIMIT @limit
     """
-    job_config = bigquery.QueryJobConfig(
-        query_parameters=[
-            bigquery.ScalarQueryParameter("limit", "INT64", limit),
-        ]
-    )
+    params = [
+        ("limit", "INT64", limit),
+    ]
     return [
         {
             "log_id": r["log_id"],
@@ -445,7 +442,7 @@ def get_recent_invocations(limit: int = 10) -> List[Dict[str, Any]]:
             "error_type": r["error_type"],
             "endpoint": r["endpoint"],
         }
-        for r in client.query(sql, job_config=job_config).result()
+        for r in _records(sql, params)
     ]
 
 
@@ -0,0 +1,110 @@
+"""
+依存関係つきの非同期 DAG 実行器。
+
+各ノードは「依存ノードの結果を引数に取る関数」として宣言し、依存がすべて解決したノードから
+順に起動する。同期関数（BigQuery 待ちなど）は呼び出し側が渡した共有スレッドプールで実行するため、
+プールの max_workers がプロセス全体の同時実行数の上限になる（リクエストごとにプールを作らない）。
+
+  - stream(): 解決したノードから順に (name, value) を返す。途中で抜けると未完了のノードはキャンセルする
+  - run():    全ノードの結果を dict で返す
+
+ノードの例外は warning を出して結果 None として扱い、依存先には None が渡る（fail-open）。
+"""
+import asyncio
+import contextvars
+import functools
+import logging
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class DagNode:
+    """DAG の 1 ノード。fn は deps の結果を同じ順の位置引数で受け取る。"""
+
+    name: str
+    fn: Callable[..., Any]
+    deps: Tuple[str, ...] = ()
+    blocking: bool = True   # False なら軽い計算としてイベントループ上で直接呼ぶ
+
+
+def _validate(nodes: Sequence[DagNode]) -> None:
+    names = [n.name for n in nodes]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate DAG node names: {names}")
+    known = set(names)
+    for node in nodes:
+        missing = [d for d in node.deps if d not in known]
+        if missing:
+            raise ValueError(f"DAG node '{node.name}' depends on unknown nodes: {missing}")
+
+    # 循環検出（トポロジカル順に並べられなければ循環）
+    remaining = {n.name: set(n.deps) for n in nodes}
+    while remaining:
+        ready = [name for name, deps in remaining.items() if not deps]
+        if not ready:
+            raise ValueError(f"DAG has a cycle among: {sorted(remaining)}")
+        for name in ready:
+            del remaining[name]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+
+
+class AsyncDagExecutor:
+    """DagNode の集合を依存順に並列実行する。"""
+
+    def __init__(self, executor: Optional[Executor] = None, name: str = "dag"):
+        self.executor = executor
+        self.name = name
+
+    async def _call(self, node: DagNode, args: Tuple[Any, ...]) -> Any:
+        try:
+            if not node.blocking:
+                return node.fn(*args)
+            # asyncio.to_thread と同じくリクエストの ContextVar（request_id など）を引き継ぐ
+            ctx = contextvars.copy_context()
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self.executor, functools.partial(ctx.run, node.fn, *args)
+            )
+        except Exception as e:
+            logger.warning(f"{self.name} node '{node.name}' failed: {e}")
+            return None
+
+    async def stream(self, nodes: Sequence[DagNode]) -> AsyncIterator[Tuple[str, Any]]:
+        """解決したノードから順に (name, value) を返す。"""
+        _validate(nodes)
+        results: Dict[str, Any] = {}
+        running: Dict[asyncio.Task, str] = {}
+        started = set()
+
+        def _start_ready() -> None:
+            for node in nodes:
+                if node.name in started or not all(d in results for d in node.deps):
+                    continue
+                started.add(node.name)
+                args = tuple(results[d] for d in node.deps)
+                running[asyncio.ensure_future(self._call(node, args))] = node.name
+
+        try:
+            _start_ready()
+            while running:
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name = running.pop(task)
+                    results[name] = task.result()
+                    # 先に返してから依存先を起動する（呼び出し側がここで抜ければ依存先は起動しない）
+                    yield name, results[name]
+                _start_ready()
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+
+    async def run(self, nodes: Sequence[DagNode]) -> Dict[str, Any]:
+        """全ノードを実行し、name → value の dict を返す。"""
+        return {name: value async for name, value in self.stream(nodes)}
@@ -0,0 +1,77 @@
+"""
+クエリ結果（pyarrow.Table / pandas.DataFrame）をレスポンス用の dict / list に列単位で変換する。
+
+iterrows() で 1 行ずつ Series を作って dict を組み立てる処理を置き換えるためのもの。
+丸め・欠損の None 化は列ごとにまとめて行い、最後に一度だけ Python オブジェクトへ落とす。
+bigquery_service.run_query_arrow は pyarrow が無い環境では DataFrame を返すため、
+ここの関数はどちらの型も受け付ける。
+"""
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    _PYARROW_AVAILABLE = True
+except ImportError:
+    pa = None  # type: ignore
+    pc = None  # type: ignore
+    _PYARROW_AVAILABLE = False
+
+Frame = Union["pa.Table", pd.DataFrame]
+
+
+def is_arrow(data: Any) -> bool:
+    return _PYARROW_AVAILABLE and isinstance(data, pa.Table)
+
+
+def num_rows(data: Frame) -> int:
+    return data.num_rows if is_arrow(data) else len(data)
+
+
+def to_pandas(data: Frame) -> pd.DataFrame:
+    """特徴量計算など pandas が必要な処理向け。Arrow からは列単位で変換される。"""
+    return data.to_pandas() if is_arrow(data) else data
+
+
+def to_records(
+    data: Frame,
+    *,
+    columns: Optional[Sequence[str]] = None,
+    round_digits: Optional[Dict[str, int]] = None,
+) -> List[Dict[str, Any]]:
+    """行ごとの dict のリストに変換する。NaN / NULL は None になる。
+
+    Args:
+        columns: 出力する列（省略時は全列）
+        round_digits: 列名 → 小数桁数。該当列は float に丸めてから出力する
+    """
+    round_digits = round_digits or {}
+
+    if is_arrow(data):
+        table = data.select(list(columns)) if columns is not None else data
+        for col, ndigits in round_digits.items():
+            idx = table.schema.get_field_index(col)
+            if idx < 0:
+                continue
+            rounded = pc.round(pc.cast(table.column(idx), pa.float64()), ndigits)
+            table = table.set_column(idx, col, rounded)
+        return table.to_pylist()
+
+    df = data[list(columns)] if columns is not None else data
+    if round_digits:
+        present = {c: n for c, n in round_digits.items() if c in df.columns}
+        df = df.astype({c: "float64" for c in present}).round(present)
+    # object 化すると numpy スカラーが Python の int / float になる
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
+
+def to_columns(data: Frame, columns: Optional[Sequence[str]] = None) -> Dict[str, List[Any]]:
+    """列名 → 値リストの dict に変換する（散布図など列指向のレスポンス用）。"""
+    if is_arrow(data):
+        table = data.select(list(columns)) if columns is not None else data
+        return table.to_pydict()
+    df = data[list(columns)] if columns is not None else data
+    return {c: df[c].astype(object).where(df[c].notna(), None).tolist() for c in df.columns}
+
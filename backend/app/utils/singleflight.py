@@ -0,0 +1,117 @@
+"""
+Single-flight: 同一キーの同時呼び出しを 1 回の実行にまとめる。
+
+試合終了直後や朝のまとめ配信のように、同じ選手・同じ対戦の画面へアクセスが集中すると、
+同一の集計が並走して BigQuery スロットを食い合う。先着の呼び出し（leader）だけが実行し、
+後続は leader の結果を待つ。完了後はキーを解放するので結果のキャッシュはしない
+（キャッシュは bigquery_service / cache_service 側の責務）。
+
+    @singleflight
+    async def get_rankings(self, season: int, limit: int = 40): ...
+
+注意: 結果オブジェクトは全呼び出し元で共有される。呼び出し側で書き換えないこと。
+"""
+import asyncio
+import functools
+import inspect
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """キー単位で実行中の呼び出しを共有するグループ。async / sync の両方に対応。"""
+
+    def __init__(self, name: str = "default"):
+        self.name = name
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+        self._futures: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any) -> T:
+        """coroutine 関数を single-flight で実行する。
+
+        実行本体は Task として切り離すため、leader の呼び出し元がキャンセルされても
+        相乗り中の呼び出しには影響しない。
+        """
+        task = self._tasks.get(key)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(fn(*args, **kwargs))
+            self._tasks[key] = task
+            task.add_done_callback(functools.partial(self._release_task, key))
+        else:
+            self.coalesced += 1
+            logger.debug(f"singleflight[{self.name}] joined in-flight call: {key}")
+        return await asyncio.shield(task)
+
+    def _release_task(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        # 全員がキャンセルして誰も結果を取りに来ない場合の "never retrieved" 警告を抑止
+        if not task.cancelled():
+            task.exception()
+
+    def do_sync(self, key: Hashable, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """同期関数を single-flight で実行する。leader は自スレッドで fn を実行する。"""
+        with self._lock:
+            fut = self._futures.get(key)
+            is_leader = fut is None
+            if is_leader:
+                fut = Future()
+                self._futures[key] = fut
+            else:
+                self.coalesced += 1
+        if not is_leader:
+            logger.debug(f"singleflight[{self.name}] joined in-flight call: {key}")
+            return fut.result()
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            fut.set_exception(e)
+            raise
+        else:
+            fut.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                if self._futures.get(key) is fut:
+                    del self._futures[key]
+
+
+def _call_key(fn: Callable, sig: inspect.Signature, args: tuple, kwargs: dict) -> Hashable:
+    """デフォルト値を補った引数からキーを作る。メソッドの self は含めない。"""
+    bound = sig.bind(*args, **kwargs)
+    bound.apply_defaults()
+    items = [(k, v) for k, v in bound.arguments.items() if k != "self"]
+    return (fn.__module__, fn.__qualname__, tuple(items))
+
+
+def singleflight(fn: Callable) -> Callable:
+    """関数デコレータ版。引数が同じ同時呼び出しを 1 回にまとめる（引数は hashable であること）。
+
+    FastAPI のエンドポイントにも使える（functools.wraps によりシグネチャは保たれる）。
+    """
+    flight = SingleFlight(name=fn.__qualname__)
+    sig = inspect.signature(fn)
+
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            return await flight.do(_call_key(fn, sig, args, kwargs), fn, *args, **kwargs)
+
+        async_wrapper.flight = flight
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def sync_wrapper(*args, **kwargs):
+        return flight.do_sync(_call_key(fn, sig, args, kwargs), fn, *args, **kwargs)
+
+    sync_wrapper.flight = flight
+    return sync_wrapper
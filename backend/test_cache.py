@@ -2,28 +2,32 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.services.cache_service import StatsCache
+import pandas as pd
+
+from backend.app.services.cache_service import QueryResultCache
 
 
 def test_cache():
-    cache = StatsCache()
-    
+    cache = QueryResultCache()
+
     # テストデータ
-    test_data = {"avg": 0.310, "hr": 54, "rbi": 130}
-    
-    # 保存
-    cache.set_player_stats("Shohei Ohtani", 2024, "season_batting", test_data)
+    test_df = pd.DataFrame({"avg": [0.310], "hr": [54], "rbi": [130]})
+    key = "bqcache:v1:manual-test"
+
+    # 保存（L1 + Redis）
+    cache.put(key, test_df, ttl=60)
     print("✅ データを保存しました")
-    
-    # 取得
-    result = cache.get_player_stats("Shohei Ohtani", 2024, "season_batting")
+
+    # L1 を空にして Redis から取得
+    cache.clear()
+    result = cache.get_remote(key, ttl=60)
     print(f"✅ 取得結果: {result}")
-    
+
     # 検証
-    if result == test_data:
+    if result is not None and result.equals(test_df):
         print("🎉 テスト成功！")
     else:
         print("❌ テスト失敗")
 
 if __name__ == "__main__":
-    test_cache()
\ No newline at end of file
+    test_cache()
@@ -0,0 +1,127 @@
+"""
+Advanced Stats のスコア縦持ち表・一括トレンド ユニットテスト
+BigQuery 接続不要: run_query_sync / run_query をモックし、トレンドが 1 回の読み込みから返ることを検証する。
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pandas as pd
+import pytest
+
+from backend.app.services import advanced_stats_service as advanced_service
+from backend.app.services.advanced_score_table import ScoreLongTable, ScoreMetric, score_table_query
+from backend.app.services.leaderboard_snapshot import LeaderboardSnapshotStore
+
+
+def _scores_df() -> pd.DataFrame:
+    return pd.DataFrame({
+        "metric_id": ["P1", "P1", "P2", "B1", "P1"],
+        "player_id": [10, 10, 10, 10, 20],
+        "game_year": [2024, 2025, 2025, 2023, 2025],
+        "score": [1.234, 0.5, -0.456, 101.0, 2.0],
+    })
+
+
+class TestScoreLongTable:
+    """ScoreLongTable のテスト"""
+
+    def test_trends_by_metric_group(self):
+        """指定した指標のあるシーズンだけを昇順で返し、無い指標は None"""
+        table = ScoreLongTable(_scores_df())
+
+        assert table.trends(10, ["P1", "P2"]) == [
+            {"season": 2024, "P1": 1.23, "P2": None},
+            {"season": 2025, "P1": 0.5, "P2": -0.46},
+        ]
+        # 二刀流: 打者指標だけを見れば打者のシーズンだけ
+        assert table.trends(10, ["B1"]) == [{"season": 2023, "B1": 101.0}]
+
+    def test_trends_many_keeps_unknown_players(self):
+        """表に無い選手は空リスト"""
+        table = ScoreLongTable(_scores_df())
+
+        many = table.trends_many([20, 99], ["P1"])
+        assert many == {20: [{"season": 2025, "P1": 2.0}], 99: []}
+
+    def test_query_unions_all_metrics(self):
+        """全指標を UNION ALL の 1 本にまとめる"""
+        sql = score_table_query([
+            ScoreMetric("P1", "proj.ds.view_a", "pitcher", "a_score"),
+            ScoreMetric("B1", "proj.ds.view_b", "batter", "b_score"),
+        ])
+
+        assert sql.count("UNION ALL") == 1
+        assert "'P1'" in sql and "`proj.ds.view_b`" in sql
+
+
+class TestAdvancedStatsTrends:
+    """AdvancedStatsService のトレンド・ランキングのテスト"""
+
+    def test_trends_share_one_load(self):
+        """単体・一括トレンドとも BigQuery の読み込みは 1 回"""
+        store = LeaderboardSnapshotStore()
+        service = advanced_service.AdvancedStatsService()
+        with patch.object(advanced_service, "get_leaderboard_snapshot_store", return_value=store), \
+             patch.object(advanced_service, "run_query_sync", return_value=_scores_df()) as bq:
+            single = asyncio.run(service.get_pitcher_trends(20))
+            bulk = asyncio.run(service.get_pitcher_trends_bulk((10, 20)))
+
+        assert single == {"pitcher_id": 20, "trends": [
+            {"season": 2025, "P1": 2.0, "P2": None, "P3": None, "P4": None, "P6": None, "P8": None},
+        ]}
+        assert [p["pitcher_id"] for p in bulk["players"]] == [10, 20]
+        assert [t["season"] for t in bulk["players"][0]["trends"]] == [2024, 2025]
+        assert bq.call_count == 1
+
+    def test_bulk_load_falls_back_per_metric(self):
+        """UNION が失敗したら指標ごとに読み、読めた指標だけで表を作る"""
+        def _query(sql, cache):
+            if "UNION ALL" in sql or "clutch_hitting_score" in sql:
+                raise RuntimeError("view missing")
+            return _scores_df().iloc[[3]]
+
+        with patch.object(advanced_service, "run_query_sync", side_effect=_query):
+            table = advanced_service._load_score_table()
+
+        assert table.trends(10, ["B1"]) == [{"season": 2023, "B1": 101.0}]
+
+    def test_unavailable_table_returns_empty_trends(self):
+        """スコアが一切読めなければ空のトレンド（従来どおり）"""
+        store = LeaderboardSnapshotStore()
+        service = advanced_service.AdvancedStatsService()
+        with patch.object(advanced_service, "get_leaderboard_snapshot_store", return_value=store), \
+             patch.object(advanced_service, "run_query_sync", side_effect=RuntimeError("down")):
+            result = asyncio.run(service.get_batter_trends(10))
+
+        assert result == {"batter_id": 10, "trends": []}
+
+    def test_ranking_and_scatter_from_one_query(self):
+        """ランキングのページと散布図を 1 回のクエリから切り出す"""
+        df = pd.DataFrame({
+            "pitcher": [1, 2, 3],
+            "player_name": ["A", "B", "C"],
+            "team_abbr": ["NYY", "LAD", "SEA"],
+            "total_2_strike_pitches": [500, 400, 300],
+            "primary_finishing_pitch": ["SL", "FF", "CU"],
+            "whiff_rate": [0.3, 0.2, 0.1],
+            "put_away_woba": [0.2, 0.25, 0.3],
+            "finisher_score": [2.0, 1.0, 0.0],
+        })
+        service = advanced_service.AdvancedStatsService()
+        with patch.object(advanced_service, "run_query", new=AsyncMock(return_value=df)) as bq:
+            result = asyncio.run(service.get_finisher_rankings(season=2025, limit=1, offset=1))
+
+        assert bq.await_count == 1
+        assert [r["pitcher_id"] for r in result["rankings"]] == [2]
+        assert len(result["scatter_all"]) == 3
+        assert result["total"] == 3
+        params = dict((name, value) for name, _, value in bq.await_args.args[1])
+        assert params["fetch_limit"] == 200
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
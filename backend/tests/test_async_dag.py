@@ -0,0 +1,110 @@
+"""
+AsyncDagExecutor ユニットテスト
+依存順の起動・共有プールでの並列実行・途中で抜けたときのキャンセルを検証する。
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from backend.app.utils.async_dag import AsyncDagExecutor, DagNode
+
+
+def _collect(executor: AsyncDagExecutor, nodes) -> list:
+    async def _run():
+        return [item async for item in executor.stream(nodes)]
+    return asyncio.run(_run())
+
+
+class TestAsyncDagExecutor:
+    """AsyncDagExecutor のテスト"""
+
+    def test_dependencies_receive_results(self):
+        """依存ノードの結果が deps の順で位置引数に渡る"""
+        nodes = [
+            DagNode("a", lambda: 2),
+            DagNode("b", lambda: 3),
+            DagNode("c", lambda a, b: a * 10 + b, ("a", "b")),
+            DagNode("d", lambda c: c + 1, ("c",), blocking=False),
+        ]
+        results = asyncio.run(AsyncDagExecutor().run(nodes))
+
+        assert results == {"a": 2, "b": 3, "c": 23, "d": 24}
+
+    def test_sections_stream_as_they_resolve(self):
+        """遅いノードを待たずに、解決したノードから順に返す"""
+        nodes = [
+            DagNode("slow", lambda: time.sleep(0.2) or "slow"),
+            DagNode("fast", lambda: "fast"),
+            DagNode("after_fast", lambda f: f + "!", ("fast",)),
+        ]
+        names = [name for name, _ in _collect(AsyncDagExecutor(), nodes)]
+
+        assert names.index("after_fast") < names.index("slow")
+
+    def test_shared_pool_caps_concurrency(self):
+        """同時実行数は渡したプールの幅を超えない"""
+        active, peak, lock = [0], [0], threading.Lock()
+
+        def _work():
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+
+        pool = ThreadPoolExecutor(max_workers=2)
+        executor = AsyncDagExecutor(pool)
+        nodes = [DagNode(f"n{i}", _work) for i in range(6)]
+
+        async def _run():
+            await asyncio.gather(executor.run(nodes), executor.run(nodes))
+
+        asyncio.run(_run())
+        pool.shutdown()
+        assert peak[0] == 2
+
+    def test_failed_node_yields_none(self):
+        """例外を投げたノードは None になり、依存先には None が渡る"""
+        nodes = [
+            DagNode("bad", lambda: 1 / 0),
+            DagNode("child", lambda bad: bad is None, ("bad",)),
+        ]
+        assert asyncio.run(AsyncDagExecutor().run(nodes)) == {"bad": None, "child": True}
+
+    def test_early_exit_skips_dependents(self):
+        """呼び出し側が抜けたら、依存先は起動せず未完了のノードはキャンセルする"""
+        started = []
+        nodes = [
+            DagNode("root", lambda: None),
+            DagNode("child", lambda r: started.append("child"), ("root",)),
+        ]
+
+        async def _run():
+            async for name, value in AsyncDagExecutor().stream(nodes):
+                if name == "root" and value is None:
+                    break
+
+        asyncio.run(_run())
+        assert started == []
+
+    def test_invalid_graphs_are_rejected(self):
+        """未知の依存・循環は実行前に ValueError"""
+        with pytest.raises(ValueError):
+            _collect(AsyncDagExecutor(), [DagNode("a", lambda x: x, ("missing",))])
+        with pytest.raises(ValueError):
+            _collect(AsyncDagExecutor(), [
+                DagNode("a", lambda b: b, ("b",)),
+                DagNode("b", lambda a: a, ("a",)),
+            ])
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
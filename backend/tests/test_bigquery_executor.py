@@ -0,0 +1,283 @@
+"""
+BigQueryExecutor ユニットテスト
+BigQuery 接続不要: クライアントをモックに差し替えて deadline・キャンセル・パラメータ変換を検証する。
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import asyncio
+import threading
+import time
+
+import pandas as pd
+import pytest
+from unittest.mock import MagicMock
+from google.cloud import bigquery
+
+from backend.app.core.exceptions import QueryTimeoutError, DataFetchError
+from backend.app.services.bigquery_service import BigQueryExecutor, build_job_config
+from backend.app.services.cache_service import QueryResultCache
+
+
+def _make_client(df=None, delay: float = 0.0):
+    """query() が job モックを返すクライアント。delay 秒だけ result() がブロックする。"""
+    client = MagicMock()
+    job = MagicMock()
+
+    def _result(timeout=None):
+        time.sleep(delay)
+
+    job.result.side_effect = _result
+    job.to_dataframe.return_value = df if df is not None else pd.DataFrame({"x": [1]})
+    client.query.return_value = job
+    return client, job
+
+
+class TestBuildJobConfig:
+    """build_job_config のパラメータ変換テスト"""
+
+    def test_tuple_params_become_scalar(self):
+        """(name, type, value) タプルは ScalarQueryParameter になる"""
+        config = build_job_config([("season", "INT64", 2025)])
+        param = config.query_parameters[0]
+        assert isinstance(param, bigquery.ScalarQueryParameter)
+        assert param.name == "season"
+        assert param.value == 2025
+
+    def test_list_value_becomes_array(self):
+        """値が list のタプルは ArrayQueryParameter になる"""
+        config = build_job_config([("ids", "INT64", [1, 2, 3])])
+        param = config.query_parameters[0]
+        assert isinstance(param, bigquery.ArrayQueryParameter)
+        assert param.values == [1, 2, 3]
+
+    def test_query_parameter_passthrough(self):
+        """QueryParameter はそのまま渡される"""
+        p = bigquery.ScalarQueryParameter("name", "STRING", "Ohtani")
+        config = build_job_config([p])
+        assert config.query_parameters[0] == p
+
+    def test_none_params(self):
+        """params 省略時は空のパラメータ"""
+        assert build_job_config(None).query_parameters == []
+
+
+class TestRunQuery:
+    """run_query / run_query_sync のテスト"""
+
+    def test_run_query_returns_dataframe(self):
+        """結果の DataFrame がそのまま返り、ジョブ側にも deadline が設定される"""
+        df = pd.DataFrame({"total": [42]})
+        client, _ = _make_client(df)
+        executor = BigQueryExecutor(max_workers=2, default_timeout=5, bq_client=client)
+        try:
+            result = asyncio.run(executor.run_query("SELECT 1", [("season", "INT64", 2025)]))
+        finally:
+            executor.shutdown()
+
+        assert result is df
+        job_config = client.query.call_args.kwargs["job_config"]
+        assert int(job_config.job_timeout_ms) == 5000
+
+    def test_run_query_timeout_cancels_job(self):
+        """deadline 超過で QueryTimeoutError になり、BQ ジョブがキャンセルされる"""
+        client, job = _make_client(delay=0.5)
+        executor = BigQueryExecutor(max_workers=2, default_timeout=5, bq_client=client)
+        try:
+            with pytest.raises(QueryTimeoutError):
+                asyncio.run(executor.run_query("SELECT 1", timeout=0.05))
+        finally:
+            executor.shutdown()
+
+        job.cancel.assert_called_once()
+
+    def test_timeout_error_is_data_fetch_error(self):
+        """既存の DataFetchError ハンドラで捕捉できる"""
+        assert issubclass(QueryTimeoutError, DataFetchError)
+
+    def test_run_query_sync_timeout_cancels_job(self):
+        """同期版でも deadline 超過でジョブがキャンセルされる"""
+        client, job = _make_client(delay=0.5)
+        executor = BigQueryExecutor(max_workers=2, default_timeout=5, bq_client=client)
+        try:
+            with pytest.raises(QueryTimeoutError):
+                executor.run_query_sync("SELECT 1", timeout=0.05)
+        finally:
+            executor.shutdown()
+
+        job.cancel.assert_called_once()
+
+    def test_concurrency_is_bounded(self):
+        """同時実行数は max_workers を超えない"""
+        lock = threading.Lock()
+        state = {"running": 0, "peak": 0}
+        client = MagicMock()
+
+        def _query(sql, job_config=None, timeout=None):
+            job = MagicMock()
+
+            def _result(timeout=None):
+                with lock:
+                    state["running"] += 1
+                    state["peak"] = max(state["peak"], state["running"])
+                time.sleep(0.05)
+                with lock:
+                    state["running"] -= 1
+
+            job.result.side_effect = _result
+            job.to_dataframe.return_value = pd.DataFrame()
+            return job
+
+        client.query.side_effect = _query
+        executor = BigQueryExecutor(max_workers=2, default_timeout=5, bq_client=client)
+
+        async def _run_many():
+            await asyncio.gather(*(executor.run_query("SELECT 1") for _ in range(6)))
+
+        try:
+            asyncio.run(_run_many())
+        finally:
+            executor.shutdown()
+
+        assert state["peak"] <= 2
+
+
+class TestDeadlineAndCancellation:
+    """deadline の起点と、共有ジョブのキャンセル条件のテスト"""
+
+    def test_queue_wait_does_not_count_against_deadline(self):
+        """プールの待ち行列にいた時間は deadline に含めない"""
+        client = MagicMock()
+
+        def _query(sql, job_config=None, timeout=None):
+            job = MagicMock()
+            delay = 0.3 if "slow" in sql else 0.05
+            job.result.side_effect = lambda timeout=None: time.sleep(delay)
+            job.to_dataframe.return_value = pd.DataFrame({"x": [1]})
+            return job
+
+        client.query.side_effect = _query
+        executor = BigQueryExecutor(max_workers=1, default_timeout=5, bq_client=client)
+
+        async def _run():
+            slow = asyncio.ensure_future(executor.run_query("SELECT 'slow'"))
+            await asyncio.sleep(0.01)
+            fast = await executor.run_query("SELECT 'fast'", timeout=0.2)
+            await slow
+            return fast
+
+        try:
+            result = asyncio.run(_run())
+        finally:
+            executor.shutdown()
+
+        assert result["x"].tolist() == [1]
+
+    def test_queue_timeout_skips_queued_query(self):
+        """待ち行列で queue_timeout を超えたら QueryTimeoutError、そのクエリは実行されない"""
+        client, _ = _make_client(delay=0.3)
+        executor = BigQueryExecutor(max_workers=1, default_timeout=5, bq_client=client, queue_timeout=0.05)
+
+        async def _run():
+            busy = asyncio.ensure_future(executor.run_query("SELECT 1"))
+            await asyncio.sleep(0.01)
+            with pytest.raises(QueryTimeoutError):
+                await executor.run_query("SELECT 2")
+            await busy
+
+        try:
+            asyncio.run(_run())
+        finally:
+            executor.shutdown()
+
+        assert client.query.call_count == 1
+
+    def test_leader_timeout_does_not_cancel_followers(self):
+        """相乗り元（leader）が timeout しても、待っている follower がいればジョブは止めない"""
+        client, job = _make_client(delay=0.2)
+        cache = QueryResultCache(redis_client=MagicMock(get=MagicMock(return_value=None)))
+        executor = BigQueryExecutor(max_workers=2, default_timeout=5, bq_client=client, cache=cache)
+        sql = "SELECT x FROM `p.d.fact_batting_stats`"
+
+        async def _run():
+            leader = asyncio.ensure_future(executor.run_query(sql, timeout=0.05))
+            await asyncio.sleep(0.01)
+            follower = await executor.run_query(sql)
+            with pytest.raises(QueryTimeoutError):
+                await leader
+            return follower
+
+        try:
+            result = asyncio.run(_run())
+        finally:
+            executor.shutdown()
+
+        assert result["x"].tolist() == [1]
+        assert client.query.call_count == 1
+        job.cancel.assert_not_called()
+
+    def test_cancel_during_job_submission_cancels_job(self):
+        """client.query() の最中に諦められたジョブも、投入直後に cancel される"""
+        client = MagicMock()
+        job = MagicMock()
+        submitted = threading.Event()
+
+        def _query(sql, job_config=None, timeout=None):
+            time.sleep(0.2)
+            submitted.set()
+            return job
+
+        client.query.side_effect = _query
+        executor = BigQueryExecutor(max_workers=1, default_timeout=5, bq_client=client)
+        try:
+            with pytest.raises(QueryTimeoutError):
+                executor.run_query_sync("SELECT 1", timeout=0.05)
+            assert submitted.wait(1)
+        finally:
+            executor.shutdown()
+
+        job.cancel.assert_called_once()
+        job.result.assert_not_called()
+
+
+class TestServiceCallSites:
+    """サービス層の BQ 読み取りが共有実行器を経由することのテスト"""
+
+    def test_matchup_tool_uses_executor(self):
+        """チャットの対戦相性ツールは run_query_sync にパラメータを渡し、失敗時は空リスト"""
+        from unittest.mock import patch
+        from backend.app.services.tools import matchup_analytics_tool as tool
+
+        df = pd.DataFrame([{"pitch_type": "FF", "pitch_count": 12}])
+        with patch.object(tool, "run_query_sync", return_value=df) as run:
+            rows = tool.mlb_matchup_analytics_tool.func("Shohei Ohtani", "Yu Darvish")
+        params = {p.name: p.value for p in run.call_args.args[1]}
+
+        assert rows == [{"pitch_type": "FF", "pitch_count": 12}]
+        assert params["batter_reversed"] == "Ohtani, Shohei"
+
+        with patch.object(tool, "run_query_sync", side_effect=QueryTimeoutError("deadline")):
+            assert tool.mlb_matchup_analytics_tool.func("Shohei Ohtani", "Yu Darvish") == []
+
+    def test_usage_stats_rows_turn_nulls_into_none(self):
+        """DataFrame の NULL（NaT / pd.NA）は従来の Row と同じく None として扱う"""
+        from unittest.mock import patch
+        from backend.app.services import usage_stats_service
+
+        df = pd.DataFrame({
+            "log_id": ["a"], "timestamp": pd.to_datetime([None], utc=True),
+            "feature": ["chat"], "model": ["gemini-2.5-flash"],
+            "input_tokens": pd.array([None], dtype="Int64"), "output_tokens": [3],
+            "estimated_cost_usd": [0.01], "llm_latency_ms": [120.0],
+            "success": pd.array([None], dtype="boolean"), "error_type": [None], "endpoint": ["/chat"],
+        })
+        with patch.object(usage_stats_service, "run_query_sync", return_value=df):
+            rows = usage_stats_service.get_recent_invocations(1)
+
+        assert rows[0]["timestamp"] is None and rows[0]["success"] is None
+        assert rows[0]["input_tokens"] == 0 and rows[0]["output_tokens"] == 3
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,174 @@
+"""
+BQLogWriter ユニットテスト
+BigQuery 接続不要: クライアントをモックに差し替えてバッチ化・背圧・停止時の書き切りを検証する。
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+from backend.app.services.bq_log_writer import BQLogWriter
+
+
+def _client():
+    client = MagicMock()
+    client.insert_rows_json.return_value = []
+    return client
+
+
+def _inserted_rows(client):
+    return sum(len(c.args[1]) for c in client.insert_rows_json.call_args_list)
+
+
+class TestBatching:
+    """バッチ化のテスト"""
+
+    def test_rows_are_written_in_multi_row_batches(self):
+        """1 行ずつ積んでも、まとめて少ない回数で挿入される"""
+        client = _client()
+        writer = BQLogWriter(batch_size=50, flush_interval=0.05)
+        for i in range(120):
+            writer.enqueue(client, "p.d.llm_interaction_logs", [{"i": i}])
+        writer.shutdown(timeout=5)
+
+        assert _inserted_rows(client) == 120
+        assert client.insert_rows_json.call_count <= 5
+        assert writer.stats()["written"] == 120
+
+    def test_partial_batch_is_flushed_by_interval(self):
+        """件数に満たなくても間隔が来れば書き込まれる"""
+        client = _client()
+        writer = BQLogWriter(batch_size=1000, flush_interval=0.05)
+        writer.enqueue(client, "p.d.t", [{"i": 1}])
+        time.sleep(0.3)
+        try:
+            assert _inserted_rows(client) == 1
+        finally:
+            writer.shutdown(timeout=5)
+
+    def test_rows_are_grouped_by_table(self):
+        """テーブルごとに別リクエストで挿入される"""
+        client = _client()
+        writer = BQLogWriter(batch_size=100, flush_interval=0.05)
+        writer.enqueue(client, "p.d.a", [{"i": 1}, {"i": 2}])
+        writer.enqueue(client, "p.d.b", [{"i": 3}])
+        writer.shutdown(timeout=5)
+
+        tables = {c.args[0]: len(c.args[1]) for c in client.insert_rows_json.call_args_list}
+        assert tables == {"p.d.a": 2, "p.d.b": 1}
+
+
+class TestBackpressureAndFailures:
+    """満杯時の破棄と書き込み失敗のテスト"""
+
+    def test_full_queue_drops_and_counts(self):
+        """キューが満杯なら待たずに捨て、dropped に数える"""
+        gate = threading.Event()
+        client = _client()
+        client.insert_rows_json.side_effect = lambda table, rows, **kwargs: gate.wait(5) and []
+        writer = BQLogWriter(max_queue=5, batch_size=1, flush_interval=0.01)
+        try:
+            # ワーカーが 1 行目の挿入で止まっている間に積み増す
+            writer.enqueue(client, "p.d.t", [{"i": 0}])
+            time.sleep(0.05)
+            started = time.monotonic()
+            accepted = writer.enqueue(client, "p.d.t", [{"i": i} for i in range(1, 11)])
+            elapsed = time.monotonic() - started
+        finally:
+            gate.set()
+            writer.shutdown(timeout=5)
+
+        assert accepted == 5
+        assert writer.stats()["dropped"] == 5
+        assert elapsed < 0.01
+
+    def test_insert_errors_are_counted_not_raised(self):
+        """挿入エラーはアプリに伝播させず failed に数える"""
+        client = _client()
+        client.insert_rows_json.side_effect = RuntimeError("bq down")
+        writer = BQLogWriter(batch_size=10, flush_interval=0.05)
+        writer.enqueue(client, "p.d.t", [{"i": 1}, {"i": 2}])
+        writer.shutdown(timeout=5)
+
+        assert writer.stats()["failed"] == 2
+        assert writer.stats()["written"] == 0
+
+    def test_invalid_rows_are_skipped_and_counted(self):
+        """不正な行だけを捨て、残りは書き込む（skip_invalid_rows）"""
+        client = _client()
+        client.insert_rows_json.return_value = [
+            {"index": 1, "errors": [{"reason": "invalid", "message": "no such field"}]},
+        ]
+        writer = BQLogWriter(batch_size=10, flush_interval=0.05)
+        writer.enqueue(client, "p.d.t", [{"i": 0}, {"bad": 1}, {"i": 2}])
+        writer.shutdown(timeout=5)
+
+        assert client.insert_rows_json.call_count == 1
+        assert client.insert_rows_json.call_args.kwargs["skip_invalid_rows"] is True
+        assert writer.stats()["written"] == 2
+        assert writer.stats()["failed"] == 1
+
+    def test_transient_errors_are_retried_with_same_insert_ids(self):
+        """503 や行単位の backendError は再試行し、insertId は最初の試行と同じものを使う"""
+        from google.api_core.exceptions import ServiceUnavailable
+
+        client = _client()
+        client.insert_rows_json.side_effect = [
+            ServiceUnavailable("try later"),
+            [{"index": 0, "errors": [{"reason": "backendError"}]}],
+            [],
+        ]
+        writer = BQLogWriter(batch_size=10, flush_interval=0.05)
+        with patch("backend.app.services.bq_log_writer.BQ_LOG_RETRY_INITIAL_DELAY_SEC", 0.01):
+            writer.enqueue(client, "p.d.t", [{"i": 0}, {"i": 1}])
+            writer.shutdown(timeout=5)
+
+        calls = client.insert_rows_json.call_args_list
+        assert len(calls) == 3
+        assert calls[2].args[1] == [{"i": 0}]
+        assert calls[2].kwargs["row_ids"] == calls[0].kwargs["row_ids"][:1]
+        assert writer.stats() == {"enqueued": 2, "written": 2, "dropped": 0, "failed": 0}
+
+    def test_retries_are_bounded(self):
+        """再試行は BQ_LOG_RETRY_ATTEMPTS 回までで、書けなかった行は failed に数える"""
+        from google.api_core.exceptions import ServiceUnavailable
+
+        client = _client()
+        client.insert_rows_json.side_effect = ServiceUnavailable("down")
+        writer = BQLogWriter(batch_size=10, flush_interval=0.05)
+        with patch("backend.app.services.bq_log_writer.BQ_LOG_RETRY_INITIAL_DELAY_SEC", 0.01), \
+                patch("backend.app.services.bq_log_writer.BQ_LOG_RETRY_ATTEMPTS", 3):
+            writer.enqueue(client, "p.d.t", [{"i": 0}, {"i": 1}])
+            writer.shutdown(timeout=5)
+
+        assert client.insert_rows_json.call_count == 3
+        assert writer.stats()["failed"] == 2
+
+    def test_enqueue_after_shutdown_is_dropped(self):
+        """停止後に積まれた行は捨てる"""
+        writer = BQLogWriter()
+        writer.shutdown(timeout=1)
+        assert writer.enqueue(_client(), "p.d.t", [{"i": 1}]) == 0
+        assert writer.stats()["dropped"] == 1
+
+
+class TestLoggerIntegration:
+    """既存ロガーからの利用"""
+
+    def test_llm_logger_enqueues_instead_of_spawning_thread(self):
+        """LLMLoggerService.log はスレッドを立てずに共有キューへ積む"""
+        from backend.app.services import llm_logger_service as mod
+
+        service = mod.LLMLoggerService.__new__(mod.LLMLoggerService)
+        service.client = _client()
+        writer = MagicMock()
+        with patch.object(mod, "get_bq_log_writer", return_value=writer):
+            service.log(mod.LLMLogEntry())
+
+        writer.enqueue.assert_called_once()
+        client, table_id, rows = writer.enqueue.call_args.args
+        assert table_id == mod.FULL_TABLE_ID
+        assert len(rows) == 1
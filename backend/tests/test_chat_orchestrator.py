@@ -0,0 +1,95 @@
+"""
+ChatOrchestrator の並列 tool 実行テスト
+Gemini 接続不要: __init__ を通さずにインスタンスを作り、tool registry をモックに差し替える。
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import asyncio
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from backend.app.middleware.request_context import add_bq_latency_ms, get_bq_latency_ms, reset_bq_latency_ms
+from backend.app.services import chat_orchestrator
+from backend.app.services.chat_orchestrator import ChatOrchestrator
+
+
+def _slow_tool(result, delay: float):
+    tool = MagicMock()
+    tool.invoke.side_effect = lambda args: (time.sleep(delay), {**result, "args": args})[1]
+    return tool
+
+
+def _orchestrator(registry):
+    orch = ChatOrchestrator.__new__(ChatOrchestrator)
+    orch._tool_registry = registry
+    return orch
+
+
+def _call(name, **args):
+    return SimpleNamespace(name=name, args=args)
+
+
+class TestExecuteTools:
+    """_execute_tools のテスト"""
+
+    def test_calls_run_concurrently_and_keep_order(self):
+        """3 つの tool が並列に走り、結果は呼び出し順に並ぶ"""
+        orch = _orchestrator({
+            "a": _slow_tool({"tool": "a"}, 0.3),
+            "b": _slow_tool({"tool": "b"}, 0.1),
+            "c": _slow_tool({"tool": "c"}, 0.2),
+        })
+        calls = [_call("a", x=1), _call("b"), _call("c")]
+
+        started = time.monotonic()
+        results = asyncio.run(orch._execute_tools(calls))
+        elapsed = time.monotonic() - started
+
+        assert [r["tool"] for r in results] == ["a", "b", "c"]
+        assert results[0]["args"] == {"x": 1}
+        # 直列なら 0.6 秒。最大値 (0.3 秒) 付近で終わる
+        assert elapsed < 0.5
+
+    def test_timeout_returns_error_result(self):
+        """timeout 超過の tool はエラー結果になり、他の tool の結果は返る"""
+        orch = _orchestrator({
+            "slow": _slow_tool({"tool": "slow"}, 0.5),
+            "fast": _slow_tool({"tool": "fast"}, 0.0),
+        })
+        with patch.object(chat_orchestrator, "CHAT_TOOL_TIMEOUT_SEC", 0.1):
+            results = asyncio.run(orch._execute_tools([_call("slow"), _call("fast")]))
+
+        assert "timed out" in results[0]["error"]
+        assert results[1]["tool"] == "fast"
+
+    def test_unknown_and_failing_tools_do_not_break_batch(self):
+        """未知の tool・例外を投げる tool はエラー結果として返る"""
+        broken = MagicMock()
+        broken.invoke.side_effect = RuntimeError("boom")
+        orch = _orchestrator({"broken": broken, "ok": _slow_tool({"tool": "ok"}, 0.0)})
+
+        results = asyncio.run(orch._execute_tools([_call("missing"), _call("broken"), _call("ok")]))
+
+        assert results[0] == {"error": "Tool missing not found"}
+        assert "boom" in results[1]["error"]
+        assert results[2]["tool"] == "ok"
+
+    def test_bq_latency_reaches_request_context(self):
+        """ワーカースレッドの tool が計上した BQ 時間が呼び出し元のコンテキストに加算される"""
+        def _bq_tool(ms):
+            tool = MagicMock()
+            tool.invoke.side_effect = lambda args: (add_bq_latency_ms(ms), {"ok": True})[1]
+            return tool
+
+        orch = _orchestrator({"a": _bq_tool(120.0), "b": _bq_tool(30.0)})
+
+        async def _request():
+            reset_bq_latency_ms()
+            add_bq_latency_ms(5.0)
+            await orch._execute_tools([_call("a"), _call("b")])
+            return get_bq_latency_ms()
+
+        assert asyncio.run(_request()) == 155.0
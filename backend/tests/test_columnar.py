@@ -0,0 +1,57 @@
+"""
+utils.columnar ユニットテスト
+pyarrow 未導入環境でも DataFrame 経路で変換結果が揃うことを検証する。
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import numpy as np
+import pandas as pd
+
+from backend.app.utils.columnar import num_rows, to_columns, to_pandas, to_records
+
+
+class TestToRecords:
+    """to_records の変換テスト"""
+
+    def test_nan_becomes_none(self):
+        """NaN / None は None になる"""
+        df = pd.DataFrame({"name": ["A", None], "ops": [0.9, np.nan]})
+        assert to_records(df) == [
+            {"name": "A", "ops": 0.9},
+            {"name": None, "ops": None},
+        ]
+
+    def test_numpy_scalars_become_python_types(self):
+        """int64 / float64 / bool は Python の int / float / bool になる"""
+        df = pd.DataFrame({"n": np.array([3], dtype="int64"), "f": [1.5], "b": [True]})
+        row = to_records(df)[0]
+        assert type(row["n"]) is int
+        assert type(row["f"]) is float
+        assert type(row["b"]) is bool
+
+    def test_round_digits_and_columns(self):
+        """指定列だけ丸め、columns 指定で列を絞る"""
+        df = pd.DataFrame({"score": [101.2345], "velo": [95.06], "spin": [2400.6], "extra": [1]})
+        rows = to_records(df, columns=["score", "velo", "spin"], round_digits={"score": 1, "spin": 0})
+        assert rows == [{"score": 101.2, "velo": 95.06, "spin": 2401.0}]
+
+    def test_round_does_not_mutate_input(self):
+        """丸めは入力 DataFrame を書き換えない"""
+        df = pd.DataFrame({"score": [101.2345]})
+        to_records(df, round_digits={"score": 1})
+        assert df["score"].iloc[0] == 101.2345
+
+
+class TestHelpers:
+    """num_rows / to_pandas / to_columns のテスト"""
+
+    def test_dataframe_passthrough(self):
+        df = pd.DataFrame({"x": [1, 2]})
+        assert num_rows(df) == 2
+        assert to_pandas(df) is df
+
+    def test_to_columns(self):
+        df = pd.DataFrame({"x": [1, 2], "y": [0.5, np.nan]})
+        assert to_columns(df) == {"x": [1, 2], "y": [0.5, None]}
@@ -0,0 +1,160 @@
+"""
+ConversationService ユニットテスト
+Redis 接続不要: リスト操作だけを持つインメモリの Redis で履歴の保存・取得を検証する。
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import contextvars
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+import redis
+
+from backend.app.middleware.request_context import set_request_id
+from backend.app.services.conversation_service import ConversationService
+
+
+class _ListRedis:
+    """RPUSH / LTRIM / EXPIRE / LRANGE / DELETE だけを持つ Redis"""
+
+    def __init__(self):
+        self.lists = {}
+        self.ttls = {}
+        self.lrange_calls = []
+
+    def lrange(self, key, start, end):
+        self.lrange_calls.append((key, start, end))
+        items = self.lists.get(key, [])
+        start = max(len(items) + start, 0) if start < 0 else start
+        return items[start:] if end == -1 else items[start:end + 1]
+
+    def pipeline(self, transaction=True):
+        return _Pipeline(self)
+
+    def delete(self, key):
+        self.lists.pop(key, None)
+
+
+class _Pipeline:
+    def __init__(self, r):
+        self.r = r
+        self.ops = []
+
+    def rpush(self, key, value):
+        self.ops.append(lambda: self.r.lists.setdefault(key, []).append(value))
+
+    def ltrim(self, key, start, end):
+        self.ops.append(lambda: self.r.lists.__setitem__(key, self.r.lists[key][start:]))
+
+    def expire(self, key, ttl):
+        self.ops.append(lambda: self.r.ttls.__setitem__(key, ttl))
+
+    def execute(self):
+        for op in self.ops:
+            op()
+
+
+def _in_request(fn, request_id="req-1"):
+    """リクエストごとの ContextVar を模して fn を実行する"""
+    def _run():
+        set_request_id(request_id)
+        return fn()
+    return contextvars.copy_context().run(_run)
+
+
+class TestHistory:
+    """add_message / get_chat_history のテスト"""
+
+    def test_append_trims_and_sets_ttl(self):
+        """1 パイプラインで追記し、最大件数に切り詰めて TTL を張る"""
+        r = _ListRedis()
+        svc = ConversationService(redis_client=r)
+        for i in range(12):
+            svc.add_message("s1", "user", f"q{i}")
+
+        history = svc.get_chat_history("s1")
+        assert [m["content"] for m in history] == [f"q{i}" for i in range(2, 12)]
+        assert r.ttls["chat_history:v2:s1"] == svc.ttl
+
+    def test_limit_reads_only_last_entries(self):
+        """limit 指定時は末尾だけを LRANGE する"""
+        r = _ListRedis()
+        svc = ConversationService(redis_client=r)
+        for i in range(8):
+            svc.add_message("s1", "user", f"q{i}")
+
+        history = svc.get_chat_history("s1", limit=3)
+        assert [m["content"] for m in history] == ["q5", "q6", "q7"]
+        assert r.lrange_calls[-1] == ("chat_history:v2:s1", -3, -1)
+
+    def test_redis_down_returns_empty(self):
+        """Redis に繋がらなければ空の履歴で続行する"""
+        client = MagicMock()
+        client.lrange.side_effect = redis.exceptions.ConnectionError("down")
+        client.pipeline.return_value.execute.side_effect = redis.exceptions.ConnectionError("down")
+        svc = ConversationService(redis_client=client)
+
+        svc.add_message("s1", "user", "hi")
+        assert svc.get_chat_history("s1") == []
+
+
+class TestRequestCache:
+    """リクエスト内キャッシュのテスト"""
+
+    def test_reads_once_per_request(self):
+        """同じリクエスト内では 1 回だけ読み、追記分はキャッシュにも反映する"""
+        r = _ListRedis()
+        svc = ConversationService(redis_client=r)
+        svc.add_message("s1", "user", "大谷の成績は？")
+
+        def _request():
+            first = svc.get_chat_history("s1", limit=5)
+            svc.add_message("s1", "user", "彼のOPSは？")
+            svc.add_message("s1", "assistant", "1.036です")
+            return first, svc.get_chat_history("s1")
+
+        first, after = _in_request(_request)
+
+        assert len(r.lrange_calls) == 1
+        assert len(first) == 1
+        assert [m["content"] for m in after] == ["大谷の成績は？", "彼のOPSは？", "1.036です"]
+        assert [json.loads(m)["content"] for m in r.lists["chat_history:v2:s1"]] == [
+            m["content"] for m in after
+        ]
+
+    def test_other_request_reads_fresh(self):
+        """別リクエストはキャッシュを共有しない"""
+        r = _ListRedis()
+        svc = ConversationService(redis_client=r)
+        svc.add_message("s1", "user", "q0")
+
+        _in_request(lambda: svc.get_chat_history("s1"), "req-1")
+        svc.add_message("s1", "user", "q1")
+        history = _in_request(lambda: svc.get_chat_history("s1"), "req-2")
+
+        assert [m["content"] for m in history] == ["q0", "q1"]
+        assert len(r.lrange_calls) == 2
+
+    def test_resolve_context_uses_recent_messages(self):
+        """resolve_context は直近 CHAT_CONTEXT_MESSAGES 件だけを読む"""
+        r = _ListRedis()
+        svc = ConversationService(redis_client=r)
+        for i in range(8):
+            svc.add_message("s1", "user", f"q{i}")
+
+        with patch(
+            "backend.app.services.conversation_service.call_gemini",
+            return_value=json.dumps({"resolved_query": "q", "context_used": True}),
+        ) as llm:
+            svc.resolve_context("彼は？", "s1")
+
+        prompt = llm.call_args.kwargs["prompt"]
+        assert "q7" in prompt and "q2" not in prompt
+        assert r.lrange_calls[-1][1] == -5
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
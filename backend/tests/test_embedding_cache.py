@@ -0,0 +1,133 @@
+"""
+EmbeddingCache ユニットテスト
+埋め込み API・Redis には接続しない: 埋め込み関数はスタブ、永続ストアは MagicMock で検証する。
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+import redis
+
+from backend.app.services.embedding_cache import EmbeddingCache, normalize_text
+
+
+class _StubEmbedder:
+    """文字数をベクトルにする埋め込み関数。呼び出しごとの入力を記録する"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(t)), 1.0] for t in texts]
+
+
+class TestEmbeddingCache:
+    """プロセス内キャッシュのテスト"""
+
+    def test_second_lookup_hits_memory(self):
+        """同じ (model, 正規化テキスト) は 2 回目以降埋め込まない"""
+        cache = EmbeddingCache()
+        embed = _StubEmbedder()
+
+        first = cache.get("m", "大谷の OPS", embed)
+        second = cache.get("m", "大谷の　OPS ", embed)
+
+        np.testing.assert_allclose(first, second)
+        assert embed.calls == [["大谷の OPS"]]
+        assert cache.stats()["hit"] == 1
+
+    def test_misses_are_embedded_in_one_batch(self):
+        """ミス分だけを重複を除いて 1 回のバッチで埋め込み、入力順で返す"""
+        cache = EmbeddingCache()
+        embed = _StubEmbedder()
+        cache.get("m", "a", embed)
+
+        vectors = cache.get_many("m", ["bb", "a", "ccc", "bb"], embed)
+
+        assert embed.calls[-1] == ["bb", "ccc"]
+        assert [v[0] for v in vectors] == [2.0, 1.0, 3.0, 2.0]
+
+    def test_models_are_separate_namespaces(self):
+        """モデル（ベクトル空間）が違えば同じ文面でも別に埋め込む"""
+        cache = EmbeddingCache()
+        embed = _StubEmbedder()
+
+        cache.get("bq:default", "xwOBA", embed)
+        cache.get("bq:RETRIEVAL_QUERY", "xwOBA", embed)
+
+        assert len(embed.calls) == 2
+
+    def test_vectors_are_read_only(self):
+        """共有されるベクトルは書き換えられない"""
+        vector = EmbeddingCache().get("m", "x", _StubEmbedder())
+
+        assert vector.dtype == np.float32
+        with pytest.raises(ValueError):
+            vector[0] = 0.0
+
+    def test_failure_returns_none_and_is_not_cached(self):
+        """埋め込みに失敗したら None を返し、次回は再試行する"""
+        cache = EmbeddingCache()
+
+        def _broken(texts):
+            raise RuntimeError("quota exceeded")
+
+        assert cache.get("m", "x", _broken) is None
+        assert cache.get("m", "x", _StubEmbedder()) is not None
+        assert cache.stats()["failed"] == 1
+
+    def test_normalize_text(self):
+        """全角・連続空白は揃え、大小文字は揃えない"""
+        assert normalize_text("  Ｓｔｕｆｆ＋　とは\n") == "Stuff+ とは"
+        assert normalize_text("ERA") != normalize_text("era")
+
+
+class TestPersistentStore:
+    """永続ストア（Redis）のテスト"""
+
+    def test_store_hit_skips_embedding(self):
+        """Redis にあればバイト列から復元し、埋め込み関数は呼ばない"""
+        store = MagicMock()
+        store.mget.return_value = [np.array([3.0, 4.0], dtype=np.float32).tobytes()]
+        cache = EmbeddingCache(store=store)
+        embed = _StubEmbedder()
+
+        vector = cache.get("m", "x", embed)
+
+        np.testing.assert_allclose(vector, [3.0, 4.0])
+        assert embed.calls == []
+        assert cache.stats()["store_hit"] == 1
+
+    def test_store_miss_writes_back_with_ttl(self):
+        """Redis にも無ければ埋め込んで、パイプラインで TTL 付きで書き戻す"""
+        store = MagicMock()
+        store.mget.return_value = [None, None]
+        cache = EmbeddingCache(store=store, ttl=60)
+
+        cache.get_many("m", ["a", "bb"], _StubEmbedder())
+
+        pipe = store.pipeline.return_value
+        assert pipe.set.call_count == 2
+        assert all(c.kwargs["ex"] == 60 for c in pipe.set.call_args_list)
+        pipe.execute.assert_called_once()
+
+    def test_store_errors_fall_back_to_memory(self):
+        """Redis 障害時もプロセス内キャッシュだけで続行する"""
+        store = MagicMock()
+        store.mget.side_effect = redis.exceptions.ConnectionError("down")
+        store.pipeline.return_value.execute.side_effect = redis.exceptions.ConnectionError("down")
+        cache = EmbeddingCache(store=store)
+        embed = _StubEmbedder()
+
+        assert cache.get("m", "x", embed) is not None
+        assert cache.get("m", "x", embed) is not None
+        assert len(embed.calls) == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,167 @@
+"""
+FeatureEncoder ユニットテスト
+従来の pd.get_dummies + 0 埋め + 列並べ替えと同じ行列になることを検証する。
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.app.services.feature_encoder import (
+    FeatureEncoder,
+    add_pitch_features,
+    encode_pitches,
+)
+
+NUMERIC = ["release_speed", "pfx_z"]
+CATEGORICAL = ["pitch_type", "prev_pitch_type"]
+
+
+def _frame() -> pd.DataFrame:
+    return pd.DataFrame({
+        "release_speed": [95.0, 84.5, 88.0, 96.1],
+        "pfx_z": [1.2, -0.3, 0.1, 1.4],
+        "pitch_type": ["FF", "SL", "CH", "FF"],
+        "prev_pitch_type": ["NONE", "FF", "SL", "CH"],
+    })
+
+
+def _get_dummies(df: pd.DataFrame, columns, drop_first=False) -> np.ndarray:
+    """従来の推論側の処理"""
+    encoded = pd.get_dummies(df[NUMERIC + CATEGORICAL], columns=CATEGORICAL, drop_first=drop_first)
+    for col in columns:
+        if col not in encoded.columns:
+            encoded[col] = 0
+    return encoded[list(columns)].to_numpy(dtype=np.float32)
+
+
+class TestFeatureEncoder:
+    """fit / from_columns / transform のテスト"""
+
+    def test_fit_matches_get_dummies(self):
+        """学習データに対しては get_dummies と同じ列・同じ値"""
+        df = _frame()
+        encoder = FeatureEncoder.fit(df, NUMERIC, CATEGORICAL)
+        expected = pd.get_dummies(df[NUMERIC + CATEGORICAL], columns=CATEGORICAL)
+
+        assert encoder.columns == expected.columns.tolist()
+        X = encoder.transform(df)
+        assert X.dtype == np.float32
+        np.testing.assert_array_equal(X, expected.to_numpy(dtype=np.float32))
+
+    def test_subset_batch_matches_padded_get_dummies(self):
+        """一部のカテゴリしか無いバッチでも列配置は学習時のまま"""
+        encoder = FeatureEncoder.fit(_frame(), NUMERIC, CATEGORICAL)
+        batch = _frame().iloc[[0, 3]]
+
+        np.testing.assert_array_equal(encoder.transform(batch), _get_dummies(batch, encoder.columns))
+
+    def test_from_columns_round_trip(self):
+        """encoded_columns から組み立てたエンコーダは fit したものと同じ行列を作る"""
+        df = _frame()
+        fitted = FeatureEncoder.fit(df, NUMERIC, CATEGORICAL)
+        rebuilt = FeatureEncoder.from_columns(fitted.columns, NUMERIC, CATEGORICAL)
+
+        np.testing.assert_array_equal(rebuilt.transform(df), fitted.transform(df))
+
+    def test_from_columns_prefers_longest_prefix(self):
+        """pitch_type_ と prev_pitch_type_ のような前方一致を取り違えない"""
+        encoder = FeatureEncoder.from_columns(
+            ["count", "count_situation_ahead", "count_x"], ["count"], ["count", "count_situation"]
+        )
+        assert encoder.categories == {"count": ["x"], "count_situation": ["ahead"]}
+
+    def test_unknown_category_is_all_zero(self):
+        """学習時に無かったカテゴリ値はその列群が全て 0"""
+        encoder = FeatureEncoder.fit(_frame(), NUMERIC, CATEGORICAL)
+        batch = _frame().assign(pitch_type=["KN", "KN", "KN", "KN"])
+
+        X = encoder.transform(batch)
+        pitch_cols = [i for i, c in enumerate(encoder.columns) if c.startswith("pitch_type_")]
+        assert not X[:, pitch_cols].any()
+
+    def test_drop_first_numeric_categories(self):
+        """drop_first と整数カテゴリ（inning など）も get_dummies と同じ列名で扱う"""
+        df = pd.DataFrame({"speed": [90.0, 91.0, 92.0], "inning": [1, 2, 3]})
+        encoder = FeatureEncoder.fit(df, ["speed"], ["inning"], drop_first=True)
+        expected = pd.get_dummies(df, columns=["inning"], drop_first=True)
+
+        assert encoder.columns == expected.columns.tolist()
+        np.testing.assert_array_equal(encoder.transform(df), expected.to_numpy(dtype=np.float32))
+
+    def test_pickle(self):
+        """アーティファクトに保存して復元できる"""
+        encoder = FeatureEncoder.fit(_frame(), NUMERIC, CATEGORICAL)
+        restored = pickle.loads(pickle.dumps(encoder))
+
+        np.testing.assert_array_equal(restored.transform(_frame()), encoder.transform(_frame()))
+
+    def test_valid_rows(self):
+        """数値特徴量の欠損行を除外する"""
+        df = _frame()
+        df.loc[1, "pfx_z"] = np.nan
+        encoder = FeatureEncoder.fit(df, NUMERIC, CATEGORICAL)
+
+        assert encoder.valid_rows(encoder.transform(df)).tolist() == [True, False, True, True]
+
+
+class TestPitchFeatures:
+    """投球特徴量の派生のテスト"""
+
+    @staticmethod
+    def _pitches() -> pd.DataFrame:
+        rng = np.random.default_rng(0)
+        n = 12
+        return pd.DataFrame({
+            "game_pk": [2, 2, 2, 1, 1, 1, 1, 2, 1, 1, 2, 2],
+            "at_bat_number": [1, 1, 2, 1, 1, 2, 2, 1, 2, 3, 2, 2],
+            "pitch_number": [2, 1, 1, 1, 2, 2, 1, 3, 3, 1, 3, 2],
+            "release_pos_x": rng.normal(size=n),
+            "release_pos_z": rng.normal(size=n),
+            "release_speed": rng.normal(90, 3, size=n),
+            "pfx_z": rng.normal(size=n),
+            "plate_x": rng.normal(size=n),
+            "plate_z": rng.normal(2.5, 0.5, size=n),
+            "sz_top": np.full(n, 3.5),
+            "sz_bot": np.full(n, 1.5),
+            "pitch_type": list("FSCFFSCSFCSF"),
+            "delta_pitcher_run_exp": rng.normal(size=n),
+        })
+
+    def test_prev_pitch_matches_groupby_shift(self):
+        """前球の列が打席ごとの groupby().shift(1) と一致する"""
+        df = self._pitches()
+        result = add_pitch_features(df, "pitching_plus_plus")
+
+        expected = df.sort_values(["game_pk", "at_bat_number", "pitch_number"])
+        grp = expected.groupby(["game_pk", "at_bat_number"])
+        prev_pfx_z = grp["pfx_z"].shift(1).fillna(expected["pfx_z"])
+        speed_diff = (expected["release_speed"] - grp["release_speed"].shift(1)).fillna(0)
+        prev_type = grp["pitch_type"].shift(1).fillna("NONE")
+
+        assert result.index.tolist() == expected.index.tolist()
+        np.testing.assert_allclose(result["prev_pfx_z"], prev_pfx_z)
+        np.testing.assert_allclose(result["speed_diff"], speed_diff)
+        assert result["prev_pitch_type"].tolist() == prev_type.tolist()
+        # 呼び出し元の DataFrame は書き換えない
+        assert "plate_z_norm" not in df.columns
+
+    def test_encode_pitches_uses_stored_encoder(self):
+        """アーティファクトの encoder で特徴量行列を作る"""
+        df = add_pitch_features(self._pitches(), "stuff_plus")
+        encoder = FeatureEncoder.fit(df, ["release_speed", "plate_z_norm"], ["pitch_type"])
+        artifact = {"encoder": encoder, "features": [], "encoded_columns": []}
+
+        df_clean, X = encode_pitches(self._pitches(), artifact, "stuff_plus")
+
+        assert len(df_clean) == X.shape[0] == 12
+        assert X.shape[1] == len(encoder.columns)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -1,7 +1,7 @@
 """
 GlossaryRAGService の単体テスト。
 
-BigQuery には一切接続しない（_client をモックに差し替える）ため、
+BigQuery には一切接続しない（run_query_sync をモックに差し替える）ため、
 GCP 認証も課金も発生しない。CI でそのまま実行できる。
 
 検証の主眼は fail-open:
@@ -10,82 +10,93 @@ GCP 認証も課金も発生しない。CI でそのまま実行できる。
   空リストを返し、呼び出し側が「検索結果なし」として処理を続行できること。
 """
 from types import SimpleNamespace
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
+import pandas as pd
+import pytest
+
+from backend.app.services.embedding_cache import EmbeddingCache
 from backend.app.services.glossary_rag_service import (
     DEFAULT_DISTANCE_THRESHOLD,
     GlossaryRAGService,
 )
 
 
-def _make_service(mock_client: MagicMock) -> GlossaryRAGService:
-    """BQ クライアントをモックに差し替えたサービスを作る。
+@pytest.fixture(autouse=True)
+def _fresh_embedding_cache():
+    """テストごとに空の埋め込みキャッシュを使う（プロセス共有のシングルトンを汚さない）。"""
+    with patch(
+        "backend.app.services.glossary_rag_service.get_embedding_cache",
+        return_value=EmbeddingCache(),
+    ):
+        yield
 
-    _client を直接セットすることで client プロパティの遅延初期化を回避し、
-    bigquery.Client() が呼ばれないようにする。
-    """
-    svc = GlossaryRAGService()
-    svc._client = mock_client
-    return svc
+
+@pytest.fixture
+def bq():
+    """共有実行器（run_query_sync）をモックに差し替える。既定は 0 行。"""
+    with patch(
+        "backend.app.services.glossary_rag_service.run_query_sync",
+        return_value=pd.DataFrame(),
+    ) as run_query_sync:
+        yield run_query_sync
+
+
+def _row(section: str, distance: float) -> dict:
+    """ML.DISTANCE 検索の 1 行。"""
+    return {
+        "section": section,
+        "source": "glossary_batting.md",
+        "category": "batting",
+        "chunk_text": f"{section}\n定義: ダミー本文",
+        "distance": distance,
+    }
 
 
-def _row(section: str, distance: float) -> SimpleNamespace:
-    """BQ の Row を模したオブジェクト。属性アクセスできればよい。"""
-    return SimpleNamespace(
-        section=section,
-        source="glossary_batting.md",
-        category="batting",
-        chunk_text=f"{section}\n定義: ダミー本文",
-        distance=distance,
-    )
+def _params(bq: MagicMock) -> dict:
+    """最後の呼び出しのクエリパラメータを {name: value} で返す。"""
+    return {name: value for name, _, value in bq.call_args.args[1]}
 
 
 # ---------------------------------------------------------------- fail-open
 
 
-def test_search_returns_empty_when_bq_raises():
+def test_search_returns_empty_when_bq_raises(bq):
     """BQ がエラーを投げても例外を外に漏らさず空リストを返す（fail-open の本体）。"""
-    mock_client = MagicMock()
-    mock_client.query.side_effect = RuntimeError("BQ unavailable")
-    svc = _make_service(mock_client)
+    bq.side_effect = RuntimeError("BQ unavailable")
 
-    assert svc.search("xwOBAとは何ですか") == []
+    assert GlossaryRAGService().search("xwOBAとは何ですか") == []
 
 
-def test_search_returns_empty_when_client_unavailable():
+def test_search_returns_empty_when_client_unavailable(bq):
     """BQ クライアントの初期化に失敗している場合も空リストを返す。"""
-    svc = GlossaryRAGService()
-    svc._client = None
-    # client プロパティが再初期化を試みても失敗するよう、生成関数を潰す
-    svc.__dict__["_client"] = None
-
-    # 認証なし環境では bigquery.Client() が例外を投げ、プロパティが None を返す。
+    # 認証なし環境では実行器のクライアント生成が例外を投げる。
     # 例外が外に漏れないことだけを保証する。
-    result = svc.search("xwOBAとは何ですか")
+    bq.side_effect = Exception("Could not automatically determine credentials")
+
+    result = GlossaryRAGService().search("xwOBAとは何ですか")
     assert isinstance(result, list)
 
 
-def test_search_returns_empty_on_blank_query():
+def test_search_returns_empty_on_blank_query(bq):
     """空文字・空白のみのクエリでは BQ を叩かない（無駄な課金を防ぐ）。"""
-    mock_client = MagicMock()
-    svc = _make_service(mock_client)
+    svc = GlossaryRAGService()
 
     assert svc.search("") == []
     assert svc.search("   ") == []
-    mock_client.query.assert_not_called()
+    bq.assert_not_called()
 
 
 # ---------------------------------------------------------------- 正常系
 
 
-def test_search_returns_hits_sorted_by_distance():
+def test_search_returns_hits_sorted_by_distance(bq):
     """距離の昇順で、必要なキーを揃えて返す。"""
-    mock_client = MagicMock()
-    mock_client.query.return_value.result.return_value = [
+    bq.return_value = pd.DataFrame([
         _row("xwOBA", 0.1831),
         _row("wOBA", 0.2352),
-    ]
-    svc = _make_service(mock_client)
+    ])
+    svc = GlossaryRAGService()
 
     hits = svc.search("xwOBAとは何ですか", category="batting")
 
@@ -94,60 +105,144 @@ def test_search_returns_hits_sorted_by_distance():
     assert set(hits[0]) == {"section", "source", "category", "chunk_text", "distance"}
 
 
-def test_search_filters_by_distance_threshold():
+def test_search_filters_by_distance_threshold(bq):
     """閾値を超えた結果は捨てる。"""
-    mock_client = MagicMock()
     over = DEFAULT_DISTANCE_THRESHOLD + 0.1
-    mock_client.query.return_value.result.return_value = [
+    bq.return_value = pd.DataFrame([
         _row("xwOBA", 0.1831),
         _row("無関係な用語", over),
-    ]
-    svc = _make_service(mock_client)
+    ])
+    svc = GlossaryRAGService()
 
     hits = svc.search("xwOBAとは何ですか")
 
     assert [h["section"] for h in hits] == ["xwOBA"]
 
 
-def test_search_returns_empty_when_no_rows():
+def test_search_returns_empty_when_no_rows(bq):
     """該当なしの場合も空リスト（None ではない）。"""
-    mock_client = MagicMock()
-    mock_client.query.return_value.result.return_value = []
-    svc = _make_service(mock_client)
-
-    assert svc.search("存在しない用語") == []
+    assert GlossaryRAGService().search("存在しない用語") == []
 
 
 # ---------------------------------------------------------------- category
 
 
-def test_unknown_category_falls_back_to_no_filter():
+def test_unknown_category_falls_back_to_no_filter(bq):
     """未知の category はフィルタなしに倒す。
 
     誤った値で 0 件になるより、全カテゴリ横断で返す方が実用的なため。
     例外を投げずにクエリまで到達することを確認する。
     """
-    mock_client = MagicMock()
-    mock_client.query.return_value.result.return_value = []
-    svc = _make_service(mock_client)
+    svc = GlossaryRAGService()
 
     assert svc.search("xwOBAとは何ですか", category="unknown_cat") == []
-    mock_client.query.assert_called_once()
+    bq.assert_called_once()
 
     # category パラメータが None にフォールバックしていることを確認する
-    job_config = mock_client.query.call_args.kwargs["job_config"]
-    params = {p.name: p.value for p in job_config.query_parameters}
-    assert params["category"] is None
+    assert _params(bq)["category"] is None
 
 
-def test_valid_category_is_passed_through():
+def test_valid_category_is_passed_through(bq):
     """正しい category はそのままクエリパラメータに渡る。"""
-    mock_client = MagicMock()
-    mock_client.query.return_value.result.return_value = []
-    svc = _make_service(mock_client)
+    GlossaryRAGService().search("xwOBAとは何ですか", category="batting")
+
+    assert _params(bq)["category"] == "batting"
+
+
+# ---------------------------------------------------------------- ローカルインデックス
+
+
+def _embedding_row(section: str, category: str, embedding: list) -> dict:
+    return {
+        "section": section,
+        "source": f"glossary_{category}.md",
+        "category": category,
+        "chunk_text": f"{section}\n定義: ダミー本文",
+        "embedding": embedding,
+    }
+
+
+@pytest.fixture
+def embed_bq():
+    """クエリ埋め込み（bq_embedding_service.run_query_sync）をモックに差し替える。"""
+    with patch("backend.app.services.bq_embedding_service.run_query_sync") as run_query_sync:
+        yield run_query_sync
+
+
+def _indexed_service(embed_bq: MagicMock, query_vector: list) -> GlossaryRAGService:
+    """インデックスをロード済みで、クエリ埋め込みだけ BQ モックが返すサービス"""
+    from backend.app.services.glossary_vector_index import GlossaryVectorIndex
+
+    def _query(sql, params, cache=True):
+        # ML.GENERATE_EMBEDDING は入力テキストごとに content と埋め込みを返す
+        texts = params[0][2]
+        return pd.DataFrame({"content": texts, "embedding": [query_vector] * len(texts)})
 
-    svc.search("xwOBAとは何ですか", category="batting")
+    embed_bq.side_effect = _query
+    svc = GlossaryRAGService()
+    svc._index = GlossaryVectorIndex([
+        _embedding_row("xwOBA", "batting", [1.0, 0.0, 0.0]),
+        _embedding_row("wOBA", "batting", [0.9, 0.3, 0.0]),
+        _embedding_row("Stuff+", "pitching", [0.95, 0.0, 0.2]),
+        _embedding_row("無関係", "statcast", [0.0, 0.0, 1.0]),
+    ])
+    return svc
+
+
+def test_local_index_matches_cosine_distance(bq, embed_bq):
+    """インデックス検索の距離は 1 - cos（ML.DISTANCE COSINE と同じ）で昇順。"""
+    svc = _indexed_service(embed_bq, [2.0, 0.0, 0.0])
+
+    hits = svc.search("xwOBAとは何ですか", distance_threshold=1.0)
+
+    assert [h["section"] for h in hits] == ["xwOBA", "Stuff+", "wOBA", "無関係"]
+    assert hits[0]["distance"] == pytest.approx(0.0, abs=1e-6)
+    assert hits[2]["distance"] == pytest.approx(1 - 0.9 / (0.9**2 + 0.3**2) ** 0.5, abs=1e-6)
+    assert set(hits[0]) == {"section", "source", "category", "chunk_text", "distance"}
+
+
+def test_local_index_category_filter(bq, embed_bq):
+    """category 指定時は他カテゴリのチャンクを返さない。"""
+    svc = _indexed_service(embed_bq, [1.0, 0.0, 0.0])
+
+    hits = svc.search("球質", category="pitching", distance_threshold=1.0)
+
+    assert [h["section"] for h in hits] == ["Stuff+"]
+
+
+def test_query_embedding_is_cached(bq, embed_bq):
+    """同じ文面（空白の違いは無視）のクエリ埋め込みは BQ を 1 回しか呼ばない。"""
+    svc = _indexed_service(embed_bq, [1.0, 0.0, 0.0])
+
+    svc.search("xwOBAとは 何ですか")
+    svc.search("xwOBAとは  何ですか ")
+
+    assert embed_bq.call_count == 1
+    bq.assert_not_called()
+
+
+def test_embedding_failure_falls_back_to_bq_search(bq, embed_bq):
+    """クエリ埋め込みに失敗したら BQ の ML.DISTANCE 検索に倒す。"""
+    svc = _indexed_service(embed_bq, [1.0, 0.0, 0.0])
+    embed_bq.side_effect = RuntimeError("embedding unavailable")
+    bq.return_value = pd.DataFrame([_row("xwOBA", 0.1831)])
+
+    hits = svc.search("xwOBAとは何ですか")
+
+    assert [h["section"] for h in hits] == ["xwOBA"]
+    assert "ML.DISTANCE" in bq.call_args.args[0]
+
+
+def test_refresh_index_skips_unchanged_table(bq):
+    """行数・最終取り込み時刻が同じなら読み直さない。"""
+    signature = pd.DataFrame([{"n": 1, "last_ingested": "2026-08-21T00:00:00"}])
+    embeddings = pd.DataFrame([_embedding_row("xwOBA", "batting", [1.0, 0.0])])
+    bq.side_effect = [signature, embeddings, signature]
+    svc = GlossaryRAGService()
 
-    job_config = mock_client.query.call_args.kwargs["job_config"]
-    params = {p.name: p.value for p in job_config.query_parameters}
-    assert params["category"] == "batting"
+    assert svc.refresh_index() is True
+    assert svc.refresh_index() is False
+    assert len(svc._index) == 1
+    assert bq.call_count == 3
+    # インデックスの読み込みは結果キャッシュを通さない（取り込み直後の変更を見逃さない）
+    assert all(call.kwargs.get("cache") is False for call in bq.call_args_list)
@@ -0,0 +1,117 @@
+"""
+InferenceBatcher ユニットテスト
+同時要求が 1 回の predict にまとまり、要求ごとの結果に正しく切り分けられることを検証する。
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+
+from backend.app.services.inference_batcher import InferenceBatcher
+
+
+class _SumModel:
+    """行和を返すモデル。predict の呼び出し回数と呼び出しスレッドを記録する"""
+
+    def __init__(self, offset: float = 0.0):
+        self.offset = offset
+        self.calls = []
+
+    def predict(self, X):
+        self.calls.append((len(X), threading.current_thread().name))
+        return X.sum(axis=1) + self.offset
+
+
+def _matrix(n: int, start: float) -> np.ndarray:
+    return np.arange(start, start + n * 2, dtype=np.float32).reshape(n, 2)
+
+
+class TestInferenceBatcher:
+    """InferenceBatcher のテスト"""
+
+    def test_concurrent_requests_share_one_predict(self):
+        """同じ窓に届いた要求は 1 回の predict にまとまり、結果は要求ごとに返る"""
+        batcher = InferenceBatcher("test", window_ms=50)
+        model = _SumModel()
+        inputs = [_matrix(n, 10.0 * n) for n in (1, 3, 2)]
+
+        async def _run():
+            return await asyncio.gather(*(batcher.predict(model, X) for X in inputs))
+
+        results = asyncio.run(_run())
+        batcher.shutdown()
+
+        for X, result in zip(inputs, results):
+            np.testing.assert_allclose(result, X.sum(axis=1))
+        assert model.calls == [(6, "inference-test")]
+        assert batcher.stats() == {"requests": 3, "batches": 1, "rows": 6, "failed": 0}
+
+    def test_models_are_not_mixed(self):
+        """hot-swap で新旧モデルが混ざっても、それぞれのモデルで推論する"""
+        batcher = InferenceBatcher("test", window_ms=50)
+        old, new = _SumModel(0.0), _SumModel(100.0)
+        X = _matrix(2, 0.0)
+
+        async def _run():
+            return await asyncio.gather(batcher.predict(old, X), batcher.predict(new, X))
+
+        from_old, from_new = asyncio.run(_run())
+        batcher.shutdown()
+
+        np.testing.assert_allclose(from_new - from_old, [100.0, 100.0])
+        assert len(old.calls) == len(new.calls) == 1
+
+    def test_max_rows_flushes_early(self):
+        """行数上限に達したら窓を待たずに実行する"""
+        batcher = InferenceBatcher("test", window_ms=10_000, max_rows=4)
+        model = _SumModel()
+
+        async def _run():
+            return await asyncio.wait_for(batcher.predict(model, _matrix(5, 0.0)), timeout=2)
+
+        assert len(asyncio.run(_run())) == 5
+        batcher.shutdown()
+
+    def test_predict_error_propagates(self):
+        """predict の例外はまとめた全要求に返る"""
+        batcher = InferenceBatcher("test", window_ms=20)
+        model = _SumModel()
+        model.predict = lambda X: (_ for _ in ()).throw(ValueError("bad input"))
+
+        async def _run():
+            return await asyncio.gather(
+                batcher.predict(model, _matrix(1, 0.0)),
+                batcher.predict(model, _matrix(1, 1.0)),
+                return_exceptions=True,
+            )
+
+        results = asyncio.run(_run())
+        batcher.shutdown()
+
+        assert all(isinstance(r, ValueError) for r in results)
+        assert batcher.stats()["failed"] == 2
+
+    def test_empty_input_skips_worker(self):
+        """空行列はワーカーを起動せずに空配列を返す"""
+        batcher = InferenceBatcher("test")
+        result = asyncio.run(batcher.predict(_SumModel(), np.empty((0, 2), dtype=np.float32)))
+
+        assert result.shape == (0,)
+        assert batcher._thread is None
+
+    def test_shutdown_rejects_new_requests(self):
+        """停止後の要求は RuntimeError"""
+        batcher = InferenceBatcher("test")
+        batcher.shutdown()
+
+        with pytest.raises(RuntimeError):
+            asyncio.run(batcher.predict(_SumModel(), _matrix(1, 0.0)))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,185 @@
+"""
+リーダーボードのシーズンスナップショット ユニットテスト
+BigQuery 接続不要: run_query_sync をモックし、絞り込み・並べ替え・件数がプロセス内で完結することを検証する。
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.app.api.schemas import PlayerBattingSeasonStats, PlayerPitchingSeasonStats
+from backend.app.services.leaderboard_snapshot import (
+    LeaderboardSnapshotStore,
+    SeasonSnapshot,
+    SnapshotSpec,
+)
+
+
+def _batting_df() -> pd.DataFrame:
+    return pd.DataFrame({
+        "idfg": [1, 2, 3, 4, 4],
+        "mlbid": [11, 12, 13, 14, 14],
+        "season": [2024] * 5,
+        "name": ["A", "B", "C", "D", "D"],
+        "league": ["al", "nl", "al", "nl", "al"],
+        "pa": [600, 500, 200, 450, 120],
+        "hr": [40, 10, 5, 30, 3],
+        "ops": [0.950, 0.800, np.nan, 0.900, 0.600],
+        "league_key": ["al", "nl", "al", "nl", "al"],
+    })
+
+
+_SPEC = SnapshotSpec(
+    threshold_column="pa",
+    id_column="idfg",
+    metrics={"ops": True, "hr": True},
+    default_metric="ops",
+)
+
+
+class TestSeasonSnapshot:
+    """SeasonSnapshot のテスト"""
+
+    def test_sort_and_min_threshold(self):
+        """最小 PA で絞り、指標の降順に並べる（NULL は末尾）"""
+        snapshot = SeasonSnapshot(_batting_df(), _SPEC, PlayerBattingSeasonStats)
+
+        by_ops = snapshot.select("mlb", 150, "ops")
+        by_hr = snapshot.select("mlb", 150, "hr")
+
+        assert [p.name for p in by_ops] == ["A", "D", "B", "C"]
+        assert [p.hr for p in by_hr] == [40, 30, 10, 5]
+        assert by_ops[-1].ops is None
+
+    def test_league_filter(self):
+        """AL / NL 指定はリーグで絞る。MLB は両リーグ"""
+        snapshot = SeasonSnapshot(_batting_df(), _SPEC, PlayerBattingSeasonStats)
+
+        assert [p.name for p in snapshot.select("nl", 1, "hr")] == ["D", "B"]
+        assert [p.name for p in snapshot.select("AL", 1, "hr")] == ["A", "C", "D"]
+
+    def test_unknown_metric_uses_default(self):
+        """未知の metric_order は既定の指標で並べる"""
+        snapshot = SeasonSnapshot(_batting_df(), _SPEC, PlayerBattingSeasonStats)
+
+        assert snapshot.select("mlb", 1, "unknown") == snapshot.select("mlb", 1, "ops")
+
+    def test_ascending_metric(self):
+        """昇順指標（ERA など）は小さい順"""
+        df = pd.DataFrame({
+            "idfg": [1, 2, 3], "name": ["A", "B", "C"], "ip": [150.0, 90.1, 180.2],
+            "era": [3.5, 2.1, np.nan], "league_key": ["al", "al", "nl"],
+        })
+        spec = SnapshotSpec(threshold_column="ip", id_column="idfg",
+                            metrics={"era": False}, default_metric="era")
+        snapshot = SeasonSnapshot(df, spec, PlayerPitchingSeasonStats)
+
+        assert [p.name for p in snapshot.select("mlb", 50, "era")] == ["B", "A", "C"]
+
+    def test_league_ignored_when_not_filterable(self):
+        """filter_league=False（リーグ情報なし）はリーグ指定を無視する"""
+        df = _batting_df().assign(league_key=None)
+        spec = SnapshotSpec(threshold_column="pa", id_column="idfg",
+                            metrics={"hr": True}, default_metric="hr", filter_league=False)
+        snapshot = SeasonSnapshot(df, spec, PlayerBattingSeasonStats)
+
+        assert len(snapshot.select("nl", 1, "hr")) == 5
+
+    def test_count_deduplicates_ids(self):
+        """対象選手数は ID の重複を 1 人として数える"""
+        snapshot = SeasonSnapshot(_batting_df(), _SPEC, PlayerBattingSeasonStats)
+
+        assert snapshot.count("mlb", 100) == 4
+        assert snapshot.count("al", 100) == 3
+        assert snapshot.count("mlb", 460) == 2
+
+
+class TestSnapshotStore:
+    """LeaderboardSnapshotStore のテスト"""
+
+    def _loader(self, calls):
+        def _load():
+            calls.append(1)
+            return SeasonSnapshot(_batting_df(), _SPEC, PlayerBattingSeasonStats)
+        return _load
+
+    def test_loads_once(self):
+        """同じキーは 1 回だけ読み込む"""
+        store = LeaderboardSnapshotStore()
+        calls = []
+
+        first = store.get(("batting", 2024), self._loader(calls))
+        second = store.get(("batting", 2024), self._loader(calls))
+
+        assert first is second
+        assert len(calls) == 1
+
+    def test_stale_snapshot_served_when_reload_fails(self):
+        """古くなって読み直しに失敗したら、古いスナップショットで応答する"""
+        store = LeaderboardSnapshotStore(max_age=0)
+        snapshot = store.get("k", self._loader([]))
+
+        def _broken():
+            raise RuntimeError("BQ unavailable")
+
+        assert store.get("k", _broken) is snapshot
+
+    def test_first_load_failure_raises(self):
+        """初回ロードの失敗は呼び出し側に伝える"""
+        store = LeaderboardSnapshotStore()
+
+        with pytest.raises(RuntimeError):
+            store.get("k", lambda: (_ for _ in ()).throw(RuntimeError("down")))
+
+    def test_refresh_stale_reloads(self):
+        """refresh_interval を過ぎたスナップショットを読み直す"""
+        store = LeaderboardSnapshotStore(refresh_interval=0)
+        calls = []
+        first = store.get("k", self._loader(calls))
+
+        assert store.refresh_stale() == 1
+        assert store.get("k", self._loader(calls)) is not first
+        assert len(calls) == 2
+
+
+@pytest.fixture
+def leaderboard_service():
+    """services.base は import 時に BigQuery クライアントを作るため、クライアント生成だけモックして読み込む"""
+    with patch("google.cloud.bigquery.Client"):
+        from backend.app.services import leaderboard_service
+    return leaderboard_service
+
+
+class TestLeaderboardService:
+    """get_batting_leaderboard / get_total_eligible_players のテスト"""
+
+    def test_variants_share_one_query(self, leaderboard_service):
+        """リーグ・並べ替え・件数を変えても BigQuery はシーズンにつき 1 回"""
+        store = LeaderboardSnapshotStore()
+        with patch.object(leaderboard_service, "get_leaderboard_snapshot_store", return_value=store), \
+             patch.object(leaderboard_service, "run_query_sync", return_value=_batting_df()) as bq:
+            by_ops = leaderboard_service.get_batting_leaderboard(2024, "MLB", 150, "ops")
+            by_hr_nl = leaderboard_service.get_batting_leaderboard(2024, "NL", 150, "hr")
+            total = leaderboard_service.get_total_eligible_players(2024, "al", "batting", min_pa=100)
+
+        assert [p.name for p in by_ops] == ["A", "D", "B", "C"]
+        assert [p.name for p in by_hr_nl] == ["D", "B"]
+        assert total == 3
+        assert bq.call_count == 1
+        assert bq.call_args.kwargs["cache"] is False
+
+    def test_query_error_returns_none(self, leaderboard_service):
+        """スナップショットを読めなければ従来どおり None"""
+        store = LeaderboardSnapshotStore()
+        with patch.object(leaderboard_service, "get_leaderboard_snapshot_store", return_value=store), \
+             patch.object(leaderboard_service, "run_query_sync", side_effect=RuntimeError("BQ down")):
+            assert leaderboard_service.get_pitching_leaderboard(2024, "MLB", 50, "era") is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
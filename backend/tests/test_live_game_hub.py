@@ -0,0 +1,115 @@
+"""
+LiveGameHub ユニットテスト
+MLB API 接続不要: LiveGameService をモックに差し替えて差分配信と上流呼び出し回数を検証する。
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+from backend.app.services.live_game_hub import LiveGameHub
+
+
+def _game(pk, inning, outs=0):
+    return {"gamePk": pk, "inning": inning, "outs": outs}
+
+
+def _service(*results):
+    service = MagicMock()
+    service.get_today_live_games = AsyncMock(side_effect=list(results))
+    return service
+
+
+class TestDiff:
+    """状態ストアの差分計算"""
+
+    def test_only_changed_games_are_sent(self):
+        hub = LiveGameHub(service=MagicMock())
+        hub._apply({"live": [_game(1, 1), _game(2, 1)], "final": [], "preview": []})
+        queue = asyncio.Queue(maxsize=8)
+        hub._subscribers.add(queue)
+
+        hub._apply({"live": [_game(1, 2), _game(2, 1)], "final": [], "preview": []})
+
+        event = queue.get_nowait()
+        assert event["type"] == "diff"
+        assert event["upsert"] == [_game(1, 2)]
+        assert "removed" not in event and "final" not in event
+
+    def test_finished_game_is_removed_and_final_list_sent(self):
+        hub = LiveGameHub(service=MagicMock())
+        hub._apply({"live": [_game(1, 9)], "final": [], "preview": []})
+        queue = asyncio.Queue(maxsize=8)
+        hub._subscribers.add(queue)
+
+        hub._apply({"live": [], "final": [{"gamePk": 1}], "preview": []})
+
+        event = queue.get_nowait()
+        assert event["removed"] == [1]
+        assert event["final"] == [{"gamePk": 1}]
+
+    def test_no_change_sends_nothing(self):
+        hub = LiveGameHub(service=MagicMock())
+        result = {"live": [_game(1, 1)], "final": [], "preview": []}
+        hub._apply(result)
+        queue = asyncio.Queue(maxsize=8)
+        hub._subscribers.add(queue)
+        hub._apply(dict(result))
+        assert queue.empty()
+
+    def test_slow_subscriber_is_resynced_with_snapshot(self):
+        hub = LiveGameHub(service=MagicMock())
+        queue = asyncio.Queue(maxsize=1)
+        hub._subscribers.add(queue)
+        hub._apply({"live": [_game(1, 1)], "final": [], "preview": []})
+        hub._apply({"live": [_game(1, 2)], "final": [], "preview": []})
+
+        event = queue.get_nowait()
+        assert event["type"] == "snapshot"
+        assert event["live"] == [_game(1, 2)]
+
+
+class TestUpstreamCalls:
+    """上流呼び出しは閲覧者数に依存しない"""
+
+    def test_many_pollers_share_one_fetch(self):
+        service = _service({"live": [_game(1, 1)], "final": [], "preview": []})
+        hub = LiveGameHub(service=service, poll_interval=60)
+
+        async def _run():
+            return await asyncio.gather(*(hub.get_snapshot() for _ in range(50)))
+
+        results = asyncio.run(_run())
+        assert service.get_today_live_games.await_count == 1
+        assert all(r["live"] == [_game(1, 1)] for r in results)
+
+    def test_subscribers_get_snapshot_then_diff(self):
+        service = _service(
+            {"live": [_game(1, 1)], "final": [], "preview": []},
+            {"live": [_game(1, 1, outs=1)], "final": [], "preview": []},
+        )
+        hub = LiveGameHub(service=service, poll_interval=0.05)
+
+        async def _run():
+            async def _read_two():
+                events = []
+                async for event in hub.subscribe(heartbeat=1):
+                    if event is not None:
+                        events.append(event)
+                    if len(events) == 2:
+                        break
+                return events
+
+            a, b = await asyncio.gather(_read_two(), _read_two())
+            await hub.stop()
+            return a, b
+
+        a, b = asyncio.run(_run())
+        for events in (a, b):
+            assert events[0]["type"] == "snapshot"
+            assert events[1]["type"] == "diff"
+            assert events[1]["upsert"] == [_game(1, 1, outs=1)]
+        assert service.get_today_live_games.await_count == 2
+        assert hub.subscriber_count == 0
@@ -0,0 +1,134 @@
+"""
+llm_gateway_service 非同期 API ユニットテスト
+Gemini 接続不要: genai クライアントと LLM ロガーをモックに差し替えて検証する。
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from backend.app.services import llm_gateway_service as gateway
+
+
+def _usage(prompt_tokens=100, output_tokens=20):
+    return SimpleNamespace(
+        prompt_token_count=prompt_tokens,
+        candidates_token_count=output_tokens,
+        cached_content_token_count=None,
+    )
+
+
+def _fake_client(response=None, chunks=None, error=None):
+    client = MagicMock()
+    if error is not None:
+        client.aio.models.generate_content = AsyncMock(side_effect=error)
+    else:
+        client.aio.models.generate_content = AsyncMock(return_value=response)
+
+    async def _stream():
+        for c in chunks or []:
+            yield c
+
+    client.aio.models.generate_content_stream = AsyncMock(side_effect=lambda **kw: _stream())
+    return client
+
+
+class TestAcallGemini:
+    """acall_gemini のテスト"""
+
+    def test_returns_text_and_logs_usage(self):
+        """テキストを返し、トークン数とコストをログに記録する"""
+        client = _fake_client(response=SimpleNamespace(text="ok", usage_metadata=_usage()))
+        llm_logger = MagicMock()
+        with patch.object(gateway, "_get_genai_client", return_value=client), \
+                patch.object(gateway, "get_llm_logger", return_value=llm_logger):
+            text = asyncio.run(gateway.acall_gemini("hi", feature="test"))
+
+        assert text == "ok"
+        entry = llm_logger.log.call_args[0][0]
+        assert entry.success is True
+        assert entry.feature == "test"
+        assert entry.input_tokens == 100
+        assert entry.output_tokens == 20
+        assert entry.estimated_cost_usd > 0
+
+    def test_error_returns_none_and_logs_failure(self):
+        """SDK 例外は None を返し、失敗としてログに残す"""
+        client = _fake_client(error=RuntimeError("boom"))
+        llm_logger = MagicMock()
+        with patch.object(gateway, "_get_genai_client", return_value=client), \
+                patch.object(gateway, "get_llm_logger", return_value=llm_logger):
+            text = asyncio.run(gateway.acall_gemini("hi"))
+
+        assert text is None
+        entry = llm_logger.log.call_args[0][0]
+        assert entry.success is False
+        assert entry.error_type == "RuntimeError"
+
+    def test_concurrent_calls_do_not_serialize(self):
+        """複数呼び出しはイベントループ上で並行に待つ"""
+        async def _slow(**kwargs):
+            await asyncio.sleep(0.1)
+            return SimpleNamespace(text="ok", usage_metadata=_usage())
+
+        client = MagicMock()
+        client.aio.models.generate_content = AsyncMock(side_effect=_slow)
+
+        async def _run_many():
+            loop = asyncio.get_running_loop()
+            t0 = loop.time()
+            results = await asyncio.gather(*(gateway.acall_gemini("hi") for _ in range(20)))
+            return results, loop.time() - t0
+
+        with patch.object(gateway, "_get_genai_client", return_value=client), \
+                patch.object(gateway, "get_llm_logger", return_value=MagicMock()):
+            results, elapsed = asyncio.run(_run_many())
+
+        assert results == ["ok"] * 20
+        assert elapsed < 1.0
+
+
+class TestAcallGeminiStream:
+    """acall_gemini_stream のテスト"""
+
+    def test_yields_chunks_and_logs_once(self):
+        """断片を受信順に返し、終了時にまとめて 1 回だけログを書く"""
+        chunks = [
+            SimpleNamespace(text="Ohtani ", usage_metadata=None),
+            SimpleNamespace(text="hit 54 HR", usage_metadata=_usage(50, 10)),
+        ]
+        client = _fake_client(chunks=chunks)
+        llm_logger = MagicMock()
+
+        async def _collect():
+            return [t async for t in gateway.acall_gemini_stream("hi", feature="stream")]
+
+        with patch.object(gateway, "_get_genai_client", return_value=client), \
+                patch.object(gateway, "get_llm_logger", return_value=llm_logger):
+            parts = asyncio.run(_collect())
+
+        assert parts == ["Ohtani ", "hit 54 HR"]
+        assert llm_logger.log.call_count == 1
+        entry = llm_logger.log.call_args[0][0]
+        assert entry.response_answer == "Ohtani hit 54 HR"
+        assert entry.input_tokens == 50
+        assert entry.output_tokens == 10
+
+
+class TestHttpOptions:
+    """共有クライアントの HTTP 設定のテスト"""
+
+    def test_retry_with_jitter(self):
+        """生成・埋め込みの config には 429 / 5xx をジッター付きで再試行する設定を付ける"""
+        retry = gateway._build_config("text/plain", None).http_options.retry_options
+
+        assert retry.attempts == gateway.GEMINI_HTTP_RETRY_ATTEMPTS
+        assert retry.jitter > 0
+        assert 429 in retry.http_status_codes and 503 in retry.http_status_codes
+
+    def test_shared_client_does_not_retry(self):
+        """caches.create() など共有クライアント経由の他の呼び出しは再試行しない"""
+        assert gateway._build_http_options().retry_options is None
@@ -0,0 +1,253 @@
+"""
+MLBStatsClient ユニットテスト
+MLB Stats API 接続不要: httpx.MockTransport で条件付き GET と diffPatch の挙動を検証する。
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import asyncio
+import copy
+
+import httpx
+import pytest
+
+from backend.app.services.mlb_stats_client import (
+    JsonPatchError,
+    MLBStatsClient,
+    apply_json_patch,
+)
+
+
+def _feed(timecode: str, inning: int):
+    return {
+        "metaData": {"timeStamp": timecode},
+        "gameData": {"teams": {}},
+        "liveData": {"linescore": {"currentInning": inning}, "plays": {"allPlays": []}},
+    }
+
+
+class TestJsonPatch:
+    """JSON Patch 適用のテスト"""
+
+    def test_add_replace_remove_move(self):
+        doc = {"a": {"b": 1}, "list": [1, 2], "old": "x"}
+        apply_json_patch(doc, [
+            {"op": "replace", "path": "/a/b", "value": 2},
+            {"op": "add", "path": "/list/-", "value": 3},
+            {"op": "add", "path": "/list/0", "value": 0},
+            {"op": "move", "from": "/old", "path": "/new"},
+            {"op": "remove", "path": "/list/1"},
+        ])
+        assert doc == {"a": {"b": 2}, "list": [0, 2, 3], "new": "x"}
+
+    def test_missing_path_raises(self):
+        with pytest.raises(JsonPatchError):
+            apply_json_patch({"a": {}}, [{"op": "remove", "path": "/a/missing"}])
+
+
+class TestConditionalGet:
+    """ETag による条件付き GET"""
+
+    def test_not_modified_returns_cached_json(self):
+        seen_headers = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen_headers.append(request.headers.get("If-None-Match"))
+            if request.headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, json={"records": [1]}, headers={"ETag": '"v1"'})
+
+        client = MLBStatsClient(transport=httpx.MockTransport(handler))
+
+        async def _run():
+            first = await client.get_json("/api/v1/standings", params={"season": 2025})
+            second = await client.get_json("/api/v1/standings", params={"season": 2025})
+            await client.aclose()
+            return first, second
+
+        first, second = asyncio.run(_run())
+        assert first == second == {"records": [1]}
+        assert seen_headers == [None, '"v1"']
+        assert client.stats()["not_modified"] == 1
+
+    def test_connection_pool_is_reused(self):
+        """同一ループ内では同じ AsyncClient を使い回す"""
+        client = MLBStatsClient(transport=httpx.MockTransport(lambda r: httpx.Response(200, json={})))
+
+        async def _run():
+            a = client.client
+            await client.get_json("/x")
+            b = client.client
+            await client.aclose()
+            return a is b
+
+        assert asyncio.run(_run())
+
+    def test_client_from_previous_loop_is_closed(self):
+        """別のループで作り直すとき、前のループの AsyncClient は閉じる"""
+        client = MLBStatsClient(transport=httpx.MockTransport(lambda r: httpx.Response(200, json={})))
+
+        async def _first():
+            return client.client
+
+        async def _second():
+            fresh = client.client
+            await asyncio.sleep(0)
+            await asyncio.sleep(0)
+            await client.aclose()
+            return fresh
+
+        old = asyncio.run(_first())
+        fresh = asyncio.run(_second())
+        assert fresh is not old
+        assert old.is_closed
+
+
+class TestLiveFeedDiffPatch:
+    """ライブフィードの差分取得"""
+
+    def test_second_poll_uses_diff_patch(self):
+        requests = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append((request.url.path, dict(request.url.params)))
+            if request.url.path.endswith("/diffPatch"):
+                return httpx.Response(200, json=[{"diff": [
+                    {"op": "replace", "path": "/liveData/linescore/currentInning", "value": 4},
+                    {"op": "replace", "path": "/metaData/timeStamp", "value": "20250401_120500"},
+                ]}])
+            return httpx.Response(200, json=_feed("20250401_120000", 3))
+
+        client = MLBStatsClient(transport=httpx.MockTransport(handler))
+
+        async def _run():
+            first = copy.deepcopy(await client.get_live_feed(777))
+            second = await client.get_live_feed(777)
+            await client.get_live_feed(777)
+            third_timecode = requests[-1][1].get("startTimecode")
+            await client.aclose()
+            return first, second, third_timecode
+
+        first, second, third_timecode = asyncio.run(_run())
+        assert first["liveData"]["linescore"]["currentInning"] == 3
+        assert second["liveData"]["linescore"]["currentInning"] == 4
+        assert requests[1] == ("/api/v1.1/game/777/feed/live/diffPatch", {"startTimecode": "20250401_120000"})
+        # 次回は更新後の timecode から差分を取る
+        assert third_timecode == "20250401_120500"
+        assert client.stats()["full_feed"] == 1
+
+    def test_bad_patch_falls_back_to_full_feed(self):
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.path.endswith("/diffPatch"):
+                return httpx.Response(200, json=[{"diff": [{"op": "remove", "path": "/nope/x"}]}])
+            return httpx.Response(200, json=_feed("20250401_120000", 5))
+
+        client = MLBStatsClient(transport=httpx.MockTransport(handler))
+
+        async def _run():
+            await client.get_live_feed(1)
+            feed = await client.get_live_feed(1)
+            await client.aclose()
+            return feed
+
+        feed = asyncio.run(_run())
+        assert feed["liveData"]["linescore"]["currentInning"] == 5
+        assert client.stats()["full_feed"] == 2
+
+    def test_patch_updates_the_cached_feed_in_place(self):
+        """差分はキャッシュ中のフィードにその場で適用し、フィードをコピーしない"""
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.path.endswith("/diffPatch"):
+                return httpx.Response(200, json=[{"diff": [
+                    {"op": "replace", "path": "/liveData/linescore/currentInning", "value": 6},
+                ]}])
+            return httpx.Response(200, json=_feed("20250401_120000", 5))
+
+        client = MLBStatsClient(transport=httpx.MockTransport(handler))
+
+        async def _run():
+            first = await client.get_live_feed(1)
+            second = await client.get_live_feed(1)
+            await client.aclose()
+            return first, second
+
+        first, second = asyncio.run(_run())
+        assert second is first
+        assert second["liveData"]["linescore"]["currentInning"] == 6
+
+    def test_failed_patch_drops_half_patched_feed(self):
+        """途中で失敗した差分を当てたフィードはキャッシュから捨て、次はフル取得する"""
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.path.endswith("/diffPatch"):
+                return httpx.Response(200, json=[{"diff": [
+                    {"op": "replace", "path": "/liveData/linescore/currentInning", "value": 9},
+                    {"op": "remove", "path": "/nope/x"},
+                ]}])
+            return httpx.Response(500)
+
+        client = MLBStatsClient(transport=httpx.MockTransport(handler))
+        client._remember_feed(1, _feed("20250401_120000", 5))
+
+        async def _run():
+            try:
+                with pytest.raises(httpx.HTTPStatusError):
+                    await client.get_live_feed(1)
+            finally:
+                await client.aclose()
+
+        asyncio.run(_run())
+        assert client._live_feeds.get(1) is None
+
+    def test_final_game_is_not_kept(self):
+        """終了した試合のフィードは diffPatch の基準として持たない"""
+        final = _feed("20250401_150000", 9)
+        final["gameData"]["status"] = {"abstractGameState": "Final"}
+        client = MLBStatsClient(transport=httpx.MockTransport(lambda r: httpx.Response(200, json=final)))
+
+        async def _run():
+            feed = await client.get_live_feed(3)
+            await client.aclose()
+            return feed
+
+        assert asyncio.run(_run())["liveData"]["linescore"]["currentInning"] == 9
+        assert len(client._live_feeds) == 0
+
+    def test_unpolled_games_expire(self):
+        """最後のポーリングから MLB_LIVE_FEED_IDLE_TTL_SEC を過ぎた試合は次のポーリングで捨てる"""
+        from unittest.mock import patch
+        from backend.app.services import mlb_stats_client
+
+        client = MLBStatsClient(transport=httpx.MockTransport(
+            lambda r: httpx.Response(200, json=_feed("20250401_120000", 1))
+        ))
+
+        async def _run():
+            with patch.object(mlb_stats_client, "MLB_LIVE_FEED_IDLE_TTL_SEC", 0):
+                await client.get_live_feed(1)
+            await client.get_live_feed(2)
+            await client.aclose()
+
+        asyncio.run(_run())
+        # get() を経由せずに消えている（次のポーリングで掃除された）
+        assert len(client._live_feeds) == 1
+        assert client._live_feeds.get(2) is not None
+
+    def test_concurrent_polls_share_one_request(self):
+        calls = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request.url.path)
+            await asyncio.sleep(0.05)
+            return httpx.Response(200, json=_feed("20250401_120000", 1))
+
+        client = MLBStatsClient(transport=httpx.MockTransport(handler))
+
+        async def _run():
+            results = await asyncio.gather(*(client.get_live_feed(9) for _ in range(10)))
+            await client.aclose()
+            return results
+
+        results = asyncio.run(_run())
+        assert len(calls) == 1
+        assert all(r is results[0] for r in results)
@@ -0,0 +1,152 @@
+"""
+ModelArtifactCache ユニットテスト
+GCS・BigQuery 接続不要: registry をモックし、ディスク層は tmp_path を使う。
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import asyncio
+import joblib
+import numpy as np
+import pytest
+from unittest.mock import MagicMock
+
+from backend.app.services.model_registry_service import MODEL_TRAINING_CONFIG, ModelVersion
+from backend.app.services.model_artifact_cache import ModelArtifactCache
+
+
+def _version(version: str, model_type: str = "batter_segmentation") -> ModelVersion:
+    return ModelVersion(
+        version=version,
+        model_type=model_type,
+        algorithm="kmeans",
+        training_season=2025,
+        gcs_path=f"gs://bucket/models/{model_type}/{version}/model.joblib",
+        is_active=True,
+    )
+
+
+def _registry(active: ModelVersion, centers: np.ndarray) -> MagicMock:
+    """download_model_file がその時点の centers を書き出す registry モック"""
+    registry = MagicMock()
+    registry.get_active_version.side_effect = lambda model_type: registry.active
+    registry.active = active
+    registry.centers = centers
+
+    def _download(gcs_path, local_path):
+        joblib.dump({"centers": registry.centers}, local_path)
+
+    registry.download_model_file.side_effect = _download
+    return registry
+
+
+class TestLoadModel:
+    """load_model のテスト"""
+
+    def test_loads_once_and_reuses(self, tmp_path):
+        """2 回目以降は registry に問い合わせない"""
+        registry = _registry(_version("v1"), np.arange(4.0))
+        cache = ModelArtifactCache(registry=registry, cache_dir=str(tmp_path))
+
+        artifact, meta = cache.load_model("batter_segmentation")
+        again, _ = cache.load_model("batter_segmentation")
+
+        assert meta.version == "v1"
+        assert again is artifact
+        np.testing.assert_array_equal(artifact["centers"], np.arange(4.0))
+        assert registry.get_active_version.call_count == 1
+        assert registry.download_model_file.call_count == 1
+
+    def test_arrays_are_memory_mapped(self, tmp_path):
+        """ディスク層からのロードは numpy 配列を mmap で読む"""
+        registry = _registry(_version("v1"), np.arange(4.0))
+        cache = ModelArtifactCache(registry=registry, cache_dir=str(tmp_path))
+
+        artifact, _ = cache.load_model("batter_segmentation")
+        assert isinstance(artifact["centers"], np.memmap)
+
+    def test_disk_tier_skips_download(self, tmp_path):
+        """同じバージョンがディスクにあれば別インスタンスでもダウンロードしない"""
+        registry = _registry(_version("v1"), np.arange(4.0))
+        ModelArtifactCache(registry=registry, cache_dir=str(tmp_path)).load_model("batter_segmentation")
+
+        fresh = ModelArtifactCache(registry=registry, cache_dir=str(tmp_path))
+        fresh.load_model("batter_segmentation")
+
+        assert registry.download_model_file.call_count == 1
+        assert fresh.stats()["disk_hit"] == 1
+
+    def test_no_active_version_raises(self, tmp_path):
+        """active バージョンがない場合 FileNotFoundError"""
+        registry = MagicMock()
+        registry.get_active_version.return_value = None
+        cache = ModelArtifactCache(registry=registry, cache_dir=str(tmp_path))
+
+        with pytest.raises(FileNotFoundError):
+            cache.load_model("batter_segmentation")
+
+
+class TestHotSwap:
+    """バージョン変更時の差し替えのテスト"""
+
+    def test_refresh_swaps_new_version(self, tmp_path):
+        """active が変わったら新バージョンに差し替え、旧ファイルを消す"""
+        registry = _registry(_version("v1"), np.zeros(2))
+        cache = ModelArtifactCache(registry=registry, cache_dir=str(tmp_path))
+        old_artifact, _ = cache.load_model("batter_segmentation")
+
+        registry.active = _version("v2")
+        registry.centers = np.ones(2)
+        assert cache.refresh("batter_segmentation") is True
+
+        artifact, meta = cache.load_model("batter_segmentation")
+        assert meta.version == "v2"
+        np.testing.assert_array_equal(artifact["centers"], np.ones(2))
+        # 旧バージョンを握っている読み手はそのまま使える
+        np.testing.assert_array_equal(old_artifact["centers"], np.zeros(2))
+        assert sorted(os.listdir(tmp_path / "batter_segmentation")) == ["v2"]
+
+    def test_refresh_same_version_is_noop(self, tmp_path):
+        """バージョンが同じなら何もしない"""
+        registry = _registry(_version("v1"), np.zeros(2))
+        cache = ModelArtifactCache(registry=registry, cache_dir=str(tmp_path))
+        cache.load_model("batter_segmentation")
+
+        assert cache.refresh("batter_segmentation") is False
+        assert registry.download_model_file.call_count == 1
+
+    def test_failed_load_keeps_old_version(self, tmp_path):
+        """新バージョンのロードに失敗したら旧バージョンを使い続ける"""
+        registry = _registry(_version("v1"), np.zeros(2))
+        cache = ModelArtifactCache(registry=registry, cache_dir=str(tmp_path))
+        cache.load_model("batter_segmentation")
+
+        registry.active = _version("v2")
+        registry.download_model_file.side_effect = OSError("GCS unavailable")
+        cache.refresh_all(["batter_segmentation"])
+
+        _, meta = cache.load_model("batter_segmentation")
+        assert meta.version == "v1"
+        # 途中のダウンロードファイルを残さない
+        assert os.listdir(tmp_path / "batter_segmentation" / "v2") == []
+
+    def test_poll_loop_prefetches(self, tmp_path):
+        """start() の先読みで全 model_type をロードする"""
+        registry = _registry(_version("v1"), np.zeros(2))
+        cache = ModelArtifactCache(registry=registry, cache_dir=str(tmp_path), poll_interval=3600)
+
+        async def _run():
+            cache.start(prefetch=True)
+            for _ in range(100):
+                if len(cache.versions()) == len(MODEL_TRAINING_CONFIG):
+                    break
+                await asyncio.sleep(0.01)
+            await cache.stop()
+
+        asyncio.run(_run())
+        assert set(cache.versions()) == set(MODEL_TRAINING_CONFIG)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,146 @@
+"""
+NLQueryCache ユニットテスト
+Gemini 接続不要: 埋め込み関数を決定的なフェイクに差し替えて Tier 1 / Tier 2 と無効化を検証する。
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import time
+from unittest.mock import MagicMock, patch
+
+from backend.app.services import nl_query_cache_service
+from backend.app.services.nl_query_cache_service import NLQueryCache, cached_parse, normalize_query
+
+PARAMS = {"query_type": "season_batting", "season": 2024, "metrics": ["homerun"], "order_by": "homerun", "limit": 1}
+
+
+def _fake_embed(text: str):
+    """「ホームラン」を含むかどうかだけで方向が決まる埋め込み（言い換えを同一視させる）"""
+    if "ホームラン" in text or "hr" in text:
+        return [1.0, 0.0, 0.0]
+    return [0.0, 1.0, 0.0]
+
+
+class TestExactTier:
+    """Tier 1（完全一致）のテスト"""
+
+    def test_normalization(self):
+        """全角・空白・末尾の句読点の違いは同一視する"""
+        assert normalize_query("２０２４年の ホームラン王は誰？") == normalize_query("2024年の ホームラン王は誰")
+
+    def test_exact_hit_returns_copy(self):
+        """ヒット時は複製を返し、呼び出し側の書き換えがキャッシュに残らない"""
+        cache = NLQueryCache(semantic_enabled=False)
+        cache.store("batter", "2024年のホームラン王は誰？", None, "v1", PARAMS)
+        hit = cache.lookup("batter", "2024年のホームラン王は誰", None, "v1")
+        assert hit == PARAMS
+        hit["output_format"] = "table"
+        assert "output_format" not in cache.lookup("batter", "2024年のホームラン王は誰", None, "v1")
+        assert cache.stats()["exact_hit"] == 2
+
+    def test_season_hint_is_part_of_key(self):
+        """会話から補完したシーズンが違えば別エントリ"""
+        cache = NLQueryCache(semantic_enabled=False)
+        cache.store("batter", "ホームラン王は誰？", 2024, "v1", PARAMS)
+        assert cache.lookup("batter", "ホームラン王は誰？", 2023, "v1") is None
+
+    def test_prompt_version_change_invalidates(self):
+        """プロンプトバージョンが変わった名前空間は破棄される"""
+        cache = NLQueryCache(semantic_enabled=False)
+        cache.store("batter", "2024年のホームラン王は誰？", None, "v1", PARAMS)
+        assert cache.lookup("batter", "2024年のホームラン王は誰？", None, "v2") is None
+        assert cache.lookup("batter", "2024年のホームラン王は誰？", None, "v1") is None
+
+
+class TestSemanticTier:
+    """Tier 2（埋め込み類似度）のテスト"""
+
+    def test_paraphrase_hits(self):
+        """言い換えでも類似度が閾値以上ならヒットし、Tier 1 にも昇格する"""
+        embed = MagicMock(side_effect=_fake_embed)
+        cache = NLQueryCache(embed_fn=embed, threshold=0.95, semantic_enabled=True)
+        cache.store("batter", "2024年のホームラン王は誰？", None, "v1", PARAMS)
+        cache.flush()
+        assert cache.lookup("batter", "2024年に一番ホームランを打ったのは？", None, "v1") == PARAMS
+        assert cache.lookup("batter", "2024年に一番ホームランを打ったのは？", None, "v1") == PARAMS
+        assert cache.stats() == {"exact_hit": 1, "semantic_hit": 1, "miss": 0}
+
+    def test_different_year_does_not_hit(self):
+        """埋め込みが近くても数字（年）が違えばヒットしない"""
+        cache = NLQueryCache(embed_fn=_fake_embed, threshold=0.95, semantic_enabled=True)
+        cache.store("batter", "2024年のホームラン王は誰？", None, "v1", PARAMS)
+        cache.flush()
+        assert cache.lookup("batter", "2023年のホームラン王は誰？", None, "v1") is None
+
+    def test_different_player_does_not_hit(self):
+        """埋め込みが同じでも選手名が違えばヒットしない"""
+        cache = NLQueryCache(embed_fn=_fake_embed, threshold=0.95, semantic_enabled=True)
+        cache.store("batter", "大谷の2024年のホームラン", None, "v1", PARAMS)
+        cache.flush()
+        assert cache.lookup("batter", "ジャッジの2024年のホームラン", None, "v1") is None
+        assert cache.lookup("batter", "judgeの2024年のhr", None, "v1") is None
+        assert cache.lookup("batter", "2024年の大谷のホームランは？", None, "v1") == PARAMS
+
+    def test_slow_embedding_does_not_block_lookup(self):
+        """埋め込みが lookup_timeout に間に合わなければ待たずに miss"""
+        def _slow_embed(text):
+            time.sleep(0.3)
+            return _fake_embed(text)
+
+        cache = NLQueryCache(embed_fn=_slow_embed, threshold=0.95, semantic_enabled=True, lookup_timeout=0.02)
+        started = time.monotonic()
+        assert cache.lookup("batter", "2024年のホームラン王は誰？", None, "v1") is None
+        assert time.monotonic() - started < 0.2
+
+    def test_semantic_tier_is_off_by_default(self):
+        """Tier 2 は明示的に有効化しない限り使わない"""
+        assert nl_query_cache_service.NL_QUERY_SEMANTIC_CACHE_ENABLED is False
+
+    def test_below_threshold_misses(self):
+        """類似度が閾値未満ならヒットしない"""
+        cache = NLQueryCache(embed_fn=_fake_embed, threshold=0.95, semantic_enabled=True)
+        cache.store("batter", "2024年のホームラン王は誰？", None, "v1", PARAMS)
+        cache.flush()
+        assert cache.lookup("batter", "2024年の打率トップは誰？", None, "v1") is None
+
+    def test_embedding_failure_falls_back_to_miss(self):
+        """埋め込み取得に失敗しても例外にならず miss 扱い"""
+        cache = NLQueryCache(embed_fn=lambda text: None, semantic_enabled=True)
+        cache.store("batter", "2024年のホームラン王は誰？", None, "v1", PARAMS)
+        cache.flush()
+        assert cache.lookup("batter", "2024年に一番ホームランを打ったのは？", None, "v1") is None
+
+
+class TestCachedParse:
+    """cached_parse のテスト"""
+
+    def test_llm_called_once_for_repeats(self):
+        """同じ質問の 2 回目は parse_fn（LLM）を呼ばない"""
+        parse_fn = MagicMock(return_value=dict(PARAMS))
+        with patch.object(nl_query_cache_service, "get_nl_query_cache",
+                          return_value=NLQueryCache(semantic_enabled=False)):
+            for _ in range(2):
+                result = cached_parse("batter", "2024年のホームラン王は誰？", None, "v1",
+                                      parse_fn, validate_fn=lambda p: True)
+        assert parse_fn.call_count == 1
+        assert result == PARAMS
+
+    def test_invalid_params_are_not_cached(self):
+        """検証に落ちたパラメータはキャッシュしない"""
+        parse_fn = MagicMock(return_value={"query_type": "DROP TABLE"})
+        with patch.object(nl_query_cache_service, "get_nl_query_cache",
+                          return_value=NLQueryCache(semantic_enabled=False)):
+            for _ in range(2):
+                cached_parse("batter", "悪い質問", None, "v1", parse_fn, validate_fn=lambda p: False)
+        assert parse_fn.call_count == 2
+
+    def test_unversioned_prompt_is_not_cached(self):
+        """プロンプトバージョンが無い（変更を検知できない）呼び出しはキャッシュしない"""
+        parse_fn = MagicMock(return_value=dict(PARAMS))
+        with patch.object(nl_query_cache_service, "get_nl_query_cache",
+                          return_value=NLQueryCache(semantic_enabled=False)):
+            for _ in range(2):
+                cached_parse("batter", "2024年のホームラン王は誰？", None, None,
+                             parse_fn, validate_fn=lambda p: True)
+        assert parse_fn.call_count == 2
@@ -0,0 +1,141 @@
+"""
+stream_player_profile / get_player_profile ユニットテスト
+BigQuery 接続不要: セクション DAG をスタブに差し替え、bio を先頭に返す順序と組み立てを検証する。
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+
+from backend.app.api.schemas import PlayerBattingKPI, PlayerBio
+from backend.app.utils.async_dag import DagNode
+
+
+@pytest.fixture
+def profile_service():
+    """services.base は import 時に BigQuery クライアントを作るため、クライアント生成だけモックして読み込む"""
+    with patch("google.cloud.bigquery.Client"):
+        from backend.app.services import player_profile_service
+    return player_profile_service
+
+
+def _stub_nodes(bio, with_rows: bool = True):
+    """本物と同じ形の DAG（bio → batting_kpi → season → monthly、risp_season は独立）"""
+    def _nodes(mlbid, season):
+        return [
+            DagNode("risp_season", lambda: ["risp"] if with_rows else None),
+            DagNode("bio", lambda: time.sleep(0.05) or bio),
+            DagNode("batting_kpi", lambda b: {"kpi": PlayerBattingKPI(season=2025), "data": {"season": 2025}}, ("bio",)),
+            DagNode("season", lambda b: b["data"]["season"], ("batting_kpi",), blocking=False),
+            DagNode("monthly", lambda s: [f"m{s}"] if with_rows else None, ("season",)),
+        ]
+    return _nodes
+
+
+def _collect(service, mlbid=1):
+    async def _run():
+        return [item async for item in service.stream_player_profile(mlbid)]
+    return asyncio.run(_run())
+
+
+class TestPlayerProfileStream:
+    """プロフィールのストリーミングのテスト"""
+
+    def test_profile_dag_is_valid(self, profile_service):
+        """本物のセクション DAG に未知の依存・循環がなく、返すセクションはすべてノードとして存在する"""
+        from backend.app.utils.async_dag import _validate
+
+        nodes = profile_service._profile_nodes(1, None)
+        _validate(nodes)
+        assert set(profile_service._SECTION_FIELDS) <= {n.name for n in nodes}
+
+    def test_bio_is_first_and_internal_nodes_hidden(self, profile_service):
+        """bio より先に解決したセクションも bio の後に返し、内部ノード（season）は返さない"""
+        bio = {"idfg": 10, "bio": PlayerBio(full_name="Test Player")}
+        with patch.object(profile_service, "_profile_nodes", _stub_nodes(bio)):
+            events = _collect(profile_service)
+
+        assert events[0] == ("bio", {"mlbid": 1, **bio})
+        assert {name for name, _ in events} == {"bio", "risp_season", "batting_kpi", "monthly"}
+        assert dict(events)["batting_kpi"]["batting_kpi"].season == 2025
+        assert dict(events)["monthly"] == {"monthly_offensive_stats": ["m2025"]}
+
+    def test_missing_player_yields_nothing(self, profile_service):
+        """bio が取れなければ何も返さず、get_player_profile は None"""
+        with patch.object(profile_service, "_profile_nodes", _stub_nodes(None)):
+            assert _collect(profile_service) == []
+            assert asyncio.run(profile_service.get_player_profile(2)) is None
+
+    def test_stream_endpoint_404_for_missing_player(self, profile_service):
+        """bio が取れなければストリームを始めずに 404"""
+        from fastapi import HTTPException
+        from backend.app.api.endpoints import player_endpoints
+
+        with patch.object(profile_service, "_profile_nodes", _stub_nodes(None)):
+            with pytest.raises(HTTPException) as exc:
+                asyncio.run(player_endpoints.stream_player_profile_endpoint(2, season=None))
+
+        assert exc.value.status_code == 404
+
+    def test_full_profile_merges_sections(self, profile_service):
+        """get_player_profile は全セクションをまとめた PlayerProfileResponse を返す"""
+        bio = {"idfg": 10, "bio": PlayerBio(full_name="Test Player")}
+        with patch.object(profile_service, "_profile_nodes", _stub_nodes(bio, with_rows=False)):
+            profile = asyncio.run(profile_service.get_player_profile(3))
+
+        assert profile.mlbid == 3
+        assert profile.idfg == 10
+        assert profile.bio.full_name == "Test Player"
+        assert profile.batting_kpi.season == 2025
+        assert profile.risp_stats is None
+
+
+class TestProfileSectionBundle:
+    """_fetch_sections（セクションのバンドル取得）のテスト"""
+
+    def test_pitcher_sections_in_one_job(self, profile_service):
+        """投手は投手・シーズン系のセクションだけを 1 回でまとめて取り、行モデルに戻す"""
+        def _bundle(selects, params):
+            return {s.name: ([{"tto": 1, "pa": 30}] if s.name == "pitcher_tto" else []) for s in selects}
+
+        pitching_kpi = profile_service.PlayerPitchingKPI(season=2025)
+        with patch.object(profile_service, "run_bundle", side_effect=_bundle) as bundle:
+            sections = profile_service._fetch_sections(1, 2025, None, pitching_kpi)
+
+        names = {s.name for s in bundle.call_args.args[0]}
+        assert bundle.call_count == 1
+        assert {"pitcher_tto", "whiff_heatmap", "inning_stats", "monthly"} <= names
+        assert not names & {"hit_location", "clutch"}
+        assert sections["pitcher_tto"][0].tto == 1
+        assert sections["whiff_heatmap"] is None
+
+    def test_no_season_keeps_only_clutch(self, profile_service):
+        """シーズン未確定なら @season を使わない clutch だけを取る"""
+        with patch.object(profile_service, "run_bundle", return_value={"clutch": []}) as bundle:
+            sections = profile_service._fetch_sections(1, None, PlayerBattingKPI(), None)
+
+        selects, params = bundle.call_args.args
+        assert [s.name for s in selects] == ["clutch"]
+        assert [p.name for p in params] == ["mlbid"]
+        assert sections == {"clutch": None}
+
+    def test_era_merged_into_inning(self, profile_service):
+        """inning ノードはバンドル結果の inning_stats に ERA by inning をマージする"""
+        inning = [profile_service.PlayerInningRow(inning=1, hits_allowed=3)]
+        era = [{"inning": 1, "era": 2.5, "earned_runs": 4.0, "innings_pitched": 14.1}]
+        node = next(n for n in profile_service._profile_nodes(1, 2025) if n.name == "inning")
+
+        merged = node.fn({"inning_stats": inning, "era_by_inning": era})
+
+        assert merged[0].era == 2.5
+        assert merged[0].earned_runs == 4
+        assert node.fn(None) is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,175 @@
+"""
+/qa/player-stats-stream（ナラティブ回答のトークンストリーミング）ユニットテスト
+Gemini・BigQuery 接続不要: acall_gemini_stream とデータ取得をスタブに差し替え、
+token → final_answer の順序と、有効なルーター経由で SSE が届くことを検証する。
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import asyncio
+import json
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def ai_service():
+    """services.base は import 時に BigQuery クライアントを作るため、クライアント生成だけモックして読み込む"""
+    with patch("google.cloud.bigquery.Client"):
+        from backend.app.services import ai_service
+    return ai_service
+
+
+def _fake_stream(chunks):
+    async def _stream(*args, **kwargs):
+        for chunk in chunks:
+            yield chunk
+    return _stream
+
+
+def _prepared(output_format="sentence"):
+    return {
+        "query_params": {"query_type": "season_batting", "name": "Shohei Ohtani", "output_format": output_format},
+        "results_df": pd.DataFrame([{"name": "Shohei Ohtani", "homerun": 54}]),
+        "season": 2024,
+        "context_used": False,
+    }
+
+
+def _collect(agen):
+    async def _run():
+        return [item async for item in agen]
+    return asyncio.run(_run())
+
+
+class TestStreamFinalResponse:
+    """BaseEngine.stream_final_response_with_llm のテスト"""
+
+    def test_chunks_are_forwarded_with_br(self, ai_service):
+        """gateway の断片をそのまま順に返し、改行は同期版と同じく <br> に変換する"""
+        from backend.app.services.analytics import base_engine
+
+        df = pd.DataFrame([{"homerun": 54}])
+        with patch.object(base_engine, "GEMINI_API_KEY", "key"), \
+             patch.object(base_engine, "acall_gemini_stream", _fake_stream(["大谷は", "54本\n", "です"])):
+            chunks = _collect(base_engine.BaseEngine.stream_final_response_with_llm("HR数は？", df))
+
+        assert chunks == ["大谷は", "54本<br>", "です"]
+
+    def test_empty_stream_falls_back(self, ai_service):
+        """断片が 1 つも来なければ同期版と同じ固定文言を返す"""
+        from backend.app.services.analytics import base_engine
+
+        df = pd.DataFrame([{"homerun": 54}])
+        with patch.object(base_engine, "GEMINI_API_KEY", "key"), \
+             patch.object(base_engine, "acall_gemini_stream", _fake_stream([])):
+            chunks = _collect(base_engine.BaseEngine.stream_final_response_with_llm("HR数は？", df))
+
+        assert chunks == ["AIによる回答を生成できませんでした。"]
+
+
+class TestStreamAiResponseForQna:
+    """stream_ai_response_for_qna のテスト"""
+
+    def test_tokens_then_final_answer(self, ai_service):
+        """ナラティブは token を順に返し、最後の final_answer は連結した回答で履歴に保存される"""
+        finalize = MagicMock(side_effect=lambda q, qp, df, s, sid, cu, text: {"answer": text, "isTable": False})
+        with patch.object(ai_service, "_prepare_qna", return_value=_prepared()), \
+             patch.object(ai_service.BaseEngine, "stream_final_response_with_llm", _fake_stream(["a", "b"])), \
+             patch.object(ai_service, "_finalize_narrative_response", finalize):
+            events = _collect(ai_service.stream_ai_response_for_qna("HR数は？", None, "s1"))
+
+        assert [e["type"] for e in events] == ["token", "token", "final_answer"]
+        assert [e["content"] for e in events[:2]] == ["a", "b"]
+        assert events[-1]["answer"] == "ab"
+        assert finalize.call_args.args[4] == "s1"
+
+    def test_early_response_has_no_tokens(self, ai_service):
+        """解析失敗などの早期終了は final_answer だけを返し、LLM ストリームを呼ばない"""
+        stream = MagicMock()
+        early = {"response": {"answer": "質問を理解できませんでした。", "isTable": False}}
+        with patch.object(ai_service, "_prepare_qna", return_value=early), \
+             patch.object(ai_service.BaseEngine, "stream_final_response_with_llm", stream):
+            events = _collect(ai_service.stream_ai_response_for_qna("???"))
+
+        assert events == [{"type": "final_answer", "answer": "質問を理解できませんでした。", "isTable": False}]
+        stream.assert_not_called()
+
+    def test_table_output_skips_narrative(self, ai_service):
+        """表形式の指定ではナラティブを生成せず、表レスポンスを final_answer で返す"""
+        stream = MagicMock()
+        with patch.object(ai_service, "_prepare_qna", return_value=_prepared("table")), \
+             patch.object(ai_service.BaseEngine, "stream_final_response_with_llm", stream), \
+             patch.object(ai_service, "get_conversation_service"):
+            events = _collect(ai_service.stream_ai_response_for_qna("表で"))
+
+        assert len(events) == 1
+        assert events[0]["type"] == "final_answer"
+        assert events[0]["isTable"] is True
+        stream.assert_not_called()
+
+
+class TestPlayerStatsStreamEndpoint:
+    """有効な API ルーター経由で /qa/player-stats-stream に届くことのテスト"""
+
+    def test_ai_router_is_enabled(self):
+        """RAG ルーターと違い、ai_analytics のルーターは api_router に組み込まれている"""
+        import ast
+
+        path = os.path.join(os.path.dirname(__file__), "..", "app", "api", "endpoints", "router.py")
+        with open(path, encoding="utf-8") as f:
+            tree = ast.parse(f.read())
+        included = {
+            node.args[0].id
+            for node in ast.walk(tree)
+            if isinstance(node, ast.Call)
+            and getattr(node.func, "attr", None) == "include_router"
+            and isinstance(node.args[0], ast.Name)
+        }
+        assert "ai_router" in included
+        assert "rag_router" not in included
+
+    def test_sse_tokens(self, ai_service):
+        """/qa/player-stats-stream が token と final_answer を SSE で返す"""
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+        from backend.app.api.rate_limit import limiter
+        from backend.app.api.endpoints import ai_analytics_endpoints
+
+        app = FastAPI()
+        app.state.limiter = limiter
+        app.include_router(ai_analytics_endpoints.router, prefix="/api/v1")
+
+        async def _events(query, season, session_id=None):
+            yield {"type": "token", "content": "54本", "node": "synthesizer"}
+            yield {"type": "final_answer", "answer": "54本", "isTable": False}
+
+        budget = MagicMock()
+        budget.is_budget_exceeded.return_value = False
+        guardrail = MagicMock()
+        guardrail.validate_and_log.return_value = (True, None)
+        with patch.object(ai_analytics_endpoints, "stream_ai_response_for_qna", _events), \
+             patch.object(ai_analytics_endpoints, "get_token_budget_service", return_value=budget), \
+             patch.object(ai_analytics_endpoints, "get_llm_logger"), \
+             patch("backend.app.services.security_guardrail.get_security_guardrail", return_value=guardrail):
+            response = TestClient(app).post(
+                "/api/v1/qa/player-stats-stream",
+                json={"query": "大谷のHR数は？", "session_id": "s1"},
+            )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = [
+            json.loads(line[len("data: "):])
+            for line in response.text.splitlines() if line.startswith("data: ")
+        ]
+        assert [e["type"] for e in events] == ["session_start", "token", "final_answer", "stream_end"]
+        assert events[1]["content"] == "54本"
+        assert events[2]["session_id"] == "s1"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
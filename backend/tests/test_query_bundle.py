@@ -0,0 +1,90 @@
+"""
+query_bundle ユニットテスト
+BigQuery 接続不要: run_query_sync をモックし、SQL の組み立て・列ごとの分配・失敗時の個別実行を検証する。
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def query_bundle():
+    """services.base は import 時に BigQuery クライアントを作るため、クライアント生成だけモックして読み込む"""
+    with patch("google.cloud.bigquery.Client"):
+        from backend.app.services import query_bundle
+    return query_bundle
+
+
+def _selects(qb):
+    return [
+        qb.BundledSelect("monthly", "SELECT game_month FROM t WHERE batter_id = @mlbid", "game_month ASC"),
+        qb.BundledSelect("clutch", "SELECT game_year FROM c WHERE batter_id = @mlbid"),
+    ]
+
+
+class TestBuildBundleSql:
+    """build_bundle_sql のテスト"""
+
+    def test_one_array_column_per_select(self, query_bundle):
+        """SELECT ごとに ARRAY<STRUCT> 列を作り、ORDER BY は ARRAY サブクエリ側に付ける"""
+        sql = query_bundle.build_bundle_sql(_selects(query_bundle))
+
+        assert "ARRAY(SELECT AS STRUCT * FROM (SELECT game_month FROM t WHERE batter_id = @mlbid) " \
+               "ORDER BY game_month ASC) AS monthly" in sql
+        assert "AS clutch" in sql
+        assert sql.count("ARRAY(") == 2
+
+    def test_duplicate_names_rejected(self, query_bundle):
+        """列名が重複するバンドルは ValueError"""
+        select = query_bundle.BundledSelect("a", "SELECT 1 AS x")
+        with pytest.raises(ValueError):
+            query_bundle.build_bundle_sql([select, select])
+
+
+class TestRunBundle:
+    """run_bundle のテスト"""
+
+    def test_demultiplexes_columns(self, query_bundle):
+        """1 行の結果を列ごとに行 dict のリストへ戻す（NaN は None、空配列は空リスト）"""
+        df = pd.DataFrame({
+            "monthly": [np.array([{"game_month": 4, "ops": 0.9}, {"game_month": 5, "ops": np.nan}])],
+            "clutch": [np.array([])],
+        })
+        with patch.object(query_bundle, "run_query_sync", return_value=df) as bq:
+            result = query_bundle.run_bundle(_selects(query_bundle), [("mlbid", "INT64", 1)])
+
+        assert result == {
+            "monthly": [{"game_month": 4, "ops": 0.9}, {"game_month": 5, "ops": None}],
+            "clutch": [],
+        }
+        assert bq.call_count == 1
+
+    def test_falls_back_per_select(self, query_bundle):
+        """バンドルが失敗したら SELECT ごとに実行し、失敗したものだけ None"""
+        def _query(sql, params):
+            if "FROM c" in sql:  # バンドルにも clutch にも含まれる
+                raise RuntimeError("Access denied on c")
+            return pd.DataFrame({"game_month": [4, 5]})
+
+        with patch.object(query_bundle, "run_query_sync", side_effect=_query) as bq:
+            result = query_bundle.run_bundle(_selects(query_bundle))
+
+        assert result == {"monthly": [{"game_month": 4}, {"game_month": 5}], "clutch": None}
+        assert bq.call_count == 3
+        assert "ORDER BY game_month ASC" in bq.call_args_list[1].args[0]
+
+    def test_no_fallback_raises(self, query_bundle):
+        """fallback=False ならバンドルの例外をそのまま投げる"""
+        with patch.object(query_bundle, "run_query_sync", side_effect=RuntimeError("down")):
+            with pytest.raises(RuntimeError):
+                query_bundle.run_bundle(_selects(query_bundle), fallback=False)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,121 @@
+"""
+Unit tests for BaseEngine.plan_query (compiled query plan cache)
+
+同じ形状のパラメータでは SQL 組み立てを省き、値だけを差し替えることを検証します。
+キャッシュ経由の結果が build_dynamic_sql / build_dynamic_statcast_sql の直接呼び出しと一致することも確認します。
+"""
+
+import pytest
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+# プロジェクトルートをPythonパスに追加
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+try:
+    from app.services.analytics.base_engine import BaseEngine, query_shape
+except ImportError:
+    from backend.app.services.analytics.base_engine import BaseEngine, query_shape
+
+
+def _direct(params):
+    """キャッシュを通さない従来経路の結果"""
+    strategy = BaseEngine.determine_query_strategy(params)
+    if strategy == "aggregated_table":
+        sql, sql_params = BaseEngine.build_dynamic_sql(params)
+    else:
+        sql, sql_params = BaseEngine.build_dynamic_statcast_sql(params)
+    return strategy, sql, sql_params
+
+
+# (1 回目, 同じ形状で値だけ違う 2 回目)
+SAME_SHAPE_PAIRS = [
+    (
+        {"query_type": "season_batting", "metrics": ["homerun"], "name": "Shohei Ohtani", "season": 2024},
+        {"query_type": "season_batting", "metrics": ["homerun"], "name": "Aaron Judge", "season": 2023},
+    ),
+    (
+        {"query_type": "season_pitching", "metrics": ["era"], "season": 2024, "order_by": "era", "limit": 10},
+        {"query_type": "season_pitching", "metrics": ["era"], "season": 2022, "order_by": "era", "limit": 5},
+    ),
+    (
+        {"query_type": "batting_splits", "split_type": "risp", "metrics": ["main_stats"], "season": 2024},
+        {"query_type": "batting_splits", "split_type": "risp", "metrics": ["main_stats"], "season": 2021},
+    ),
+    (
+        {"query_type": "batting_splits", "split_type": "pitch_type", "metrics": ["avg"],
+         "name": "Shohei Ohtani", "season": 2024, "pitch_type": ["Slider", "Sweeper"]},
+        {"query_type": "batting_splits", "split_type": "pitch_type", "metrics": ["avg"],
+         "name": "Mookie Betts", "season": 2024, "pitch_type": ["Curveball", "Cutter"]},
+    ),
+    (
+        {"query_type": "batting_splits", "split_type": "risp", "metrics": ["avg"],
+         "name": "Shohei Ohtani", "season": 2024, "inning": [7, 8, 9], "strikes": 2},
+        {"query_type": "batting_splits", "split_type": "risp", "metrics": ["avg"],
+         "name": "Juan Soto", "season": 2023, "inning": [1, 2], "strikes": 1},
+    ),
+]
+
+
+@pytest.fixture(autouse=True)
+def _clear_plan_cache():
+    BaseEngine.clear_query_plan_cache()
+    yield
+    BaseEngine.clear_query_plan_cache()
+
+
+class TestPlanEquivalence:
+    """キャッシュ経由の結果が従来経路と一致することを検証"""
+
+    @pytest.mark.parametrize("first,second", SAME_SHAPE_PAIRS)
+    def test_cached_plan_matches_direct_build(self, first, second):
+        """同形状の 2 回目（キャッシュヒット）も直接組み立てた結果と同一"""
+        assert query_shape(first) == query_shape(second)
+        assert BaseEngine.plan_query(first) == _direct(first)
+        assert BaseEngine.plan_query(second) == _direct(second)
+
+    def test_unbuildable_params_return_none(self):
+        """組み立てられないパラメータは従来どおり SQL が None"""
+        params = {"query_type": "invalid_type", "metrics": ["homerun"]}
+        assert BaseEngine.plan_query(params) == ("aggregated_table", None, {})
+
+
+class TestPlanCacheHits:
+    """SQL 組み立ての省略を検証"""
+
+    def test_repeated_shape_skips_sql_build(self):
+        """同じ形状の 2 回目以降は build_dynamic_sql を呼ばない"""
+        first, second = SAME_SHAPE_PAIRS[0]
+        with patch.object(BaseEngine, "build_dynamic_sql", wraps=BaseEngine.build_dynamic_sql) as build:
+            BaseEngine.plan_query(first)
+            _, _, sql_params = BaseEngine.plan_query(second)
+        assert build.call_count == 1
+        assert sql_params == {"player_name": "Aaron Judge", "season": 2023}
+
+    def test_structural_change_compiles_new_plan(self):
+        """metrics や条件の有無が変われば別プランになる"""
+        base = {"query_type": "season_batting", "metrics": ["homerun"], "season": 2024}
+        variants = [
+            {**base, "metrics": ["homerun", "avg"]},
+            {**base, "name": "Shohei Ohtani"},
+            {**base, "limit": 10},
+            {**base, "season": None},
+        ]
+        shapes = {query_shape(base)} | {query_shape(v) for v in variants}
+        assert len(shapes) == 1 + len(variants)
+
+    def test_single_and_multiple_pitch_types_are_distinct_shapes(self):
+        """球種 1 つと複数では GROUP BY の有無が変わるため別形状"""
+        base = {"query_type": "batting_splits", "split_type": "pitch_type", "metrics": ["avg"], "season": 2024}
+        single = {**base, "pitch_type": ["Slider"]}
+        multiple = {**base, "pitch_type": ["Slider", "Sweeper"]}
+        assert query_shape(single) != query_shape(multiple)
+        assert BaseEngine.plan_query(single) == _direct(single)
+        assert BaseEngine.plan_query(multiple) == _direct(multiple)
+
+    def test_zero_count_is_distinct_from_missing(self):
+        """strikes=0 は「指定あり」として扱われる"""
+        base = {"query_type": "batting_splits", "split_type": "risp", "metrics": ["avg"], "season": 2024}
+        assert query_shape({**base, "strikes": 0}) != query_shape(base)
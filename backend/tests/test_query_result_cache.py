@@ -0,0 +1,236 @@
+"""
+QueryResultCache ユニットテスト
+BigQuery・Redis 接続不要: クライアントをモックに差し替えて L1/L2・single-flight を検証する。
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import asyncio
+import time
+from decimal import Decimal
+
+import pandas as pd
+import redis
+from unittest.mock import MagicMock
+from google.cloud import bigquery
+
+from backend.app.services.bigquery_service import BigQueryExecutor
+from backend.app.services.cache_service import (
+    QueryResultCache,
+    TTLLRUCache,
+    make_query_cache_key,
+    ttl_for_sql,
+    is_cacheable_sql,
+    _serialize_df,
+    _deserialize_df,
+)
+
+
+def _slow_client(df: pd.DataFrame, delay: float = 0.1):
+    """result() が delay 秒かかるクライアント。呼ばれた回数は client.query.call_count で確認する。"""
+    client = MagicMock()
+
+    def _query(sql, job_config=None, timeout=None):
+        job = MagicMock()
+        job.result.side_effect = lambda timeout=None: time.sleep(delay)
+        job.to_dataframe.return_value = df.copy()
+        job.total_bytes_processed = 1000
+        return job
+
+    client.query.side_effect = _query
+    return client
+
+
+def _offline_redis():
+    r = MagicMock()
+    r.get.side_effect = redis.exceptions.ConnectionError("offline")
+    r.setex.side_effect = redis.exceptions.ConnectionError("offline")
+    return r
+
+
+class TestKeyAndTTL:
+    """キー生成と TTL 決定のテスト"""
+
+    def test_whitespace_and_comments_do_not_change_key(self):
+        """空白・行コメントだけの差は同じキーになる"""
+        params = [bigquery.ScalarQueryParameter("season", "INT64", 2025)]
+        k1 = make_query_cache_key("SELECT *\n  FROM t -- memo\nWHERE season = @season", params)
+        k2 = make_query_cache_key("SELECT * FROM t WHERE season = @season", params)
+        assert k1 == k2
+
+    def test_quoted_strings_are_not_normalized(self):
+        """引用符の中の空白・"--" は変えない（別クエリが同じキーにならない）"""
+        k1 = make_query_cache_key("SELECT * FROM t WHERE name = 'a  b'", [])
+        k2 = make_query_cache_key("SELECT * FROM t WHERE name = 'a b'", [])
+        k3 = make_query_cache_key("SELECT * FROM t WHERE note = '--x'", [])
+        k4 = make_query_cache_key("SELECT * FROM t WHERE note = ''", [])
+        assert k1 != k2
+        assert k3 != k4
+
+    def test_params_change_key(self):
+        """パラメータ値が違えば別キー"""
+        sql = "SELECT * FROM t WHERE season = @season"
+        k1 = make_query_cache_key(sql, [bigquery.ScalarQueryParameter("season", "INT64", 2024)])
+        k2 = make_query_cache_key(sql, [bigquery.ScalarQueryParameter("season", "INT64", 2025)])
+        assert k1 != k2
+
+    def test_shortest_family_ttl_wins(self):
+        """複数系統を JOIN する SQL は最短 TTL を採用する"""
+        sql = "SELECT * FROM `p.d.dim_players` JOIN `p.d.view_tbl_batter_rolling_vs_season_stats_7_days` USING (id)"
+        assert ttl_for_sql(sql) == 30 * 60
+
+    def test_log_ttl_matches_whole_table_name(self):
+        """運用ログの短い TTL はテーブル名の完全一致だけ（"log" を含むだけのテーブルは対象外）"""
+        assert ttl_for_sql("SELECT * FROM `p.d.llm_interaction_logs`") == 60
+        assert ttl_for_sql("SELECT * FROM `p.d.mart_pitcher_game_log`") == 6 * 3600
+
+    def test_only_reads_are_cacheable(self):
+        """SELECT / WITH 以外はキャッシュしない"""
+        assert is_cacheable_sql("  -- c\nWITH a AS (SELECT 1) SELECT * FROM a")
+        assert not is_cacheable_sql("INSERT INTO t VALUES (1)")
+
+
+class TestTTLLRUCache:
+    """L1 の TTL / LRU のテスト"""
+
+    def test_expired_entry_is_dropped(self):
+        cache = TTLLRUCache(max_entries=4)
+        cache.set("a", 1, ttl=0.01)
+        time.sleep(0.02)
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_least_recently_used_is_evicted(self):
+        cache = TTLLRUCache(max_entries=2)
+        cache.set("a", 1, ttl=60)
+        cache.set("b", 2, ttl=60)
+        cache.get("a")
+        cache.set("c", 3, ttl=60)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+
+    def test_byte_limit_evicts(self):
+        cache = TTLLRUCache(max_entries=10, max_bytes=100)
+        cache.set("a", 1, ttl=60, size=60)
+        cache.set("b", 2, ttl=60, size=60)
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+
+
+class TestExecutorWithCache:
+    """BigQueryExecutor + QueryResultCache の結合テスト"""
+
+    def test_concurrent_identical_queries_run_once(self):
+        """同一クエリ 50 本の同時実行で BigQuery ジョブは 1 本だけ"""
+        df = pd.DataFrame({"player": ["A", "B"], "ops": [0.9, 0.8]})
+        client = _slow_client(df)
+        cache = QueryResultCache(redis_client=_offline_redis())
+        executor = BigQueryExecutor(max_workers=4, default_timeout=5, bq_client=client, cache=cache)
+        sql = "SELECT * FROM `p.d.mart_batter_season_stats` WHERE season = @season"
+
+        async def _run_many():
+            return await asyncio.gather(
+                *(executor.run_query(sql, [("season", "INT64", 2025)]) for _ in range(50))
+            )
+
+        try:
+            results = asyncio.run(_run_many())
+        finally:
+            executor.shutdown()
+
+        assert client.query.call_count == 1
+        assert all(r.equals(df) for r in results)
+        stats = cache.stats()
+        assert stats["miss"] == 1
+        assert stats["coalesced"] == 49
+
+    def test_second_call_hits_l1_and_counts_bytes_saved(self):
+        """2 回目は L1 ヒットし、節約バイト数が積算される"""
+        df = pd.DataFrame({"x": [1]})
+        client = _slow_client(df, delay=0)
+        cache = QueryResultCache(redis_client=_offline_redis())
+        executor = BigQueryExecutor(max_workers=2, default_timeout=5, bq_client=client, cache=cache)
+        sql = "SELECT x FROM `p.d.fact_batting_stats`"
+        try:
+            executor.run_query_sync(sql)
+            second = executor.run_query_sync(sql)
+        finally:
+            executor.shutdown()
+
+        assert client.query.call_count == 1
+        assert second.equals(df)
+        assert cache.stats()["l1_hit"] == 1
+        assert cache.stats()["bytes_saved"] == 1000
+
+    def test_returned_frames_are_isolated_from_cache(self):
+        """呼び出し側が結果を書き換えてもキャッシュは汚れない"""
+        client = _slow_client(pd.DataFrame({"x": [1]}), delay=0)
+        cache = QueryResultCache(redis_client=_offline_redis())
+        executor = BigQueryExecutor(max_workers=2, default_timeout=5, bq_client=client, cache=cache)
+        sql = "SELECT x FROM `p.d.fact_batting_stats`"
+        try:
+            first = executor.run_query_sync(sql)
+            first["x"] = 99
+            second = executor.run_query_sync(sql)
+        finally:
+            executor.shutdown()
+
+        assert second["x"].tolist() == [1]
+
+    def test_cache_false_bypasses(self):
+        """cache=False は毎回 BigQuery を叩く"""
+        client = _slow_client(pd.DataFrame({"x": [1]}), delay=0)
+        cache = QueryResultCache(redis_client=_offline_redis())
+        executor = BigQueryExecutor(max_workers=2, default_timeout=5, bq_client=client, cache=cache)
+        sql = "SELECT x FROM `p.d.fact_batting_stats`"
+        try:
+            executor.run_query_sync(sql, cache=False)
+            executor.run_query_sync(sql, cache=False)
+        finally:
+            executor.shutdown()
+
+        assert client.query.call_count == 2
+
+    def test_l2_hit_is_promoted_to_l1(self):
+        """Redis にあれば BigQuery を叩かずに返し、L1 にも載る"""
+        df = pd.DataFrame({"x": [1, 2]})
+        client = _slow_client(df, delay=0)
+        store = {}
+        fake_redis = MagicMock()
+        fake_redis.get.side_effect = lambda k: store.get(k)
+        fake_redis.setex.side_effect = lambda k, ttl, v: store.__setitem__(k, v)
+
+        sql = "SELECT x FROM `p.d.fact_batting_stats`"
+        writer = BigQueryExecutor(max_workers=1, default_timeout=5, bq_client=client,
+                                  cache=QueryResultCache(redis_client=fake_redis))
+        reader_cache = QueryResultCache(redis_client=fake_redis)
+        reader = BigQueryExecutor(max_workers=1, default_timeout=5, bq_client=client, cache=reader_cache)
+        try:
+            writer.run_query_sync(sql)
+            result = reader.run_query_sync(sql)
+        finally:
+            writer.shutdown()
+            reader.shutdown()
+
+        assert client.query.call_count == 1
+        assert result["x"].tolist() == [1, 2]
+        assert reader_cache.stats()["l2_hit"] == 1
+        assert len(reader_cache.l1) == 1
+
+    def test_serialization_roundtrip(self):
+        """L2 の Arrow IPC 表現で列型が保たれる（NUMERIC は Decimal のまま）"""
+        df = pd.DataFrame({
+            "i": [1, 2],
+            "f": [0.5, None],
+            "s": ["a", "b"],
+            "n": [Decimal("0.345"), Decimal("1.250")],
+            "d": pd.to_datetime(["2025-04-01", "2025-04-02"]),
+        })
+        restored, nbytes = _deserialize_df(_serialize_df(df, 42))
+        assert nbytes == 42
+        for col in ("i", "f", "d"):
+            assert restored[col].dtype == df[col].dtype
+        assert restored["s"].tolist() == ["a", "b"]
+        assert restored["n"].tolist() == [Decimal("0.345"), Decimal("1.250")]
+        assert isinstance(restored["n"].iloc[0], Decimal)
@@ -0,0 +1,174 @@
+"""
+RateLimiter（GCRA）ユニットテスト
+Redis 接続不要: インメモリ実装の挙動と、Redis 障害時のフォールバック・ミドルウェア連携を検証する。
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import redis
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from backend.app.services import rate_limiter_service
+from backend.app.services.rate_limiter_service import (
+    InMemoryGCRA,
+    Limit,
+    RateLimiter,
+    session_tokens_key,
+)
+
+
+class TestInMemoryGCRA:
+    """インメモリ GCRA のテスト"""
+
+    def test_allows_rate_then_rejects(self):
+        """period 内に rate 件までは通り、超えたら 1 件分の間隔を待たせる"""
+        gcra = InMemoryGCRA()
+        limit = Limit("k", rate=5, period=60)
+        results = [gcra.check([limit]) for _ in range(6)]
+        assert all(r.allowed for r in results[:5])
+        assert not results[5].allowed
+        assert 0 < results[5].retry_after <= 12.0
+
+    def test_rejection_does_not_consume_other_keys(self):
+        """どれか 1 つで弾かれたら他のキーも消費しない"""
+        gcra = InMemoryGCRA()
+        roomy = Limit("global", rate=100, period=60)
+        tight = Limit("session:a", rate=1, period=60)
+        assert gcra.check([roomy, tight]).allowed
+        result = gcra.check([roomy, tight])
+        assert not result.allowed
+        assert result.rejected == tight
+        # global は 1 件分しか進んでいない → 残り 99 件通る
+        assert all(gcra.check([roomy]).allowed for _ in range(99))
+
+    def test_charge_blocks_until_debt_is_repaid(self):
+        """後払いで上限を超えたら cost=0 の確認でも弾かれる"""
+        gcra = InMemoryGCRA()
+        key = session_tokens_key("ip:1.2.3.4")
+        gcra.charge(Limit(key, rate=1000, period=60, cost=500))
+        assert gcra.check([Limit(key, rate=1000, period=60, cost=0)]).allowed
+        gcra.charge(Limit(key, rate=1000, period=60, cost=1000))
+        result = gcra.check([Limit(key, rate=1000, period=60, cost=0)])
+        assert not result.allowed
+        assert result.retry_after > 0
+
+    def test_expired_keys_are_swept(self):
+        """期限切れのキーは後続の check で捨てられる"""
+        gcra = InMemoryGCRA()
+        for i in range(10):
+            gcra.check([Limit(f"k{i}", rate=1000, period=0.001)])
+        asyncio.run(asyncio.sleep(0.01))
+        gcra.check([Limit("new", rate=10, period=60)])
+        assert len(gcra) == 1
+
+
+class TestRedisFallback:
+    """Redis 障害時のフォールバック"""
+
+    def test_redis_error_falls_back_to_memory(self):
+        """Redis に繋がらなくても判定は継続し、しばらく Redis を叩かない"""
+        client = MagicMock()
+        script = MagicMock(side_effect=redis.exceptions.ConnectionError("down"))
+        client.register_script.return_value = script
+        limiter = RateLimiter(backend="redis", redis_client=client)
+        limit = Limit("k", rate=1, period=60)
+
+        first = asyncio.run(limiter.acheck([limit]))
+        second = asyncio.run(limiter.acheck([limit]))
+
+        assert first.allowed
+        assert not second.allowed
+        assert script.call_count == 1
+
+    def test_redis_result_is_mapped(self):
+        """Lua の戻り値（拒否・キー番号・待ち ms）を結果に変換する"""
+        client = MagicMock()
+        client.register_script.return_value = MagicMock(return_value=[0, 2, 1500])
+        limiter = RateLimiter(backend="redis", redis_client=client)
+        limits = [Limit("global", rate=100), Limit("session:x", rate=1)]
+
+        result = limiter.check(limits)
+
+        assert not result.allowed
+        assert result.rejected == limits[1]
+        assert result.retry_after == 1.5
+
+
+def _settings(**overrides):
+    settings = MagicMock()
+    settings.rate_limit_enabled = True
+    settings.rate_limit_global_per_minute = 100
+    settings.rate_limit_session_per_minute = 2
+    settings.rate_limit_session_tokens_per_minute = 1000
+    for k, v in overrides.items():
+        setattr(settings, k, v)
+    return settings
+
+
+def _client(limiter, **overrides):
+    from backend.app.middleware import rate_limit as mw
+
+    async def ok(request):
+        return PlainTextResponse("ok")
+
+    app = Starlette(routes=[
+        Route("/api/v1/players", ok),
+        Route("/api/v1/qa/agentic-stats", ok, methods=["POST"]),
+    ])
+    with patch.object(mw, "get_settings", return_value=_settings(**overrides)), \
+            patch.object(mw, "get_monitoring_service", return_value=MagicMock()), \
+            patch.object(mw, "get_rate_limiter", return_value=limiter):
+        wrapped = mw.RateLimitMiddleware(app)
+    return TestClient(wrapped)
+
+
+class TestMiddleware:
+    """RateLimitMiddleware との結合"""
+
+    def test_session_limit_returns_429_with_retry_after(self):
+        client = _client(RateLimiter())
+        assert client.get("/api/v1/players").status_code == 200
+        assert client.get("/api/v1/players").status_code == 200
+        response = client.get("/api/v1/players")
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) >= 1
+        assert "Per-session" in response.json()["detail"]
+
+    def test_token_debt_blocks_llm_endpoints_only(self):
+        """トークン枠を使い切った識別子は LLM エンドポイントだけ弾かれる"""
+        limiter = RateLimiter()
+        client = _client(limiter, rate_limit_session_per_minute=100)
+        limiter.charge(Limit(session_tokens_key("ip:testclient"), rate=1000, period=60, cost=5000))
+
+        with patch("backend.app.middleware.rate_limit.get_llm_logger", return_value=MagicMock()):
+            response = client.post("/api/v1/qa/agentic-stats")
+        assert response.status_code == 429
+        assert "token" in response.json()["detail"]
+        assert client.get("/api/v1/players").status_code == 200
+
+
+class TestTokenBudgetCharge:
+    """TokenBudgetService からの後払い計上"""
+
+    def test_record_usage_charges_current_identity(self):
+        from backend.app.middleware.request_context import set_rate_limit_identity
+        from backend.app.services.token_budget_service import TokenBudgetService
+
+        limiter = RateLimiter()
+        service = TokenBudgetService()
+        with patch.object(rate_limiter_service, "_rate_limiter", limiter):
+            set_rate_limit_identity("user:abc")
+            try:
+                service.record_usage(10 * service.session_tokens_per_minute, pool="chat")
+            finally:
+                set_rate_limit_identity("")
+
+        key = session_tokens_key("user:abc")
+        assert not limiter.check([Limit(key, rate=service.session_tokens_per_minute, cost=0)]).allowed
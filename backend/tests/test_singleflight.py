@@ -0,0 +1,137 @@
+"""
+SingleFlight ユニットテスト
+同一キーの同時呼び出しが 1 回の実行にまとまることを検証する。
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from backend.app.utils.singleflight import SingleFlight, singleflight
+
+
+class TestAsyncSingleFlight:
+    """async 版のテスト"""
+
+    def test_concurrent_same_key_runs_once(self):
+        """同一キー 20 並列で本体は 1 回だけ実行される"""
+        calls = {"n": 0}
+
+        @singleflight
+        async def fetch(mlbid: int, season: int = 2025):
+            calls["n"] += 1
+            await asyncio.sleep(0.05)
+            return {"mlbid": mlbid}
+
+        async def _run():
+            return await asyncio.gather(*(fetch(660271) for _ in range(10)),
+                                        *(fetch(660271, season=2025) for _ in range(10)))
+
+        results = asyncio.run(_run())
+        assert calls["n"] == 1
+        assert all(r == {"mlbid": 660271} for r in results)
+        assert fetch.flight.coalesced == 19
+
+    def test_different_keys_run_separately(self):
+        calls = []
+
+        @singleflight
+        async def fetch(mlbid: int):
+            calls.append(mlbid)
+            await asyncio.sleep(0.01)
+            return mlbid
+
+        async def _run():
+            return await asyncio.gather(fetch(1), fetch(2))
+
+        assert asyncio.run(_run()) == [1, 2]
+        assert sorted(calls) == [1, 2]
+
+    def test_method_key_ignores_self(self):
+        """別インスタンスからの同一引数呼び出しもまとめる"""
+        calls = {"n": 0}
+
+        class Service:
+            @singleflight
+            async def rankings(self, season: int):
+                calls["n"] += 1
+                await asyncio.sleep(0.02)
+                return season
+
+        async def _run():
+            return await asyncio.gather(Service().rankings(2025), Service().rankings(2025))
+
+        assert asyncio.run(_run()) == [2025, 2025]
+        assert calls["n"] == 1
+
+    def test_exception_is_shared_and_key_released(self):
+        """例外は全員に伝播し、完了後は再実行される"""
+        calls = {"n": 0}
+
+        @singleflight
+        async def fetch(x: int):
+            calls["n"] += 1
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        async def _run():
+            return await asyncio.gather(fetch(1), fetch(1), return_exceptions=True)
+
+        results = asyncio.run(_run())
+        assert all(isinstance(r, ValueError) for r in results)
+        assert calls["n"] == 1
+        asyncio.run(_run())
+        assert calls["n"] == 2
+
+    def test_follower_survives_leader_cancellation(self):
+        """leader 側のキャンセルで相乗り側の結果は失われない"""
+        flight = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.05)
+            return "ok"
+
+        async def _run():
+            leader = asyncio.ensure_future(flight.do("k", work))
+            await asyncio.sleep(0)
+            follower = asyncio.ensure_future(flight.do("k", work))
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            return await follower
+
+        assert asyncio.run(_run()) == "ok"
+
+
+class TestSyncSingleFlight:
+    """sync 版のテスト"""
+
+    def test_threads_same_key_runs_once(self):
+        calls = {"n": 0}
+        lock = threading.Lock()
+
+        @singleflight
+        def profile(mlbid: int, season=None):
+            with lock:
+                calls["n"] += 1
+            time.sleep(0.1)
+            return mlbid
+
+        with ThreadPoolExecutor(max_workers=8) as ex:
+            results = list(ex.map(lambda _: profile(660271), range(8)))
+
+        assert results == [660271] * 8
+        assert calls["n"] == 1
+
+    def test_sync_exception_propagates(self):
+        @singleflight
+        def boom():
+            raise RuntimeError("x")
+
+        with pytest.raises(RuntimeError):
+            boom()
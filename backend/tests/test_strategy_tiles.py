@@ -0,0 +1,157 @@
+"""
+対戦戦略レポートの事前計算タイル ユニットテスト
+BigQuery / GCS 接続不要: run_query をモックし、タイルの形式・ストアの読み出し順・HTTP キャッシュヘッダを検証する。
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.app.services import strategy_tiles
+from backend.app.services.strategy_tiles import (
+    COUNT_MATRIX,
+    HEAT_ZONE,
+    SPRAY,
+    LocalTileBackend,
+    StrategyTileStore,
+    build_tile,
+    decode_tile,
+    encode_tile,
+    tile_key,
+)
+
+
+def _heat_df(player_ids=(1,)) -> pd.DataFrame:
+    rows = []
+    for pid in player_ids:
+        rows += [
+            {"player_id": pid, "row_idx": 0, "col": 0, "xwoba": 0.345, "n": 12},
+            {"player_id": pid, "row_idx": 2, "col": 4, "xwoba": None, "n": 3},
+        ]
+    return pd.DataFrame(rows)
+
+
+class TestTileCodec:
+    """タイルのバイナリ形式のテスト"""
+
+    def test_heat_zone_round_trip(self):
+        """xwOBA は float16（小数 3 桁は保たれる）、サンプルなしは NaN、件数は uint16"""
+        data = build_tile(HEAT_ZONE, _heat_df())
+        arrays = decode_tile(HEAT_ZONE, data)
+
+        assert len(data) == HEAT_ZONE.size == 105
+        assert round(float(arrays["xwoba"][0, 0]), 3) == 0.345
+        assert np.isnan(arrays["xwoba"][2, 4]) and np.isnan(arrays["xwoba"][1, 1])
+        assert arrays["counts"][0, 0] == 12 and arrays["counts"].sum() == 15
+
+    def test_counts_saturate(self):
+        """uint16 を超える件数は上限で飽和する"""
+        data = encode_tile(SPRAY, {"bip_tb": np.array([[70000, 10], [0, 0], [1, 2]])})
+
+        assert decode_tile(SPRAY, data)["bip_tb"].tolist() == [[65535, 10], [0, 0], [1, 2]]
+
+    def test_count_matrix_cells(self):
+        """カウントは 0-0 〜 3-2 の固定順、無いカウントは空"""
+        df = pd.DataFrame({
+            "balls": [0, 3], "strikes": [0, 2], "pitch_type": ["ff", "SL"],
+            "pitch_count": [40, 9], "total_pitches": [80, 20],
+        })
+        arrays = decode_tile(COUNT_MATRIX, build_tile(COUNT_MATRIX, df))
+
+        assert arrays["calls"][0] == b"FF" and arrays["calls"][11] == b"SL"
+        assert arrays["calls"][1] == b""
+        assert arrays["pitches"][11].tolist() == [9, 20]
+
+    def test_bad_header_rejected(self):
+        """別種類・長さ違いのバイト列は ValueError"""
+        with pytest.raises(ValueError):
+            decode_tile(SPRAY, build_tile(HEAT_ZONE, _heat_df()))
+        with pytest.raises(ValueError):
+            decode_tile(HEAT_ZONE, build_tile(HEAT_ZONE, _heat_df())[:-1])
+
+
+class TestStrategyTileStore:
+    """StrategyTileStore のテスト"""
+
+    def test_build_season_then_serve_without_query(self, tmp_path):
+        """日次バッチは種類ごとに 1 クエリで全選手分を保存し、以降の読み出しは BigQuery を叩かない"""
+        store = StrategyTileStore(LocalTileBackend(str(tmp_path)))
+        with patch.object(strategy_tiles, "run_query", new=AsyncMock(return_value=_heat_df((1, 2)))) as bq:
+            written = asyncio.run(store.build_season(2025, [HEAT_ZONE]))
+            tile = asyncio.run(store.get(HEAT_ZONE, 2, 2025))
+
+        assert written == {"heat_zone": 2}
+        assert bq.await_count == 1
+        assert "@player_id" not in bq.await_args.args[0]
+        assert (tmp_path / tile_key(HEAT_ZONE, 1, 2025)).exists()
+        assert tile.precomputed and tile.max_age == strategy_tiles.STRATEGY_TILE_TTL_SEC
+        assert tile.arrays["counts"][0, 0] == 12
+
+    def test_missing_tile_aggregates_on_demand(self, tmp_path):
+        """タイルが無い選手はその場で 1 選手分を集計し、短い TTL でプロセス内にだけ持つ"""
+        store = StrategyTileStore(LocalTileBackend(str(tmp_path)))
+        with patch.object(strategy_tiles, "run_query", new=AsyncMock(return_value=_heat_df())) as bq:
+            first = asyncio.run(store.get(HEAT_ZONE, 1, 2025))
+            second = asyncio.run(store.get(HEAT_ZONE, 1, 2025))
+
+        assert bq.await_count == 1
+        assert "batter = @player_id" in bq.await_args.args[0]
+        assert not first.precomputed and first.max_age == strategy_tiles.STRATEGY_TILE_ON_DEMAND_TTL_SEC
+        assert second is first
+        assert not (tmp_path / tile_key(HEAT_ZONE, 1, 2025)).exists()
+
+    def test_backend_error_falls_back_to_query(self):
+        """保存先の読み出しに失敗してもその場集計で返す"""
+        backend = MagicMock()
+        backend.get.side_effect = RuntimeError("GCS down")
+        store = StrategyTileStore(backend)
+        with patch.object(strategy_tiles, "run_query", new=AsyncMock(return_value=pd.DataFrame())):
+            tile = asyncio.run(store.get(SPRAY, 1, 2025))
+
+        assert tile.arrays["bip_tb"].sum() == 0
+
+
+class TestTileEndpoints:
+    """タイルを返すエンドポイントのテスト"""
+
+    @pytest.fixture
+    def endpoints(self):
+        with patch("google.cloud.bigquery.Client"):
+            from backend.app.api.endpoints import strategy_report_endpoints
+        return strategy_report_endpoints
+
+    def _call(self, endpoints, store, if_none_match=None):
+        from starlette.requests import Request
+        from starlette.responses import Response
+
+        headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+        request = Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+        response = Response()
+        with patch.object(endpoints, "get_strategy_tile_store", return_value=store):
+            body = asyncio.run(endpoints.get_heat_zone_endpoint(request, response, batter_id=1, season=2025))
+        return body, response
+
+    def test_heat_zone_response_and_etag(self, endpoints, tmp_path):
+        """従来と同じ形のレスポンスに Cache-Control / ETag を付け、一致する If-None-Match には 304"""
+        backend = LocalTileBackend(str(tmp_path))
+        backend.put(tile_key(HEAT_ZONE, 1, 2025), build_tile(HEAT_ZONE, _heat_df()))
+        store = StrategyTileStore(backend)
+
+        body, response = self._call(endpoints, store)
+
+        assert body["zone"][0][0] == 0.345 and body["zone"][2][4] is None
+        assert body["counts"][2][4] == 3 and body["total_pa"] == 15
+        assert response.headers["Cache-Control"] == f"private, max-age={strategy_tiles.STRATEGY_TILE_TTL_SEC}"
+
+        not_modified, _ = self._call(endpoints, store, if_none_match=response.headers["ETag"])
+        assert not_modified.status_code == 304
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
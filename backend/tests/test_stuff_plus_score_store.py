@@ -0,0 +1,178 @@
+"""
+Stuff+ 事前計算スコアストアのユニットテスト
+BigQuery 接続不要: ストア・statcast 取得をモックし、集約ロジックを検証する。
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import asyncio
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.app.services.model_registry_service import ModelVersion
+from backend.app.services.stuff_plus_score_store import to_daily_sums
+from backend.app.services.stuff_plus_service import StuffPlusService, score_pitches
+
+FEATURES = ["release_speed", "release_spin_rate"]
+
+
+class _LinearModel:
+    """release_speed に比例する予測を返すだけのモデル"""
+
+    def predict(self, X):
+        return X[:, FEATURES.index("release_speed")] / 1000.0
+
+
+ARTIFACT = {
+    "model": _LinearModel(),
+    "features": FEATURES,
+    "encoded_columns": FEATURES + ["pitch_type_FF", "pitch_type_SL"],
+    "z_score_mu": 0.09,
+    "z_score_sigma": 0.002,
+    "min_pitches": 3,
+}
+
+
+def _pitches() -> pd.DataFrame:
+    """2 日 × 2 球種の投球"""
+    rows = []
+    for day, speeds in [(date(2025, 4, 1), [95, 96, 97, 84]), (date(2025, 5, 2), [94, 98, 85, 86])]:
+        for i, speed in enumerate(speeds):
+            is_ff = speed > 90
+            rows.append({
+                "pitcher": 1, "player_name": "Doe, John",
+                "pitch_type": "FF" if is_ff else "SL",
+                "pitch_name": "4-Seam Fastball" if is_ff else "Slider",
+                "release_speed": float(speed), "release_spin_rate": 2300.0 + i,
+                "plate_z": 2.5, "sz_top": 3.5, "sz_bot": 1.5,
+                "delta_pitcher_run_exp": 0.01 * i,
+                "game_date": day,
+            })
+    return pd.DataFrame(rows)
+
+
+def _service(through, stored: pd.DataFrame, tail: pd.DataFrame) -> StuffPlusService:
+    svc = StuffPlusService.__new__(StuffPlusService)
+    svc.registry = MagicMock()
+    svc.registry.load_model.return_value = (
+        ARTIFACT,
+        ModelVersion(version="v1", model_type="stuff_plus", algorithm="xgboost", training_season=2025),
+    )
+    svc.store = MagicMock()
+    svc.store.scored_through = AsyncMock(return_value=through)
+    svc.store.lookup = AsyncMock(return_value=stored)
+    svc._fetch_pitches = AsyncMock(return_value=tail)
+    return svc
+
+
+class TestDailySums:
+    """to_daily_sums のテスト"""
+
+    def test_sums_per_pitch_and_day(self):
+        """投手 × 球種 × 日 ごとに投球数と合計を持つ"""
+        daily = to_daily_sums(score_pitches(_pitches(), ARTIFACT, "stuff_plus"))
+
+        assert len(daily) == 4
+        ff_day1 = daily[(daily["pitch_name"] == "4-Seam Fastball") & (daily["game_date"] == date(2025, 4, 1))]
+        assert int(ff_day1["pitch_count"].iloc[0]) == 3
+        assert float(ff_day1["velo_sum"].iloc[0]) == pytest.approx(95 + 96 + 97)
+        assert float(ff_day1["pred_run_exp_sum"].iloc[0]) == pytest.approx((95 + 96 + 97) / 1000.0)
+
+    def test_empty(self):
+        """推論対象がなければ空"""
+        assert to_daily_sums(score_pitches(_pitches().iloc[0:0], ARTIFACT, "stuff_plus")).empty
+
+
+class TestPredictSinglePitcher:
+    """ストア引き当てとその場推論の合算のテスト"""
+
+    def test_store_plus_tail_matches_full_inference(self):
+        """ストア（4/1 分）+ 未スコア分（5/2 分）の結果が全件その場推論と一致する"""
+        df = _pitches()
+        full = asyncio.run(_service(None, pd.DataFrame(), df).predict_single_pitcher(1))
+
+        day1 = df[df["game_date"] == date(2025, 4, 1)]
+        day2 = df[df["game_date"] == date(2025, 5, 2)]
+        stored = to_daily_sums(score_pitches(day1, ARTIFACT, "stuff_plus"))
+        svc = _service(date(2025, 4, 1), stored, day2)
+        split = asyncio.run(svc.predict_single_pitcher(1))
+
+        assert split == full
+        assert full["player_name"] == "John Doe"
+        ff = next(p for p in full["pitches"] if p["pitch_name"] == "4-Seam Fastball")
+        assert ff["pitch_count"] == 5
+        assert ff["sufficient_sample"] is True
+        svc.store.lookup.assert_awaited_once()
+        svc._fetch_pitches.assert_awaited_once_with(1, 2025, after=date(2025, 4, 1))
+
+    def test_fully_scored_skips_inference(self):
+        """未スコア分がなければモデルを呼ばない"""
+        stored = to_daily_sums(score_pitches(_pitches(), ARTIFACT, "stuff_plus"))
+        svc = _service(date(2025, 5, 2), stored, _pitches().iloc[0:0])
+
+        with patch("backend.app.services.stuff_plus_service.encode_pitches") as encoder:
+            result = asyncio.run(svc.predict_single_pitcher(1))
+
+        encoder.assert_not_called()
+        assert {p["pitch_name"] for p in result["pitches"]} == {"4-Seam Fastball", "Slider"}
+
+    def test_no_data_raises(self):
+        """ストアにも statcast にもなければ ValueError"""
+        svc = _service(None, pd.DataFrame(), _pitches().iloc[0:0])
+        with pytest.raises(ValueError):
+            asyncio.run(svc.predict_single_pitcher(1))
+
+    def test_monthly_trend_from_sums(self):
+        """月別推移も日別合計から組み立てる"""
+        stored = to_daily_sums(score_pitches(_pitches(), ARTIFACT, "stuff_plus"))
+        svc = _service(date(2025, 5, 2), stored, _pitches().iloc[0:0])
+
+        result = asyncio.run(svc.get_monthly_trend(1))
+
+        assert [m["month"] for m in result["monthly"]] == [4, 5]
+        assert result["monthly"][0]["4-Seam Fastball_count"] == 3
+        assert result["monthly"][1]["total_count"] == 4
+
+
+class TestScoreNewPitches:
+    """日次バッチのテスト"""
+
+    def test_rescores_recent_days(self):
+        """scored_through の数日前から取り直してストアを置き換える"""
+        svc = _service(date(2025, 5, 2), pd.DataFrame(), pd.DataFrame())
+        svc.store.replace_from = MagicMock()
+
+        with patch(
+            "backend.app.services.stuff_plus_service.run_query_arrow",
+            new=AsyncMock(return_value=_pitches()),
+        ) as fetch:
+            result = asyncio.run(svc.score_new_pitches("stuff_plus", 2025, rescore_days=2))
+
+        params = dict((name, value) for name, _, value in fetch.await_args.args[1])
+        assert params["from_date"] == date(2025, 4, 30)
+        daily, model_type, version, season, from_date = svc.store.replace_from.call_args.args
+        assert (model_type, version, season, from_date) == ("stuff_plus", "v1", 2025, date(2025, 4, 30))
+        assert len(daily) == result["rows"] == 4
+
+    def test_new_version_scores_whole_season(self):
+        """未スコアのバージョンはシーズン全体が対象"""
+        svc = _service(None, pd.DataFrame(), pd.DataFrame())
+        svc.store.replace_from = MagicMock()
+
+        with patch(
+            "backend.app.services.stuff_plus_service.run_query_arrow",
+            new=AsyncMock(return_value=_pitches()),
+        ):
+            result = asyncio.run(svc.score_new_pitches("stuff_plus", 2025))
+
+        assert result["from_date"] is None
+        assert svc.store.replace_from.call_args.args[4] is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
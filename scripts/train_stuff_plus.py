@@ -28,6 +28,11 @@ from dotenv import load_dotenv
 # プロジェクトルートをパスに追加（backend.app.* のインポートを解決）
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+from backend.app.services.feature_encoder import (
+    PITCH_CATEGORICAL_COLUMNS,
+    FeatureEncoder,
+    add_pitch_features,
+)
 from backend.app.services.model_registry_service import ModelRegistryService, ModelVersion
 
 # ロギング設定
@@ -61,12 +66,8 @@ PITCHING_PP_FEATURES = STUFF_FEATURES + [
     'release_diff', 'speed_diff', 'prev_pfx_z',
 ]
 
-# モデルごとの One-Hot Encoding 対象カテゴリカルカラム
-CATEGORICAL_COLUMNS = {
-    "stuff_plus": ["pitch_type"],
-    "pitching_plus": ["pitch_type"],
-    "pitching_plus_plus": ["pitch_type", "prev_pitch_type"],
-}
+# モデルごとの One-Hot Encoding 対象カテゴリカルカラム（推論側と共通）
+CATEGORICAL_COLUMNS = PITCH_CATEGORICAL_COLUMNS
 
 # XGBoost ハイパーパラメータ
 XGB_PARAMS = {
@@ -191,22 +192,22 @@ class StuffPlusTrainer:
     # ----------------------------------------------------------
     def train_model(
         self, df: pd.DataFrame, features: List[str], model_name: str
-    ) -> Tuple[xgb.XGBRegressor, pd.DataFrame, pd.DataFrame, Dict[str, float]]:
+    ) -> Tuple[xgb.XGBRegressor, pd.DataFrame, FeatureEncoder, np.ndarray, Dict[str, float]]:
         """
         XGBoost 学習
         Returns:
-            (model, df_clean, df_encoded, metrics)
+            (model, df_clean, encoder, X, metrics)
         """
         logger.info(f"--- Training {model_name} ({len(features)} features) ---")
 
         # カテゴリカルカラムをモデルごとに決定
         cat_cols = CATEGORICAL_COLUMNS.get(model_name, ["pitch_type"])
 
-        # 欠損除去 + One-Hot Encoding
+        # 欠損除去 + One-Hot Encoding（列配置をエンコーダとして確定し、アーティファクトに保存する）
         df_clean = df.dropna(subset=features + ["delta_pitcher_run_exp"]).copy()
-        df_encoded = pd.get_dummies(df_clean[features + cat_cols], columns=cat_cols)
+        encoder = FeatureEncoder.fit(df_clean, features, cat_cols)
 
-        X = df_encoded
+        X = encoder.transform(df_clean)
         y = df_clean["delta_pitcher_run_exp"].values
         logger.info(f"X shape: {X.shape}, y shape: {y.shape}")
 
@@ -216,6 +217,8 @@ class StuffPlusTrainer:
         # XGBoost 学習
         model = xgb.XGBRegressor(**XGB_PARAMS)
         model.fit(X_train, y_train, eval_set=[(X_test, y_test)], verbose=50)
+        # 特徴量重要度を列名で引けるようにする
+        model.get_booster().feature_names = encoder.columns
 
         # Pitch-level 評価
         y_pred = model.predict(X_test)
@@ -231,7 +234,7 @@ class StuffPlusTrainer:
         }
         logger.info(f"{model_name} pitch-level: RMSE={rmse:.4f}, R²={r2:.4f}")
 
-        return model, df_clean, df_encoded, metrics
+        return model, df_clean, encoder, X, metrics
 
 
     # ----------------------------------------------------------
@@ -241,7 +244,7 @@ class StuffPlusTrainer:
         self,
         df_clean: pd.DataFrame,
         model: xgb.XGBRegressor,
-        df_encoded: pd.DataFrame,
+        X: np.ndarray,
         model_name: str,
         metrics: Dict[str, float],
     ) -> Tuple[pd.DataFrame, Dict[str, float]]:
@@ -253,7 +256,7 @@ class StuffPlusTrainer:
         score_col = model_name
 
         # 全データに対する予測
-        df_clean["predicted_run_exp"] = model.predict(df_encoded)
+        df_clean["predicted_run_exp"] = model.predict(X)
 
         # 投手 × 球種ごとに集約
         ranking = (
@@ -313,7 +316,7 @@ class StuffPlusTrainer:
         model: xgb.XGBRegressor,
         ranking: pd.DataFrame,
         features: List[str],
-        encoded_columns: List[str],
+        encoder: FeatureEncoder,
         metrics: Dict[str, float],
         model_name: str,
         season: int,
@@ -334,7 +337,8 @@ class StuffPlusTrainer:
         model_artifact = {
             "model": model,
             "features": features,
-            "encoded_columns": encoded_columns,
+            "encoded_columns": encoder.columns,
+            "encoder": encoder,
             "z_score_mu": metrics["z_score_mu"],
             "z_score_sigma": metrics["z_score_sigma"],
             "min_pitches": self.min_pitches,
@@ -360,7 +364,7 @@ class StuffPlusTrainer:
             "season": season,
             "version": version_str,
             "features": features,
-            "encoded_columns": encoded_columns,
+            "encoded_columns": encoder.columns,
             "xgb_params": XGB_PARAMS,
             "min_pitches": self.min_pitches,
             "metrics": metrics,
@@ -448,37 +452,15 @@ class StuffPlusTrainer:
         # 1. データ取得（1回だけ）
         df = self.fetch_data(season)
 
-        # 特徴量エンジニアリング: plate_z を打者ストライクゾーンで正規化
-        sz_range = df["sz_top"] - df["sz_bot"]
-        df["plate_z_norm"] = np.where(
-            sz_range > 0,
-            (df["plate_z"] - df["sz_bot"]) / sz_range,
-            np.nan,
-        )
+        # 特徴量エンジニアリング（推論・ドリフト監視と共通）
+        #   plate_z_norm:  plate_z を打者ストライクゾーンで正規化
+        #   zone_distance: ゾーン中心 (0, 0.5) からの距離
+        #   release_diff / speed_diff: 前球とのリリースポイント差・球速差（トンネル）
+        # Pitching++ 用の列は全モデル分をまとめて作る（各モデルは自分の特徴量だけ使う）
+        df = add_pitch_features(df, "pitching_plus_plus")
         n_valid = df["plate_z_norm"].notna().sum()
         logger.info(f"plate_z_norm computed: {n_valid:,}/{len(df):,} valid rows")
 
-        # Pitching++ 用特徴量エンジニアリング
-        # P5: zone_distance — ゾーン中心 (0, 0.5) からの距離
-        df["zone_distance"] = np.sqrt(
-            df["plate_x"] ** 2 + (df["plate_z_norm"] - 0.5) ** 2
-        )
-
-        # P1: release_diff — 前球とのリリースポイント差（トンネル距離）
-        df["release_diff"] = np.sqrt(
-            (df["release_pos_x"] - df["prev_release_pos_x"]) ** 2
-            + (df["release_pos_z"] - df["prev_release_pos_z"]) ** 2
-        )
-
-        # P1: speed_diff — 前球との球速差
-        df["speed_diff"] = df["release_speed"] - df["prev_release_speed"]
-
-        # 打席の最初の球（prev = NULL）をデフォルト値で埋める
-        df["release_diff"] = df["release_diff"].fillna(0)       # トンネル無し
-        df["speed_diff"] = df["speed_diff"].fillna(0)            # 球速変化なし
-        df["prev_pfx_z"] = df["prev_pfx_z"].fillna(df["pfx_z"]) # 自球の変化量
-        df["prev_pitch_type"] = df["prev_pitch_type"].fillna("NONE")  # 前球なし
-
         logger.info(
             f"Pitching++ features: zone_distance valid={df['zone_distance'].notna().sum():,}, "
             f"release_diff valid={df['release_diff'].notna().sum():,}"
@@ -495,18 +477,18 @@ class StuffPlusTrainer:
             logger.info(f"{'=' * 30} {model_name} {'=' * 30}")
 
             # 2. モデル学習
-            model, df_clean, df_encoded, metrics = self.train_model(
+            model, df_clean, encoder, X, metrics = self.train_model(
                 df, features, model_name
             )
 
             # 3. ランキング計算
             ranking, metrics = self.compute_rankings(
-                df_clean, model, df_encoded, model_name, metrics
+                df_clean, model, X, model_name, metrics
             )
 
             # 4. GCS + Model Registry 保存
             version = self.save_artifacts(
-                model, ranking, features, df_encoded.columns.tolist(),
+                model, ranking, features, encoder,
                 metrics, model_name, season,
             )
 
@@ -78,6 +78,8 @@ module "backend_cloud_run" {
     BIGQUERY_BATTING_STATS_TABLE_ID  = "fact_batting_stats_with_risp"
     BIGQUERY_PITCHING_STATS_TABLE_ID = "fact_pitching_stats"
     ENVIRONMENT                      = var.environment
+    # 対戦戦略レポートの事前計算タイルはインスタンス間で共有する
+    STRATEGY_TILE_BACKEND            = "gcs"
   }
 
   secrets = {
@@ -208,6 +210,67 @@ resource "google_cloud_scheduler_job" "lad_summary_night_game" {
   depends_on = [google_cloud_run_v2_service_iam_member.lad_scheduler_invoker]
 }
 
+# Stuff+ / Pitching+ 日次スコアリング（night game の statcast 取り込み後 = UTC 12:00）
+# 未スコアの投球を active モデルで推論し stuff_plus_pitch_scores に保存する
+resource "google_cloud_scheduler_job" "stuff_plus_daily_scoring" {
+  project   = var.project_id
+  region    = var.region
+  name      = "stuff-plus-daily-scoring"
+  schedule  = "0 12 * * *"
+  time_zone = "UTC"
+
+  http_target {
+    http_method = "POST"
+    uri         = "${module.backend_cloud_run.service_url}/api/v1/internal/stuff-plus/score"
+
+    # 内部パスの OIDC 許可リスト（WORKFLOWS_SA_EMAIL）に登録済みの Scheduler SA を使う
+    oidc_token {
+      service_account_email = google_service_account.lad_summary_scheduler_sa.email
+      audience              = module.backend_cloud_run.service_url
+    }
+  }
+
+  # シーズン全体の再スコア時は数分かかる
+  attempt_deadline = "1800s"
+
+  retry_config {
+    retry_count          = 1
+    min_backoff_duration = "60s"
+  }
+
+  depends_on = [google_cloud_run_v2_service_iam_member.lad_scheduler_invoker]
+}
+
+# 対戦戦略レポートのタイル日次作成（statcast 取り込み・Stuff+ スコアリングの後 = UTC 12:30）
+# heat-zone / spray / count-matrix を選手 × シーズンごとに集計して GCS に保存する
+resource "google_cloud_scheduler_job" "strategy_tiles_daily_build" {
+  project   = var.project_id
+  region    = var.region
+  name      = "strategy-tiles-daily-build"
+  schedule  = "30 12 * * *"
+  time_zone = "UTC"
+
+  http_target {
+    http_method = "POST"
+    uri         = "${module.backend_cloud_run.service_url}/api/v1/internal/strategy-report/tiles/build"
+
+    # 内部パスの OIDC 許可リスト（WORKFLOWS_SA_EMAIL）に登録済みの Scheduler SA を使う
+    oidc_token {
+      service_account_email = google_service_account.lad_summary_scheduler_sa.email
+      audience              = module.backend_cloud_run.service_url
+    }
+  }
+
+  attempt_deadline = "1800s"
+
+  retry_config {
+    retry_count          = 1
+    min_backoff_duration = "60s"
+  }
+
+  depends_on = [google_cloud_run_v2_service_iam_member.lad_scheduler_invoker]
+}
+
 # Monitoring & Alerting
 module "monitoring" {
   source = "../../modules/monitoring"